@@ -0,0 +1,298 @@
+#Benchmark
+
+#Imports
+import os
+import io
+import gc
+import sys
+import json
+import time
+import platform
+import subprocess
+import tracemalloc
+import warnings
+import contextlib
+import numpy as np
+import pandas as pd
+import pm4py
+from datetime import datetime
+from log_generator import generate_event_table, get_business_process_log_df, get_uipath_log_lines, get_merged_log_df
+from bot_log_parser import uipath_log_to_df
+from log_merger import merge_logs
+from measures import preprocess_lifecycles, preprocess_add_columns, compute_measure
+
+#Benchmark of the parser, the merger and the measures on synthetic logs of several sizes (see log_generator.py)
+#Every stage is timed and its peak memory (of the python allocations, measured with tracemalloc) is recorded.
+#The results are saved as json file, so that the results of different versions of the code can be compared
+benchmark_format_version = 1
+#The numbers of events of the generated logs
+benchmark_scales = [10**3, 10**4, 10**5]
+#The twelve measures of the paper
+benchmark_measure_names = ['relative_fails', 'exception_time_impact', 'exception_time_variance', 'relative_execution_time',
+                           'execution_time_variance', 'bot_human_handover_count', 'bot_human_handover_impact',
+                           'bot_human_handover_variance', 'relative_case_fails', 'automation_rate',
+                           'case_activities_execution_time', 'case_activities_execution_time_variance']
+#The largest number of events a stage is run for. merge_logs looks up the bot events of every business process event
+#and copies the merged log for every bot job, so larger logs are merged by the generator instead
+benchmark_stage_max_events = {'uipath_log_to_df': 10**6, 'merge_logs': 10**4}
+#The attributes of the generated logs
+benchmark_attributes = {'attr_activity': 'concept:name', 'attr_timestamp': 'time:timestamp', 'attr_traceID': 'caseId',
+                        'attr_success': 'success', 'attr_bot': 'bot', 'attr_eventid': 'eventId',
+                        'attr_lifecycle': 'lifecycle:transition'}
+
+def run_benchmark_stage(stage, function, arguments, measure_memory=True, keyword_arguments=None):
+    """
+    Runs one stage of the benchmark, i.e. calls the function with the arguments and measures its time and
+    peak memory. The output and the warnings of the function are suppressed
+
+    Parameters
+    -----------
+    stage
+        The name of the stage (e.g. 'merge_logs')
+    function
+        The function of the stage
+    arguments
+        The list of the arguments of the function
+    measure_memory
+        Whether the peak memory should be measured or not. tracemalloc slows down the stage, so the times of
+        benchmarks with and without measuring the memory should not be compared
+    keyword_arguments
+        The dictionary of the keyword arguments of the function
+
+    Returns
+    -----------
+    result, record
+        The result of the function and the record of the stage (name, seconds and peak memory in MB)
+    """
+    if keyword_arguments is None:
+        keyword_arguments = {}
+    gc.collect()
+    if measure_memory:
+        tracemalloc.start()
+    start_time = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()), warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        result = function(*arguments, **keyword_arguments)
+    seconds = time.perf_counter() - start_time
+    peak_memory = None
+    if measure_memory:
+        peak_memory = tracemalloc.get_traced_memory()[1] / 2**20
+        tracemalloc.stop()
+    return result, {'stage': stage, 'seconds': round(seconds, 6),
+                    'peak_memory_mb': None if peak_memory is None else round(peak_memory, 3)}
+def prepare_bot_log_for_merge(df_log_bot):
+    """
+    Renames the columns of a parsed bot log like log_merger.py does after loading the parsed xes file
+    """
+    df_log_bot = df_log_bot.rename(columns={'case:caseId': 'botCaseId'})
+    df_log_bot['bot'] = True
+    return df_log_bot
+def merge_generated_logs(df_log_business_process, df_log_bot):
+    """
+    Merges a generated business process log with its parsed bot log (see log_merger.py)
+    """
+    df_merged_log = merge_logs(df_log_business_process, prepare_bot_log_for_merge(df_log_bot), 'RPA_Exec_Nr',
+                               'Ordnungsbegriff', show_progress=False)
+    df_merged_log['time:timestamp'] = pd.to_datetime(df_merged_log['time:timestamp'], format='mixed')
+    return df_merged_log
+def parse_generated_bot_log(bot_log_lines):
+    """
+    Parses the lines of a generated UiPath bot log with the configuration of the log of the company (see bot_log_parser.py)
+    """
+    return uipath_log_to_df(bot_log_lines, 'Ordnungsbegriff', 'message', 'timeStamp', 'level', ['Info', ''], "start",
+                            'fingerprint', 'jobId', 'robotName', 'processName', 'processVersion', 'level', "Error", False,
+                            attr_workflow='fileName')
+def benchmark_scale(no_of_events, events_per_case=50, generator_parameters=None, stage_max_events=None,
+                    measure_memory=True):
+    """
+    Generates a log with the given number of events and benchmarks all stages on it
+
+    Parameters
+    -----------
+    no_of_events
+        The number of events of the generated log
+    events_per_case
+        The mean number of events of a case
+    generator_parameters
+        Further parameters of generate_event_table (e.g. {'bot_share': 0.8, 'failure_rate': 0.1})
+    stage_max_events
+        The largest number of events a stage is run for (see benchmark_stage_max_events)
+    measure_memory
+        Whether the peak memory of the stages should be measured or not
+
+    Returns
+    -----------
+    records
+        The records of the stages (skipped stages have the status 'skipped')
+    """
+    if generator_parameters is None:
+        generator_parameters = {}
+    if stage_max_events is None:
+        stage_max_events = benchmark_stage_max_events
+    attr_activity = benchmark_attributes['attr_activity']
+    attr_traceID = benchmark_attributes['attr_traceID']
+    attr_success = benchmark_attributes['attr_success']
+    attr_bot = benchmark_attributes['attr_bot']
+    attr_eventid = benchmark_attributes['attr_eventid']
+    attr_timestamp = benchmark_attributes['attr_timestamp']
+    no_of_cases = max(1, no_of_events // events_per_case)
+    records = []
+
+    df_events, record = run_benchmark_stage('generate_event_table', generate_event_table,
+                                            [no_of_events, no_of_cases], measure_memory, generator_parameters)
+    if df_events is None:
+        print("no log could be generated with", no_of_events, "events")
+        return records
+    add_stage_record(records, record, no_of_events, no_of_cases)
+    df_log_business_process = get_business_process_log_df(df_events)
+
+    #merge_logs is only run on the parsed bot log
+    df_log_bot = None
+    if no_of_events <= stage_max_events.get('uipath_log_to_df', no_of_events):
+        bot_log_lines = get_uipath_log_lines(df_events)
+        df_log_bot, record = run_benchmark_stage('uipath_log_to_df', parse_generated_bot_log, [bot_log_lines],
+                                                 measure_memory)
+        add_stage_record(records, record, no_of_events, no_of_cases)
+        del bot_log_lines
+    else:
+        add_stage_record(records, {'stage': 'uipath_log_to_df'}, no_of_events, no_of_cases, 'skipped')
+    if df_log_bot is not None and no_of_events <= stage_max_events.get('merge_logs', no_of_events):
+        df_merged_log, record = run_benchmark_stage('merge_logs', merge_generated_logs,
+                                                    [df_log_business_process, df_log_bot], measure_memory)
+        add_stage_record(records, record, no_of_events, no_of_cases)
+    else:
+        add_stage_record(records, {'stage': 'merge_logs'}, no_of_events, no_of_cases, 'skipped')
+        #the generator builds the same merged log without merge_logs
+        df_merged_log = get_merged_log_df(df_events)
+    del df_events, df_log_business_process
+
+    (df_log, dfg), record = run_benchmark_stage('preprocess_lifecycles', preprocess_lifecycles,
+                                                [df_merged_log, benchmark_attributes['attr_lifecycle'], attr_timestamp,
+                                                 False], measure_memory)
+    add_stage_record(records, record, no_of_events, no_of_cases)
+    del df_merged_log
+    df_log, record = run_benchmark_stage('preprocess_add_columns', preprocess_add_columns,
+                                         [df_log, attr_traceID, attr_timestamp, attr_activity, attr_eventid, attr_bot],
+                                         measure_memory)
+    add_stage_record(records, record, no_of_events, no_of_cases)
+
+    for measure_name in benchmark_measure_names:
+        result, record = run_benchmark_stage(measure_name, compute_measure,
+                                             [df_log, measure_name, attr_activity, attr_success, attr_bot, attr_traceID,
+                                              2, False], measure_memory)
+        add_stage_record(records, record, no_of_events, no_of_cases)
+    return records
+def add_stage_record(records, record, no_of_events, no_of_cases, status='ok'):
+    """
+    Adds the record of a stage with the size of the log and the status ('ok' or 'skipped') to the records
+    and prints it out
+    """
+    record = {'stage': record['stage'], 'scale': no_of_events, 'events': no_of_events, 'cases': no_of_cases,
+              'seconds': record.get('seconds'), 'peak_memory_mb': record.get('peak_memory_mb'), 'status': status}
+    records.append(record)
+    if status == 'ok':
+        print(no_of_events, "events:", record['stage'], record['seconds'], "s", record['peak_memory_mb'], "MB")
+    else:
+        print(no_of_events, "events:", record['stage'], status)
+def get_code_version():
+    """
+    Gets the git commit of the code (with '-dirty' if the code has uncommitted changes), None outside of a git repository
+    """
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True).stdout.strip()
+        changes = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], capture_output=True,
+                                 text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return commit + ("-dirty" if changes else "")
+def run_benchmarks(scales=None, events_per_case=50, generator_parameters=None, stage_max_events=None,
+                   measure_memory=True, output_dir="results/benchmarks/"):
+    """
+    Benchmarks all stages on generated logs of several sizes and saves the results as json file
+    ('benchmark_<date>_<time>.json'), which also contains the code version, the versions of the libraries and the
+    parameters of the benchmark
+
+    Parameters
+    -----------
+    scales
+        The numbers of events of the generated logs (see benchmark_scales)
+    events_per_case
+        The mean number of events of a case
+    generator_parameters
+        Further parameters of generate_event_table (e.g. {'bot_share': 0.8, 'failure_rate': 0.1})
+    stage_max_events
+        The largest number of events a stage is run for (see benchmark_stage_max_events)
+    measure_memory
+        Whether the peak memory of the stages should be measured or not
+    output_dir
+        The folder the results are saved to (None if the results should not be saved)
+
+    Returns
+    -----------
+    benchmark
+        The results as dictionary
+    """
+    if scales is None:
+        scales = benchmark_scales
+    if stage_max_events is None:
+        stage_max_events = benchmark_stage_max_events
+    benchmark = {'format_version': benchmark_format_version,
+                 'created': datetime.now().isoformat(timespec='seconds'),
+                 'code_version': get_code_version(),
+                 'environment': {'python': platform.python_version(), 'platform': platform.platform(),
+                                 'cpus': os.cpu_count(), 'numpy': np.__version__, 'pandas': pd.__version__,
+                                 'pm4py': pm4py.__version__},
+                 'parameters': {'scales': list(scales), 'events_per_case': events_per_case,
+                                'generator_parameters': generator_parameters or {},
+                                'stage_max_events': stage_max_events, 'measure_memory': measure_memory},
+                 'results': []}
+    for no_of_events in scales:
+        benchmark['results'].extend(benchmark_scale(no_of_events, events_per_case, generator_parameters,
+                                                    stage_max_events, measure_memory))
+    if output_dir is not None:
+        os.makedirs(output_dir, exist_ok=True)
+        path = os.path.join(output_dir, "benchmark_" + datetime.now().strftime("%Y%m%d_%H%M%S") + ".json")
+        with open(path, 'w') as file:
+            json.dump(benchmark, file, indent=2)
+        print("Saved benchmark results to", path)
+    return benchmark
+def load_benchmark_results(path):
+    """
+    Loads the results of a saved benchmark as dataframe (one row per scale and stage)
+    """
+    with open(path, 'r') as file:
+        benchmark = json.load(file)
+    return pd.DataFrame(benchmark['results'])
+def compare_benchmarks(path_baseline, path_current):
+    """
+    Compares the results of two saved benchmarks (e.g. of two versions of the code)
+
+    Parameters
+    -----------
+    path_baseline
+        The path to the json file of the baseline benchmark
+    path_current
+        The path to the json file of the current benchmark
+
+    Returns
+    -----------
+    df_comparison
+        The seconds and peak memory of both benchmarks for every scale and stage they have in common and
+        the ratios current/baseline (e.g. a time ratio of 0.5 means the stage takes half the time)
+    """
+    columns = ['scale', 'stage', 'seconds', 'peak_memory_mb']
+    df_baseline = load_benchmark_results(path_baseline)
+    df_current = load_benchmark_results(path_current)
+    df_baseline = df_baseline.loc[df_baseline['status'] == 'ok', columns]
+    df_current = df_current.loc[df_current['status'] == 'ok', columns]
+    df_comparison = df_baseline.merge(df_current, on=['scale', 'stage'], suffixes=('_baseline', '_current'))
+    df_comparison['time_ratio'] = df_comparison['seconds_current'] / df_comparison['seconds_baseline']
+    df_comparison['memory_ratio'] = df_comparison['peak_memory_mb_current'] / df_comparison['peak_memory_mb_baseline']
+    return df_comparison
+
+
+if __name__ == "__main__":
+    #Benchmark all stages on logs with 10**3, 10**4 and 10**5 events
+    #(e.g. 'python3 benchmark.py 1000 10000 100000 1000000' for other scales)
+    scales = [int(scale) for scale in sys.argv[1:]] if len(sys.argv) > 1 else benchmark_scales
+    run_benchmarks(scales)
@@ -7,16 +7,196 @@ import numpy as np
 from datetime import timezone, datetime, timedelta
 import pytz
 import json
+import re
 from os import listdir
 from pm4py.objects.log.exporter.xes import exporter as xes_exporter
 from pm4py.objects.conversion.log import converter as log_converter
 from pm4py.visualization.dfg import visualizer as dfg_visualization
+from profiling import profiled_stage
+from event_store import insert_log_df
+from deduplication import deduplicate_events
+
+#Mining of activity templates from free-text log messages
+#Tokens that are masked before the messages are mined, since they vary between otherwise identical messages
+#(the order matters: GUIDs and paths can contain numbers)
+masking_patterns = [
+    ('<GUID>', re.compile(r'^[({]?[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}[)}]?[.,;:]?$')),
+    ('<PATH>', re.compile(r'^(?:[a-zA-Z]:)?(?:[\\/][^\\/]+)+[\\/]?$|^[^\\/\s]+(?:[\\/][^\\/]+)+$|^[^\s]+\.(?:pdf|xlsx?|csv|txt|docx?|xml|json|zip|png|jpe?g)$', re.IGNORECASE)),
+    ('<NUM>', re.compile(r'^[-+]?(?:\d+[.,:/])*\d+[.,;:]?$|^0x[0-9a-fA-F]+$')),
+]
+wildcard_token = '<*>'
+def mask_log_message(message):
+    """
+    Splits a log message into tokens and masks the tokens that are GUIDs, paths/file names or numbers
+
+    Parameters
+    -----------
+    message
+        The log message (e.g. "Lies 2 Personen aus")
+
+    Returns
+    -----------
+    tokens
+        The tokens of the message, e.g. ['Lies', '<NUM>', 'Personen', 'aus']
+    """
+    tokens = []
+    for token in str(message).split():
+        for mask, pattern in masking_patterns:
+            if pattern.match(token):
+                token = mask
+                break
+        tokens.append(token)
+    return tokens
+def create_template_miner(depth=4, similarity_threshold=0.4, max_children=100):
+    """
+    Creates the state of a log template miner. The miner follows the Drain approach: the messages are sorted into a
+    parse tree of fixed depth (first by the number of tokens, then by their first tokens) and in the leaf of the tree
+    the most similar template is searched. Thus every message is compared to a few templates only
+
+    Parameters
+    -----------
+    depth
+        The depth of the parse tree (including the root and the leaf layer), i.e. depth-2 tokens are used for the
+        inner nodes of the tree
+    similarity_threshold
+        The minimum share of equal tokens, so that a message is assigned to an existing template.
+        Otherwise a new template is created
+    max_children
+        The maximum number of children of an inner node. Further tokens are sorted into a wildcard child
+
+    Returns
+    -----------
+    template_miner
+        The state of the miner (a dictionary containing the parse tree and the templates)
+    """
+    return {'depth': depth, 'similarity_threshold': similarity_threshold, 'max_children': max_children,
+            'root': {}, 'templates': []}
+def get_template_similarity(template_tokens, tokens):
+    """
+    Calculates the share of tokens of a message that are equal to the tokens of a template (of the same length)
+    and the number of wildcards in the template
+
+    Parameters
+    -----------
+    template_tokens
+        The tokens of the template
+    tokens
+        The tokens of the message
+
+    Returns
+    -----------
+    similarity, no_of_wildcards
+        The share of equal tokens (wildcards do not count as equal) and the number of wildcards in the template
+    """
+    no_of_equal_tokens = 0
+    no_of_wildcards = 0
+    for template_token, token in zip(template_tokens, tokens):
+        if template_token == wildcard_token:
+            no_of_wildcards = no_of_wildcards + 1
+        elif template_token == token:
+            no_of_equal_tokens = no_of_equal_tokens + 1
+    return no_of_equal_tokens / max(len(tokens), 1), no_of_wildcards
+def add_log_message_to_template_miner(template_miner, message):
+    """
+    Assigns a log message to a template of the miner. If no template is similar enough, a new template is created.
+    Otherwise the tokens of the template that differ from the message are replaced by wildcards
+
+    Parameters
+    -----------
+    template_miner
+        The state of the miner (see create_template_miner), which is updated
+    message
+        The log message
+
+    Returns
+    -----------
+    template_id
+        The id of the template the message was assigned to
+    """
+    tokens = mask_log_message(message)
+
+    #first layer: number of tokens, then the first tokens of the message
+    node = template_miner['root'].setdefault(len(tokens), {})
+    for token in tokens[:template_miner['depth'] - 2]:
+        children = node.setdefault('children', {})
+        if token not in children:
+            if any(character.isdigit() for character in token) or len(children) >= template_miner['max_children']:
+                token = wildcard_token
+        node = children.setdefault(token, {})
+    template_ids = node.setdefault('template_ids', [])
+
+    #leaf: search the most similar template (with as few wildcards as possible)
+    best_template = None
+    best_similarity = (-1, 0)
+    for template_id in template_ids:
+        template = template_miner['templates'][template_id]
+        similarity, no_of_wildcards = get_template_similarity(template['tokens'], tokens)
+        if (similarity, -no_of_wildcards) > best_similarity:
+            best_template = template
+            best_similarity = (similarity, -no_of_wildcards)
+
+    if best_template is None or best_similarity[0] < template_miner['similarity_threshold']:
+        template_id = len(template_miner['templates'])
+        template_miner['templates'].append({'template_id': template_id, 'tokens': tokens, 'size': 1})
+        template_ids.append(template_id)
+        return template_id
+
+    best_template['tokens'] = [template_token if template_token == token else wildcard_token
+                               for template_token, token in zip(best_template['tokens'], tokens)]
+    best_template['size'] = best_template['size'] + 1
+    return best_template['template_id']
+def get_template_name(template_miner, template_id):
+    """
+    Gets the name of a template, i.e. its tokens joined by spaces (e.g. "Lies <NUM> Personen aus")
+
+    Parameters
+    -----------
+    template_miner
+        The state of the miner (see create_template_miner)
+    template_id
+        The id of the template
+
+    Returns
+    -----------
+    template_name
+        The name of the template
+    """
+    return " ".join(template_miner['templates'][template_id]['tokens'])
+@profiled_stage('mine_activity_templates', rows_argument='messages')
+def mine_activity_templates(messages, template_miner=None):
+    """
+    Maps every log message to an activity template in one pass over the messages.
+    The names of the templates are taken after all messages were added, since a template becomes more general
+    (more wildcards) when further messages are assigned to it
+
+    Parameters
+    -----------
+    messages
+        The log messages (e.g. a column of a dataframe)
+    template_miner
+        The state of a miner (see create_template_miner). If None, a new miner with the standard values is created
+
+    Returns
+    -----------
+    template_ids, template_names
+        The id and the name of the template of every message
+    """
+    if template_miner is None:
+        template_miner = create_template_miner()
+    template_ids = [add_log_message_to_template_miner(template_miner, message) for message in messages]
+    template_names_by_id = [get_template_name(template_miner, template_id)
+                            for template_id in range(len(template_miner['templates']))]
+    template_names = [template_names_by_id[template_id] for template_id in template_ids]
+    return template_ids, template_names
 
 #UiPath to .xes
 #Define parsing function
+@profiled_stage('uipath_log_to_df', rows_argument='log_lines')
 def uipath_log_to_df(log_lines, connecting_attribute, attr_conceptName, attr_timestamp, attr_lifecycle, valuesLifecycle,
                      standardValueLifecycle, attr_eventId, attr_caseId, attr_resource, attr_botProcessName,
-                     attr_botProcessVersionNumber, attr_succcess, valueNoSuccess, traceLevelOnly):
+                     attr_botProcessVersionNumber, attr_succcess, valueNoSuccess, traceLevelOnly, mineActivityTemplates=False,
+                     attr_workflow=None, event_store=None, event_store_log='bot_log', show_progress=True,
+                     deduplication=None):
     """
     Converts a UiPath log to a dataframe.
     The function is aborted, if one of the attributes given as inputs is not found in the log.
@@ -55,7 +235,23 @@ def uipath_log_to_df(log_lines, connecting_attribute, attr_conceptName, attr_tim
     traceLevelOnly
         A boolean that indicates if only trace level log entries should be considered
         or others as well (e.g. Info or Error level log entries)
-    
+    mineActivityTemplates
+        A boolean that indicates if the values of attr_conceptName (e.g. free-text messages) should be collapsed into
+        activity templates (see mine_activity_templates). If yes, concept:name contains the name of the template,
+        the original value is kept in the column 'activityMessage' and the id of the template in 'activityTemplateId'
+    attr_workflow
+        The name of the attribute whose value is used for the workflow attribute in the resulting xes log, i.e. the
+        workflow (file) that produced the log entry (e.g. 'fileName'). If None, no workflow attribute is added
+    event_store
+        A connection to an event store (see event_store.py). If given, the parsed events are also inserted into
+        the event store (appended to the log event_store_log)
+    event_store_log
+        The name of the log in the event store (e.g. 'company_bot')
+    show_progress
+        Whether the status messages should be printed out or not (e.g. off for small batches of a live log)
+    deduplication
+        The state of a deduplication (see deduplication.py). If given, the events whose fingerprint (eventId) was
+        parsed before, e.g. in an overlapping export of the log, are removed
 
     Returns
     -----------
@@ -79,6 +275,8 @@ def uipath_log_to_df(log_lines, connecting_attribute, attr_conceptName, attr_tim
     column_names = df_log.columns
     attributes_not_found = {connecting_attribute, attr_conceptName, attr_timestamp, attr_eventId, attr_caseId, attr_resource,
                            attr_botProcessName, attr_botProcessVersionNumber, attr_lifecycle, attr_succcess}
+    if attr_workflow is not None:
+        attributes_not_found.add(attr_workflow)
     for column in column_names:
         #Check if name of attribute is a substring in the original column name (which includes the "."-separated json path)
         if connecting_attribute in column:
@@ -105,6 +303,9 @@ def uipath_log_to_df(log_lines, connecting_attribute, attr_conceptName, attr_tim
         elif attr_botProcessVersionNumber in column:
             df_log.rename(columns={column: 'botProcessVersionNumber'}, inplace=True)
             attributes_not_found.discard(attr_botProcessVersionNumber)
+        elif attr_workflow is not None and attr_workflow in column:
+            df_log.rename(columns={column: 'workflow'}, inplace=True)
+            attributes_not_found.discard(attr_workflow)
         
         if attr_lifecycle in column:
             #the column name containing the infos for the lifecycle attribute
@@ -118,7 +319,7 @@ def uipath_log_to_df(log_lines, connecting_attribute, attr_conceptName, attr_tim
     if len(attributes_not_found) > 0:
         print("The following attributes were not found in the log, function is aborted: ", attributes_not_found)
         return
-    else:
+    elif show_progress:
         print("Found all attributes in the log that were provided as inputs")
             
     df_log['success'] = df_log.apply(lambda x: False if x[success_col] == valueNoSuccess else True, axis=1)
@@ -133,96 +334,115 @@ def uipath_log_to_df(log_lines, connecting_attribute, attr_conceptName, attr_tim
     else:
         df_log.drop([lifecycle_col, success_col], axis=1, inplace=True)
 
-    df_log = df_log[['case:caseId', 'concept:name', 'time:timestamp', 'eventId', 'org:resource', 'botProcessName',
-                     'botProcessVersionNumber', 'success', 'lifecycle:transition', connecting_attribute]]
+    output_columns = ['case:caseId', 'concept:name', 'time:timestamp', 'eventId', 'org:resource', 'botProcessName',
+                      'botProcessVersionNumber', 'success', 'lifecycle:transition', connecting_attribute]
+    if attr_workflow is not None:
+        output_columns.append('workflow')
+    if mineActivityTemplates:
+        template_ids, template_names = mine_activity_templates(df_log['concept:name'])
+        df_log['activityMessage'] = df_log['concept:name']
+        df_log['activityTemplateId'] = template_ids
+        df_log['concept:name'] = template_names
+        output_columns = output_columns + ['activityMessage', 'activityTemplateId']
+    df_log = df_log[output_columns]
+    if deduplication is not None:
+        df_log = deduplicate_events(deduplication, df_log, 'eventId')
+    if event_store is not None:
+        insert_log_df(event_store, event_store_log, df_log, 'case:caseId', attr_connecting=connecting_attribute)
         
     return df_log
 
-#Parse UiPath log from BPI challenge (Bot_Log_UiPath.txt)
-path_uiPath_bot_log = "data/BPI_Bot_Log_UiPath.txt"
-
-file = open(path_uiPath_bot_log, 'r')
-lines = file.read().splitlines()
-file.close()
-
-connecting_attribute = 'businessActivityId'
-attr_conceptName = 'DisplayName'
-attr_timestamp = 'timeStamp'
-attr_lifecycle = 'State'
-valuesLifecycle = ['Executing', 'Closed']
-standardValueLifecycle = "complete"
-attr_eventId = 'fingerprint'
-attr_caseId = 'jobId'
-attr_resource = 'robotName'
-attr_botProcessName = 'processName'
-attr_botProcessVersionNumber = 'processVersion'
-attr_succcess = 'State'
-valueNoSuccess = "Faulted"
-traceLevelOnly = True
-
-df_log = uipath_log_to_df(lines, connecting_attribute, attr_conceptName, attr_timestamp, attr_lifecycle, valuesLifecycle, standardValueLifecycle, attr_eventId, attr_caseId,
-                          attr_resource, attr_botProcessName, attr_botProcessVersionNumber, attr_succcess, valueNoSuccess, traceLevelOnly)
-
-parameters = {log_converter.Variants.TO_EVENT_LOG.value.Parameters.CASE_ID_KEY: 'case:caseId'}
-log = log_converter.apply(df_log, parameters=parameters, variant=log_converter.Variants.TO_EVENT_LOG)
-
-xes_exporter.apply(log, 'results/BPI_Bot_Log_UiPath_Parsed.xes')
-
-#Display log as directly follows graph
-dfg, start_activities, end_activities = pm4py.discover_dfg(log)
-#pm4py.view_dfg(dfg, start_activities, end_activities)
-pm4py.save_vis_dfg(dfg,start_activities, end_activities,"results/graphs/" + 'dfg_BPI_Bot_Log_UiPath_Parsed.svg')
-
-
-#Parse UiPath real world log from company
-path_uiPath_bot_log = "data/Company_Bot_Log_UiPath.txt"
-
-file = open(path_uiPath_bot_log, 'r')
-lines = file.read().splitlines()
-file.close()
-
-connecting_attribute = 'Ordnungsbegriff'
-attr_conceptName = 'message'
-attr_timestamp = 'timeStamp'
-attr_lifecycle = 'level'
-valuesLifecycle = ['Info', '']
-standardValueLifecycle = "start"
-attr_eventId = 'fingerprint'
-attr_caseId = 'jobId'
-attr_resource = 'robotName'
-attr_botProcessName = 'processName'
-attr_botProcessVersionNumber = 'processVersion'
-attr_succcess = 'level'
-valueNoSuccess = "Error"
-traceLevelOnly = False
-
-df_log = uipath_log_to_df(lines, connecting_attribute, attr_conceptName, attr_timestamp, attr_lifecycle, valuesLifecycle,standardValueLifecycle, attr_eventId, attr_caseId,
-                          attr_resource, attr_botProcessName, attr_botProcessVersionNumber, attr_succcess, valueNoSuccess, traceLevelOnly)
-
-parameters = {log_converter.Variants.TO_EVENT_LOG.value.Parameters.CASE_ID_KEY: 'case:caseId'}
-log = log_converter.apply(df_log, parameters=parameters, variant=log_converter.Variants.TO_EVENT_LOG)
-
-xes_exporter.apply(log, 'results/Company_Bot_Log_UiPath_Parsed.xes')
-
-#Display log as directly follows graph
-dfg, start_activities, end_activities = pm4py.discover_dfg(log)
-#pm4py.view_dfg(dfg, start_activities, end_activities)
-pm4py.save_vis_dfg(dfg,start_activities, end_activities,"results/graphs/" + 'dfg_Company_Bot_Log_UiPath_Parsed.svg')
-
-
-#BluePrism to .xes
-folderPath_bluePrism_bot_logs = "data/BluePrism_Logs/"
-
-attr_conceptName = 'StageName'
-attr_timestamp_start = 'Resource Start'
-attr_timestamp_end = 'Resource End'
-attr_eventId = 'StageID'
-attr_botProcessName = 'Process'
-attr_succcess = 'Result'
+if __name__ == "__main__":
+    #Parse UiPath log from BPI challenge (Bot_Log_UiPath.txt)
+    path_uiPath_bot_log = "data/BPI_Bot_Log_UiPath.txt"
+
+    file = open(path_uiPath_bot_log, 'r')
+    lines = file.read().splitlines()
+    file.close()
+
+    connecting_attribute = 'businessActivityId'
+    attr_conceptName = 'DisplayName'
+    attr_timestamp = 'timeStamp'
+    attr_lifecycle = 'State'
+    valuesLifecycle = ['Executing', 'Closed']
+    standardValueLifecycle = "complete"
+    attr_eventId = 'fingerprint'
+    attr_caseId = 'jobId'
+    attr_resource = 'robotName'
+    attr_botProcessName = 'processName'
+    attr_botProcessVersionNumber = 'processVersion'
+    attr_succcess = 'State'
+    valueNoSuccess = "Faulted"
+    traceLevelOnly = True
+
+    df_log = uipath_log_to_df(lines, connecting_attribute, attr_conceptName, attr_timestamp, attr_lifecycle, valuesLifecycle, standardValueLifecycle, attr_eventId, attr_caseId,
+                              attr_resource, attr_botProcessName, attr_botProcessVersionNumber, attr_succcess, valueNoSuccess, traceLevelOnly)
+
+    parameters = {log_converter.Variants.TO_EVENT_LOG.value.Parameters.CASE_ID_KEY: 'case:caseId'}
+    log = log_converter.apply(df_log, parameters=parameters, variant=log_converter.Variants.TO_EVENT_LOG)
+
+    xes_exporter.apply(log, 'results/BPI_Bot_Log_UiPath_Parsed.xes')
+
+    #Display log as directly follows graph
+    dfg, start_activities, end_activities = pm4py.discover_dfg(log)
+    #pm4py.view_dfg(dfg, start_activities, end_activities)
+    pm4py.save_vis_dfg(dfg,start_activities, end_activities,"results/graphs/" + 'dfg_BPI_Bot_Log_UiPath_Parsed.svg')
+
+
+    #Parse UiPath real world log from company
+    path_uiPath_bot_log = "data/Company_Bot_Log_UiPath.txt"
+
+    file = open(path_uiPath_bot_log, 'r')
+    lines = file.read().splitlines()
+    file.close()
+
+    connecting_attribute = 'Ordnungsbegriff'
+    attr_conceptName = 'message'
+    attr_timestamp = 'timeStamp'
+    attr_lifecycle = 'level'
+    valuesLifecycle = ['Info', '']
+    standardValueLifecycle = "start"
+    attr_eventId = 'fingerprint'
+    attr_caseId = 'jobId'
+    attr_resource = 'robotName'
+    attr_botProcessName = 'processName'
+    attr_botProcessVersionNumber = 'processVersion'
+    attr_succcess = 'level'
+    valueNoSuccess = "Error"
+    traceLevelOnly = False
+    attr_workflow = 'fileName'
+
+    df_log = uipath_log_to_df(lines, connecting_attribute, attr_conceptName, attr_timestamp, attr_lifecycle, valuesLifecycle,standardValueLifecycle, attr_eventId, attr_caseId,
+                              attr_resource, attr_botProcessName, attr_botProcessVersionNumber, attr_succcess, valueNoSuccess, traceLevelOnly,
+                              attr_workflow=attr_workflow)
+
+    parameters = {log_converter.Variants.TO_EVENT_LOG.value.Parameters.CASE_ID_KEY: 'case:caseId'}
+    log = log_converter.apply(df_log, parameters=parameters, variant=log_converter.Variants.TO_EVENT_LOG)
+
+    xes_exporter.apply(log, 'results/Company_Bot_Log_UiPath_Parsed.xes')
+
+    #Display log as directly follows graph
+    dfg, start_activities, end_activities = pm4py.discover_dfg(log)
+    #pm4py.view_dfg(dfg, start_activities, end_activities)
+    pm4py.save_vis_dfg(dfg,start_activities, end_activities,"results/graphs/" + 'dfg_Company_Bot_Log_UiPath_Parsed.svg')
+
+
+if __name__ == "__main__":
+    #BluePrism to .xes
+    folderPath_bluePrism_bot_logs = "data/BluePrism_Logs/"
+
+    attr_conceptName = 'StageName'
+    attr_timestamp_start = 'Resource Start'
+    attr_timestamp_end = 'Resource End'
+    attr_eventId = 'StageID'
+    attr_botProcessName = 'Process'
+    attr_succcess = 'Result'
 
 #Define parsing function
+@profiled_stage('blueprism_log_to_df')
 def blueprism_log_to_df(folder_path, resources_list, version_nr_list, connecting_attribute, attr_conceptName, attr_timestamp_start,
-                        attr_timestamp_end, attr_eventId, attr_botProcessName, attr_succcess):
+                        attr_timestamp_end, attr_eventId, attr_botProcessName, attr_succcess, event_store=None,
+                        event_store_log='bot_log'):
     """
     Converts a BluePrism log to a dataframe.
     The function is aborted, if one of the attributes given as inputs is not found in the log.
@@ -249,6 +469,11 @@ def blueprism_log_to_df(folder_path, resources_list, version_nr_list, connecting
         The name of the attribute whose value is used for the botProcessName attribute in the resulting xes log
     attr_succcess
         The name of the attribute whose value is used for the success attribute in the resulting xes log
+    event_store
+        A connection to an event store (see event_store.py). If given, the parsed events are also inserted into
+        the event store (appended to the log event_store_log)
+    event_store_log
+        The name of the log in the event store (e.g. 'company_bot')
 
     Returns
     -----------
@@ -327,26 +552,32 @@ def blueprism_log_to_df(folder_path, resources_list, version_nr_list, connecting
 
     df_log = df_log[['case:caseId', 'concept:name', 'time:timestamp', 'eventId', 'org:resource',
                      'botProcessName', 'botProcessVersionNumber', 'success', 'lifecycle:transition', connecting_attribute]]
+    if event_store is not None:
+        insert_log_df(event_store, event_store_log, df_log, 'case:caseId', attr_connecting=connecting_attribute)
         
     return df_log
 
-resources = ["bot1"]
-versions = ["1.0.0"]
+if __name__ == "__main__":
+    resources = ["bot1"]
+    versions = ["1.0.0"]
 
-df_log = blueprism_log_to_df(folderPath_bluePrism_bot_logs, resources, versions,'Value', attr_conceptName, attr_timestamp_start,
-                             attr_timestamp_end, attr_eventId, attr_botProcessName, attr_succcess)
+    df_log = blueprism_log_to_df(folderPath_bluePrism_bot_logs, resources, versions,'Value', attr_conceptName, attr_timestamp_start,
+                                 attr_timestamp_end, attr_eventId, attr_botProcessName, attr_succcess)
 
-parameters = {log_converter.Variants.TO_EVENT_LOG.value.Parameters.CASE_ID_KEY: 'case:caseId'}
-log = log_converter.apply(df_log, parameters=parameters, variant=log_converter.Variants.TO_EVENT_LOG)
+    parameters = {log_converter.Variants.TO_EVENT_LOG.value.Parameters.CASE_ID_KEY: 'case:caseId'}
+    log = log_converter.apply(df_log, parameters=parameters, variant=log_converter.Variants.TO_EVENT_LOG)
 
-xes_exporter.apply(log, 'results/BluePrism_Bot_Log_Parsed.xes')
+    xes_exporter.apply(log, 'results/BluePrism_Bot_Log_Parsed.xes')
 
 
-#AutomationAnywhere to .xes
-folderPath_AutomationAnywhere_bot_logs = "data/AutomationAnywhere_Logs/"
+if __name__ == "__main__":
+    #AutomationAnywhere to .xes
+    folderPath_AutomationAnywhere_bot_logs = "data/AutomationAnywhere_Logs/"
 
 #Define parsing function
-def automationAnywhere_log_to_df(folder_path, column_names, attr_succcess, lifecycle_value):
+@profiled_stage('automationAnywhere_log_to_df')
+def automationAnywhere_log_to_df(folder_path, column_names, attr_succcess, lifecycle_value, event_store=None,
+                                 event_store_log='bot_log'):
     """
     Converts an AutomationAnywhere log to a dataframe.
     The function is aborted, if one of the attributes given as inputs is not found in the log.
@@ -362,6 +593,11 @@ def automationAnywhere_log_to_df(folder_path, column_names, attr_succcess, lifec
         The name of the attribute whose value is used for the success attribute in the resulting xes log
     lifecycle_value
         The standard value that should be set for the lifecycle:transition attribute ("start" or "complete")
+    event_store
+        A connection to an event store (see event_store.py). If given, the parsed events are also inserted into
+        the event store (appended to the log event_store_log)
+    event_store_log
+        The name of the log in the event store (e.g. 'company_bot')
 
     Returns
     -----------
@@ -395,17 +631,20 @@ def automationAnywhere_log_to_df(folder_path, column_names, attr_succcess, lifec
     df_log['lifecycle:transition'] = df_log.apply(lambda x: lifecycle_value, axis=1)
     df_log = df_log[['case:caseId', 'concept:name', 'time:timestamp', 'eventId', 'org:resource',
                      'botProcessName', 'botProcessVersionNumber', 'success', 'lifecycle:transition', 'connectingAttribute']]
+    if event_store is not None:
+        insert_log_df(event_store, event_store_log, df_log, 'case:caseId', attr_connecting='connectingAttribute')
         
     return df_log
 
-column_names = ["time:timestamp", "concept:name", "botProcessName", "org:resource", "case:caseId", "eventId",
-                "botProcessVersionNumber", "connectingAttribute"]
-attr_succcess = "concept:name"
-lifecycle_value = "complete"
+if __name__ == "__main__":
+    column_names = ["time:timestamp", "concept:name", "botProcessName", "org:resource", "case:caseId", "eventId",
+                    "botProcessVersionNumber", "connectingAttribute"]
+    attr_succcess = "concept:name"
+    lifecycle_value = "complete"
 
-df_log = automationAnywhere_log_to_df(folderPath_AutomationAnywhere_bot_logs, column_names, attr_succcess, lifecycle_value)
+    df_log = automationAnywhere_log_to_df(folderPath_AutomationAnywhere_bot_logs, column_names, attr_succcess, lifecycle_value)
 
-parameters = {log_converter.Variants.TO_EVENT_LOG.value.Parameters.CASE_ID_KEY: 'case:caseId'}
-log = log_converter.apply(df_log, parameters=parameters, variant=log_converter.Variants.TO_EVENT_LOG)
+    parameters = {log_converter.Variants.TO_EVENT_LOG.value.Parameters.CASE_ID_KEY: 'case:caseId'}
+    log = log_converter.apply(df_log, parameters=parameters, variant=log_converter.Variants.TO_EVENT_LOG)
 
-xes_exporter.apply(log, 'results/AutomationAnywhere_Bot_Log_Parsed.xes')
+    xes_exporter.apply(log, 'results/AutomationAnywhere_Bot_Log_Parsed.xes')
@@ -0,0 +1,240 @@
+#Deduplication
+
+#Imports
+import os
+import json
+import math
+import sqlite3
+import hashlib
+from collections import deque
+import numpy as np
+from profiling import profiled_stage
+
+#Streaming deduplication of bot log events by their fingerprint (the UiPath 'fingerprint', mapped to 'eventId'),
+#e.g. for overlapping exports of the Orchestrator logs
+#The fingerprints of the latest events are kept in memory (exact, a window of a fixed number of fingerprints).
+#All fingerprints are also added to a history on disk, so that duplicates are found over months of data while the
+#memory stays bounded. The history is either
+#   'bloom'     a Bloom filter in a memory-mapped file: fast and of fixed size, but with a small probability
+#               (deduplication_false_positive_rate) that a new event is taken for a duplicate
+#   'sqlite'    a table of all fingerprints in a SQLite database: exact, but slower and growing with the history
+#The number of fingerprints kept in memory
+deduplication_window_size = 1000000
+#The number of fingerprints the Bloom filter is sized for and the probability of a false duplicate at this size
+deduplication_expected_fingerprints = 10000000
+deduplication_false_positive_rate = 1e-6
+#The number of fingerprints looked up in the SQLite history at once
+deduplication_sqlite_batch_size = 500
+
+def create_deduplication_state(window_size=deduplication_window_size, history_path=None, history_type='bloom',
+                               expected_fingerprints=deduplication_expected_fingerprints,
+                               false_positive_rate=deduplication_false_positive_rate):
+    """
+    Creates the state of a deduplication. An existing history at the path is opened and continued
+
+    Parameters
+    -----------
+    window_size
+        The number of fingerprints of the latest events that are kept in memory
+    history_path
+        The path to the history on disk (e.g. 'results/deduplication/company.bloom'), None for no history,
+        i.e. duplicates are only found within the window
+    history_type
+        'bloom' for a Bloom filter or 'sqlite' for an exact set of fingerprints in a SQLite database
+    expected_fingerprints
+        The number of fingerprints the Bloom filter is sized for (only used when a new Bloom filter is created)
+    false_positive_rate
+        The probability of a false duplicate when the Bloom filter holds expected_fingerprints fingerprints
+
+    Returns
+    -----------
+    deduplication_state
+        The state of the deduplication as dictionary (None if the history cannot be opened)
+    """
+    state = {'window': set(), 'window_order': deque(), 'window_size': window_size, 'history_type': None,
+             'events': 0, 'duplicates': 0, 'history_duplicates': 0}
+    if history_path is None:
+        return state
+    directory = os.path.dirname(history_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    if history_type == 'bloom':
+        state['bloom'] = open_bloom_filter(history_path, expected_fingerprints, false_positive_rate)
+        if state['bloom'] is None:
+            return None
+    elif history_type == 'sqlite':
+        connection = sqlite3.connect(history_path)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("CREATE TABLE IF NOT EXISTS fingerprints (fingerprint TEXT PRIMARY KEY) WITHOUT ROWID")
+        state['connection'] = connection
+    else:
+        print("Unknown history_type", history_type, "('bloom' or 'sqlite')")
+        return None
+    state['history_type'] = history_type
+    return state
+def close_deduplication_state(state):
+    """
+    Writes the history of a deduplication to disk and closes it
+    """
+    if state['history_type'] == 'bloom':
+        close_bloom_filter(state['bloom'])
+    elif state['history_type'] == 'sqlite':
+        state['connection'].close()
+    state['history_type'] = None
+
+#Bloom filter in a memory-mapped file
+def get_bloom_filter_size(expected_fingerprints, false_positive_rate):
+    """
+    Gets the number of bits and of hash functions of a Bloom filter with the given false positive rate
+    at the expected number of fingerprints
+    """
+    no_of_bits = int(math.ceil(-expected_fingerprints * math.log(false_positive_rate) / math.log(2) ** 2))
+    no_of_bits = ((no_of_bits + 7) // 8) * 8
+    no_of_hashes = max(1, int(round(no_of_bits / expected_fingerprints * math.log(2))))
+    return no_of_bits, no_of_hashes
+def open_bloom_filter(path, expected_fingerprints, false_positive_rate):
+    """
+    Opens the Bloom filter at the path or creates it. Its parameters are kept next to it (path + '.json')
+
+    Returns
+    -----------
+    bloom
+        A dictionary with the memory-mapped bits, the number of bits and hash functions and the number of added
+        fingerprints (None if the file of the bits does not match its parameters)
+    """
+    parameters_path = path + '.json'
+    if os.path.exists(path) and os.path.exists(parameters_path):
+        with open(parameters_path) as file:
+            parameters = json.load(file)
+        if os.path.getsize(path) != parameters['no_of_bits'] // 8:
+            print("The Bloom filter", path, "does not match its parameters")
+            return None
+        bits = np.memmap(path, dtype=np.uint8, mode='r+')
+    else:
+        no_of_bits, no_of_hashes = get_bloom_filter_size(expected_fingerprints, false_positive_rate)
+        parameters = {'no_of_bits': no_of_bits, 'no_of_hashes': no_of_hashes, 'no_of_fingerprints': 0}
+        bits = np.memmap(path, dtype=np.uint8, mode='w+', shape=(no_of_bits // 8,))
+    return {'path': path, 'bits': bits, 'no_of_bits': parameters['no_of_bits'],
+            'no_of_hashes': parameters['no_of_hashes'], 'no_of_fingerprints': parameters['no_of_fingerprints']}
+def close_bloom_filter(bloom):
+    """
+    Writes the bits and the parameters of a Bloom filter to disk
+    """
+    bloom['bits'].flush()
+    with open(bloom['path'] + '.json', 'w') as file:
+        json.dump({'no_of_bits': bloom['no_of_bits'], 'no_of_hashes': bloom['no_of_hashes'],
+                   'no_of_fingerprints': bloom['no_of_fingerprints']}, file)
+def get_bloom_positions(bloom, fingerprints):
+    """
+    Gets the positions of the bits of every fingerprint (double hashing of a 128 bit blake2b hash)
+
+    Returns
+    -----------
+    positions
+        A numpy array with one row per fingerprint and one column per hash function
+    """
+    digests = np.frombuffer(b''.join(hashlib.blake2b(str(fingerprint).encode('utf-8'), digest_size=16).digest()
+                                     for fingerprint in fingerprints), dtype=np.uint64).reshape(-1, 2)
+    hash_numbers = np.arange(bloom['no_of_hashes'], dtype=np.uint64)
+    #uint64 arithmetic wraps around, which is fine for hashing
+    return (digests[:, :1] + hash_numbers * (digests[:, 1:] | np.uint64(1))) % np.uint64(bloom['no_of_bits'])
+def bloom_filter_contains(bloom, positions):
+    """
+    Checks for every fingerprint whether all its bits are set (the fingerprint was probably added before)
+    """
+    bit_values = bloom['bits'][(positions >> np.uint64(3)).astype(np.int64)] >> (positions & np.uint64(7)).astype(np.uint8)
+    return np.all(bit_values & 1, axis=1)
+def add_to_bloom_filter(bloom, positions):
+    """
+    Sets the bits of the fingerprints
+    """
+    positions = positions.ravel()
+    np.bitwise_or.at(bloom['bits'], (positions >> np.uint64(3)).astype(np.int64),
+                     np.left_shift(1, (positions & np.uint64(7)).astype(np.uint8)).astype(np.uint8))
+    bloom['no_of_fingerprints'] = bloom['no_of_fingerprints'] + len(positions) // bloom['no_of_hashes']
+
+#Exact history in SQLite
+def sqlite_history_contains(connection, fingerprints):
+    """
+    Checks for every fingerprint whether it is in the SQLite history
+    """
+    found = set()
+    for start in range(0, len(fingerprints), deduplication_sqlite_batch_size):
+        batch = fingerprints[start:start+deduplication_sqlite_batch_size]
+        rows = connection.execute("SELECT fingerprint FROM fingerprints WHERE fingerprint IN (" +
+                                  ", ".join("?" * len(batch)) + ")", batch).fetchall()
+        found.update(row[0] for row in rows)
+    return np.array([fingerprint in found for fingerprint in fingerprints], dtype=bool)
+def add_to_sqlite_history(connection, fingerprints):
+    """
+    Adds the fingerprints to the SQLite history
+    """
+    with connection:
+        connection.executemany("INSERT OR IGNORE INTO fingerprints (fingerprint) VALUES (?)",
+                               [(fingerprint,) for fingerprint in fingerprints])
+
+#Deduplication of the events
+def add_to_window(state, fingerprints):
+    """
+    Adds fingerprints to the window in memory. The oldest fingerprints leave the window once it is full
+    """
+    window = state['window']
+    window_order = state['window_order']
+    for fingerprint in fingerprints:
+        window.add(fingerprint)
+        window_order.append(fingerprint)
+    while len(window_order) > state['window_size']:
+        window.discard(window_order.popleft())
+@profiled_stage('deduplicate_events', rows_argument='df_log')
+def deduplicate_events(state, df_log, attr_fingerprint='eventId'):
+    """
+    Removes the events whose fingerprint was seen before (in the same dataframe, in the window or in the history)
+    and adds the fingerprints of the new events to the window and the history. Events without fingerprint are kept
+
+    Parameters
+    -----------
+    state
+        The state of the deduplication (see create_deduplication_state), which is updated
+    df_log
+        The parsed events (e.g. of uipath_log_to_df), in the order in which they were read
+    attr_fingerprint
+        The name/key of the attribute which contains the fingerprint. Example value: 'eventId'
+
+    Returns
+    -----------
+    df_log
+        The events without the duplicates (in the same order)
+    """
+    if attr_fingerprint not in df_log.columns:
+        print("The log has no column", attr_fingerprint, ", it is not deduplicated")
+        return df_log
+    fingerprint_values = df_log[attr_fingerprint]
+    has_fingerprint = fingerprint_values.notna().to_numpy()
+    fingerprints = fingerprint_values.astype(str).to_numpy()
+    #the first event of every fingerprint in the dataframe is a candidate
+    is_duplicate = fingerprint_values.duplicated(keep='first').to_numpy() & has_fingerprint
+    window = state['window']
+    is_duplicate = is_duplicate | np.array([has and fingerprint in window for has, fingerprint
+                                            in zip(has_fingerprint, fingerprints)], dtype=bool)
+
+    candidates = np.flatnonzero(has_fingerprint & ~is_duplicate)
+    if len(candidates) > 0 and state['history_type'] is not None:
+        candidate_fingerprints = fingerprints[candidates].tolist()
+        if state['history_type'] == 'bloom':
+            positions = get_bloom_positions(state['bloom'], candidate_fingerprints)
+            in_history = bloom_filter_contains(state['bloom'], positions)
+            add_to_bloom_filter(state['bloom'], positions[~in_history])
+        else:
+            in_history = sqlite_history_contains(state['connection'], candidate_fingerprints)
+            add_to_sqlite_history(state['connection'], [fingerprint for fingerprint, found
+                                                        in zip(candidate_fingerprints, in_history) if not found])
+        is_duplicate[candidates[in_history]] = True
+        state['history_duplicates'] = state['history_duplicates'] + int(in_history.sum())
+        candidates = candidates[~in_history]
+    add_to_window(state, fingerprints[candidates].tolist())
+
+    state['events'] = state['events'] + len(df_log)
+    state['duplicates'] = state['duplicates'] + int(is_duplicate.sum())
+    if not is_duplicate.any():
+        return df_log
+    return df_log.loc[~is_duplicate]
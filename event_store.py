@@ -0,0 +1,382 @@
+#Event Store
+
+#Imports
+import os
+import json
+import sqlite3
+import numpy as np
+import pandas as pd
+from datetime import datetime
+from pm4py.objects.conversion.log import converter as log_converter
+import pm4py
+from log_merger import merge_logs
+from profiling import profiled_stage
+
+#Embedded SQLite event store for parsed bot logs, business process logs and merged logs
+#Every log is stored under a name (e.g. 'company_bot'). Every event is one row of the table 'events': all attributes
+#of the event are kept as json ('attributes'), the timestamp also as nanoseconds since 1970 (UTC). The case, activity,
+#resource, connecting attribute and bot process version are copied to columns with indexes, so that queries for some
+#cases, a time range or a bot process version only read the events they need instead of the whole log.
+#The database uses write-ahead logging (WAL), so queries can run while a log is inserted
+event_store_format_version = 1
+event_store_schema = [
+    """CREATE TABLE IF NOT EXISTS logs (log_id INTEGER PRIMARY KEY, name TEXT UNIQUE NOT NULL, columns TEXT NOT NULL,
+                                        core_columns TEXT NOT NULL, datetime_columns TEXT NOT NULL, created TEXT)""",
+    """CREATE TABLE IF NOT EXISTS events (id INTEGER PRIMARY KEY, log_id INTEGER NOT NULL, case_id TEXT, activity TEXT,
+                                          timestamp INTEGER, resource TEXT, connecting_value TEXT,
+                                          bot_process_version TEXT, attributes TEXT NOT NULL)""",
+    "CREATE INDEX IF NOT EXISTS events_case ON events (log_id, case_id)",
+    "CREATE INDEX IF NOT EXISTS events_connecting_value ON events (log_id, connecting_value)",
+    "CREATE INDEX IF NOT EXISTS events_activity ON events (log_id, activity)",
+    "CREATE INDEX IF NOT EXISTS events_resource ON events (log_id, resource)",
+    "CREATE INDEX IF NOT EXISTS events_timestamp ON events (log_id, timestamp)",
+    "CREATE INDEX IF NOT EXISTS events_bot_process_version ON events (log_id, bot_process_version)",
+    "CREATE TABLE IF NOT EXISTS metadata (key TEXT PRIMARY KEY, value TEXT)"]
+#The number of events inserted with one executemany
+event_store_batch_size = 10000
+
+def open_event_store(path):
+    """
+    Opens the event store at the given path (it is created if it does not exist yet) in WAL mode
+
+    Parameters
+    -----------
+    path
+        The path to the SQLite database (e.g. 'results/event_store.sqlite')
+
+    Returns
+    -----------
+    connection
+        The sqlite3 connection to the event store
+    """
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    connection = sqlite3.connect(path)
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute("PRAGMA synchronous=NORMAL")
+    with connection:
+        for statement in event_store_schema:
+            connection.execute(statement)
+        connection.execute("INSERT OR IGNORE INTO metadata (key, value) VALUES ('format_version', ?)",
+                           (str(event_store_format_version),))
+    return connection
+def get_json_default(value):
+    """
+    Converts the values json cannot serialize (numpy scalars, timestamps)
+    """
+    if isinstance(value, np.generic):
+        return value.item()
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return str(value)
+def get_connecting_key(value):
+    """
+    Gets the key of a value of a connecting attribute in the event store, so that the values of the business process log
+    and of the bot log match (e.g. 3406673285104 and 3406673285104.0 give '3406673285104').
+    Missing values and booleans (e.g. RPA_Exec_Nr false for activities without bot) give None
+    """
+    if value is None or isinstance(value, (bool, np.bool_)):
+        return None
+    if isinstance(value, (float, np.floating)):
+        if np.isnan(value):
+            return None
+        if float(value).is_integer():
+            return str(int(value))
+    if isinstance(value, np.generic):
+        value = value.item()
+    return str(value)
+def get_key_column(df_log, column, function=str):
+    """
+    Gets the values of a column as list of keys for an indexed column of the event store (None for missing values
+    or if the column is not in the log)
+    """
+    if column is None or column not in df_log.columns:
+        return [None] * len(df_log)
+    return [None if (value is None or (not isinstance(value, str) and pd.isna(value))) else function(value)
+            for value in df_log[column].tolist()]
+def get_timestamp_nanoseconds(timestamps):
+    """
+    Converts timestamps (datetimes or strings, e.g. '2022-05-12T12:02:50.2020306+02:00') to nanoseconds since 1970
+    (UTC). Timestamps without time zone are taken as UTC. Missing timestamps give None
+    """
+    timestamps = pd.to_datetime(pd.Series(timestamps), utc=True, format='mixed')
+    nanoseconds = timestamps.to_numpy(dtype='datetime64[ns]').astype(np.int64)
+    return [None if is_missing else int(value) for value, is_missing in zip(nanoseconds, timestamps.isna().to_numpy())]
+@profiled_stage('insert_log_df', rows_argument='df_log')
+def insert_log_df(connection, log_name, df_log, attr_case, attr_activity='concept:name', attr_timestamp='time:timestamp',
+                  attr_resource='org:resource', attr_connecting=None, attr_bot_process_version='botProcessVersionNumber',
+                  batch_size=event_store_batch_size, replace=False):
+    """
+    Inserts the events of a log dataframe into the event store (batched executemany in one transaction).
+    If the log already exists, the events are appended, unless replace is true
+
+    Parameters
+    -----------
+    connection
+        The connection to the event store (see open_event_store)
+    log_name
+        The name of the log in the event store (e.g. 'company_bot')
+    df_log
+        The log dataframe
+    attr_case
+        The name/key of the attribute which contains the case (e.g. 'case:caseId' for bot logs or 'caseId')
+    attr_activity
+        The name/key of the attribute which contains the activity. Example value: 'concept:name'
+    attr_timestamp
+        The name/key of the attribute which contains the timestamp. Example value: 'time:timestamp'
+    attr_resource
+        The name/key of the attribute which contains the resource. Example value: 'org:resource'
+    attr_connecting
+        The name/key of the connecting attribute (e.g. 'Ordnungsbegriff' or 'RPA_Exec_Nr'), None if the log has none
+    attr_bot_process_version
+        The name/key of the attribute which contains the version of the bot process. Example value: 'botProcessVersionNumber'
+    batch_size
+        The number of events inserted with one executemany
+    replace
+        Whether the events of an existing log with the same name should be deleted first or not
+
+    Returns
+    -----------
+    no_of_events
+        The number of inserted events
+    """
+    core_columns = {'case': attr_case, 'activity': attr_activity, 'timestamp': attr_timestamp, 'resource': attr_resource,
+                    'connecting': attr_connecting, 'bot_process_version': attr_bot_process_version}
+    if attr_case not in df_log.columns or attr_timestamp not in df_log.columns:
+        print("The log has no column", attr_case if attr_case not in df_log.columns else attr_timestamp,
+              ", it is not inserted")
+        return 0
+    columns = list(df_log.columns)
+    datetime_columns = [column for column in columns if pd.api.types.is_datetime64_any_dtype(df_log[column])]
+
+    with connection:
+        log_row = connection.execute("SELECT log_id, columns, datetime_columns FROM logs WHERE name = ?",
+                                     (log_name,)).fetchone()
+        if log_row is not None and replace:
+            connection.execute("DELETE FROM events WHERE log_id = ?", (log_row[0],))
+            connection.execute("DELETE FROM logs WHERE log_id = ?", (log_row[0],))
+            log_row = None
+        if log_row is None:
+            log_id = connection.execute(
+                "INSERT INTO logs (name, columns, core_columns, datetime_columns, created) VALUES (?, ?, ?, ?, ?)",
+                (log_name, json.dumps(columns), json.dumps(core_columns), json.dumps(datetime_columns),
+                 datetime.now().isoformat(timespec='seconds'))).lastrowid
+        else:
+            #the columns of the appended events are added to the columns of the log
+            log_id = log_row[0]
+            existing_columns = json.loads(log_row[1])
+            existing_datetime_columns = json.loads(log_row[2])
+            connection.execute("UPDATE logs SET columns = ?, datetime_columns = ? WHERE log_id = ?",
+                               (json.dumps(existing_columns + [column for column in columns if column not in existing_columns]),
+                                json.dumps(existing_datetime_columns + [column for column in datetime_columns
+                                                                        if column not in existing_datetime_columns]),
+                                log_id))
+
+        for batch_start in range(0, len(df_log), batch_size):
+            df_batch = df_log.iloc[batch_start:batch_start+batch_size]
+            attribute_values = [df_batch[column].astype(object).where(df_batch[column].notna(), None).tolist()
+                                for column in columns]
+            attributes = [json.dumps({column: value for column, value in zip(columns, row) if value is not None},
+                                     default=get_json_default) for row in zip(*attribute_values)]
+            rows = zip([log_id] * len(df_batch), get_key_column(df_batch, attr_case),
+                       get_key_column(df_batch, attr_activity), get_timestamp_nanoseconds(df_batch[attr_timestamp]),
+                       get_key_column(df_batch, attr_resource), get_key_column(df_batch, attr_connecting, get_connecting_key),
+                       get_key_column(df_batch, attr_bot_process_version), attributes)
+            connection.executemany("""INSERT INTO events (log_id, case_id, activity, timestamp, resource, connecting_value,
+                                      bot_process_version, attributes) VALUES (?, ?, ?, ?, ?, ?, ?, ?)""", rows)
+    return len(df_log)
+def import_xes_to_event_store(connection, path, log_name, attr_case, attr_activity='concept:name',
+                              attr_timestamp='time:timestamp', attr_resource='org:resource', attr_connecting=None,
+                              attr_bot_process_version='botProcessVersionNumber', replace=True):
+    """
+    Reads a log in xes format (e.g. a business process log from the data folder) and inserts it into the event store
+    (see insert_log_df for the parameters)
+    """
+    df_log = log_converter.apply(pm4py.read_xes(path), variant=log_converter.Variants.TO_DATA_FRAME)
+    return insert_log_df(connection, log_name, df_log, attr_case, attr_activity, attr_timestamp, attr_resource,
+                         attr_connecting, attr_bot_process_version, replace=replace)
+def get_event_store_logs(connection):
+    """
+    Gets the logs of the event store with their number of events and cases and their first and last timestamp
+    """
+    rows = connection.execute("""SELECT logs.name, COUNT(events.id), COUNT(DISTINCT events.case_id),
+                                        MIN(events.timestamp), MAX(events.timestamp)
+                                 FROM logs LEFT JOIN events ON events.log_id = logs.log_id
+                                 GROUP BY logs.log_id ORDER BY logs.log_id""").fetchall()
+    df_logs = pd.DataFrame(rows, columns=['log', 'events', 'cases', 'first_timestamp', 'last_timestamp'])
+    for column in ['first_timestamp', 'last_timestamp']:
+        df_logs[column] = pd.to_datetime(df_logs[column], unit='ns', utc=True)
+    return df_logs
+def delete_log(connection, log_name):
+    """
+    Deletes a log and its events from the event store
+    """
+    with connection:
+        connection.execute("DELETE FROM events WHERE log_id IN (SELECT log_id FROM logs WHERE name = ?)", (log_name,))
+        connection.execute("DELETE FROM logs WHERE name = ?", (log_name,))
+
+#Queries on the event store
+def set_query_keys(connection, table, keys):
+    """
+    Writes the keys of a query (e.g. many case IDs) to a temporary table, so that the query joins them via the index
+    instead of passing thousands of parameters
+    """
+    connection.execute("CREATE TEMP TABLE IF NOT EXISTS " + table + " (key TEXT PRIMARY KEY)")
+    connection.execute("DELETE FROM " + table)
+    connection.executemany("INSERT OR IGNORE INTO " + table + " (key) VALUES (?)", [(key,) for key in keys])
+def get_query_nanoseconds(timestamp):
+    """
+    Converts the bound of a time range (string, datetime or pandas timestamp) to nanoseconds since 1970 (UTC)
+    """
+    return get_timestamp_nanoseconds([timestamp])[0]
+@profiled_stage('query_events')
+def query_events(connection, log_name, case_ids=None, start=None, end=None, activities=None, resources=None,
+                 connecting_values=None, bot_process_versions=None, whole_cases=True):
+    """
+    Queries the events of a log in the event store via the indexes. All given conditions have to be met.
+    The events are returned in the order in which they were inserted
+
+    Parameters
+    -----------
+    connection
+        The connection to the event store (see open_event_store)
+    log_name
+        The name of the log in the event store (e.g. 'company_merged')
+    case_ids
+        A list of case IDs (None for all cases)
+    start, end
+        The time range (e.g. '2022-05-09' and '2022-05-16', the end is excluded; None for no bound)
+    activities
+        A list of activities (None for all activities)
+    resources
+        A list of resources (None for all resources)
+    connecting_values
+        A list of values of the connecting attribute (None for all values)
+    bot_process_versions
+        A list of versions of the bot process (None for all versions)
+    whole_cases
+        If true, all events of the cases with at least one matching event are returned (e.g. the whole cases that
+        started in the time range or that contain a bot event of the version), so that the measures see whole traces.
+        If false, only the matching events are returned
+
+    Returns
+    -----------
+    df_log
+        The events as log dataframe with the columns of the inserted log (None if the log is not in the event store)
+    """
+    log_row = connection.execute("SELECT log_id, columns, datetime_columns FROM logs WHERE name = ?",
+                                 (log_name,)).fetchone()
+    if log_row is None:
+        print("The log", log_name, "is not in the event store")
+        return None
+    log_id, columns, datetime_columns = log_row[0], json.loads(log_row[1]), json.loads(log_row[2])
+
+    conditions = ["log_id = ?"]
+    parameters = [log_id]
+    if case_ids is not None:
+        set_query_keys(connection, 'query_case_ids', [str(case_id) for case_id in case_ids])
+        conditions.append("case_id IN (SELECT key FROM query_case_ids)")
+    if connecting_values is not None:
+        set_query_keys(connection, 'query_connecting_values',
+                       [key for key in (get_connecting_key(value) for value in connecting_values) if key is not None])
+        conditions.append("connecting_value IN (SELECT key FROM query_connecting_values)")
+    if start is not None:
+        conditions.append("timestamp >= ?")
+        parameters.append(get_query_nanoseconds(start))
+    if end is not None:
+        conditions.append("timestamp < ?")
+        parameters.append(get_query_nanoseconds(end))
+    for column, values in [('activity', activities), ('resource', resources), ('bot_process_version', bot_process_versions)]:
+        if values is not None:
+            values = [str(value) for value in values]
+            conditions.append(column + " IN (" + ", ".join("?" * len(values)) + ")")
+            parameters.extend(values)
+
+    if whole_cases and len(conditions) > 1:
+        query = """SELECT attributes FROM events WHERE log_id = ? AND case_id IN
+                   (SELECT case_id FROM events WHERE """ + " AND ".join(conditions) + ") ORDER BY id"
+        parameters = [log_id] + parameters
+    else:
+        query = "SELECT attributes FROM events WHERE " + " AND ".join(conditions) + " ORDER BY id"
+    rows = connection.execute(query, parameters).fetchall()
+
+    df_log = pd.DataFrame.from_records([json.loads(row[0]) for row in rows], columns=columns)
+    for column in datetime_columns:
+        df_log[column] = pd.to_datetime(df_log[column], utc=True, format='mixed')
+    return df_log
+@profiled_stage('merge_logs_from_event_store')
+def merge_logs_from_event_store(connection, business_process_log_name, bot_log_name, connecting_attribute_business_process,
+                                connecting_attribute_bot, case_ids=None, start=None, end=None, merged_log_name=None,
+                                attr_case='caseId', show_progress=True):
+    """
+    Merges a business process log with a bot log from the event store (see merge_logs). Only the cases of the business
+    process log that match the case IDs and time range are read, and only the bot events of their connecting values
+
+    Parameters
+    -----------
+    connection
+        The connection to the event store (see open_event_store)
+    business_process_log_name
+        The name of the business process log in the event store (e.g. 'company_business_process')
+    bot_log_name
+        The name of the parsed bot log in the event store (e.g. 'company_bot')
+    connecting_attribute_business_process
+        The connecting attribute in the business process log (e.g. 'RPA_Exec_Nr')
+    connecting_attribute_bot
+        The connecting attribute in the bot log (e.g. 'Ordnungsbegriff')
+    case_ids
+        A list of case IDs of the business process log (None for all cases)
+    start, end
+        The time range of the business process cases (see query_events)
+    merged_log_name
+        If given, the merged log is inserted into the event store with this name (e.g. 'company'), replacing an
+        existing log with this name
+    attr_case
+        The name/key of the attribute which contains the case in the business process log. Example value: 'caseId'
+    show_progress
+        Whether a progress update every 100 events should be printed out or not
+
+    Returns
+    -----------
+    df_merged
+        The merged log as a dataframe (None if a log is not in the event store)
+    """
+    df_log_business_process = query_events(connection, business_process_log_name, case_ids=case_ids, start=start, end=end)
+    if df_log_business_process is None:
+        return None
+    df_log_bot = query_events(connection, bot_log_name,
+                              connecting_values=df_log_business_process[connecting_attribute_business_process].tolist(),
+                              whole_cases=False)
+    if df_log_bot is None:
+        return None
+    #Preprocess the bot log like log_merger.py does after loading the parsed xes file
+    df_log_bot.rename(columns={"case:caseId": "botCaseId"}, inplace=True)
+    df_log_bot.drop([column for column in ['case:concept:name'] if column in df_log_bot.columns], axis=1, inplace=True)
+    df_log_bot["bot"] = True
+    #the connecting values of both logs are compared with their keys (e.g. the business process log may contain floats)
+    df_log_business_process['connecting_key'] = [get_connecting_key(value) for value in
+                                                 df_log_business_process[connecting_attribute_business_process]]
+    df_log_bot['connecting_key'] = [get_connecting_key(value) for value in df_log_bot[connecting_attribute_bot]]
+
+    df_merged = merge_logs(df_log_business_process, df_log_bot, 'connecting_key', 'connecting_key',
+                           show_progress=show_progress)
+    df_merged.drop(['connecting_key'], axis=1, inplace=True)
+    df_merged['time:timestamp'] = pd.to_datetime(df_merged['time:timestamp'], utc=True, format='mixed')
+    if merged_log_name is not None:
+        insert_log_df(connection, merged_log_name, df_merged, attr_case, attr_connecting=connecting_attribute_business_process,
+                      replace=True)
+    return df_merged
+
+
+if __name__ == "__main__":
+    #Fill the event store with the logs of the company and merge them
+    connection = open_event_store("results/event_store.sqlite")
+    import_xes_to_event_store(connection, 'data/Company_BusinessProcess_Log.xes', 'company_business_process', 'caseId',
+                              attr_connecting='RPA_Exec_Nr')
+    import_xes_to_event_store(connection, 'results/Company_Bot_Log_UiPath_Parsed.xes', 'company_bot', 'case:caseId',
+                              attr_connecting='Ordnungsbegriff')
+    merge_logs_from_event_store(connection, 'company_business_process', 'company_bot', 'RPA_Exec_Nr', 'Ordnungsbegriff',
+                                merged_log_name='company')
+    print(get_event_store_logs(connection))
+    connection.close()
@@ -0,0 +1,636 @@
+#Live Tailing
+
+#Imports
+import os
+import glob
+import json
+import time
+import heapq
+import asyncio
+import logging
+import pandas as pd
+from bot_log_parser import uipath_log_to_df
+from event_store import insert_log_df, get_connecting_key
+from deduplication import deduplicate_events
+from streaming_measures import create_streaming_state, update_streaming_state, close_trace, close_all_traces
+from profiling import profile_stage
+
+#Ingestion service that tails the UiPath log files of many robots at once (asyncio) and publishes the parsed events
+#incrementally, e.g. to the event store and to a live merge with the business process log that updates the streaming
+#measures (see streaming_measures.py)
+#   tailers         one task per log file reads the new complete lines. Rotated files (renamed or deleted and
+#                   recreated) are read to their end before the new file is opened, truncated files are read again
+#                   from the start. New files matching the patterns are picked up while the service runs
+#   queue           the tailers put their lines into a bounded queue. If the parser and the publishers are slower than
+#                   the robots write, the queue fills up and the tailers wait, i.e. the lines stay in the files
+#   parser          the lines are parsed in batches (at most live_batch_size lines, at least every live_batch_interval
+#                   seconds) with uipath_log_to_df and the UiPath attribute mapping of live_uipath_configuration
+#   publishers      functions that are called with every parsed batch (dataframe like uipath_log_to_df returns)
+#The files to tail (glob patterns, e.g. one log file per robot on a share)
+live_log_patterns = ["data/live_logs/*.txt"]
+#Whether the existing content of the files found at the start should be skipped (only new lines are read)
+live_start_at_end = False
+#The seconds between two checks of a file for new lines and between two searches for new files
+live_poll_interval = 0.5
+live_discovery_interval = 5.0
+#The maximum number of bytes read from a file at once
+live_read_size = 1024 * 1024
+#The maximum number of lines of a batch and the maximum number of seconds a line waits for its batch
+live_batch_size = 5000
+live_batch_interval = 1.0
+#The maximum number of chunks of lines in the queue between the tailers and the parser
+live_queue_size = 64
+#The attribute mapping of the UiPath logs (see uipath_log_to_df, the configuration of the log of the company)
+live_uipath_configuration = {'connecting_attribute': 'Ordnungsbegriff', 'attr_conceptName': 'message',
+                             'attr_timestamp': 'timeStamp', 'attr_lifecycle': 'level', 'valuesLifecycle': ['Info', ''],
+                             'standardValueLifecycle': "start", 'attr_eventId': 'fingerprint', 'attr_caseId': 'jobId',
+                             'attr_resource': 'robotName', 'attr_botProcessName': 'processName',
+                             'attr_botProcessVersionNumber': 'processVersion', 'attr_succcess': 'level',
+                             'valueNoSuccess': "Error", 'traceLevelOnly': False, 'attr_workflow': 'fileName'}
+#The seconds (event time) the live merge waits for late events before it releases the events in timestamp order
+live_allowed_lateness = 5.0
+#The seconds (event time) after the last event of a case until the case is closed, once all its business process
+#events were released
+live_trace_timeout = 3600.0
+#The watermark of the live merge is the latest timestamp of the slowest robot. Robots whose latest event is older than
+#the latest event of all robots by more than these seconds (event time) are idle and do not hold the watermark back
+live_source_idle_timeout = 900.0
+logger = logging.getLogger('bot_log_mining')
+
+#Reading the new lines of a file
+def create_tailed_file(path, start_at_end=False):
+    """
+    Creates the state of a tailed file
+
+    Parameters
+    -----------
+    path
+        The path to the log file
+    start_at_end
+        Whether the existing content of the file should be skipped or not
+
+    Returns
+    -----------
+    tailed_file
+        A dictionary with the path, the open file, its inode, the incomplete last line and the number of read lines
+    """
+    return {'path': path, 'file': None, 'inode': None, 'start_at_end': start_at_end, 'partial': b'', 'lines': 0,
+            'rotations': 0}
+def open_tailed_file(tailed_file):
+    """
+    Opens the file of a tailed file (at the start or at the end). Returns False if the file does not exist (yet)
+    """
+    try:
+        file = open(tailed_file['path'], 'rb')
+    except FileNotFoundError:
+        return False
+    if tailed_file['start_at_end']:
+        file.seek(0, os.SEEK_END)
+        #later versions of the file (after a rotation) are read from the start
+        tailed_file['start_at_end'] = False
+    tailed_file['file'] = file
+    tailed_file['inode'] = os.fstat(file.fileno()).st_ino
+    tailed_file['partial'] = b''
+    return True
+def decode_lines(data):
+    """
+    Decodes complete lines of a log file (utf-8, without line breaks and byte order marks)
+    """
+    return [line.decode('utf-8', errors='replace').lstrip('\ufeff').rstrip('\r') for line in data.split(b'\n')]
+def read_new_lines(tailed_file, read_size=live_read_size):
+    """
+    Reads the new complete lines of a tailed file. If the file was rotated and the old file is read to its end,
+    the new file at the path is opened. If the file was truncated, it is read again from the start.
+    Runs in a worker thread, so that slow file systems (e.g. a share) do not block the event loop
+
+    Parameters
+    -----------
+    tailed_file
+        The state of the tailed file (see create_tailed_file), which is updated
+    read_size
+        The maximum number of bytes read at once
+
+    Returns
+    -----------
+    lines, more
+        The new complete lines and whether there may be more data to read right away
+    """
+    if tailed_file['file'] is None and not open_tailed_file(tailed_file):
+        return [], False
+    file = tailed_file['file']
+    data = file.read(read_size)
+    if data:
+        data = tailed_file['partial'] + data
+        end_of_lines = data.rfind(b'\n')
+        if end_of_lines == -1:
+            tailed_file['partial'] = data
+            return [], len(data) >= read_size
+        tailed_file['partial'] = data[end_of_lines+1:]
+        lines = decode_lines(data[:end_of_lines])
+        tailed_file['lines'] = tailed_file['lines'] + len(lines)
+        return lines, True
+
+    #at the end of the file: check whether it was rotated or truncated
+    try:
+        status = os.stat(tailed_file['path'])
+    except FileNotFoundError:
+        #rotated, the new file was not created yet
+        return [], False
+    if status.st_ino != tailed_file['inode']:
+        #the old file is read to its end, its last line is complete even without a line break
+        lines = decode_lines(tailed_file['partial']) if tailed_file['partial'] else []
+        file.close()
+        tailed_file['file'] = None
+        tailed_file['rotations'] = tailed_file['rotations'] + 1
+        tailed_file['lines'] = tailed_file['lines'] + len(lines)
+        return lines, True
+    if status.st_size < file.tell():
+        file.seek(0)
+        tailed_file['partial'] = b''
+        tailed_file['rotations'] = tailed_file['rotations'] + 1
+        return [], True
+    return [], False
+def close_tailed_file(tailed_file):
+    """
+    Closes the file of a tailed file
+    """
+    if tailed_file['file'] is not None:
+        tailed_file['file'].close()
+        tailed_file['file'] = None
+
+#Parsing the lines in batches
+def parse_uipath_lines(lines, configuration=None):
+    """
+    Parses lines of UiPath logs with the attribute mapping of the configuration (see uipath_log_to_df).
+    Lines without json (e.g. empty lines) and lines with invalid json (e.g. cut off lines) are skipped
+
+    Parameters
+    -----------
+    lines
+        The lines of the UiPath logs
+    configuration
+        The parameters of uipath_log_to_df (live_uipath_configuration if None)
+
+    Returns
+    -----------
+    df_log
+        The parsed events (None if no line could be parsed or an attribute of the mapping was not found)
+    """
+    configuration = live_uipath_configuration if configuration is None else configuration
+    lines = [line for line in lines if '{' in line]
+    valid_lines = []
+    for line in lines:
+        try:
+            json.loads("{" + line.split("{", 1)[1])
+            valid_lines.append(line)
+        except ValueError:
+            logger.warning("skipped a line with invalid json: %s", line[:200])
+    if len(valid_lines) == 0:
+        return None
+    return uipath_log_to_df(valid_lines, show_progress=False, **configuration)
+
+#Publishers of the parsed batches
+def get_event_store_publisher(connection, log_name, connecting_attribute=None):
+    """
+    Gets a publisher that inserts every parsed batch into a log of the event store (see event_store.py)
+
+    Parameters
+    -----------
+    connection
+        The connection to the event store (see open_event_store)
+    log_name
+        The name of the bot log in the event store (e.g. 'company_bot')
+    connecting_attribute
+        The connecting attribute of the bot log (the one of live_uipath_configuration if None)
+    """
+    if connecting_attribute is None:
+        connecting_attribute = live_uipath_configuration['connecting_attribute']
+    def publish(df_batch):
+        insert_log_df(connection, log_name, df_batch, 'case:caseId', attr_connecting=connecting_attribute)
+    return publish
+def get_event_seconds(timestamp):
+    """
+    Converts a timestamp (datetime or string) to seconds since the epoch (None for missing timestamps)
+    """
+    if timestamp is None or pd.isnull(timestamp):
+        return None
+    timestamp = pd.Timestamp(timestamp)
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.tz_localize('UTC')
+    return timestamp.timestamp()
+def get_lifecycle_timestamps(event, attr_timestamp, attr_lifecycle):
+    """
+    Sets the 'start_timestamp' or 'end_timestamp' of an event by its lifecycle (like preprocess_lifecycles for
+    logs with only 'start' or only 'complete' events)
+    """
+    timestamp = pd.Timestamp(event.pop(attr_timestamp))
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.tz_localize('UTC')
+    if event.get(attr_lifecycle) == 'start':
+        event['start_timestamp'] = timestamp
+        event['end_timestamp'] = None
+    else:
+        event['start_timestamp'] = None
+        event['end_timestamp'] = timestamp
+    return event
+def create_live_merge_state(df_log_business_process, connecting_attribute_business_process, connecting_attribute_bot=None,
+                            attr_traceID='caseId', attr_activity='concept:name', attr_success='success', attr_bot='bot',
+                            attr_timestamp='time:timestamp', attr_lifecycle='lifecycle:transition',
+                            attr_resource='org:resource', allowed_lateness=live_allowed_lateness,
+                            trace_timeout=live_trace_timeout, source_idle_timeout=live_source_idle_timeout):
+    """
+    Creates the state of a live merge of the parsed bot events with a business process log (see merge_logs). The merged
+    events are released in timestamp order into the state of the streaming measures, as soon as the watermark (the
+    latest timestamp of the bot events minus the allowed lateness) has passed them. Like in merge_logs, the bot events
+    are placed after the business process event with the same connecting value (before it, if its lifecycle is 'complete')
+    and take its attributes (e.g. the caseId). Bot events without a business process event are not merged.
+    Since the robots write their logs independently, the watermark follows the slowest robot that is not idle
+    (see live_source_idle_timeout). Bot events that arrive after the watermark has passed them are released right away
+    and counted as late events
+
+    Parameters
+    -----------
+    df_log_business_process
+        The business process log as dataframe
+    connecting_attribute_business_process
+        The connecting attribute in the business process log (e.g. 'RPA_Exec_Nr')
+    connecting_attribute_bot
+        The connecting attribute in the bot log (the one of live_uipath_configuration if None)
+    attr_traceID, attr_activity, attr_success, attr_bot, attr_timestamp, attr_lifecycle
+        The names/keys of the attributes in the merged log (see measures.py)
+    attr_resource
+        The name/key of the attribute in the bot log which contains the robot. Example value: 'org:resource'
+    allowed_lateness
+        The seconds (event time) the merge waits for late events
+    trace_timeout
+        The seconds (event time) after the last event of a case until the case is closed
+    source_idle_timeout
+        The seconds (event time) a robot may fall behind the other robots before it is treated as idle
+
+    Returns
+    -----------
+    live_merge_state
+        The state of the live merge as dictionary, the streaming measures are read from 'streaming_state'
+    """
+    if connecting_attribute_bot is None:
+        connecting_attribute_bot = live_uipath_configuration['connecting_attribute']
+    df_log_business_process = df_log_business_process.reset_index(drop=True)
+    events = df_log_business_process.to_dict('records')
+    event_seconds = [get_event_seconds(event[attr_timestamp]) for event in events]
+    #the business process events are released in timestamp order (events without timestamp at the end)
+    order = sorted(range(len(events)), key=lambda position: (event_seconds[position] is None,
+                                                               event_seconds[position] or 0.0, position))
+    connecting_events = {}
+    remaining_events = {}
+    for position, event in enumerate(events):
+        key = get_connecting_key(event.get(connecting_attribute_business_process))
+        if key is not None:
+            connecting_events.setdefault(key, []).append(position)
+        remaining_events[event[attr_traceID]] = remaining_events.get(event[attr_traceID], 0) + 1
+    return {'business_process_events': events, 'business_process_seconds': event_seconds, 'order': order,
+            'next_position': 0, 'connecting_events': connecting_events, 'remaining_events': remaining_events,
+            'connecting_attribute_bot': connecting_attribute_bot, 'pending': [], 'sequence': 0, 'watermark': None,
+            'last_seen': {}, 'source_seconds': {}, 'streaming_state': create_streaming_state(), 'released_events': 0,
+            'unmatched_events': 0, 'late_events': 0,
+            'attributes': {'traceID': attr_traceID, 'activity': attr_activity, 'success': attr_success, 'bot': attr_bot,
+                           'timestamp': attr_timestamp, 'lifecycle': attr_lifecycle, 'resource': attr_resource},
+            'allowed_lateness': allowed_lateness, 'trace_timeout': trace_timeout,
+            'source_idle_timeout': source_idle_timeout}
+def add_pending_event(live_merge_state, seconds, rank, event):
+    """
+    Adds a merged event to the events waiting for the watermark. Events with the same timestamp are released by their
+    rank: business process events with lifecycle 'start' (0), bot events (1), business process events with lifecycle
+    'complete' (2)
+    """
+    heapq.heappush(live_merge_state['pending'], (seconds, rank, live_merge_state['sequence'], event))
+    live_merge_state['sequence'] = live_merge_state['sequence'] + 1
+def add_bot_events_to_live_merge(live_merge_state, df_batch):
+    """
+    Adds the events of a parsed batch of bot events to the live merge and releases the events the watermark has passed.
+    Can be used as publisher (see get_live_merge_publisher)
+
+    Parameters
+    -----------
+    live_merge_state
+        The state of the live merge (see create_live_merge_state), which is updated
+    df_batch
+        The parsed bot events (see uipath_log_to_df)
+    """
+    attributes = live_merge_state['attributes']
+    bp_events = live_merge_state['business_process_events']
+    source_seconds = live_merge_state['source_seconds']
+    for bot_event in df_batch.to_dict('records'):
+        positions = live_merge_state['connecting_events'].get(
+            get_connecting_key(bot_event.get(live_merge_state['connecting_attribute_bot'])), [])
+        if len(positions) == 0:
+            live_merge_state['unmatched_events'] = live_merge_state['unmatched_events'] + 1
+            continue
+        #like log_merger.py after loading the parsed bot log
+        bot_event['botCaseId'] = bot_event.pop('case:caseId', None)
+        bot_event[attributes['bot']] = True
+        seconds = get_event_seconds(bot_event[attributes['timestamp']])
+        if seconds is None:
+            continue
+        source = bot_event.get(attributes['resource'])
+        if source not in source_seconds or seconds > source_seconds[source]:
+            source_seconds[source] = seconds
+        if live_merge_state['watermark'] is not None and seconds <= live_merge_state['watermark']:
+            live_merge_state['late_events'] = live_merge_state['late_events'] + 1
+        for position in positions:
+            merged_event = dict(bot_event)
+            for column, value in bp_events[position].items():
+                if column not in merged_event:
+                    merged_event[column] = value
+            add_pending_event(live_merge_state, seconds, 1,
+                              get_lifecycle_timestamps(merged_event, attributes['timestamp'], attributes['lifecycle']))
+    if source_seconds:
+        latest_seconds = max(source_seconds.values())
+        watermark = min(seconds for seconds in source_seconds.values()
+                        if seconds >= latest_seconds - live_merge_state['source_idle_timeout'])
+        watermark = watermark - live_merge_state['allowed_lateness']
+        if live_merge_state['watermark'] is None or watermark > live_merge_state['watermark']:
+            live_merge_state['watermark'] = watermark
+    release_live_merge_events(live_merge_state, live_merge_state['watermark'])
+def release_live_merge_events(live_merge_state, watermark, close_traces=True):
+    """
+    Releases the merged events up to the watermark (all events if the watermark is infinite) in timestamp order into
+    the state of the streaming measures and closes the cases that timed out
+
+    Parameters
+    -----------
+    live_merge_state
+        The state of the live merge (see create_live_merge_state), which is updated
+    watermark
+        The timestamp (seconds since the epoch) up to which the events are released
+    close_traces
+        Whether the cases that timed out should be closed or not
+    """
+    if watermark is None:
+        return
+    attributes = live_merge_state['attributes']
+    bp_events = live_merge_state['business_process_events']
+    bp_seconds = live_merge_state['business_process_seconds']
+    order = live_merge_state['order']
+    while live_merge_state['next_position'] < len(order):
+        position = order[live_merge_state['next_position']]
+        seconds = bp_seconds[position]
+        if seconds is not None and seconds > watermark:
+            break
+        if seconds is None and watermark != float('inf'):
+            break
+        event = dict(bp_events[position])
+        rank = 2 if event.get(attributes['lifecycle']) == 'complete' else 0
+        add_pending_event(live_merge_state, seconds if seconds is not None else float('inf'), rank,
+                          get_lifecycle_timestamps(event, attributes['timestamp'], attributes['lifecycle']))
+        live_merge_state['next_position'] = live_merge_state['next_position'] + 1
+
+    streaming_state = live_merge_state['streaming_state']
+    pending = live_merge_state['pending']
+    while pending and pending[0][0] <= watermark:
+        seconds, rank, sequence, event = heapq.heappop(pending)
+        update_streaming_state(streaming_state, event, attributes['traceID'], attributes['activity'],
+                               attributes['success'], attributes['bot'])
+        trace_id = event[attributes['traceID']]
+        live_merge_state['last_seen'][trace_id] = seconds
+        if rank != 1:
+            live_merge_state['remaining_events'][trace_id] = live_merge_state['remaining_events'][trace_id] - 1
+        live_merge_state['released_events'] = live_merge_state['released_events'] + 1
+
+    if close_traces:
+        for trace_id, last_seen in list(live_merge_state['last_seen'].items()):
+            if live_merge_state['remaining_events'].get(trace_id, 0) == 0 and \
+                    last_seen + live_merge_state['trace_timeout'] <= watermark:
+                close_trace(streaming_state, trace_id)
+                del live_merge_state['last_seen'][trace_id]
+def flush_live_merge(live_merge_state):
+    """
+    Releases all waiting events and closes all cases (e.g. when the service is stopped)
+    """
+    release_live_merge_events(live_merge_state, float('inf'), close_traces=False)
+    close_all_traces(live_merge_state['streaming_state'])
+    live_merge_state['last_seen'] = {}
+def get_live_merge_publisher(live_merge_state):
+    """
+    Gets a publisher that adds every parsed batch to a live merge (see create_live_merge_state)
+    """
+    def publish(df_batch):
+        add_bot_events_to_live_merge(live_merge_state, df_batch)
+    return publish
+
+#The service
+def create_live_tailing_state(patterns=None, publishers=None, configuration=None, start_at_end=live_start_at_end,
+                              deduplication=None):
+    """
+    Creates the state of the live tailing service
+
+    Parameters
+    -----------
+    patterns
+        The glob patterns of the log files (live_log_patterns if None)
+    publishers
+        The functions that are called with every parsed batch (e.g. get_live_merge_publisher)
+    configuration
+        The parameters of uipath_log_to_df (live_uipath_configuration if None)
+    start_at_end
+        Whether the existing content of the files found at the start should be skipped or not
+    deduplication
+        The state of a deduplication (see deduplication.py). If given, the events whose fingerprint was read before
+        (e.g. in another file or before a restart of the service) are removed before they are published
+
+    Returns
+    -----------
+    live_state
+        The state of the service as dictionary, with statistics of the read lines, parsed events and latencies
+    """
+    return {'patterns': live_log_patterns if patterns is None else patterns, 'publishers': publishers or [],
+            'configuration': live_uipath_configuration if configuration is None else configuration,
+            'start_at_end': start_at_end, 'deduplication': deduplication, 'files': {}, 'tasks': {}, 'queue': None,
+            'stop': None, 'parser': None, 'tailers_done': False,
+            'lines': 0, 'events': 0, 'batches': 0, 'failed_batches': 0, 'failed_publishes': 0, 'queue_waits': 0,
+            'dropped_lines': 0, 'last_latency': None, 'max_latency': 0.0}
+async def put_lines(live_state, lines, poll_interval=live_poll_interval):
+    """
+    Puts the lines read from a log file into the queue. While the queue is full, it waits for the parser, but gives up
+    (and drops the lines) if the parser has finished, or if the service is stopped and the queue is still full.
+    Returns whether the lines were put into the queue
+    """
+    queue = live_state['queue']
+    if queue.full():
+        live_state['queue_waits'] = live_state['queue_waits'] + 1
+    item = (time.monotonic(), lines)
+    while True:
+        stopped = live_state['stop'].is_set()
+        try:
+            await asyncio.wait_for(queue.put(item), poll_interval)
+            return True
+        except asyncio.TimeoutError:
+            if stopped or live_state['parser'] is None or live_state['parser'].done():
+                logger.warning("the queue is full and the %s, %d lines are dropped",
+                               "service is stopped" if stopped else "parser has finished", len(lines))
+                live_state['dropped_lines'] = live_state['dropped_lines'] + len(lines)
+                return False
+async def tail_log_file(live_state, tailed_file, poll_interval=live_poll_interval):
+    """
+    Reads the new lines of a log file until the service is stopped and puts them into the queue
+    (waits while the queue is full, see put_lines)
+    """
+    try:
+        while not live_state['stop'].is_set():
+            lines, more = await asyncio.to_thread(read_new_lines, tailed_file)
+            if lines and not await put_lines(live_state, lines, poll_interval):
+                return
+            if not more:
+                try:
+                    await asyncio.wait_for(live_state['stop'].wait(), poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+    finally:
+        close_tailed_file(tailed_file)
+async def discover_log_files(live_state, discovery_interval=live_discovery_interval, poll_interval=live_poll_interval):
+    """
+    Searches for log files matching the patterns until the service is stopped and starts a tailer for every new file.
+    The files found at the first search are read from the end, if the service starts at the end
+    """
+    first_search = True
+    while not live_state['stop'].is_set():
+        for pattern in live_state['patterns']:
+            for path in sorted(glob.glob(pattern)):
+                if path in live_state['files']:
+                    continue
+                tailed_file = create_tailed_file(path, start_at_end=first_search and live_state['start_at_end'])
+                live_state['files'][path] = tailed_file
+                live_state['tasks'][path] = asyncio.create_task(tail_log_file(live_state, tailed_file, poll_interval))
+                logger.info("tailing %s", path)
+        first_search = False
+        try:
+            await asyncio.wait_for(live_state['stop'].wait(), discovery_interval)
+        except asyncio.TimeoutError:
+            pass
+def parse_batch(live_state, lines):
+    """
+    Parses a batch of lines (runs in a worker thread). Returns None if the batch could not be parsed
+    """
+    try:
+        return parse_uipath_lines(lines, live_state['configuration'])
+    except Exception:
+        logger.exception("a batch of %d lines could not be parsed", len(lines))
+        live_state['failed_batches'] = live_state['failed_batches'] + 1
+        return None
+def publish_batch(live_state, df_batch, first_read):
+    """
+    Calls the publishers with a parsed batch (in the event loop, so the publishers do not need to be thread-safe).
+    A publisher that fails is counted and logged, the other publishers still get the batch
+    """
+    with profile_stage('live_publish', rows=len(df_batch)):
+        for publisher in live_state['publishers']:
+            try:
+                publisher(df_batch)
+            except Exception:
+                logger.exception("a batch of %d events could not be published", len(df_batch))
+                live_state['failed_publishes'] = live_state['failed_publishes'] + 1
+    live_state['events'] = live_state['events'] + len(df_batch)
+    latency = time.monotonic() - first_read
+    live_state['last_latency'] = latency
+    live_state['max_latency'] = max(live_state['max_latency'], latency)
+async def parse_and_publish_batches(live_state, batch_size=live_batch_size, batch_interval=live_batch_interval):
+    """
+    Takes the lines from the queue, parses them in batches (in a worker thread) and calls the publishers
+    (one batch after another), until all tailers are stopped and the queue is empty
+    """
+    queue = live_state['queue']
+    while True:
+        lines = []
+        first_read = None
+        deadline = None
+        while len(lines) < batch_size:
+            if deadline is None and live_state['tailers_done'] and queue.empty():
+                break
+            timeout = batch_interval if deadline is None else max(deadline - time.monotonic(), 0)
+            try:
+                read_time, chunk = await asyncio.wait_for(queue.get(), timeout)
+            except asyncio.TimeoutError:
+                if deadline is None:
+                    continue
+                break
+            if first_read is None:
+                first_read = read_time
+                deadline = time.monotonic() + batch_interval
+            lines.extend(chunk)
+        if not lines:
+            return
+        live_state['lines'] = live_state['lines'] + len(lines)
+        live_state['batches'] = live_state['batches'] + 1
+        df_batch = await asyncio.to_thread(parse_batch, live_state, lines)
+        if df_batch is not None and live_state['deduplication'] is not None:
+            df_batch = deduplicate_events(live_state['deduplication'], df_batch, 'eventId')
+        if df_batch is not None and len(df_batch) > 0:
+            publish_batch(live_state, df_batch, first_read)
+async def run_live_tailing(live_state, duration=None, queue_size=live_queue_size, batch_size=live_batch_size,
+                           batch_interval=live_batch_interval, poll_interval=live_poll_interval,
+                           discovery_interval=live_discovery_interval):
+    """
+    Runs the live tailing service until it is stopped (stop_live_tailing) or the duration has passed.
+    At the end, the lines that were read are parsed and published
+
+    Parameters
+    -----------
+    live_state
+        The state of the service (see create_live_tailing_state)
+    duration
+        The number of seconds the service runs (None runs until it is stopped)
+    queue_size
+        The maximum number of chunks of lines in the queue between the tailers and the parser
+    batch_size, batch_interval
+        The maximum number of lines of a batch and the maximum number of seconds a line waits for its batch
+    poll_interval, discovery_interval
+        The seconds between two checks of a file for new lines and between two searches for new files
+    """
+    live_state['queue'] = asyncio.Queue(maxsize=queue_size)
+    live_state['stop'] = asyncio.Event()
+    live_state['tailers_done'] = False
+    discovery = asyncio.create_task(discover_log_files(live_state, discovery_interval, poll_interval))
+    parser = asyncio.create_task(parse_and_publish_batches(live_state, batch_size, batch_interval))
+    live_state['parser'] = parser
+    try:
+        if duration is None:
+            await live_state['stop'].wait()
+        else:
+            try:
+                await asyncio.wait_for(live_state['stop'].wait(), duration)
+            except asyncio.TimeoutError:
+                pass
+    finally:
+        live_state['stop'].set()
+        await discovery
+        await asyncio.gather(*live_state['tasks'].values(), return_exceptions=True)
+        #the parser stops once the lines of all tailers are published
+        live_state['tailers_done'] = True
+        await parser
+def stop_live_tailing(live_state):
+    """
+    Stops the live tailing service (the lines that were read are still parsed and published)
+    """
+    if live_state['stop'] is not None:
+        live_state['stop'].set()
+
+
+if __name__ == "__main__":
+    #Tail the UiPath logs of the robots and merge them live with the business process log of the company
+    from pm4py.objects.conversion.log import converter as log_converter
+    import pm4py
+    from streaming_measures import streaming_measure_functions
+    logging.basicConfig(level=logging.INFO)
+    df_log_business_process = log_converter.apply(pm4py.read_xes('data/Company_BusinessProcess_Log.xes'),
+                                                  variant=log_converter.Variants.TO_DATA_FRAME)
+    live_merge_state = create_live_merge_state(df_log_business_process, 'RPA_Exec_Nr')
+    live_state = create_live_tailing_state(live_log_patterns, [get_live_merge_publisher(live_merge_state)])
+    try:
+        asyncio.run(run_live_tailing(live_state))
+    except KeyboardInterrupt:
+        pass
+    flush_live_merge(live_merge_state)
+    print("Read", live_state['lines'], "lines,", live_state['events'], "events,", live_merge_state['released_events'],
+          "merged events,", live_merge_state['unmatched_events'], "bot events without business process event")
+    labels, coloring, measure = streaming_measure_functions['relative_fails'](live_merge_state['streaming_state'], 2)
+    for activity, label in labels.items():
+        print(label.replace("\n", ": "))
@@ -0,0 +1,318 @@
+#Log Generator
+
+#Imports
+import os
+import json
+import numpy as np
+import pandas as pd
+from datetime import timezone, datetime, timedelta
+from pm4py.objects.log.exporter.xes import exporter as xes_exporter
+from pm4py.objects.conversion.log import converter as log_converter
+
+#Synthetic logs of an RPA-enabled business process, e.g. to benchmark the parser, the merger and the measures at any scale
+#Like in the log of the company, some activities of the business process are executed by a bot ('... RPA'). Every
+#execution of such an activity starts a bot job, whose UiPath log entries carry the same connecting number as the
+#business process event ('Ordnungsbegriff' in the bot log, 'RPA_Exec_Nr' in the business process log).
+#All random values are drawn from a numpy generator with a fixed seed, so the same parameters always give the same logs
+generator_time_zone = timezone(timedelta(hours=2))
+generator_start_time = datetime(2022, 5, 1, 8, 0, 0, tzinfo=generator_time_zone)
+generator_period_days = 30
+#mean time between two business process events of a case and between two log entries of a bot job (in seconds)
+generator_mean_human_gap = 3600
+generator_mean_bot_gap = 5
+#every third activity of the business process is executed by a bot
+generator_rpa_activity_every = 3
+generator_business_process_name = 'syntheticProcess'
+generator_bot_process_name = 'SyntheticRPAProcess'
+
+def get_uuids(rng, n):
+    """
+    Draws n random ids in the format of a uuid (e.g. '1eccb318-5d3e-45ef-ab79-a71262a7445f') from the generator rng
+    """
+    hex_string = rng.bytes(16*n).hex()
+    return [hex_string[i:i+8] + '-' + hex_string[i+8:i+12] + '-' + hex_string[i+12:i+16] + '-' + hex_string[i+16:i+20]
+            + '-' + hex_string[i+20:i+32] for i in range(0, 32*n, 32)]
+def get_positions_in_groups(group_sizes):
+    """
+    Gets the position of every element within its group, for groups of consecutive elements with the given sizes
+    """
+    group_starts = np.cumsum(group_sizes) - group_sizes
+    return np.arange(group_sizes.sum()) - np.repeat(group_starts, group_sizes)
+def generate_event_table(no_of_events, no_of_cases, no_of_activities=10, bot_share=0.5, failure_rate=0.05,
+                         no_of_bot_activities=20, no_of_robots=2, bot_versions=None, seed=0):
+    """
+    Generates the events of a merged log (business process events and bot log entries) as one table in the order
+    of the merged log, i.e. every bot job directly follows the business process event that started it.
+    Every case starts with 'Activity 1' and then moves through the activities in a cycle, skipping an activity
+    now and then, so that the log has several variants
+
+    Parameters
+    -----------
+    no_of_events
+        The total number of events (business process events and bot log entries), e.g. 10**3 to 10**7
+    no_of_cases
+        The number of cases of the business process. Every case has at least one business process event
+    no_of_activities
+        The number of activities of the business process
+    bot_share
+        The share of bot log entries among all events (between 0 and 1)
+    failure_rate
+        The probability of an event to fail (error in the bot log, success false in the business process log)
+    no_of_bot_activities
+        The number of different messages of the bot log entries
+    no_of_robots
+        The number of robots executing the bot jobs
+    bot_versions
+        The versions of the bot process. The jobs of later days use later versions. Default: ['1.0.0', '1.1.0']
+    seed
+        The seed of the random number generator
+
+    Returns
+    -----------
+    df_events
+        The table of the events (None if the parameters do not allow a log with the given number of events)
+    """
+    if bot_versions is None:
+        bot_versions = ['1.0.0', '1.1.0']
+    rng = np.random.default_rng(seed)
+    no_of_bot_events = int(round(no_of_events * bot_share))
+    no_of_bp_events = no_of_events - no_of_bot_events
+    if no_of_cases < 1 or no_of_bp_events < no_of_cases:
+        print("every case needs at least one business process event, reduce the bot share or the number of cases")
+        return None
+
+    #business process events: a cycle through the activities, steps of two skip an activity
+    bp_events_per_case = 1 + rng.multinomial(no_of_bp_events - no_of_cases, np.full(no_of_cases, 1/no_of_cases))
+    steps = np.where(get_positions_in_groups(bp_events_per_case) == 0, 0, 1 + (rng.random(no_of_bp_events) < 0.25))
+    step_sums = np.cumsum(steps)
+    first_step_sums = np.repeat(step_sums[np.cumsum(bp_events_per_case) - bp_events_per_case], bp_events_per_case)
+    bp_activities = (step_sums - first_step_sums) % no_of_activities
+    is_rpa_activity = np.arange(no_of_activities) % generator_rpa_activity_every == min(1, no_of_activities-1)
+    bp_is_rpa = is_rpa_activity[bp_activities]
+
+    #bot jobs: the bot log entries are distributed over (a random subset of) the executions of the bot activities
+    rpa_positions = np.flatnonzero(bp_is_rpa)
+    no_of_jobs = min(len(rpa_positions), no_of_bot_events)
+    if no_of_bot_events > 0 and no_of_jobs == 0:
+        print("the log contains no execution of a bot activity, increase the number of events per case")
+        return None
+    job_positions = np.sort(rng.choice(rpa_positions, size=no_of_jobs, replace=False))
+    bot_events_per_bp_event = np.zeros(no_of_bp_events, dtype=np.int64)
+    if no_of_jobs > 0:
+        bot_events_per_bp_event[job_positions] = 1 + rng.multinomial(no_of_bot_events - no_of_jobs,
+                                                                     np.full(no_of_jobs, 1/no_of_jobs))
+    job_of_bp_event = np.full(no_of_bp_events, -1)
+    job_of_bp_event[job_positions] = np.arange(no_of_jobs)
+
+    #merged order: every business process event is followed by the entries of its bot job
+    block_sizes = 1 + bot_events_per_bp_event
+    bp_event = np.repeat(np.arange(no_of_bp_events), block_sizes)
+    position_in_job = get_positions_in_groups(block_sizes)
+    is_bot = position_in_job > 0
+    case = np.repeat(np.arange(no_of_cases), bp_events_per_case)[bp_event]
+    events_per_case = np.bincount(case, minlength=no_of_cases)
+
+    #timestamps: the cases start within the period, the events of a case follow each other with exponential gaps
+    gaps = np.where(is_bot, rng.exponential(generator_mean_bot_gap, no_of_events),
+                    rng.exponential(generator_mean_human_gap, no_of_events))
+    gaps[get_positions_in_groups(events_per_case) == 0] = 0
+    gap_sums = np.cumsum(gaps)
+    gap_sums = gap_sums - np.repeat(gap_sums[np.cumsum(events_per_case) - events_per_case], events_per_case)
+    case_starts = np.sort(rng.uniform(0, generator_period_days*24*3600, no_of_cases))
+    seconds = np.round((case_starts[case] + gap_sums) * 10**6).astype(np.int64)
+    timestamps = (pd.Timestamp(generator_start_time) + pd.to_timedelta(seconds, unit='us'))
+
+    #attributes of the bot jobs
+    job = np.where(is_bot, job_of_bp_event[bp_event], -1)
+    #(one placeholder job, if the log has no bot jobs)
+    job_start_seconds = seconds[np.flatnonzero(is_bot & (position_in_job == 1))] if no_of_jobs > 0 else np.zeros(1)
+    job_version = np.minimum(job_start_seconds * len(bot_versions) // (generator_period_days*24*3600*10**6 + 1),
+                             len(bot_versions)-1).astype(np.int64)
+    job_robot = rng.integers(0, no_of_robots, max(no_of_jobs, 1))
+    bot_activity = (position_in_job - 1) % no_of_bot_activities
+    activity_names = np.array(["Activity " + str(i+1) + (" RPA" if is_rpa_activity[i] else "")
+                               for i in range(no_of_activities)])
+    bot_activity_names = np.array(["Bot activity " + str(i+1) for i in range(no_of_bot_activities)])
+    workflow_names = np.array(["Workflow " + str(i//5 + 1) for i in range(no_of_bot_activities)])
+    robot_names = np.array(["Robot " + str(i+1) for i in range(no_of_robots)])
+
+    df_events = pd.DataFrame({
+        'case': case,
+        'caseId': np.array(get_uuids(rng, no_of_cases))[case],
+        'bot': is_bot,
+        'activity': np.where(is_bot, bot_activity_names[bot_activity], activity_names[bp_activities[bp_event]]),
+        'timestamp': timestamps,
+        'success': rng.random(no_of_events) >= failure_rate,
+        'eventId': get_uuids(rng, no_of_events),
+        'resource': np.where(is_bot, robot_names[job_robot[job]],
+                             np.where(bp_is_rpa[bp_event], 'RPA user',
+                                      np.char.add('User ', ((bp_activities[bp_event] % 7) + 1).astype(str)))),
+        'job': job,
+        'jobId': np.where(is_bot, np.array(get_uuids(rng, max(no_of_jobs, 1)))[job], None),
+        'robot': np.where(is_bot, job_robot[job], -1),
+        'botVersion': np.where(is_bot, np.array(bot_versions)[job_version[job]], None),
+        'workflow': np.where(is_bot, workflow_names[bot_activity], None),
+        #connecting number of the executions of the bot activities (0 for all other business process events)
+        'connectingNumber': np.where(bp_is_rpa[bp_event], 10**12 + bp_event, 0),
+        'caseNumber': 2*10**12 + case})
+    return df_events
+def get_business_process_log_df(df_events):
+    """
+    Gets the business process log of a generated event table as dataframe, with the attributes of the business
+    process log of the company (like the dataframe pm4py reads from its xes file)
+
+    Parameters
+    -----------
+    df_events
+        The generated event table (see generate_event_table)
+
+    Returns
+    -----------
+    df_log_business_process
+        The business process log as dataframe
+    """
+    df_bp = df_events.loc[~df_events['bot']]
+    is_rpa = (df_bp['connectingNumber'] > 0).to_numpy()
+    df_log_business_process = pd.DataFrame({
+        'concept:name': df_bp['activity'].to_numpy(),
+        'caseId': df_bp['caseId'].to_numpy(),
+        'time:timestamp': df_bp['timestamp'].to_numpy(),
+        'success': df_bp['success'].to_numpy(),
+        'bot': is_rpa,
+        'eventId': df_bp['eventId'].to_numpy(),
+        'lifecycle:transition': 'start',
+        'org:resource': df_bp['resource'].to_numpy(),
+        'processName': generator_business_process_name,
+        'DN': df_bp['caseNumber'].to_numpy(),
+        #like in the log of the company, the attribute is false for events that are not executed by a bot
+        'RPA_Exec_Nr': np.where(is_rpa, df_bp['connectingNumber'].to_numpy(), False).astype(object),
+        'case:concept:name': df_bp['caseId'].to_numpy()})
+    df_log_business_process['time:timestamp'] = df_log_business_process['time:timestamp'].dt.tz_convert(generator_time_zone)
+    return df_log_business_process
+def iterate_uipath_log_lines(df_events, chunk_size=100000):
+    """
+    Formats the bot events of a generated event table as lines of a UiPath log
+    (e.g. '12:02:50.2020 Info {"message": "Bot activity 1", "level": "Information", ...}').
+    The lines are formatted in chunks, so that large logs can be written to a file without keeping all lines in memory
+
+    Parameters
+    -----------
+    df_events
+        The generated event table (see generate_event_table)
+    chunk_size
+        The number of lines formatted at once
+
+    Returns
+    -----------
+    lines
+        A generator of the lists of lines of the chunks
+    """
+    df_bot = df_events.loc[df_events['bot']]
+    for chunk_start in range(0, len(df_bot), chunk_size):
+        df_chunk = df_bot.iloc[chunk_start:chunk_start+chunk_size]
+        timestamps = df_chunk['timestamp'].dt.tz_convert(generator_time_zone)
+        times = timestamps.dt.strftime('%H:%M:%S.%f').str[:-2].to_numpy()
+        iso_timestamps = (timestamps.dt.strftime('%Y-%m-%dT%H:%M:%S.%f') + '0+02:00').to_numpy()
+        lines = []
+        for time, iso_timestamp, message, success, event_id, robot, robot_name, workflow, connecting_number, version, \
+                job_id in zip(times, iso_timestamps, df_chunk['activity'].to_numpy(), df_chunk['success'].to_numpy(),
+                              df_chunk['eventId'].to_numpy(), df_chunk['robot'].to_numpy(),
+                              df_chunk['resource'].to_numpy(), df_chunk['workflow'].to_numpy(),
+                              df_chunk['connectingNumber'].to_numpy(), df_chunk['botVersion'].to_numpy(),
+                              df_chunk['jobId'].to_numpy()):
+            entry = {"message": message, "level": "Information" if success else "Error",
+                     "logType": "User" if success else "Default", "timeStamp": iso_timestamp,
+                     "fingerprint": event_id, "windowsIdentity": "rpa_win", "machineName": robot_name,
+                     "fileName": workflow, "Ordnungsbegriff": int(connecting_number),
+                     "logF_BusinessProcessName": generator_bot_process_name,
+                     "processName": generator_bot_process_name + "_Processing", "processVersion": version,
+                     "jobId": job_id, "robotName": robot_name, "machineId": int(robot) + 1, "organizationUnitId": 1}
+            lines.append(time + (" Info " if success else " Error ") + json.dumps(entry))
+        yield lines
+def get_uipath_log_lines(df_events):
+    """
+    Gets the bot events of a generated event table as list of lines of a UiPath log (see iterate_uipath_log_lines)
+    """
+    lines = []
+    for chunk_lines in iterate_uipath_log_lines(df_events):
+        lines.extend(chunk_lines)
+    return lines
+def get_merged_log_df(df_events):
+    """
+    Gets the merged log of a generated event table as dataframe, i.e. the result of merge_logs (log_merger.py) for the
+    business process log and the parsed bot log, with the timestamps converted to datetimes.
+    Unlike merge_logs, the merged log is built without looking up the bot events of every business process event,
+    so it can also be used for logs that are too large to be merged in reasonable time
+
+    Parameters
+    -----------
+    df_events
+        The generated event table (see generate_event_table)
+
+    Returns
+    -----------
+    df_merged
+        The merged log as dataframe
+    """
+    df_log_business_process = get_business_process_log_df(df_events)
+    bp_position = np.cumsum(~df_events['bot'].to_numpy()) - 1
+    df_merged = df_log_business_process.iloc[bp_position].reset_index(drop=True)
+    #the rows of the bot events get the attributes of the bot events, like in merge_logs
+    #('bot' is also true for the business process events executed by a bot)
+    df_merged['bot'] = df_events['bot'].to_numpy() | df_merged['bot'].to_numpy()
+    for column, values in {'concept:name': 'activity', 'success': 'success', 'eventId': 'eventId',
+                           'org:resource': 'resource'}.items():
+        df_merged[column] = df_events[values].to_numpy()
+    df_merged['time:timestamp'] = df_events['timestamp'].dt.tz_convert(generator_time_zone).array
+    bot_columns = {'botCaseId': df_events['jobId'],
+                   'botProcessName': pd.Series(generator_bot_process_name + "_Processing", index=df_events.index),
+                   'botProcessVersionNumber': df_events['botVersion'], 'Ordnungsbegriff': df_events['connectingNumber'],
+                   'workflow': df_events['workflow']}
+    for column, values in bot_columns.items():
+        df_merged[column] = values.where(df_events['bot']).to_numpy()
+    return df_merged
+def generate_logs(no_of_events, no_of_cases, no_of_activities=10, bot_share=0.5, failure_rate=0.05,
+                  no_of_bot_activities=20, no_of_robots=2, bot_versions=None, seed=0):
+    """
+    Generates a business process log and a matching UiPath bot log (see generate_event_table for the parameters)
+
+    Returns
+    -----------
+    logs
+        A dictionary with the event table ('events'), the business process log as dataframe ('business_process')
+        and the lines of the UiPath bot log ('bot_log_lines'). None if the parameters do not allow a log
+    """
+    df_events = generate_event_table(no_of_events, no_of_cases, no_of_activities, bot_share, failure_rate,
+                                     no_of_bot_activities, no_of_robots, bot_versions, seed)
+    if df_events is None:
+        return None
+    return {'events': df_events, 'business_process': get_business_process_log_df(df_events),
+            'bot_log_lines': get_uipath_log_lines(df_events)}
+def save_generated_logs(df_events, folder_path, log_name):
+    """
+    Saves the business process log of a generated event table as xes file ('<log_name>_BusinessProcess_Log.xes') and
+    its bot log as UiPath log file ('<log_name>_Bot_Log_UiPath.txt'), like the logs in the data folder
+
+    Parameters
+    -----------
+    df_events
+        The generated event table (see generate_event_table)
+    folder_path
+        The folder the logs are saved to
+    log_name
+        The name of the logs (e.g. 'Synthetic')
+    """
+    os.makedirs(folder_path, exist_ok=True)
+    with open(os.path.join(folder_path, log_name + "_Bot_Log_UiPath.txt"), 'w') as file:
+        for lines in iterate_uipath_log_lines(df_events):
+            file.write("\n".join(lines) + "\n")
+    df_log_business_process = get_business_process_log_df(df_events)
+    parameters = {log_converter.Variants.TO_EVENT_LOG.value.Parameters.CASE_ID_KEY: 'caseId'}
+    log = log_converter.apply(df_log_business_process, parameters=parameters, variant=log_converter.Variants.TO_EVENT_LOG)
+    xes_exporter.apply(log, os.path.join(folder_path, log_name + "_BusinessProcess_Log.xes"))
+
+
+if __name__ == "__main__":
+    #Generate a synthetic log with 10000 events in 200 cases
+    df_events = generate_event_table(10**4, 200, no_of_activities=10, bot_share=0.5, failure_rate=0.05, seed=0)
+    save_generated_logs(df_events, "results/synthetic/", "Synthetic")
@@ -10,8 +10,10 @@ from os import listdir
 from pm4py.objects.log.importer.xes import importer as xes_importer
 from pm4py.objects.log.exporter.xes import exporter as xes_exporter
 from pm4py.objects.conversion.log import converter as log_converter
+from profiling import profiled_stage, report_progress
 
 #Define merging function
+@profiled_stage('merge_logs', rows_argument='df_log_business_process')
 def merge_logs(df_log_business_process, df_log_bot,
                connecting_attribute_business_process, connecting_attribute_bot, show_progress=True):
     """
@@ -71,7 +73,7 @@ def merge_logs(df_log_business_process, df_log_bot,
         if show_progress:
             progress_counter = progress_counter + 1
             if progress_counter % 100 == 0:
-                print(progress_counter, " of ", len(df_log_business_process), " business process events")
+                report_progress('merge_logs', progress_counter, len(df_log_business_process), "business process events")
                     
     df_merged = df_merged.sort_index().reset_index(drop=True)
     
@@ -79,72 +81,73 @@ def merge_logs(df_log_business_process, df_log_bot,
     return df_merged
 
 
-#Merge BPI Challenge Logs
-
-#Load and preprocess business process event log and parsed bot log from BPI challenge
-path_business_process_log = 'data/BPI_BusinessProcess_Log.xes'
-path_bot_log = 'results/BPI_Bot_Log_UiPath_Parsed.xes'
-
-#Load the business process event log
-log_bp = xes_importer.apply(path_business_process_log)
-df_log_business_process = log_converter.apply(log_bp, variant=log_converter.Variants.TO_DATA_FRAME)
-#Preprocess
-df_log_business_process.rename(columns={"eventid": "eventId", "docid_uuid": "caseId"}, inplace=True)
-
-#Load the bot log
-log_bot = xes_importer.apply(path_bot_log)
-df_log_bot = log_converter.apply(log_bot, variant=log_converter.Variants.TO_DATA_FRAME)
-#Preprocess
-df_log_bot.rename(columns={"case:caseId": "botCaseId"}, inplace=True)
-df_log_bot.drop(['case:concept:name'], axis=1, inplace=True)
-df_log_bot["bot"] = True
-
-#Merge logs
-df_merged_log = merge_logs(df_log_business_process, df_log_bot, 'eventId', 'businessActivityId', show_progress=True)
-df_merged_log['time:timestamp'] = pd.to_datetime(df_merged_log['time:timestamp'], format='mixed')
-df_merged_log.sort_values(by='time:timestamp')
-
-#Save
-parameters = {log_converter.Variants.TO_EVENT_LOG.value.Parameters.CASE_ID_KEY: 'caseId'}
-merged_log = log_converter.apply(df_merged_log, parameters=parameters, variant=log_converter.Variants.TO_EVENT_LOG)
-xes_exporter.apply(merged_log, 'results/BPI_Merged_Log.xes')
-
-#Display log as directly follows graph
-dfg, start_activities, end_activities = pm4py.discover_dfg(merged_log)
-#pm4py.view_dfg(dfg, start_activities, end_activities)
-pm4py.save_vis_dfg(dfg,start_activities, end_activities,"results/graphs/" + 'dfg_BPI_Merged_Log.svg')
-
-
-#Merge Real World Log from Company
-
-#Load and preprocess business process event log and parsed bot log from company
-path_business_process_log = 'data/Company_BusinessProcess_Log.xes'
-path_bot_log = 'results/Company_Bot_Log_UiPath_Parsed.xes'
-
-#Load the business process event log
-log_bp = xes_importer.apply(path_business_process_log)
-df_log_business_process = log_converter.apply(log_bp, variant=log_converter.Variants.TO_DATA_FRAME)
-
-#Load the bot log
-log_bot = xes_importer.apply(path_bot_log)
-df_log_bot = log_converter.apply(log_bot, variant=log_converter.Variants.TO_DATA_FRAME)
-#Preprocess
-df_log_bot.rename(columns={"case:caseId": "botCaseId"}, inplace=True)
-df_log_bot.drop(['case:concept:name'], axis=1, inplace=True)
-df_log_bot["bot"] = True
-
-#Merge logs
-df_merged_log = merge_logs(df_log_business_process, df_log_bot, 'RPA_Exec_Nr', 'Ordnungsbegriff', show_progress=True)
-
-df_merged_log['time:timestamp'] = pd.to_datetime(df_merged_log['time:timestamp'], format='mixed')
-df_merged_log.sort_values(by='time:timestamp')
-
-#Save
-parameters = {log_converter.Variants.TO_EVENT_LOG.value.Parameters.CASE_ID_KEY: 'caseId'}
-merged_log = log_converter.apply(df_merged_log, parameters=parameters, variant=log_converter.Variants.TO_EVENT_LOG)
-xes_exporter.apply(merged_log, 'results/Company_Merged_Log.xes')
-
-#Display log as directly follows graph
-dfg, start_activities, end_activities = pm4py.discover_dfg(merged_log)
-#pm4py.view_dfg(dfg, start_activities, end_activities)
-pm4py.save_vis_dfg(dfg,start_activities, end_activities,"results/graphs/" + 'dfg_Company_Merged_Log.svg')
\ No newline at end of file
+if __name__ == "__main__":
+    #Merge BPI Challenge Logs
+
+    #Load and preprocess business process event log and parsed bot log from BPI challenge
+    path_business_process_log = 'data/BPI_BusinessProcess_Log.xes'
+    path_bot_log = 'results/BPI_Bot_Log_UiPath_Parsed.xes'
+
+    #Load the business process event log
+    log_bp = xes_importer.apply(path_business_process_log)
+    df_log_business_process = log_converter.apply(log_bp, variant=log_converter.Variants.TO_DATA_FRAME)
+    #Preprocess
+    df_log_business_process.rename(columns={"eventid": "eventId", "docid_uuid": "caseId"}, inplace=True)
+
+    #Load the bot log
+    log_bot = xes_importer.apply(path_bot_log)
+    df_log_bot = log_converter.apply(log_bot, variant=log_converter.Variants.TO_DATA_FRAME)
+    #Preprocess
+    df_log_bot.rename(columns={"case:caseId": "botCaseId"}, inplace=True)
+    df_log_bot.drop(['case:concept:name'], axis=1, inplace=True)
+    df_log_bot["bot"] = True
+
+    #Merge logs
+    df_merged_log = merge_logs(df_log_business_process, df_log_bot, 'eventId', 'businessActivityId', show_progress=True)
+    df_merged_log['time:timestamp'] = pd.to_datetime(df_merged_log['time:timestamp'], format='mixed')
+    df_merged_log.sort_values(by='time:timestamp')
+
+    #Save
+    parameters = {log_converter.Variants.TO_EVENT_LOG.value.Parameters.CASE_ID_KEY: 'caseId'}
+    merged_log = log_converter.apply(df_merged_log, parameters=parameters, variant=log_converter.Variants.TO_EVENT_LOG)
+    xes_exporter.apply(merged_log, 'results/BPI_Merged_Log.xes')
+
+    #Display log as directly follows graph
+    dfg, start_activities, end_activities = pm4py.discover_dfg(merged_log)
+    #pm4py.view_dfg(dfg, start_activities, end_activities)
+    pm4py.save_vis_dfg(dfg,start_activities, end_activities,"results/graphs/" + 'dfg_BPI_Merged_Log.svg')
+
+
+    #Merge Real World Log from Company
+
+    #Load and preprocess business process event log and parsed bot log from company
+    path_business_process_log = 'data/Company_BusinessProcess_Log.xes'
+    path_bot_log = 'results/Company_Bot_Log_UiPath_Parsed.xes'
+
+    #Load the business process event log
+    log_bp = xes_importer.apply(path_business_process_log)
+    df_log_business_process = log_converter.apply(log_bp, variant=log_converter.Variants.TO_DATA_FRAME)
+
+    #Load the bot log
+    log_bot = xes_importer.apply(path_bot_log)
+    df_log_bot = log_converter.apply(log_bot, variant=log_converter.Variants.TO_DATA_FRAME)
+    #Preprocess
+    df_log_bot.rename(columns={"case:caseId": "botCaseId"}, inplace=True)
+    df_log_bot.drop(['case:concept:name'], axis=1, inplace=True)
+    df_log_bot["bot"] = True
+
+    #Merge logs
+    df_merged_log = merge_logs(df_log_business_process, df_log_bot, 'RPA_Exec_Nr', 'Ordnungsbegriff', show_progress=True)
+
+    df_merged_log['time:timestamp'] = pd.to_datetime(df_merged_log['time:timestamp'], format='mixed')
+    df_merged_log.sort_values(by='time:timestamp')
+
+    #Save
+    parameters = {log_converter.Variants.TO_EVENT_LOG.value.Parameters.CASE_ID_KEY: 'caseId'}
+    merged_log = log_converter.apply(df_merged_log, parameters=parameters, variant=log_converter.Variants.TO_EVENT_LOG)
+    xes_exporter.apply(merged_log, 'results/Company_Merged_Log.xes')
+
+    #Display log as directly follows graph
+    dfg, start_activities, end_activities = pm4py.discover_dfg(merged_log)
+    #pm4py.view_dfg(dfg, start_activities, end_activities)
+    pm4py.save_vis_dfg(dfg,start_activities, end_activities,"results/graphs/" + 'dfg_Company_Merged_Log.svg')
\ No newline at end of file
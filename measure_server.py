@@ -0,0 +1,432 @@
+#Measure Server
+
+#Imports
+import json
+import threading
+import logging
+from collections import OrderedDict
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+import numpy as np
+import pandas as pd
+from measures import standard_values_for_logs, compute_measure, render_measure_result, discover_dfg_from_df, \
+    add_derived_columns, measure_derived_columns
+from trace_index import build_trace_index, get_trace_bitmap, bitmap_and, bitmap_or, get_sub_log, count_traces, \
+    trace_index_dimensions
+from profiling import profile_stage
+
+#Long-running server that loads and enriches the configured merged logs once (all derived columns and the trace index)
+#and answers measure requests from memory over HTTP, so that a front end does not re-read the xes file for every question.
+#Requests are handled in parallel threads. The rendered results are kept in a LRU cache, so a repeated request is
+#answered without computing the measure again. The measures of one log are computed in parallel, a lock per log only
+#guards adding a missing derived column to the shared log dataframe
+#Requests:
+#   GET /logs                       the loaded logs with their number of events and traces
+#   GET /measures                   the names of the measures
+#   GET /stats                      the number of hits and misses of the cache
+#   GET /measure?log=company&measure=relative_fails&format=json&resource=bot1&success=false
+#   POST /measure with the body {"log": "company", "measure": "relative_fails", "format": "csv",
+#                                "filters": {"resource": ["bot1", "bot2"], "success": false, "at_activity": "Check documents RPA"}}
+#The filters select whole traces with the trace index: a trace is kept if it has an event with one of the values of every
+#filter (see trace_index_dimensions and 'activity'). With 'at_activity' the filters refer to the events of this activity
+#('at_activity' without a filter on another dimension is answered with 400)
+#Output formats: 'json' (labels and colors of the activities and edges or the records of the dataframe), 'csv' (measures
+#with a dataframe as output), 'dot' (the graph as graphviz source) and 'svg'/'png' (needs the graphviz binaries)
+server_host = "127.0.0.1"
+server_port = 8765
+#The logs that are loaded when the server starts ('company' and/or 'bpi', see standard_log_configurations)
+server_logs = ['company']
+#The number of rendered results kept in the cache
+server_cache_size = 256
+#An event store and the cases that should be loaded from it (see load_merged_log_from_event_store), None for the xes files
+server_event_store = None
+server_event_filter = None
+server_output_formats = ['json', 'csv', 'dot', 'svg', 'png']
+server_measure_names = ['relative_fails', 'exception_time_impact', 'exception_time_variance', 'relative_execution_time',
+                        'execution_time_variance', 'bot_human_handover_count', 'bot_human_handover_impact',
+                        'bot_human_handover_variance', 'relative_case_fails', 'automation_rate',
+                        'case_activities_execution_time', 'case_activities_execution_time_variance',
+                        'edge_waiting_time_mean', 'edge_waiting_time_median', 'edge_waiting_time_p95',
+                        'edge_waiting_times', 'sub_workflow_timings', 'execution_time_p50', 'execution_time_p90',
+                        'execution_time_p99', 'time_until_end_p50', 'time_until_end_p90', 'time_until_end_p99',
+                        'robot_concurrency', 'robot_idle_gaps', 'robot_utilization', 'robot_queueing']
+#The measures with a dataframe as output, all other measures have a dfg visualization as output
+server_dataframe_measures = ['relative_case_fails', 'automation_rate', 'case_activities_execution_time',
+                             'case_activities_execution_time_variance', 'edge_waiting_times', 'sub_workflow_timings',
+                             'robot_concurrency', 'robot_idle_gaps', 'robot_utilization', 'robot_queueing']
+server_content_types = {'json': 'application/json', 'csv': 'text/csv; charset=utf-8', 'dot': 'text/vnd.graphviz',
+                        'svg': 'image/svg+xml', 'png': 'image/png'}
+logger = logging.getLogger('bot_log_mining')
+
+#State of the server
+def create_measure_server_state(cache_size=server_cache_size):
+    """
+    Creates the state of a measure server: the loaded logs and the LRU cache of the rendered results
+
+    Parameters
+    -----------
+    cache_size
+        The number of rendered results kept in the cache
+
+    Returns
+    -----------
+    state
+        The state of the server as dictionary
+    """
+    return {'logs': {}, 'cache': OrderedDict(), 'cache_size': cache_size, 'cache_lock': threading.Lock(),
+            'hits': 0, 'misses': 0}
+def load_server_log(state, log_name, event_store_path=None, event_filter=None):
+    """
+    Loads and preprocesses a log, adds all derived columns and builds its trace index, so that the measures
+    only read the log dataframe (see standard_values_for_logs)
+
+    Parameters
+    -----------
+    state
+        The state of the server (see create_measure_server_state)
+    log_name
+        The name of the log, e.g., 'company' or 'bpi'
+    event_store_path
+        The path to an event store the log should be loaded from (None for the xes file)
+    event_filter
+        The conditions of the query of the cases from the event store (see query_events)
+
+    Returns
+    -----------
+    loaded
+        Whether the log was loaded or not
+    """
+    df_log, dfg, attr_activity, attr_success, attr_bot, attr_traceID = standard_values_for_logs(
+        log_name, derived_columns=None, event_store_path=event_store_path, event_filter=event_filter)
+    if df_log is None:
+        print("The log", log_name, "could not be loaded")
+        return False
+    trace_index = build_trace_index(df_log, attr_traceID, attr_activity, attr_success, attr_bot)
+    state['logs'][log_name] = {'df_log': df_log, 'dfg': dfg, 'attr_activity': attr_activity, 'attr_success': attr_success,
+                               'attr_bot': attr_bot, 'attr_traceID': attr_traceID, 'trace_index': trace_index,
+                               'lock': threading.Lock()}
+    #results of the previous version of the log are outdated
+    with state['cache_lock']:
+        for key in [key for key in state['cache'] if key[0] == log_name]:
+            del state['cache'][key]
+    return True
+
+#Filters on the traces
+def get_filter_value(dimension, value):
+    """
+    Converts a value of a filter given as string in the query of an url (e.g. 'false') to the type of the values
+    in the trace index
+    """
+    if dimension in ['success', 'bot'] and isinstance(value, str):
+        if value.lower() in ['true', 'false']:
+            return value.lower() == 'true'
+    return value
+def get_filter_bitmap(trace_index, filters):
+    """
+    Gets the bitmap of the traces that match all filters (a trace matches a filter if it has an event with
+    one of its values)
+
+    Parameters
+    -----------
+    trace_index
+        The index of the log (see build_trace_index)
+    filters
+        The filters as dictionary, e.g. {'resource': ['bot1', 'bot2'], 'success': False, 'at_activity': 'Check documents'}
+
+    Returns
+    -----------
+    bitmap, error
+        The packed bitmap of the traces (None if there are no filters) and an error message (None if the filters are valid)
+    """
+    filters = dict(filters or {})
+    at_activity = filters.pop('at_activity', None)
+    if at_activity is not None and not any(dimension != 'activity' for dimension in filters):
+        return None, "the filter at_activity needs a filter on another dimension (e.g. resource or success)"
+    bitmaps = []
+    for dimension, values in filters.items():
+        if dimension != 'activity' and dimension not in trace_index_dimensions:
+            return None, "unknown filter " + str(dimension)
+        values = values if isinstance(values, list) else [values]
+        if len(values) == 0:
+            return None, "the filter " + str(dimension) + " has no values"
+        activity = at_activity if dimension != 'activity' else None
+        bitmaps.append(bitmap_or(*[get_trace_bitmap(trace_index, dimension, get_filter_value(dimension, value), activity)
+                                   for value in values]))
+    if len(bitmaps) == 0:
+        return None, None
+    return bitmap_and(*bitmaps), None
+def get_canonical_filters(filters):
+    """
+    Gets the filters as string that is the same for equal filters (used as part of the key of the cache)
+    """
+    return json.dumps({dimension: sorted(values, key=str) if isinstance(values, list) else values
+                       for dimension, values in (filters or {}).items()}, sort_keys=True, default=str)
+
+#Output of the results
+def get_json_value(value):
+    """
+    Converts a value of a result to a value json can serialize (timedeltas and timestamps as strings)
+    """
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, (pd.Timedelta, pd.Timestamp)):
+        return str(value)
+    return value
+def get_graphical_result_json(measure_result, dfg):
+    """
+    Converts the result of a measure with a dfg visualization to a dictionary with the label and color of every
+    activity and the frequency (and label and value, if the measure labels the edges) of every edge
+    """
+    activity_labeling, activity_coloring, edges_labeling, edges_values = measure_result
+    activities = [{'activity': activity, 'label': label, 'color': activity_coloring.get(activity)}
+                  for activity, label in activity_labeling.items()]
+    edges = []
+    for (source, target), frequency in dfg.items():
+        edge = {'source': source, 'target': target, 'frequency': get_json_value(frequency)}
+        if edges_labeling is not None:
+            edge['label'] = edges_labeling.get((source, target))
+            edge['value'] = get_json_value(edges_values.get((source, target)))
+        edges.append(edge)
+    return {'activities': activities, 'edges': edges}
+def render_server_result(is_graphical_measure, measure_result, df_log, log_name, dfg, measure_name, attr_activity,
+                         output_format, max_no_of_edges):
+    """
+    Renders the result of a measure (see compute_measure) in the requested output format
+
+    Returns
+    -----------
+    status, content_type, body
+        The http status, the content type and the body of the response
+    """
+    if output_format == 'json':
+        if is_graphical_measure:
+            result = get_graphical_result_json(measure_result, dfg)
+        else:
+            result = {'columns': [str(column) for column in measure_result.columns],
+                      'records': [[get_json_value(value) for value in row]
+                                  for row in measure_result.itertuples(index=False, name=None)]}
+        result['measure'] = measure_name
+        result['log'] = log_name
+        return 200, server_content_types['json'], json.dumps(result, default=str).encode('utf-8')
+    if not is_graphical_measure:
+        return 200, server_content_types['csv'], measure_result.to_csv(index=False, sep=';').encode('utf-8')
+    gviz = render_measure_result(True, measure_result, df_log, log_name, dfg, measure_name, attr_activity,
+                                 max_no_of_edges=max_no_of_edges)
+    if output_format == 'dot':
+        return 200, server_content_types['dot'], gviz.source.encode('utf-8')
+    try:
+        return 200, server_content_types[output_format], gviz.pipe(format=output_format)
+    except Exception as error:
+        return get_error_response(500, "the graph could not be rendered as " + output_format + ": " + str(error))
+def get_error_response(status, message):
+    """
+    Gets the response for an invalid request or a failed measure
+    """
+    return status, server_content_types['json'], json.dumps({'error': message}).encode('utf-8')
+
+#Requests
+def get_measure_response(state, request):
+    """
+    Answers a measure request from the cache or computes and renders the measure on the (filtered) log
+
+    Parameters
+    -----------
+    state
+        The state of the server (see create_measure_server_state)
+    request
+        The request as dictionary with the keys 'log', 'measure', 'format' (default 'json'), 'filters' (optional)
+        and the optional parameters 'significance_level', 'round_decimals' and 'max_no_of_edges'
+
+    Returns
+    -----------
+    status, content_type, body
+        The http status, the content type and the body of the response
+    """
+    log_name = request.get('log')
+    measure_name = request.get('measure')
+    output_format = request.get('format', 'json')
+    if log_name not in state['logs']:
+        return get_error_response(404, "the log " + str(log_name) + " is not loaded")
+    if measure_name not in server_measure_names:
+        return get_error_response(404, "unknown measure " + str(measure_name))
+    if output_format not in server_output_formats:
+        return get_error_response(400, "unknown format " + str(output_format))
+    if measure_name in server_dataframe_measures and output_format not in ['json', 'csv']:
+        return get_error_response(400, "the measure " + measure_name + " has a dataframe as output, use 'json' or 'csv'")
+    if measure_name not in server_dataframe_measures and output_format == 'csv':
+        return get_error_response(400, "the measure " + measure_name + " has a graph as output, use 'json', 'dot', 'svg' or 'png'")
+    if not isinstance(request.get('filters') or {}, dict):
+        return get_error_response(400, "the filters have to be a json object")
+    try:
+        significance_level = request.get('significance_level')
+        significance_level = float(significance_level) if significance_level is not None else None
+        round_decimals = int(request.get('round_decimals', 2))
+        max_no_of_edges = int(request.get('max_no_of_edges', 150))
+    except (TypeError, ValueError):
+        return get_error_response(400, "invalid parameter")
+
+    key = (log_name, measure_name, output_format, get_canonical_filters(request.get('filters')), significance_level,
+           round_decimals, max_no_of_edges)
+    with state['cache_lock']:
+        if key in state['cache']:
+            state['cache'].move_to_end(key)
+            state['hits'] += 1
+            return state['cache'][key]
+
+    server_log = state['logs'][log_name]
+    bitmap, error = get_filter_bitmap(server_log['trace_index'], request.get('filters'))
+    if error is not None:
+        return get_error_response(400, error)
+    if bitmap is not None and count_traces(server_log['trace_index'], bitmap) == 0:
+        return get_error_response(404, "no traces match the filters")
+    attr_activity = server_log['attr_activity']
+    attr_traceID = server_log['attr_traceID']
+    with state['cache_lock']:
+        state['misses'] += 1
+    with profile_stage('server_request:' + measure_name):
+        #the only change of the shared log dataframe, all derived columns are usually added when the log is loaded
+        with server_log['lock']:
+            add_derived_columns(server_log['df_log'], measure_derived_columns.get(measure_name, []), attr_traceID,
+                                attr_activity, 'eventId', server_log['attr_bot'])
+        if bitmap is None:
+            df_log, dfg = server_log['df_log'], server_log['dfg']
+        else:
+            #the traces are kept whole, so the derived columns of the log are valid for the sub-log
+            df_log = get_sub_log(server_log['trace_index'], server_log['df_log'], bitmap)
+            dfg = discover_dfg_from_df(df_log, attr_activity, attr_traceID)[0]
+        is_graphical_measure, measure_result = compute_measure(df_log, measure_name, attr_activity,
+                                                               server_log['attr_success'], server_log['attr_bot'],
+                                                               attr_traceID, round_decimals=round_decimals,
+                                                               show_progress=False,
+                                                               significance_level=significance_level)
+        if measure_result is None:
+            return get_error_response(500, "the measure " + measure_name + " could not be computed")
+        response = render_server_result(is_graphical_measure, measure_result, df_log, log_name, dfg, measure_name,
+                                        attr_activity, output_format, max_no_of_edges)
+
+    if response[0] == 200:
+        with state['cache_lock']:
+            state['cache'][key] = response
+            state['cache'].move_to_end(key)
+            while len(state['cache']) > state['cache_size']:
+                state['cache'].popitem(last=False)
+    return response
+def get_server_logs_response(state):
+    """
+    Gets the loaded logs with their number of events and traces
+    """
+    logs = [{'log': log_name, 'events': len(server_log['df_log']), 'traces': server_log['trace_index']['n_traces']}
+            for log_name, server_log in state['logs'].items()]
+    return 200, server_content_types['json'], json.dumps(logs).encode('utf-8')
+def get_server_stats_response(state):
+    """
+    Gets the number of hits and misses and the size of the cache
+    """
+    with state['cache_lock']:
+        stats = {'hits': state['hits'], 'misses': state['misses'], 'cached_results': len(state['cache']),
+                 'cache_size': state['cache_size']}
+    return 200, server_content_types['json'], json.dumps(stats).encode('utf-8')
+def get_query_request(query):
+    """
+    Converts the query of a GET request (e.g. 'log=company&measure=relative_fails&resource=bot1&resource=bot2') to
+    a measure request: the parameters that are no options of the request are filters
+    """
+    options = ['log', 'measure', 'format', 'significance_level', 'round_decimals', 'max_no_of_edges']
+    request = {'filters': {}}
+    for parameter, values in parse_qs(query).items():
+        if parameter in options:
+            request[parameter] = values[-1]
+        elif parameter == 'at_activity':
+            request['filters'][parameter] = values[-1]
+        else:
+            request['filters'][parameter] = values if len(values) > 1 else values[0]
+    return request
+
+class MeasureRequestHandler(BaseHTTPRequestHandler):
+    """
+    Handles the http requests of the measure server (the state of the server is server.state)
+    """
+    def do_GET(self):
+        url = urlparse(self.path)
+        state = self.server.state
+        if url.path == '/logs':
+            self.send_server_response(*get_server_logs_response(state))
+        elif url.path == '/measures':
+            self.send_server_response(200, server_content_types['json'], json.dumps(server_measure_names).encode('utf-8'))
+        elif url.path == '/stats':
+            self.send_server_response(*get_server_stats_response(state))
+        elif url.path == '/measure':
+            self.send_measure_response(get_query_request(url.query))
+        else:
+            self.send_server_response(*get_error_response(404, "unknown path " + url.path))
+    def do_POST(self):
+        if urlparse(self.path).path != '/measure':
+            self.send_server_response(*get_error_response(404, "unknown path " + self.path))
+            return
+        try:
+            request = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+        except ValueError:
+            self.send_server_response(*get_error_response(400, "the body is no valid json"))
+            return
+        if not isinstance(request, dict):
+            self.send_server_response(*get_error_response(400, "the body has to be a json object"))
+            return
+        self.send_measure_response(request)
+    def send_measure_response(self, request):
+        try:
+            response = get_measure_response(self.server.state, request)
+        except Exception as error:
+            logger.exception("measure request failed")
+            response = get_error_response(500, str(error))
+        self.send_server_response(*response)
+    def send_server_response(self, status, content_type, body):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    def log_message(self, format, *args):
+        logger.info("%s - " + format, self.address_string(), *args)
+
+def create_measure_server(state, host=server_host, port=server_port):
+    """
+    Creates the http server (one thread per request) for a state with loaded logs (see load_server_log).
+    The server is started with serve_forever() and stopped with shutdown()
+    """
+    server = ThreadingHTTPServer((host, port), MeasureRequestHandler)
+    server.daemon_threads = True
+    server.state = state
+    return server
+def serve_measures(log_names=server_logs, host=server_host, port=server_port, cache_size=server_cache_size,
+                   event_store_path=None, event_filter=None):
+    """
+    Loads the logs and answers measure requests until the server is interrupted (Ctrl+C)
+
+    Parameters
+    -----------
+    log_names
+        The names of the logs that should be loaded, e.g., ['company', 'bpi']
+    host, port
+        The address of the server
+    cache_size
+        The number of rendered results kept in the cache
+    event_store_path
+        The path to an event store the logs should be loaded from (None for the xes files)
+    event_filter
+        The conditions of the query of the cases from the event store (see query_events)
+    """
+    state = create_measure_server_state(cache_size)
+    for log_name in log_names:
+        load_server_log(state, log_name, event_store_path, event_filter)
+    server = create_measure_server(state, host, port)
+    print("Serving measures of the logs", list(state['logs'].keys()), "on http://" + host + ":" + str(server.server_port))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    serve_measures(server_logs, server_host, server_port, server_cache_size, server_event_store, server_event_filter)
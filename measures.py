@@ -3,14 +3,23 @@
 #Imports
 import pm4py
 import tempfile
+import os
+import json
+import pickle
+import hashlib
+import shutil
+import time
+import multiprocessing
+import threading
+import heapq
+import re
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 from copy import copy
 import pandas as pd
 import numpy as np
 from datetime import timezone, datetime, timedelta
 from graphviz import Digraph
 #from IPython.display import display
-from pm4py.objects.log.util import interval_lifecycle
-from pm4py.statistics.attributes.log import get as attr_get
 from pm4py.objects.dfg.utils import dfg_utils
 from pm4py.util import xes_constants as xes
 from pm4py.visualization.common.utils import *
@@ -23,7 +32,9 @@ from pm4py.visualization.common import save as gsave
 from enum import Enum
 from pm4py.util import exec_utils
 from pm4py.objects.conversion.log import converter as log_converter
-from pm4py.algo.discovery.dfg import algorithm as dfg_discovery
+from profiling import profile_stage, profiled_stage, report_progress, create_profiler, start_profiler, stop_profiler, \
+    print_profile_summary, save_profile
+from event_store import open_event_store, query_events
 
 #Customized functions for directly follows graph (dfg) visualization based on pm4py standard functions
 def own_variant_measure_get_min_max_value(dfg):
@@ -75,8 +86,52 @@ def own_variant_measure_assign_penwidth_edges(dfg):
         penwidth[edge] = str(v1)
 
     return penwidth
+def reduce_dfg(dfg, max_no_of_edges, activities_count=None, min_activity_frequency=0):
+    """
+    Reduces a DFG graph to the edges that are visualized, without changing the given DFG graph.
+    Activities that occur less often than min_activity_frequency are collapsed into one aggregate node
+    (the counts of their edges are added up). Then the max_no_of_edges most frequent edges are kept, selected with
+    a heap instead of sorting all edges. Ties are broken by the names of the activities, so that the same edges
+    are kept in every run
+
+    Parameters
+    -----------
+    dfg
+        DFG graph
+    max_no_of_edges
+        Maximum number of edges that are kept
+    activities_count
+        Count of attributes in the log, needed to collapse the low-frequency activities
+    min_activity_frequency
+        Activities with a lower count are collapsed into one aggregate node. If 0, no activity is collapsed
+
+    Returns
+    -----------
+    reduced_dfg
+        A new DFG graph with at most max_no_of_edges edges
+    """
+    low_frequency_activities = set()
+    if activities_count is not None and min_activity_frequency > 0:
+        low_frequency_activities = {act for act, count in activities_count.items() if count < min_activity_frequency}
+
+    if low_frequency_activities:
+        aggregate_activity = str(len(low_frequency_activities)) + " activities with less than " + str(
+            min_activity_frequency) + " events"
+        dfg_aggregated = {}
+        for edge, count in dfg.items():
+            source = aggregate_activity if edge[0] in low_frequency_activities else edge[0]
+            target = aggregate_activity if edge[1] in low_frequency_activities else edge[1]
+            dfg_aggregated[(source, target)] = dfg_aggregated.get((source, target), 0) + count
+    else:
+        dfg_aggregated = dfg
+
+    # more fine grained ordering to avoid that edges that are below the threshold are
+    # undeterministically removed
+    top_edges = heapq.nlargest(max_no_of_edges, dfg_aggregated.items(), key=lambda x: (x[1], x[0][0], x[0][1]))
+    return dict(top_edges)
 def own_variant_measure_graphviz_visualization(activities_count, activities_color, activities_labels, dfg, show_edge_labels=True, image_format="png", measure="own_measure_1",
-                           max_no_of_edges_in_diagram=170, start_activities=None, end_activities=None):
+                           max_no_of_edges_in_diagram=170, start_activities=None, end_activities=None, edges_labels=None,
+                           edges_values=None, layout_cache_dir=None, layout_name="dfg", min_activity_frequency=0):
     """
     Do GraphViz visualization of a DFG graph
 
@@ -94,6 +149,18 @@ def own_variant_measure_graphviz_visualization(activities_count, activities_colo
         A boolean indicating whether the labels of the edges of the graph should be displayed or not
     max_no_of_edges_in_diagram
         Maximum number of edges in the diagram allowed for visualization
+    edges_labels
+        labels (str) for the visualization of each edge. If None, the edges are labeled with their frequency
+    edges_values
+        values for each edge which define the penwidth of the edges. If None, the penwidth depends on the frequency
+    layout_cache_dir
+        If given, the positions of the nodes and edges are computed once for the graph (see get_dfg_layout),
+        cached in this folder and applied to the graph, so that it can be rendered without running the layout again
+        (see save_gviz). If None, the graph is laid out with dot when it is rendered
+    layout_name
+        The name the cached layout file starts with (e.g. the name of the log)
+    min_activity_frequency
+        Activities that occur less often in the log are collapsed into one aggregate node (see reduce_dfg)
 
     Returns
     -----------
@@ -108,22 +175,18 @@ def own_variant_measure_graphviz_visualization(activities_count, activities_colo
     filename = tempfile.NamedTemporaryFile(suffix='.gv')
     viz = Digraph("", filename=filename.name, engine='dot', graph_attr={'bgcolor': 'transparent'})
 
-    # first, remove edges in diagram that exceeds the maximum number of edges in the diagram
-    dfg_key_value_list = []
-    for edge in dfg:
-        dfg_key_value_list.append([edge, dfg[edge]])
-    # more fine grained sorting to avoid that edges that are below the threshold are
-    # undeterministically removed
-    dfg_key_value_list = sorted(dfg_key_value_list, key=lambda x: (x[1], x[0][0], x[0][1]), reverse=True)
-    dfg_key_value_list = dfg_key_value_list[0:min(len(dfg_key_value_list), max_no_of_edges_in_diagram)]
-    dfg_allowed_keys = [x[0] for x in dfg_key_value_list]
-    dfg_keys = list(dfg.keys())
-    for edge in dfg_keys:
-        if edge not in dfg_allowed_keys:
-            del dfg[edge]
+    # first, reduce the diagram to the edges (and activities) that are visualized, without changing the given dfg
+    dfg = reduce_dfg(dfg, max_no_of_edges_in_diagram, activities_count=activities_count,
+                     min_activity_frequency=min_activity_frequency)
 
     # calculate edges penwidth
-    penwidth = own_variant_measure_assign_penwidth_edges(dfg)
+    if edges_values is None:
+        penwidth = own_variant_measure_assign_penwidth_edges(dfg)
+    else:
+        # edges without a value get the minimum value
+        edges_values_in_dfg = {edge: edges_values[edge] for edge in dfg if edge in edges_values}
+        min_edge_value = min(edges_values_in_dfg.values(), default=0)
+        penwidth = own_variant_measure_assign_penwidth_edges({edge: edges_values_in_dfg.get(edge, min_edge_value) for edge in dfg})
     activities_in_dfg = set()
     # activities_count_int is then just the same as activities_count
     activities_count_int = copy(activities_count)
@@ -132,53 +195,73 @@ def own_variant_measure_graphviz_visualization(activities_count, activities_colo
         activities_in_dfg.add(edge[0])
         activities_in_dfg.add(edge[1])
 
-    # represent nodes
-    viz.attr('node', shape='box')
-
     if len(activities_in_dfg) == 0:
         activities_to_include = sorted(list(set(activities_count_int)))
     else:
         # take unique elements as a list not as a set (in this way, nodes are added in the same order to the graph)
         activities_to_include = sorted(list(set(activities_in_dfg)))
 
+    # the node ids are stable, so that the same activity always gets the same node in every run
     activities_map = {}
+    for act in activities_to_include:
+        activities_map[act] = get_stable_node_id(act)
+
+    # make edges addition always in the same order
+    dfg_edges = sorted(list(dfg.keys()))
+
+    start_activities_to_include = [act for act in start_activities if act in activities_map]
+    end_activities_to_include = [act for act in end_activities if act in activities_map]
+
+    # get the fixed positions of the nodes and edges (computed once and then loaded from the cache)
+    node_attributes = {}
+    edge_attributes = {}
+    #the cached layout is computed for edges labeled with their frequency, so graphs with other edge labels
+    #(e.g. waiting times) are laid out with dot
+    if layout_cache_dir is not None and edges_labels is None:
+        layout = get_dfg_layout(activities_to_include, dfg, start_activities_to_include, end_activities_to_include,
+                                layout_cache_dir, layout_name)
+        node_attributes = layout['nodes']
+        edge_attributes = layout['edges']
+        viz.engine = 'neato'
+        viz.attr(bb=layout['bb'])
+
+    # represent nodes
+    viz.attr('node', shape='box')
 
     for act in activities_to_include:
         if act in activities_count_int:
             #viz.node(str(hash(act)), act + " (" + str(activities_count_int[act]) + ")", style='filled',
             #         fillcolor=activities_color[act])
             #customized:
-            viz.node(str(hash(act)), activities_labels[act], style='filled',
-                     fillcolor=activities_color[act])
-            activities_map[act] = str(hash(act))
+            viz.node(activities_map[act], activities_labels[act], style='filled',
+                     fillcolor=activities_color[act], **node_attributes.get(activities_map[act], {}))
         else:
-            viz.node(str(hash(act)), act)
-            activities_map[act] = str(hash(act))
-
-    # make edges addition always in the same order
-    dfg_edges = sorted(list(dfg.keys()))
+            viz.node(activities_map[act], act, **node_attributes.get(activities_map[act], {}))
 
     # represent edges
     for edge in dfg_edges:
         label = str(dfg[edge])
+        if edges_labels is not None and edge in edges_labels:
+            label = edges_labels[edge]
         #label = human_readable_stat(dfg[edge])
         if show_edge_labels:
-            viz.edge(str(hash(edge[0])), str(hash(edge[1])), label=label, penwidth=str(penwidth[edge]))
+            viz.edge(activities_map[edge[0]], activities_map[edge[1]], label=label, penwidth=str(penwidth[edge]),
+                     **edge_attributes.get(activities_map[edge[0]] + "->" + activities_map[edge[1]], {}))
         else:
-            viz.edge(str(hash(edge[0])), str(hash(edge[1])), label="", penwidth=str(penwidth[edge]))
-        
-    start_activities_to_include = [act for act in start_activities if act in activities_map]
-    end_activities_to_include = [act for act in end_activities if act in activities_map]
+            viz.edge(activities_map[edge[0]], activities_map[edge[1]], label="", penwidth=str(penwidth[edge]),
+                     **edge_attributes.get(activities_map[edge[0]] + "->" + activities_map[edge[1]], {}))
 
     if start_activities_to_include:
-        viz.node("@@startnode", "@@S", style='filled', shape='circle', fillcolor="#32CD32", fontcolor="#32CD32")
+        viz.node("@@startnode", "@@S", style='filled', shape='circle', fillcolor="#32CD32", fontcolor="#32CD32",
+                 **node_attributes.get("@@startnode", {}))
         for act in start_activities_to_include:
-            viz.edge("@@startnode", activities_map[act])
+            viz.edge("@@startnode", activities_map[act], **edge_attributes.get("@@startnode->" + activities_map[act], {}))
 
     if end_activities_to_include:
-        viz.node("@@endnode", "@@E", style='filled', shape='circle', fillcolor="#FFA500", fontcolor="#FFA500")
+        viz.node("@@endnode", "@@E", style='filled', shape='circle', fillcolor="#FFA500", fontcolor="#FFA500",
+                 **node_attributes.get("@@endnode", {}))
         for act in end_activities_to_include:
-            viz.edge(activities_map[act], "@@endnode")
+            viz.edge(activities_map[act], "@@endnode", **edge_attributes.get(activities_map[act] + "->@@endnode", {}))
 
     viz.attr(overlap='false')
     viz.attr(fontsize='11')
@@ -186,29 +269,179 @@ def own_variant_measure_graphviz_visualization(activities_count, activities_colo
     viz.format = image_format
 
     return viz
-def custom_variant_measure_apply(dfg, activities_color, activities_labels, show_edge_labels=True, log=None, parameters=None,
-                                 activities_count=None, max_no_of_edges=200):
+def custom_variant_measure_apply(dfg, activities_color, activities_labels, show_edge_labels=True, parameters=None,
+                                 activities_count=None, max_no_of_edges=200, edges_labels=None, edges_values=None,
+                                 layout_cache_dir=None, layout_name="dfg", min_activity_frequency=0):
     if parameters is None:
         parameters = {}
 
-    activity_key = exec_utils.get_param_value(Parameters.ACTIVITY_KEY, parameters, xes.DEFAULT_NAME_KEY)
     image_format = exec_utils.get_param_value(Parameters.FORMAT, parameters, "png")
     max_no_of_edges_in_diagram = exec_utils.get_param_value(Parameters.MAX_NO_EDGES_IN_DIAGRAM, parameters, max_no_of_edges)
     start_activities = exec_utils.get_param_value(Parameters.START_ACTIVITIES, parameters, [])
     end_activities = exec_utils.get_param_value(Parameters.END_ACTIVITIES, parameters, [])
 
     if activities_count is None:
-        if log is not None:
-            activities_count = attr_get.get_attribute_values(log, activity_key, parameters=parameters)
-        else:
-            activities = dfg_utils.get_activities_from_dfg(dfg)
-            activities_count = {key: 1 for key in activities}
+        activities = dfg_utils.get_activities_from_dfg(dfg)
+        activities_count = {key: 1 for key in activities}
 
     return own_variant_measure_graphviz_visualization(activities_count, activities_color, activities_labels, dfg, show_edge_labels, image_format=image_format,
                                   max_no_of_edges_in_diagram=max_no_of_edges_in_diagram,
-                                  start_activities=start_activities, end_activities=end_activities)
+                                  start_activities=start_activities, end_activities=end_activities,
+                                  edges_labels=edges_labels, edges_values=edges_values,
+                                  layout_cache_dir=layout_cache_dir, layout_name=layout_name,
+                                  min_activity_frequency=min_activity_frequency)
+
+#Functions for computing the layout of the dfg once and reusing it for the visualizations of all measures
+#Increase the version if the way the layout is computed changes, so that old layouts are not reused
+layout_format_version = 3
+#The space that is reserved in every node for the values of the measures below the name of the activity
+#(the most lines and the longest line of the values of all measures, e.g. a confidence interval with its p-value)
+layout_measure_label_lines = 3
+layout_measure_label_width = 50
+#The render threads of apply_measures_parallel share the layout cache, so the layout is computed by one thread only
+layout_cache_lock = threading.Lock()
+def get_stable_node_id(activity):
+    """
+    Gets a node id for an activity that is the same in every run (unlike hash(), which is salted per interpreter run)
+
+    Parameters
+    -----------
+    activity
+        The name of the activity
+
+    Returns
+    -----------
+    node_id
+        The node id of the activity in the visualization
+    """
+    return "act_" + hashlib.md5(str(activity).encode('utf-8')).hexdigest()
+def get_node_size(activity):
+    """
+    Gets the fixed size (width and height in inches, as strings) of the node of an activity. The node is big enough for
+    the name of the activity and the values of every measure (see layout_measure_label_lines), so that the same
+    layout fits the visualizations of all measures (approximately 0.1 inch per character and 0.2 inch per line)
+    """
+    lines = str(activity).split("\n")
+    longest_line = max([len(line) for line in lines] + [layout_measure_label_width])
+    width = max(3.6, np.ceil(0.1 * longest_line * 2) / 2)
+    height = max(1.0, np.ceil((0.2 * (len(lines) + layout_measure_label_lines) + 0.3) * 2) / 2)
+    return str(width), str(height)
+def compute_dfg_layout(activities_to_include, dfg, start_activities, end_activities):
+    """
+    Computes the positions of the nodes and edges of a dfg with dot (dot -Tjson).
+    The nodes get a fixed size that only depends on the name of the activity (see get_node_size) and not on the labels
+    of a measure, so that the positions fit the visualizations of all measures
+
+    Parameters
+    -----------
+    activities_to_include
+        The activities that are represented as nodes
+    dfg
+        DFG graph (already reduced to the edges that are visualized)
+    start_activities
+        The start activities that are connected to the start node
+    end_activities
+        The end activities that are connected to the end node
+
+    Returns
+    -----------
+    layout
+        A dictionary with the bounding box of the graph ('bb'), the attributes (pos, width, height) of every node
+        by node id ('nodes') and the attributes (pos, lp) of every edge by 'tail_id->head_id' ('edges')
+    """
+    viz = Digraph("", engine='dot', graph_attr={'bgcolor': 'transparent'})
+    viz.attr('node', shape='box', fixedsize='true')
+    for act in activities_to_include:
+        width, height = get_node_size(act)
+        viz.node(get_stable_node_id(act), "", width=width, height=height)
+    #the edges are laid out with their frequency as label
+    for edge in sorted(list(dfg.keys())):
+        viz.edge(get_stable_node_id(edge[0]), get_stable_node_id(edge[1]), label=str(dfg[edge]))
+    if start_activities:
+        viz.node("@@startnode", "", shape='circle', width="0.75", height="0.75")
+        for act in start_activities:
+            viz.edge("@@startnode", get_stable_node_id(act))
+    if end_activities:
+        viz.node("@@endnode", "", shape='circle', width="0.75", height="0.75")
+        for act in end_activities:
+            viz.edge(get_stable_node_id(act), "@@endnode")
+    viz.attr(overlap='false')
+    viz.attr(fontsize='11')
+
+    layout_json = json.loads(viz.pipe(format='json'))
+    layout = {'bb': layout_json['bb'], 'nodes': {}, 'edges': {}}
+    node_ids = {}
+    for node in layout_json.get('objects', []):
+        node_ids[node['_gvid']] = node['name']
+        layout['nodes'][node['name']] = {'pos': node['pos'], 'width': node['width'], 'height': node['height'],
+                                         'fixedsize': 'true'}
+    for edge in layout_json.get('edges', []):
+        edge_attributes = {'pos': edge['pos']}
+        if 'lp' in edge:
+            edge_attributes['lp'] = edge['lp']
+        layout['edges'][node_ids[edge['tail']] + "->" + node_ids[edge['head']]] = edge_attributes
+    return layout
+def get_dfg_layout(activities_to_include, dfg, start_activities, end_activities, layout_cache_dir, layout_name):
+    """
+    Gets the layout of a dfg (see compute_dfg_layout). The layout is computed once per graph (i.e. per log and
+    edge filter) and then loaded from the layout cache
+
+    Parameters
+    -----------
+    activities_to_include
+        The activities that are represented as nodes
+    dfg
+        DFG graph (already reduced to the edges that are visualized)
+    start_activities
+        The start activities that are connected to the start node
+    end_activities
+        The end activities that are connected to the end node
+    layout_cache_dir
+        The folder containing the cached layouts
+    layout_name
+        The name the cached layout file starts with (e.g. the name of the log)
+
+    Returns
+    -----------
+    layout
+        The layout of the dfg
+    """
+    graph_description = [layout_format_version, [str(act) for act in activities_to_include],
+                         [[str(edge[0]), str(edge[1]), str(dfg[edge])] for edge in sorted(list(dfg.keys()))],
+                         [str(act) for act in start_activities], [str(act) for act in end_activities]]
+    layout_key = hashlib.sha256(json.dumps(graph_description).encode('utf-8')).hexdigest()
+    layout_path = os.path.join(layout_cache_dir, layout_name + "_" + layout_key[:16] + ".json")
+    with layout_cache_lock:
+        if os.path.isfile(layout_path):
+            with open(layout_path, 'r') as layout_file:
+                return json.load(layout_file)
+        layout = compute_dfg_layout(activities_to_include, dfg, start_activities, end_activities)
+        os.makedirs(layout_cache_dir, exist_ok=True)
+        #write to a temporary file first, so that an interrupted run does not leave an incomplete layout
+        with open(layout_path + ".tmp", 'w') as layout_file:
+            json.dump(layout, layout_file)
+        os.replace(layout_path + ".tmp", layout_path)
+    return layout
+def save_gviz(gviz, output_file_path):
+    """
+    Saves the visualization of a dfg. If the positions of the visualization are fixed (see get_dfg_layout),
+    neato only draws the graph at these positions (neato -n2) instead of computing the layout again
+
+    Parameters
+    -----------
+    gviz
+        The visualization of the dfg
+    output_file_path
+        Path where the visualization should be saved
+    """
+    if gviz.engine == 'neato':
+        rendered_file_path = gviz.render(cleanup=True, neato_no_op=2)
+        shutil.copyfile(rendered_file_path, output_file_path)
+    else:
+        dfg_visualization.save(gviz, output_file_path)
 
 #Functions for loading and preprocessing the merged log 
+@profiled_stage('load_merged_log_and_preprocess')
 def load_merged_log_and_preprocess(path, attr_lifecycle, attr_timestamp, show_progress=True):
     """
     Load a merged log in xes format here and preprocess.
@@ -262,54 +495,353 @@ def load_merged_log_and_preprocess(path, attr_lifecycle, attr_timestamp, show_pr
         Whether a progress update every 1000 events should be printed out or not
     Returns
     -----------
-    log_final, df_log_final, dfg_final
-        The log loaded in pm4py, the log as dataframe and the directly follows graph
+    df_log_final, dfg_final
+        The log as dataframe and the directly follows graph (discovered directly from the dataframe)
     """
     
-    log_initial = pm4py.read_xes(path)
-    df_log_initial = log_converter.apply(log_initial, variant=log_converter.Variants.TO_DATA_FRAME)
-    
+    #pm4py reads the xes log as dataframe, the pm4py EventLog object is not needed for the measures
+    with profile_stage('read_xes') as record:
+        df_log_initial = log_converter.apply(pm4py.read_xes(path), variant=log_converter.Variants.TO_DATA_FRAME)
+        if record is not None:
+            record['rows'] = len(df_log_initial)
+
+    return preprocess_lifecycles(df_log_initial, attr_lifecycle, attr_timestamp, show_progress)
+@profiled_stage('load_merged_log_from_event_store')
+def load_merged_log_from_event_store(event_store_path, log_name, attr_lifecycle, attr_timestamp, event_filter=None,
+                                     show_progress=True):
+    """
+    Loads a merged log from the event store (see event_store.py) instead of a xes file and preprocesses it
+    (see load_merged_log_and_preprocess). Only the cases selected by the event filter are read
+
+    Parameters
+    -----------
+    event_store_path
+        The path to the event store (e.g. 'results/event_store.sqlite')
+    log_name
+        The name of the merged log in the event store (e.g. 'company')
+    attr_lifecycle
+        The name/key of the attribute in the log which contains the lifecycle ('start' or 'complete').
+        Example value: 'lifecycle:transition'
+    attr_timestamp
+        The name/key of the attribute in the log which contains the timestamp. Example value: 'time:timestamp'
+    event_filter
+        The conditions of the query as dictionary (see query_events), e.g. {'start': '2022-05-09', 'end': '2022-05-16'}
+        for the cases of one week or {'bot_process_versions': ['1.4.0-final.4']} for the cases with a bot process version.
+        Whole cases are read. None reads the whole log
+    show_progress
+        Whether a progress update every 1000 events should be printed out or not
+
+    Returns
+    -----------
+    df_log_final, dfg_final
+        The log as dataframe and the directly follows graph (None, None if the log is not in the event store or no
+        case matches the filter)
+    """
+    connection = open_event_store(event_store_path)
+    df_log_initial = query_events(connection, log_name, **(event_filter or {}))
+    connection.close()
+    if df_log_initial is None:
+        return None, None
+    if len(df_log_initial) == 0:
+        print("No case of the log", log_name, "matches the filter", event_filter)
+        return None, None
+    return preprocess_lifecycles(df_log_initial, attr_lifecycle, attr_timestamp, show_progress)
+def get_group_cumsum(values, group_starts):
+    """
+    Cumulative sums of values that are sorted by group, restarting at the first value of every group
+
+    Parameters
+    -----------
+    values
+        The values (numpy array), sorted by group
+    group_starts
+        A boolean numpy array marking the first value of every group
+    """
+    cumsum = np.cumsum(values)
+    #the sum of all values before the group of every value
+    group_start_indices = np.maximum.accumulate(np.where(group_starts, np.arange(len(values)), 0))
+    return cumsum - (cumsum - values)[group_start_indices]
+@profiled_stage('pair_lifecycles', rows_argument='df_log')
+def pair_lifecycles(df_log, attr_lifecycle, attr_timestamp, attr_activity='concept:name', attr_case='case:concept:name',
+                    attr_instance='lifecycle:instance', unmatched_starts='drop', unmatched_completes='instant',
+                    overlap_matching='fifo', keep_start_attributes=False, show_progress=True):
+    """
+    Pairs the 'start' and 'complete' events of a lifecycle log and returns one event per pair with the columns
+    'start_timestamp' and 'end_timestamp' (the dataframe version of pm4py's interval_lifecycle.to_interval).
+    Every complete event is paired with an open start event of the same case, activity and instance (if the log has an
+    instance attribute). The events of every (case, activity, instance) group are sorted in the order of the log, the
+    number of open starts after every event is the cumulative sum of +1 (start) and -1 (complete), corrected by the
+    running maximum of its deficit for complete events without an open start. Then the k-th paired complete event of a
+    group is paired with the k-th start event (first in, first out), or every start event with the next complete event
+    that closes its level of open starts (last in, first out). Transitions other than 'start' and 'complete' are dropped,
+    events without transition count as complete events.
+    The result is ordered like the result of to_interval: by case (in the order of their first event) and by the start
+    timestamp, then in the order of the log
+
+    Parameters
+    -----------
+    df_log
+        The lifecycle log dataframe
+    attr_lifecycle
+        The name/key of the attribute in the log which contains the lifecycle ('start' or 'complete').
+        Example value: 'lifecycle:transition'
+    attr_timestamp
+        The name/key of the attribute in the log which contains the timestamp. Example value: 'time:timestamp'
+    attr_activity
+        The name/key of the attribute in the log which contains the name of an activity. Example value: 'concept:name'
+    attr_case
+        The name/key of the attribute that identifies the cases. Example value: 'case:concept:name'
+    attr_instance
+        The name/key of the attribute that identifies the instances of an activity, if several instances of the same
+        activity of a case can be running at the same time (not used if it is not in the log)
+    unmatched_starts
+        'drop' for dropping start events without complete event (like to_interval) or 'open' for keeping them as
+        events without end timestamp
+    unmatched_completes
+        'instant' for keeping complete events without start event with their timestamp as start timestamp
+        (like to_interval), 'no_start' for keeping them without start timestamp or 'drop' for dropping them
+    overlap_matching
+        Which open start event of overlapping instances a complete event is paired with: 'fifo' for the earliest
+        (like to_interval) or 'lifo' for the latest
+    keep_start_attributes
+        Whether the attributes of the start events are added to the paired events (as '@@startevent_' + attribute,
+        like to_interval) or not
+    show_progress
+        Whether the number of paired, unmatched and overlapping events should be reported or not
+
+    Returns
+    -----------
+    df_log_interval
+        The interval log dataframe, without the columns attr_lifecycle and attr_timestamp
+    """
+    if unmatched_starts not in ['drop', 'open'] or unmatched_completes not in ['instant', 'no_start', 'drop'] or \
+            overlap_matching not in ['fifo', 'lifo']:
+        print("Unknown option for unmatched_starts ('drop', 'open'), unmatched_completes ('instant', 'no_start', 'drop')",
+              "or overlap_matching ('fifo', 'lifo')")
+        return None
+    transitions = df_log[attr_lifecycle]
+    transitions = transitions.where(transitions.notna(), 'complete').astype(str).str.lower().to_numpy()
+    is_start_all = transitions == 'start'
+    is_complete_all = transitions == 'complete'
+    group_columns = [attr_case, attr_activity] + ([attr_instance] if attr_instance in df_log.columns else [])
+    group_codes = df_log.groupby(group_columns, sort=False, dropna=False).ngroup().to_numpy()
+
+    #the start and complete events sorted by group and in the order of the log
+    positions = np.flatnonzero(is_start_all | is_complete_all)
+    positions = positions[np.lexsort((positions, group_codes[positions]))]
+    groups = group_codes[positions]
+    is_start = is_start_all[positions]
+    is_complete = ~is_start
+    group_starts = np.ones(len(positions), dtype=bool)
+    group_starts[1:] = groups[1:] != groups[:-1]
+
+    #number of open starts after every event: complete events without open start (deficit) do not count
+    balance = get_group_cumsum(np.where(is_start, 1, -1).astype(np.int64), group_starts)
+    deficit = np.maximum(-balance, 0) + groups * (len(positions) + 1)
+    deficit = np.maximum.accumulate(deficit) - groups * (len(positions) + 1)
+    open_starts = balance + deficit
+    open_starts_before = np.where(group_starts, 0, np.roll(open_starts, 1))
+    is_paired_complete = is_complete & (open_starts_before > 0)
+
+    if overlap_matching == 'fifo':
+        #the k-th paired complete event of a group is paired with the k-th start event of the group
+        start_indices = np.flatnonzero(is_start)
+        complete_indices = np.flatnonzero(is_paired_complete)
+        complete_ranks = get_group_cumsum(is_paired_complete.astype(np.int64), group_starts)[complete_indices]
+        first_start_of_group = np.searchsorted(groups[start_indices], groups[complete_indices], side='left')
+        paired_start_indices = start_indices[first_start_of_group + complete_ranks - 1]
+    else:
+        #a start event is paired with the next complete event that closes its level of open starts
+        levels = np.where(is_start, open_starts, open_starts_before)
+        candidates = np.flatnonzero(is_start | is_paired_complete)
+        candidates = candidates[np.lexsort((candidates, levels[candidates], groups[candidates]))]
+        is_pair = (is_start[candidates[:-1]] & is_paired_complete[candidates[1:]] &
+                   (groups[candidates[:-1]] == groups[candidates[1:]]) &
+                   (levels[candidates[:-1]] == levels[candidates[1:]]))
+        paired_start_indices = candidates[:-1][is_pair]
+        complete_indices = candidates[1:][is_pair]
+    is_paired_start = np.zeros(len(positions), dtype=bool)
+    is_paired_start[paired_start_indices] = True
+
+    timestamps = df_log[attr_timestamp]
+    complete_positions = positions[complete_indices]
+    start_positions = positions[paired_start_indices]
+    end_timestamps = [timestamps.iloc[complete_positions]]
+    start_timestamps = [timestamps.iloc[start_positions]]
+    row_positions = [complete_positions]
+    attribute_positions = [start_positions]
+    unmatched_complete_positions = positions[is_complete & ~is_paired_complete]
+    if unmatched_completes != 'drop':
+        row_positions.append(unmatched_complete_positions)
+        end_timestamps.append(timestamps.iloc[unmatched_complete_positions])
+        no_start_timestamps = timestamps.iloc[unmatched_complete_positions]
+        if unmatched_completes == 'no_start':
+            no_start_timestamps = pd.Series(pd.NaT, index=no_start_timestamps.index, dtype=timestamps.dtype)
+        start_timestamps.append(no_start_timestamps)
+        attribute_positions.append(np.full(len(unmatched_complete_positions), -1))
+    unmatched_start_positions = positions[is_start & ~is_paired_start]
+    if unmatched_starts == 'open':
+        row_positions.append(unmatched_start_positions)
+        end_timestamps.append(pd.Series(pd.NaT, index=timestamps.index[unmatched_start_positions], dtype=timestamps.dtype))
+        start_timestamps.append(timestamps.iloc[unmatched_start_positions])
+        attribute_positions.append(unmatched_start_positions)
+    if show_progress:
+        no_of_starts = int(is_start.sum())
+        report_progress('pair_lifecycles', len(complete_positions), no_of_starts, "start events paired")
+        report_progress('pair_lifecycles', len(unmatched_complete_positions), int(is_complete.sum()),
+                        "complete events without start event")
+        report_progress('pair_lifecycles', int((is_start & (open_starts > 1)).sum()), no_of_starts,
+                        "start events of overlapping instances")
+
+    row_positions = np.concatenate(row_positions)
+    attribute_positions = np.concatenate(attribute_positions)
+    df_log_interval = df_log.iloc[row_positions].drop(columns=[attr_lifecycle, attr_timestamp])
+    if keep_start_attributes:
+        has_start = attribute_positions >= 0
+        #the case attributes are the same for both events
+        for column in [column for column in df_log_interval.columns if not column.startswith('case:')]:
+            start_values = df_log[column].iloc[np.where(has_start, attribute_positions, 0)].to_numpy(dtype=object)
+            df_log_interval['@@startevent_' + column] = np.where(has_start, start_values, np.nan)
+    df_log_interval['start_timestamp'] = pd.concat(start_timestamps).array
+    df_log_interval['end_timestamp'] = pd.concat(end_timestamps).array
+
+    #ordered by case (in the order of their first event in the log), start timestamp and position in the log,
+    #missing start timestamps last
+    case_codes, cases = pd.factorize(df_log[attr_case], use_na_sentinel=False)
+    case_codes = case_codes[row_positions]
+    start_keys = pd.to_datetime(df_log_interval['start_timestamp'], utc=True)
+    start_keys = np.where(start_keys.isna(), np.iinfo(np.int64).max, start_keys.to_numpy(dtype='datetime64[ns]').view('int64'))
+    order = np.lexsort((row_positions, start_keys, case_codes))
+    return df_log_interval.iloc[order].reset_index(drop=True)
+@profiled_stage('preprocess_lifecycles', rows_argument='df_log_initial')
+def preprocess_lifecycles(df_log_initial, attr_lifecycle, attr_timestamp, show_progress=True):
+    """
+    Preprocesses a merged log dataframe (see load_merged_log_and_preprocess), i.e. converts the lifecycles of the
+    events to the columns 'start_timestamp' and 'end_timestamp' and discovers the directly follows graph
+
+    Parameters
+    -----------
+    df_log_initial
+        The merged log as dataframe (e.g. as read from the xes log or as returned by merge_logs)
+    attr_lifecycle
+        The name/key of the attribute in the log which contains the lifecycle ('start' or 'complete').
+        Example value: 'lifecycle:transition'
+    attr_timestamp
+        The name/key of the attribute in the log which contains the timestamp. Example value: 'time:timestamp'
+    show_progress
+        Whether the number of paired, unmatched and overlapping lifecycle events should be reported or not
+        (see pair_lifecycles)
+    Returns
+    -----------
+    df_log_final, dfg_final
+        The log as dataframe and the directly follows graph (discovered directly from the dataframe)
+    """
     #Check if the log includes 'start' AND 'complete' events
     all_lifecycles = list(df_log_initial[attr_lifecycle].unique())
     print("All lifecylces in log:", all_lifecycles)
     if 'start' in all_lifecycles and 'complete' in all_lifecycles:
         print("This log includes 'start' and 'complete' events")
-        #If yes convert lifecycle log to interval log
-        log_final = interval_lifecycle.to_interval(log_initial)
-        df_log_final = log_converter.apply(log_final, variant=log_converter.Variants.TO_DATA_FRAME)
+        #If yes convert lifecycle log to interval log: every start event is paired with its complete event
+        #(the 'start_timestamp' and 'end_timestamp' columns are set by pair_lifecycles)
+        df_log_final = pair_lifecycles(df_log_initial, attr_lifecycle, attr_timestamp, show_progress=show_progress)
     else:
         print("This log does not include 'start' AND 'complete' events")
         #not 'start' AND 'complete' events included
-        log_final = log_initial
-        #add/adjust the respective columns 'start_timestamp' and 'time:timestamp' accordingly for every event
-        df_log_final =df_log_initial.copy()
-        df_log_final['start_timestamp'] = pd.NaT
-        progress_counter = 0
-        for index, event in df_log_final.iterrows():
-            if event[attr_lifecycle] == 'start':
-                #the timestamps are written in the 'start_timestamp' column
-                df_log_final.at[index,'start_timestamp'] = event[attr_timestamp]
-                #and the value in the 'time:timestamp' column is set to nat
-                df_log_final.at[index, attr_timestamp] = pd.NaT
-            #Note: When lifecylce is 'complete' then the timestamp already is in the right column ('time:timestamp') and the
-            #'start_timestamp' column is already set to NaT, so nothing to change here
-            elif event[attr_lifecycle] != 'complete':
-                #Delete row since lifecycle attribute is not 'start' or 'complete'
-                df_log_final.drop(index, inplace=True)
-            if show_progress:
-                progress_counter = progress_counter + 1
-                if progress_counter % 1000 == 0:
-                    print(progress_counter, " of ", len(df_log_final), " events preprocessed")
+        #add/adjust the respective columns 'start_timestamp' and 'time:timestamp' accordingly for every event:
+        #the timestamps of 'start' events are moved to the 'start_timestamp' column, the timestamps of 'complete'
+        #events stay in the 'time:timestamp' column. Events with any other lifecycle are deleted
+        is_start = (df_log_initial[attr_lifecycle] == 'start').to_numpy()
+        is_complete = (df_log_initial[attr_lifecycle] == 'complete').to_numpy()
+        df_log_final = df_log_initial.loc[is_start | is_complete].copy()
+        is_start = is_start[is_start | is_complete]
+        df_log_final['start_timestamp'] = df_log_final[attr_timestamp].where(is_start)
+        df_log_final[attr_timestamp] = df_log_final[attr_timestamp].where(~is_start)
     
     df_log_final.rename(columns={attr_timestamp: 'end_timestamp'}, inplace=True)
     df_log_final['end_timestamp'] =  pd.to_datetime(df_log_final['end_timestamp'], utc=True)
     df_log_final['start_timestamp'] =  pd.to_datetime(df_log_final['start_timestamp'], utc=True)
-    dfg_final = dfg_discovery.apply(log_final)
+    dfg_final, start_activities, end_activities, activities_count = discover_dfg_from_df(df_log_final)
+
+    return df_log_final, dfg_final
+def get_event_order(df_log, attr_case):
+    """
+    Sorts the events (stable) by case and by their timestamp ('start_timestamp' or if not given 'end_timestamp'),
+    i.e. in the order in which the events directly follow each other. Missing timestamps are sorted last within the case
+
+    Parameters
+    -----------
+    df_log
+        The log dataframe including the columns 'start_timestamp' and 'end_timestamp'
+    attr_case
+        The name/key of the attribute that identifies the traces (cases) of the xes log. Example value: 'case:concept:name'
+
+    Returns
+    -----------
+    case_codes, order
+        The integer code of the case of every event in sorted order (-1 for events without case) and
+        the positions of the events in the log dataframe in sorted order
+    """
+    case_codes, cases = pd.factorize(df_log[attr_case], sort=False)
+    max_timestamp = np.iinfo(np.int64).max
+    start_timestamps = pd.to_datetime(df_log['start_timestamp'], utc=True)
+    end_timestamps = pd.to_datetime(df_log['end_timestamp'], utc=True)
+    sort_timestamps = start_timestamps.where(start_timestamps.notna(), end_timestamps)
+    sort_key_1 = np.where(sort_timestamps.isna(), max_timestamp, sort_timestamps.to_numpy(dtype='datetime64[ns]').view('int64'))
+    sort_key_2 = np.where(end_timestamps.isna(), max_timestamp, end_timestamps.to_numpy(dtype='datetime64[ns]').view('int64'))
+    order = np.lexsort((sort_key_2, sort_key_1, case_codes))
+    return case_codes[order], order
+@profiled_stage('discover_dfg_from_df', rows_argument='df_log')
+def discover_dfg_from_df(df_log, attr_activity='concept:name', attr_case='case:concept:name'):
+    """
+    Discovers the directly follows graph, the start and end activities and the activity counts directly from the
+    log dataframe, without converting it to a pm4py EventLog.
+    The events are sorted (stable) by case and by their timestamp ('start_timestamp' or if not given 'end_timestamp'),
+    then the directly follows relations are counted by comparing the sorted arrays with the arrays shifted by one event
+
+    Parameters
+    -----------
+    df_log
+        The log dataframe including the columns 'start_timestamp' and 'end_timestamp'
+    attr_activity
+        The name/key of the attribute in the log which contains the name of an activity. Example value: 'concept:name'
+    attr_case
+        The name/key of the attribute that identifies the traces (cases) of the xes log. Example value: 'case:concept:name'
+
+    Returns
+    -----------
+    dfg, start_activities, end_activities, activities_count
+        The directly follows graph (dictionary with (activity, activity) tuples as keys and their counts as values),
+        the start activities and end activities with their counts and the number of events of every activity
+    """
+    case_codes, order = get_event_order(df_log, attr_case)
+    activity_codes, activities = pd.factorize(df_log[attr_activity], sort=False)
+    no_of_activities = len(activities)
+    activity_codes = activity_codes[order]
 
-    return log_final, df_log_final, dfg_final
+    #events without case or activity are not considered
+    is_valid = (case_codes >= 0) & (activity_codes >= 0)
+    same_case_as_next = (case_codes[:-1] == case_codes[1:]) & is_valid[:-1] & is_valid[1:]
+    edge_codes = activity_codes[:-1][same_case_as_next] * no_of_activities + activity_codes[1:][same_case_as_next]
+    edge_codes, edge_counts = np.unique(edge_codes, return_counts=True)
+    dfg = {(activities[edge_code // no_of_activities], activities[edge_code % no_of_activities]): int(edge_count)
+           for edge_code, edge_count in zip(edge_codes, edge_counts)}
+
+    is_case_start = np.ones(len(case_codes), dtype=bool)
+    is_case_start[1:] = case_codes[1:] != case_codes[:-1]
+    is_case_end = np.ones(len(case_codes), dtype=bool)
+    is_case_end[:-1] = case_codes[:-1] != case_codes[1:]
+    start_counts = np.bincount(activity_codes[is_case_start & is_valid], minlength=no_of_activities)
+    end_counts = np.bincount(activity_codes[is_case_end & is_valid], minlength=no_of_activities)
+    activity_counts = np.bincount(activity_codes[activity_codes >= 0], minlength=no_of_activities)
+    start_activities = {activities[code]: int(count) for code, count in enumerate(start_counts) if count > 0}
+    end_activities = {activities[code]: int(count) for code, count in enumerate(end_counts) if count > 0}
+    activities_count = {activities[code]: int(count) for code, count in enumerate(activity_counts) if count > 0}
+
+    return dfg, start_activities, end_activities, activities_count
 def preprocess_add_columns(df_log, attr_traceID, attr_timestamp, attr_activity, attr_eventid, attr_bot):
     """
     Adds several new columns to the log dataframe (one row in df equals one event):
+        is_first_event_in_trace: indicates whether the event is the first event of its trace
         path: The path of the current trace, i.e. the sequence in which the activities are executed in this trace
         trace_start: The time when the current trace started
         trace_end: The time when the current trace ended
@@ -320,6 +852,8 @@ def preprocess_add_columns(df_log, attr_traceID, attr_timestamp, attr_activity,
         act_exe_time_appr: The approximated execution time of the current event (uses start or end times only,
             depending on which values are given)
         followed_by: indicates by whom the following event was executed ('bot', 'human' or if it was the 'end_of_trace') 
+    Note: The columns are computed with the functions in derived_columns_registry. To compute only the columns a
+    specific measure needs, use add_derived_columns instead
 
     Parameters
     -----------
@@ -341,161 +875,491 @@ def preprocess_add_columns(df_log, attr_traceID, attr_timestamp, attr_activity,
     Returns
     -----------
     df
-        The dataframe with the 4 new columns
+        The dataframe with the new columns
     """
     df = df_log.copy()
-    all_traceIDs = list(df[attr_traceID].unique())
-    all_traceIDs = [x for x in all_traceIDs if str(x) != 'nan']
-    
-    counter = 0
-    df['is_first_event_in_trace'] = False
-    for trace in all_traceIDs:
-        eventsInTrace = df.loc[(df[attr_traceID] == trace)]
-        first_event_id = eventsInTrace[attr_eventid].iloc[0]
-        df.loc[df[str(attr_eventid)] == first_event_id, 'is_first_event_in_trace'] = True
-        
-        trace_path = eventsInTrace[attr_activity].tolist()
-        trace_path_str = ','.join(trace_path)
-        df.loc[df[attr_traceID] == trace, 'path'] = trace_path_str
-        
-        min_start_timestamp = eventsInTrace['start_timestamp'].min()
-        min_end_timestamp = eventsInTrace['end_timestamp'].min()
-        if not pd.isnull(min_start_timestamp):
-            trace_start = min_start_timestamp
-        else:
-            #If only complete events are in the log then the trace start time is approximately set to
-            #the end/complete timestamp of the first event in the trace
-            trace_start = min_end_timestamp
-        
-        max_start_timestamp = eventsInTrace['start_timestamp'].max()
-        max_end_timestamp = eventsInTrace['end_timestamp'].max()
-        if not pd.isnull(max_end_timestamp):
-            trace_end = max_end_timestamp
-        else:
-            #If only start events are in the log then the trace end time is approximately set to
-            #the start timestamp of the last event in the trace
-            trace_end = max_start_timestamp
-        df.loc[df[attr_traceID] == trace, 'trace_start'] = trace_start
-        df.loc[df[attr_traceID] == trace, 'trace_end'] = trace_end
-        df['trace_start'] =  pd.to_datetime(df['trace_start'], utc=True)
-        df['trace_end'] =  pd.to_datetime(df['trace_end'], utc=True)
-        df['trace_execution_time'] = df['trace_end'] - df['trace_start']
-        
-        counter = counter + 1
-        if counter%100 == 0:
-            print(counter, "of", len(all_traceIDs), "traces")
-    
-    df['time_until_end'] = df.apply(lambda x: x['trace_end'] - x['end_timestamp'] if not pd.isnull(x['end_timestamp']) else x['trace_end'] - x['start_timestamp'], axis=1)
-    df['time_until_end'] = df.apply(lambda x: x['time_until_end'] if x['time_until_end'] >= timedelta(days = 0) else timedelta(days = 0), axis=1)
-    
-    df['act_exe_time'] = df['end_timestamp'] - df['start_timestamp']
-            
-    all_start_timestamps = list(df['start_timestamp'].unique())
-    if all_start_timestamps == [pd.NaT] or pd.isnull(all_start_timestamps).all():
-        #i.e only complete/end events are in the log
-        df['act_exe_time_appr'] = df['end_timestamp'] - df['end_timestamp'].shift(1)
-        df.loc[df['is_first_event_in_trace'] == True, 'act_exe_time_appr'] = pd.NaT
-    else:
-        df['act_exe_time_appr'] = df['start_timestamp'] - df['start_timestamp'].shift(1)
-        df.loc[df['is_first_event_in_trace'] == True, 'act_exe_time_appr'] = pd.NaT
-    
-    
-    df['following_trace'] = df[attr_traceID].shift(-1)
-    df['following_resource'] = df[attr_bot].shift(-1)
-    df['followed_by'] = df.apply(lambda x: 'bot' if x['following_resource'] == True else 'human', axis=1)
-    df['followed_by'] = df.apply(lambda x: 'end_of_trace' if x[attr_traceID] != x['following_trace'] else x['followed_by'], axis=1)
-    df.drop(['following_trace', 'following_resource'], axis=1, inplace=True)
+    add_derived_columns(df, list(derived_columns_registry.keys()), attr_traceID, attr_activity, attr_eventid, attr_bot)
     
     return df
 
-#Customized helper functions based on pm4py standard functions
-def get_color_hex(color_as_string, color_intensity):
+#Registry of the columns that are derived from the log dataframe
+#Every derived column declares the derived columns it depends on and the function computing it.
+#The functions get the log dataframe (which already contains the columns the derived column depends on) and
+#return the new column as series. Columns that depend on the order of the events in a trace use the same order as
+#the directly follows graph (see get_event_order), not the order of the rows
+def get_trace_groups(df, attr_traceID):
     """
-    Tranforming a color inputed as string and a wanted intensity to a respective color hex value.
-    Beginning not with the darkest shade of the respective color for better visualization
+    Groups the events of the log dataframe by trace. Events without a traceID are not considered
 
     Parameters
     -----------
-    color_as_string
-        The wanted color formulated as string
-    color_intensity
-        An intensity value between 0 and 1
-        
+    df
+        The log dataframe
+    attr_traceID
+        The name/key of the attribute in the log which contains the traceID. Example value: 'docid_uuid'
+
     Returns
     -----------
-    color_hex
-        The hex value of the specific color
+    trace_groups
+        The dataframe grouped by traceID (in the order in which the traces appear in the log)
     """
-    if color_as_string == 'yellow':
-        #color_hex = '#FFFF00'
-        r = int((color_intensity*100)+155)
-        g = int((color_intensity*100)+155)
-        b = 0
-    elif color_as_string == 'blue':
-        #color_hex = '#0000FF'
-        r = 0
-        g = 100
-        b = int((color_intensity*100)+155)
-    elif color_as_string == 'green':
-        #color_hex = '#00FF00'
-        r = 0
-        g = int((color_intensity*100)+155)
-        b = 0
-    else:
-        #grey
-        #color_hex = '#808080'
-        r = 128
-        g = 128
-        b = 128
-        
-    color_hex = "#{:02x}{:02x}{:02x}".format(r,g,b)
-    return color_hex
-def get_color_intensity(dict_values):
+    return df.loc[df[attr_traceID].notna()].groupby(attr_traceID, sort=False)
+def get_adjacent_events_in_trace(df, attr_traceID):
     """
-    Depending on the calculated measure values for every activity, the color intensities are calcualted.
-    A higher measure value means a higher color intensity (brighter).
-    If no fails occured at a specific activity (e.g. relative fails measure), or an activity was always followed by
-        a human (e.g. bot human handover impact measure) the intensity is set to 0.0.
-    If only fails occured at a specific activity (e.g. relative fails measure), or an activity was always followed by
-        a bot (e.g. bot human handover impact measure), the intensity is set to 1.0.
-    If no data was available, the intensity is set to 0.0.
-    If all activities have the same measure value (min=max), the intensities of all activities are set to 0.5
+    Gets the previous and the next event in the trace of every event, in the order of get_event_order
 
     Parameters
     -----------
-    dict_values
-        Contains for every activity the value of the specific measure, calculated in advance (e.g. for 'relative fails measure')
-        Some special values can be 'no fails' or 'only fails', which lead to a special coloring
-        
+    df
+        The log dataframe
+    attr_traceID
+        The name/key of the attribute in the log which contains the traceID. Example value: 'docid_uuid'
+
     Returns
     -----------
-    intensity
-        A color intensity value between 0 and 1
+    previous_positions, next_positions
+        Numpy arrays with the position (row number) of the previous and of the next event in the trace of every event
+        (-1 for the first/last event of a trace and for events without traceID)
     """
-    dict_non_str_only = {}
-    for activity, value in dict_values.items():
-        if not isinstance(value,str):
-            dict_non_str_only[activity] = value
-    if len(dict_non_str_only) == 0:
-        #This case occurs if all dict_values are strings
-        min_value = 0
-        max_value = 0
-    else:
-        min_value = min(dict_non_str_only.values())
-        max_value = max(dict_non_str_only.values())
-    
-    intensity = {}
-    for activity, value in dict_values.items():
-        if value == "no fails" or value == "always followed by human" or value == "once followed by bot":
-            intensity[activity] = 0
-        elif value == "only fails" or value == "always followed by bot" or value == "once followed by human":
-            intensity[activity] = 1
-        elif value == "no data":
-            intensity[activity] = 0
-        else:
-            #If all activities have the same measure values, all color intensities are set to the middle value 0.5
-            if min_value == max_value:
-                intensity[activity] = 0.5
+    case_codes, order = get_event_order(df, attr_traceID)
+    same_case_as_next = (case_codes[:-1] == case_codes[1:]) & (case_codes[:-1] >= 0)
+    previous_positions = np.full(len(df), -1, dtype=np.int64)
+    next_positions = np.full(len(df), -1, dtype=np.int64)
+    previous_positions[order[1:][same_case_as_next]] = order[:-1][same_case_as_next]
+    next_positions[order[:-1][same_case_as_next]] = order[1:][same_case_as_next]
+    return previous_positions, next_positions
+def derive_is_first_event_in_trace(df, attr_traceID, attr_activity, attr_eventid, attr_bot):
+    """
+    Marks the first event of every trace (identified by its eventId)
+    """
+    previous_positions, next_positions = get_adjacent_events_in_trace(df, attr_traceID)
+    is_first_event = (previous_positions < 0) & df[attr_traceID].notna().to_numpy()
+    #events without an eventId are never marked, since they cannot be identified
+    first_event_ids = df.loc[is_first_event, attr_eventid].dropna()
+    return df[attr_eventid].isin(first_event_ids)
+def derive_path(df, attr_traceID, attr_activity, attr_eventid, attr_bot):
+    """
+    The path of the trace of every event, i.e. the activities of the trace joined by commas
+    """
+    case_codes, order = get_event_order(df, attr_traceID)
+    df_ordered = df.iloc[order]
+    trace_paths = get_trace_groups(df_ordered, attr_traceID)[attr_activity].agg(','.join)
+    return df[attr_traceID].map(trace_paths)
+def derive_trace_start(df, attr_traceID, attr_activity, attr_eventid, attr_bot):
+    """
+    The start time of the trace of every event
+    """
+    trace_groups = get_trace_groups(df, attr_traceID)
+    min_start_timestamp = trace_groups['start_timestamp'].min()
+    min_end_timestamp = trace_groups['end_timestamp'].min()
+    #If only complete events are in the log then the trace start time is approximately set to
+    #the end/complete timestamp of the first event in the trace
+    trace_start = min_start_timestamp.where(min_start_timestamp.notna(), min_end_timestamp)
+    return pd.to_datetime(df[attr_traceID].map(trace_start), utc=True)
+def derive_trace_end(df, attr_traceID, attr_activity, attr_eventid, attr_bot):
+    """
+    The end time of the trace of every event
+    """
+    trace_groups = get_trace_groups(df, attr_traceID)
+    max_start_timestamp = trace_groups['start_timestamp'].max()
+    max_end_timestamp = trace_groups['end_timestamp'].max()
+    #If only start events are in the log then the trace end time is approximately set to
+    #the start timestamp of the last event in the trace
+    trace_end = max_end_timestamp.where(max_end_timestamp.notna(), max_start_timestamp)
+    return pd.to_datetime(df[attr_traceID].map(trace_end), utc=True)
+def derive_trace_execution_time(df, attr_traceID, attr_activity, attr_eventid, attr_bot):
+    """
+    The execution time of the trace of every event (trace_end-trace_start)
+    """
+    return df['trace_end'] - df['trace_start']
+def derive_time_until_end(df, attr_traceID, attr_activity, attr_eventid, attr_bot):
+    """
+    The time it takes from every event to the end of its trace
+    """
+    time_until_end = (df['trace_end'] - df['end_timestamp']).where(df['end_timestamp'].notna(),
+                                                                   df['trace_end'] - df['start_timestamp'])
+    #negative and unknown times until the end are set to 0
+    return time_until_end.where(time_until_end >= timedelta(days = 0), timedelta(days = 0))
+def derive_act_exe_time(df, attr_traceID, attr_activity, attr_eventid, attr_bot):
+    """
+    The exact execution time of every event (end_timestamp-start_timestamp)
+    """
+    return df['end_timestamp'] - df['start_timestamp']
+def derive_act_exe_time_appr(df, attr_traceID, attr_activity, attr_eventid, attr_bot):
+    """
+    The execution time of every event approximated by the time since the previous event in the trace
+    """
+    if df['start_timestamp'].isna().all():
+        #i.e only complete/end events are in the log
+        timestamps = df['end_timestamp']
+    else:
+        timestamps = df['start_timestamp']
+    previous_positions, next_positions = get_adjacent_events_in_trace(df, attr_traceID)
+    previous_timestamps = timestamps.iloc[np.maximum(previous_positions, 0)].set_axis(df.index)
+    act_exe_time_appr = timestamps - previous_timestamps
+    #the first event of a trace (and events without traceID) has no previous event
+    return act_exe_time_appr.where(previous_positions >= 0, pd.NaT)
+def derive_followed_by(df, attr_traceID, attr_activity, attr_eventid, attr_bot):
+    """
+    By whom the following event was executed ('bot', 'human' or 'end_of_trace')
+    """
+    previous_positions, next_positions = get_adjacent_events_in_trace(df, attr_traceID)
+    following_resource = df[attr_bot].to_numpy()[np.maximum(next_positions, 0)]
+    followed_by = pd.Series(np.where(following_resource == True, 'bot', 'human'), index=df.index, dtype=object)
+    #the last event of a trace (and events without traceID) are followed by the end of the trace
+    return followed_by.where(next_positions >= 0, 'end_of_trace')
+
+derived_columns_registry = {
+    'is_first_event_in_trace': {'depends_on': [], 'function': derive_is_first_event_in_trace},
+    'path': {'depends_on': [], 'function': derive_path},
+    'trace_start': {'depends_on': [], 'function': derive_trace_start},
+    'trace_end': {'depends_on': [], 'function': derive_trace_end},
+    'trace_execution_time': {'depends_on': ['trace_start', 'trace_end'], 'function': derive_trace_execution_time},
+    'time_until_end': {'depends_on': ['trace_end'], 'function': derive_time_until_end},
+    'act_exe_time': {'depends_on': [], 'function': derive_act_exe_time},
+    'act_exe_time_appr': {'depends_on': [], 'function': derive_act_exe_time_appr},
+    'followed_by': {'depends_on': [], 'function': derive_followed_by}
+}
+
+#The derived columns every measure reads (in addition to the attributes of the merged log)
+measure_derived_columns = {
+    'relative_fails': [],
+    'exception_time_impact': ['time_until_end'],
+    'exception_time_variance': ['time_until_end'],
+    'relative_execution_time': ['trace_execution_time', 'act_exe_time', 'act_exe_time_appr'],
+    'execution_time_variance': ['act_exe_time', 'act_exe_time_appr'],
+    'bot_human_handover_count': ['followed_by'],
+    'bot_human_handover_impact': ['followed_by', 'time_until_end'],
+    'bot_human_handover_variance': ['followed_by', 'time_until_end'],
+    'relative_case_fails': ['path'],
+    'automation_rate': [],
+    'case_activities_execution_time': ['path', 'act_exe_time', 'act_exe_time_appr'],
+    'case_activities_execution_time_variance': ['path', 'act_exe_time', 'act_exe_time_appr'],
+    'edge_waiting_time_mean': [],
+    'edge_waiting_time_median': [],
+    'edge_waiting_time_p95': [],
+    'edge_waiting_times': [],
+    'sub_workflow_timings': [],
+    'execution_time_p50': ['act_exe_time', 'act_exe_time_appr'],
+    'execution_time_p90': ['act_exe_time', 'act_exe_time_appr'],
+    'execution_time_p99': ['act_exe_time', 'act_exe_time_appr'],
+    'time_until_end_p50': ['time_until_end'],
+    'time_until_end_p90': ['time_until_end'],
+    'time_until_end_p99': ['time_until_end'],
+    'robot_concurrency': [],
+    'robot_idle_gaps': [],
+    'robot_utilization': [],
+    'robot_queueing': []
+}
+def add_derived_columns(df, column_names, attr_traceID, attr_activity, attr_eventid, attr_bot):
+    """
+    Adds the given derived columns (and the derived columns they depend on) to the log dataframe in place.
+    Columns that already exist in the dataframe are not computed again, i.e. every derived column is computed
+    on first access only and then memoized in the dataframe of the log
+
+    Parameters
+    -----------
+    df
+        The log dataframe, which is extended in place
+    column_names
+        The names of the derived columns that are needed (keys of derived_columns_registry)
+    attr_traceID
+        The name/key of the attribute in the log which contains the traceID,
+        i.e. the identifier that matches every event to a specific trace. Example value: 'docid_uuid'
+    attr_activity
+        The name/key of the attribute in the log which contains the name of an activity. Example value: 'concept:name'
+    attr_eventid
+        The name/key of the attribute in the log which contains the unique id of an event. Example value: 'eventid'
+    attr_bot
+        The name/key of the attribute in the log which contains the information
+        whether the event was executed by a bot or not (true / false). Example value: 'bot'
+
+    Returns
+    -----------
+    df
+        The log dataframe including the derived columns
+    """
+    for column_name in column_names:
+        if column_name in df.columns:
+            continue
+        if column_name not in derived_columns_registry:
+            print("unknown derived column", column_name)
+            continue
+        add_derived_columns(df, derived_columns_registry[column_name]['depends_on'], attr_traceID, attr_activity,
+                            attr_eventid, attr_bot)
+        with profile_stage('derived_column:' + column_name, len(df), 'derived_column'):
+            df[column_name] = derived_columns_registry[column_name]['function'](df, attr_traceID, attr_activity,
+                                                                                attr_eventid, attr_bot)
+    return df
+def get_measure_derived_columns(measure_names):
+    """
+    Collects the derived columns the given measures read
+
+    Parameters
+    -----------
+    measure_names
+        The names of the measures (e.g. ['relative_fails', 'automation_rate'])
+
+    Returns
+    -----------
+    column_names
+        The names of the derived columns needed by at least one of the measures
+    """
+    column_names = []
+    for measure_name in measure_names:
+        for column_name in measure_derived_columns.get(measure_name, []):
+            if column_name not in column_names:
+                column_names.append(column_name)
+    return column_names
+
+#Functions for caching the preprocessed log as on-disk snapshot
+#Increase the version if the layout of a snapshot, the preprocessing or the derived columns change, so that old
+#snapshots are not reused
+snapshot_format_version = 2
+def get_file_content_hash(path, chunk_size=1024*1024):
+    """
+    Calculates the sha256 hash of the content of a file. The file is read in chunks, so that large logs do not
+    have to be loaded into memory completely
+
+    Parameters
+    -----------
+    path
+        The path to the file
+    chunk_size
+        The number of bytes that are read at once
+
+    Returns
+    -----------
+    content_hash
+        The hex digest of the sha256 hash of the file content
+    """
+    sha256 = hashlib.sha256()
+    with open(path, 'rb') as file:
+        chunk = file.read(chunk_size)
+        while chunk:
+            sha256.update(chunk)
+            chunk = file.read(chunk_size)
+    return sha256.hexdigest()
+def get_snapshot_key(path, attributes):
+    """
+    Calculates the key of a snapshot. The key changes whenever the content of the source log, the attribute configuration
+    or the snapshot format changes
+
+    Parameters
+    -----------
+    path
+        The path to the merged xes log
+    attributes
+        A dictionary with the names/keys of the attributes used for preprocessing (e.g. {'attr_activity': 'concept:name'})
+
+    Returns
+    -----------
+    snapshot_key
+        The hex digest identifying the snapshot
+    """
+    key_parts = {'content_hash': get_file_content_hash(path), 'attributes': attributes,
+                 'format_version': snapshot_format_version}
+    return hashlib.sha256(json.dumps(key_parts, sort_keys=True).encode('utf-8')).hexdigest()
+@profiled_stage('save_snapshot', rows_argument='df_log')
+def save_snapshot(snapshot_dir, df_log, dfg):
+    """
+    Saves the preprocessed log dataframe and the directly follows graph as snapshot to disk.
+    Numeric, boolean, datetime and timedelta columns are saved as single .npy files, so that they can be memory-mapped
+    when the snapshot is loaded again. All other columns (e.g. strings) are pickled together.
+    The snapshot is first written to a temporary folder and renamed afterwards, so that no incomplete snapshot is left
+    behind if the process is interrupted
+
+    Parameters
+    -----------
+    snapshot_dir
+        The folder the snapshot is saved to
+    df_log
+        The preprocessed log dataframe
+    dfg
+        The directly follows graph
+    """
+    tmp_dir = snapshot_dir + ".tmp"
+    if os.path.isdir(tmp_dir):
+        shutil.rmtree(tmp_dir)
+    os.makedirs(tmp_dir)
+
+    columns_meta = []
+    object_columns = {}
+    for column_number, column in enumerate(df_log.columns):
+        values = df_log[column]
+        file_name = "column_" + str(column_number) + ".npy"
+        if isinstance(values.dtype, pd.DatetimeTZDtype):
+            #tz-aware timestamps are saved as int64 nanoseconds since epoch in UTC
+            np.save(os.path.join(tmp_dir, file_name), values.dt.tz_convert('UTC').to_numpy(dtype='datetime64[ns]').view('int64'))
+            columns_meta.append({'name': column, 'storage': 'npy', 'file': file_name, 'tz': str(values.dt.tz)})
+        elif isinstance(values.dtype, np.dtype) and values.dtype.kind in 'biufmM':
+            np.save(os.path.join(tmp_dir, file_name), values.to_numpy())
+            columns_meta.append({'name': column, 'storage': 'npy', 'file': file_name, 'tz': None})
+        else:
+            object_columns[column] = values.reset_index(drop=True)
+            columns_meta.append({'name': column, 'storage': 'pickle', 'file': None, 'tz': None})
+
+    with open(os.path.join(tmp_dir, "object_columns.pkl"), 'wb') as file:
+        pickle.dump(object_columns, file, protocol=pickle.HIGHEST_PROTOCOL)
+    with open(os.path.join(tmp_dir, "index.pkl"), 'wb') as file:
+        pickle.dump(df_log.index, file, protocol=pickle.HIGHEST_PROTOCOL)
+    with open(os.path.join(tmp_dir, "dfg.pkl"), 'wb') as file:
+        pickle.dump(dfg, file, protocol=pickle.HIGHEST_PROTOCOL)
+    with open(os.path.join(tmp_dir, "meta.json"), 'w') as file:
+        json.dump({'format_version': snapshot_format_version, 'columns': columns_meta}, file)
+
+    if os.path.isdir(snapshot_dir):
+        shutil.rmtree(snapshot_dir)
+    os.rename(tmp_dir, snapshot_dir)
+@profiled_stage('load_snapshot')
+def load_snapshot(snapshot_dir):
+    """
+    Loads a snapshot that was saved with save_snapshot.
+    The .npy columns are memory-mapped (copy-on-write), i.e. they are only read from disk when they are accessed
+    and can still be modified in memory without changing the snapshot on disk
+
+    Parameters
+    -----------
+    snapshot_dir
+        The folder of the snapshot
+
+    Returns
+    -----------
+    df_log, dfg
+        The preprocessed log dataframe and the directly follows graph
+    """
+    with open(os.path.join(snapshot_dir, "meta.json"), 'r') as file:
+        meta = json.load(file)
+    with open(os.path.join(snapshot_dir, "object_columns.pkl"), 'rb') as file:
+        object_columns = pickle.load(file)
+    with open(os.path.join(snapshot_dir, "index.pkl"), 'rb') as file:
+        index = pickle.load(file)
+    with open(os.path.join(snapshot_dir, "dfg.pkl"), 'rb') as file:
+        dfg = pickle.load(file)
+
+    columns = {}
+    for column_meta in meta['columns']:
+        if column_meta['storage'] == 'npy':
+            values = np.load(os.path.join(snapshot_dir, column_meta['file']), mmap_mode='c')
+            if column_meta['tz'] is not None:
+                values = pd.DatetimeIndex(values.view('datetime64[ns]')).tz_localize('UTC').tz_convert(column_meta['tz'])
+            columns[column_meta['name']] = values
+        else:
+            columns[column_meta['name']] = object_columns[column_meta['name']].to_numpy()
+    #copy=False keeps the memory-mapped arrays instead of consolidating them into new blocks
+    df_log = pd.DataFrame(columns, copy=False)
+    df_log.index = index
+
+    return df_log, dfg
+def evict_stale_snapshots(snapshot_cache_dir, log_name, current_snapshot_dir):
+    """
+    Deletes all snapshots of a log except the current one. Snapshots of a log become stale as soon as the content of the
+    log or the attribute configuration changes
+
+    Parameters
+    -----------
+    snapshot_cache_dir
+        The folder containing all snapshots
+    log_name
+        The name of the log, e.g., 'company' or 'bpi'
+    current_snapshot_dir
+        The folder of the snapshot that should be kept
+    """
+    for folder_name in os.listdir(snapshot_cache_dir):
+        folder_path = os.path.join(snapshot_cache_dir, folder_name)
+        if folder_name.startswith(log_name + "_") and os.path.isdir(folder_path) and \
+                os.path.abspath(folder_path) != os.path.abspath(current_snapshot_dir):
+            print("Evicting stale snapshot", folder_path)
+            shutil.rmtree(folder_path)
+
+#Customized helper functions based on pm4py standard functions
+def get_color_hex(color_as_string, color_intensity):
+    """
+    Tranforming a color inputed as string and a wanted intensity to a respective color hex value.
+    Beginning not with the darkest shade of the respective color for better visualization
+
+    Parameters
+    -----------
+    color_as_string
+        The wanted color formulated as string
+    color_intensity
+        An intensity value between 0 and 1
+        
+    Returns
+    -----------
+    color_hex
+        The hex value of the specific color
+    """
+    if color_as_string == 'yellow':
+        #color_hex = '#FFFF00'
+        r = int((color_intensity*100)+155)
+        g = int((color_intensity*100)+155)
+        b = 0
+    elif color_as_string == 'blue':
+        #color_hex = '#0000FF'
+        r = 0
+        g = 100
+        b = int((color_intensity*100)+155)
+    elif color_as_string == 'green':
+        #color_hex = '#00FF00'
+        r = 0
+        g = int((color_intensity*100)+155)
+        b = 0
+    else:
+        #grey
+        #color_hex = '#808080'
+        r = 128
+        g = 128
+        b = 128
+        
+    color_hex = "#{:02x}{:02x}{:02x}".format(r,g,b)
+    return color_hex
+def get_color_intensity(dict_values):
+    """
+    Depending on the calculated measure values for every activity, the color intensities are calcualted.
+    A higher measure value means a higher color intensity (brighter).
+    If no fails occured at a specific activity (e.g. relative fails measure), or an activity was always followed by
+        a human (e.g. bot human handover impact measure) the intensity is set to 0.0.
+    If only fails occured at a specific activity (e.g. relative fails measure), or an activity was always followed by
+        a bot (e.g. bot human handover impact measure), the intensity is set to 1.0.
+    If no data was available or the value is not statistically significant, the intensity is set to 0.0.
+    If all activities have the same measure value (min=max), the intensities of all activities are set to 0.5
+
+    Parameters
+    -----------
+    dict_values
+        Contains for every activity the value of the specific measure, calculated in advance (e.g. for 'relative fails measure')
+        Some special values can be 'no fails' or 'only fails', which lead to a special coloring
+        
+    Returns
+    -----------
+    intensity
+        A color intensity value between 0 and 1
+    """
+    dict_non_str_only = {}
+    for activity, value in dict_values.items():
+        if not isinstance(value,str):
+            dict_non_str_only[activity] = value
+    if len(dict_non_str_only) == 0:
+        #This case occurs if all dict_values are strings
+        min_value = 0
+        max_value = 0
+    else:
+        min_value = min(dict_non_str_only.values())
+        max_value = max(dict_non_str_only.values())
+    
+    intensity = {}
+    for activity, value in dict_values.items():
+        if value == "no fails" or value == "always followed by human" or value == "once followed by bot":
+            intensity[activity] = 0
+        elif value == "only fails" or value == "always followed by bot" or value == "once followed by human":
+            intensity[activity] = 1
+        elif value == "no data" or value == "not significant":
+            intensity[activity] = 0
+        else:
+            #If all activities have the same measure values, all color intensities are set to the middle value 0.5
+            if min_value == max_value:
+                intensity[activity] = 0.5
             else:
                 intensity[activity] = (value-min_value)/(max_value-min_value)
     return intensity
@@ -576,6 +1440,145 @@ def timeFormatter_seconds_input(total_seconds):
     return seconds_as_string
 
 
+#Bootstrap significance of differences of means (exception time impact and bot human handover impact)
+#The bootstrap replicates use Poisson(1) weights for every value instead of resampling with replacement, so the
+#replicates of all activities are computed at once as weighted sums of one (replicates x values) matrix
+def bootstrap_difference_of_means(values, groups, in_first_sample, n_groups, n_bootstrap=1000, confidence_level=0.95,
+                                  seed=0, max_matrix_size=2*10**7, min_sample_size=2):
+    """
+    Computes for every group (e.g. activity) the difference between the mean of its first sample and the mean of
+    its second sample (e.g. time until end when failed and when not failed), together with a bootstrap confidence
+    interval and a two-sided bootstrap p-value for the difference being 0
+
+    Parameters
+    -----------
+    values
+        A numpy array with all values
+    groups
+        A numpy array with the group (0 to n_groups-1) of every value
+    in_first_sample
+        A boolean numpy array indicating whether a value belongs to the first or to the second sample of its group
+    n_groups
+        The number of groups
+    n_bootstrap
+        The number of bootstrap replicates
+    confidence_level
+        The confidence level of the intervals
+    seed
+        The seed of the random Poisson weights
+    max_matrix_size
+        The maximum number of weights generated at once. The replicates are computed in chunks of this size
+    min_sample_size
+        The minimum number of values in both samples of a group for a test of its difference
+
+    Returns
+    -----------
+    differences, ci_lower, ci_upper, p_values
+        Numpy arrays with the observed difference, the bounds of the confidence interval and the p-value of every group
+        (the interval and p-value are NaN for groups with less than min_sample_size values in a sample or with
+        replicates that are all equal, since their differences cannot be tested)
+    """
+    cells = groups * 2 + (~in_first_sample).astype(np.int64)
+    order = np.argsort(cells, kind='stable')
+    values = values[order].astype(np.float64)
+    cells = cells[order]
+    n_cells = 2 * n_groups
+    cell_starts = np.searchsorted(cells, np.arange(n_cells), side='left')
+    cell_ends = np.searchsorted(cells, np.arange(n_cells), side='right')
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        observed_means = (np.bincount(cells, weights=values, minlength=n_cells) /
+                          np.bincount(cells, minlength=n_cells))
+    differences = observed_means[0::2] - observed_means[1::2]
+
+    rng = np.random.default_rng(seed)
+    replicates = np.empty((n_bootstrap, n_groups))
+    chunk_size = max(1, min(n_bootstrap, max_matrix_size // max(len(values), 1)))
+    for chunk_start in range(0, n_bootstrap, chunk_size):
+        chunk_end = min(chunk_start + chunk_size, n_bootstrap)
+        weights = rng.poisson(1.0, size=(chunk_end - chunk_start, len(values))).astype(np.float64)
+        #the weighted sums of all cells are differences of the cumulative sums at the cell borders
+        cumulative_weights = np.concatenate([np.zeros((len(weights), 1)), np.cumsum(weights, axis=1)], axis=1)
+        cumulative_values = np.concatenate([np.zeros((len(weights), 1)), np.cumsum(weights * values, axis=1)], axis=1)
+        cell_weights = cumulative_weights[:, cell_ends] - cumulative_weights[:, cell_starts]
+        cell_values = cumulative_values[:, cell_ends] - cumulative_values[:, cell_starts]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            cell_means = cell_values / cell_weights
+        replicates[chunk_start:chunk_end] = cell_means[:, 0::2] - cell_means[:, 1::2]
+
+    valid_replicates = (~np.isnan(replicates)).sum(axis=0)
+    alpha = 1 - confidence_level
+    ci_lower = np.full(n_groups, np.nan)
+    ci_upper = np.full(n_groups, np.nan)
+    p_values = np.full(n_groups, np.nan)
+    #a sample with a single value or without variance gives replicates that are all equal, that would be "significant"
+    cell_sizes = cell_ends - cell_starts
+    has_samples = (cell_sizes[0::2] >= min_sample_size) & (cell_sizes[1::2] >= min_sample_size)
+    with np.errstate(invalid='ignore'):
+        is_degenerate = ~(np.nanmax(replicates, axis=0, initial=-np.inf, where=~np.isnan(replicates)) >
+                          np.nanmin(replicates, axis=0, initial=np.inf, where=~np.isnan(replicates)))
+    has_replicates = (valid_replicates > 0) & ~np.isnan(differences) & has_samples & ~is_degenerate
+    if has_replicates.any():
+        with np.errstate(invalid='ignore'):
+            bounds = np.nanpercentile(replicates[:, has_replicates], [alpha / 2 * 100, (1 - alpha / 2) * 100], axis=0)
+        ci_lower[has_replicates] = bounds[0]
+        ci_upper[has_replicates] = bounds[1]
+        below = (replicates[:, has_replicates] <= 0).sum(axis=0)
+        above = (replicates[:, has_replicates] >= 0).sum(axis=0)
+        n_valid = valid_replicates[has_replicates]
+        p_values[has_replicates] = np.minimum(1.0, 2 * np.minimum(below + 1, above + 1) / (n_valid + 1))
+    return differences, ci_lower, ci_upper, p_values
+def apply_bootstrap_significance(measure_values, labels, activities, df_samples, significance_level, n_bootstrap=1000):
+    """
+    Adds the bootstrap confidence interval and p-value of a difference of means to the labels of the activities and
+    replaces the values of activities whose difference is not significant by "not significant",
+    so that only significant differences are colored
+
+    Parameters
+    -----------
+    measure_values
+        The value (difference of means) or special value (string) of every activity
+    labels
+        The labels of the activities, which are extended
+    activities
+        The activities (names as strings)
+    df_samples
+        A dataframe with one row per value: 'activity', 'value' (in seconds) and 'in_first_sample'
+    significance_level
+        The significance level (e.g. 0.05). The confidence level of the intervals is 1 - significance_level
+    n_bootstrap
+        The number of bootstrap replicates
+
+    Returns
+    -----------
+    coloring_values, labels
+        The values the coloring is based on and the extended labels. Differences that cannot be tested
+        (too few values or no variance) are "not significant" as well
+    """
+    activity_codes = {activity: code for code, activity in enumerate(activities)}
+    groups = df_samples['activity'].map(activity_codes).to_numpy()
+    differences, ci_lower, ci_upper, p_values = bootstrap_difference_of_means(df_samples['value'].to_numpy(),
+                                                                              groups.astype(np.int64),
+                                                                              df_samples['in_first_sample'].to_numpy(),
+                                                                              len(activities), n_bootstrap=n_bootstrap,
+                                                                              confidence_level=1 - significance_level)
+    coloring_values = dict(measure_values)
+    labels = dict(labels)
+    for activity, code in activity_codes.items():
+        if isinstance(measure_values[activity], str):
+            continue
+        if np.isnan(p_values[code]):
+            coloring_values[activity] = "not significant"
+            labels[activity] = labels[activity] + "\n(not significant, too few values for a test)"
+            continue
+        labels[activity] = (labels[activity] + "\n" + str(round((1 - significance_level) * 100)) + "% CI: " +
+                            timeFormatter_seconds_input(ci_lower[code]) + " - " +
+                            timeFormatter_seconds_input(ci_upper[code]) + "\n" + "p = " + str(round(p_values[code], 3)))
+        if p_values[code] >= significance_level:
+            coloring_values[activity] = "not significant"
+            labels[activity] = labels[activity] + " (not significant)"
+    return coloring_values, labels
+
 #Defining measures with a directly follows graph (dfg) visualization as output
 def measure_relative_fails(df_log, round_decimals, attr_activity, attr_success, attr_bot):
     """
@@ -638,7 +1641,8 @@ def measure_relative_fails(df_log, round_decimals, attr_activity, attr_success,
         labels[activity] = activity + "\n" + value_str
     
     return labels, coloring, 'relative fails'
-def measure_exception_time_impact(df_log, attr_activity, attr_success, attr_bot):
+def measure_exception_time_impact(df_log, attr_activity, attr_success, attr_bot, significance_level=None,
+                                  n_bootstrap=1000):
     """
     Measure: Calculates the average impact (in terms of time) which an activity has on the process, if the activity fails.
     It compares the remaining duration of the whole process in cases where the activity under observation failed
@@ -658,6 +1662,11 @@ def measure_exception_time_impact(df_log, attr_activity, attr_success, attr_bot)
     attr_bot
         The name/key of the attribute in the log which contains the information
         whether the event was executed by a bot or not (true / false). Example value: 'bot'
+    significance_level
+        If given (e.g. 0.05), the labels show a bootstrap confidence interval and p-value of every difference
+        and only significant differences are colored (see apply_bootstrap_significance)
+    n_bootstrap
+        The number of bootstrap replicates
         
     Returns
     -----------
@@ -692,9 +1701,6 @@ def measure_exception_time_impact(df_log, attr_activity, attr_success, attr_bot)
             performed_by[str(activity)] = "bot_only"
         else:
             performed_by[str(activity)] = "manual_only"
-        
-    color_intensities = get_color_intensity(exception_time_impact)
-    coloring = get_coloring_by_resource(performed_by, color_intensities)
     
     labels = {}
     for activity, value in exception_time_impact.items():
@@ -703,6 +1709,21 @@ def measure_exception_time_impact(df_log, attr_activity, attr_success, attr_bot)
         else:
             value_str = value
         labels[activity] = activity + "\n" + value_str
+
+    coloring_values = exception_time_impact
+    if significance_level is not None:
+        df_with_success = df_log.loc[(df_log[attr_success] == True) | (df_log[attr_success] == False)]
+        df_samples = pd.DataFrame({'activity': df_with_success[attr_activity].astype(str),
+                                   'value': df_with_success['time_until_end'].dt.total_seconds(),
+                                   'in_first_sample': (df_with_success[attr_success] == False)})
+        exception_time_impact_seconds = {activity: value if isinstance(value, str) else value.total_seconds()
+                                         for activity, value in exception_time_impact.items()}
+        coloring_values, labels = apply_bootstrap_significance(exception_time_impact_seconds, labels,
+                                                               list(exception_time_impact.keys()), df_samples,
+                                                               significance_level, n_bootstrap)
+        
+    color_intensities = get_color_intensity(coloring_values)
+    coloring = get_coloring_by_resource(performed_by, color_intensities)
     
     return labels, coloring, 'exception time impact'
 def measure_exception_time_variance(df_log, attr_activity, attr_success, attr_bot):
@@ -997,7 +2018,7 @@ def measure_bot_human_handover_count(df_log, attr_activity, attr_bot):
             labels[activity] = activity + "\n" + "followed by bot: " + str(value) + "\n" + "followed by human: " + str(value_2)
     
     return labels, coloring, 'bot_human_handover_count'
-def measure_bot_human_handover_impact(df_log, attr_activity, attr_bot):
+def measure_bot_human_handover_impact(df_log, attr_activity, attr_bot, significance_level=None, n_bootstrap=1000):
     """
     Measure: Calculates for every activity how much longer it takes on average to end the process,
         when the activity is followed by a bot activity, compared to when it is followed by a human activity.
@@ -1014,6 +2035,11 @@ def measure_bot_human_handover_impact(df_log, attr_activity, attr_bot):
     attr_bot
         The name/key of the attribute in the log which contains the information
         whether the event was executed by a bot or not (true / false). Example value: 'bot'
+    significance_level
+        If given (e.g. 0.05), the labels show a bootstrap confidence interval and p-value of every difference
+        and only significant differences are colored (see apply_bootstrap_significance)
+    n_bootstrap
+        The number of bootstrap replicates
         
     Returns
     -----------
@@ -1048,9 +2074,6 @@ def measure_bot_human_handover_impact(df_log, attr_activity, attr_bot):
             performed_by[str(activity)] = "bot_only"
         else:
             performed_by[str(activity)] = "manual_only"
-        
-    color_intensities = get_color_intensity(bot_human_handover_impact)
-    coloring = get_coloring_by_resource(performed_by, color_intensities)
     
     labels = {}
     for activity, value in bot_human_handover_impact.items():
@@ -1059,6 +2082,21 @@ def measure_bot_human_handover_impact(df_log, attr_activity, attr_bot):
         else:
             value_str = value
         labels[activity] = activity + "\n" + value_str
+
+    coloring_values = bot_human_handover_impact
+    if significance_level is not None:
+        df_followed = df_log.loc[df_log['followed_by'].isin(['bot', 'human'])]
+        df_samples = pd.DataFrame({'activity': df_followed[attr_activity].astype(str),
+                                   'value': df_followed['time_until_end'].dt.total_seconds(),
+                                   'in_first_sample': (df_followed['followed_by'] == 'bot')})
+        bot_human_handover_impact_seconds = {activity: value if isinstance(value, str) else value.total_seconds()
+                                             for activity, value in bot_human_handover_impact.items()}
+        coloring_values, labels = apply_bootstrap_significance(bot_human_handover_impact_seconds, labels,
+                                                               list(bot_human_handover_impact.keys()), df_samples,
+                                                               significance_level, n_bootstrap)
+        
+    color_intensities = get_color_intensity(coloring_values)
+    coloring = get_coloring_by_resource(performed_by, color_intensities)
     
     return labels, coloring, 'bot_human_handover_impact'
 def measure_bot_human_handover_variance(df_log, attr_activity, attr_bot):
@@ -1224,7 +2262,7 @@ def measure_relative_case_fails(df_log, round_decimals, attr_traceID, attr_succe
         if show_progress:
             progress_counter = progress_counter + 1
             if progress_counter % 100 == 0:
-                print(progress_counter, " of ", len(paths_list), " paths")
+                report_progress('relative_case_fails', progress_counter, len(paths_list), "paths")
         
     results_df = pd.DataFrame(
                 {'path': paths_list,
@@ -1349,7 +2387,7 @@ def measure_case_activities_execution_time(df_log, attr_activity, show_progress=
         if show_progress:
             progress_counter = progress_counter + 1
             if progress_counter % 100 == 0:
-                print(progress_counter, " of ", len(paths_list), " paths")
+                report_progress('case_activities_execution_time', progress_counter, len(paths_list), "paths")
         
     return results_df, 'case_activities_execution_time'
 
@@ -1417,65 +2455,1471 @@ def measure_case_activities_execution_time_variance(df_log, attr_activity, show_
         if show_progress:
             progress_counter = progress_counter + 1
             if progress_counter % 100 == 0:
-                print(progress_counter, " of ", len(paths_list), " paths")
+                report_progress('case_activities_execution_time_variance', progress_counter, len(paths_list), "paths")
         
     return results_df, 'case_activities_execution_time_variance'
 
-#Function for applying the measures
-def apply_measure(df_log, log_name, dfg, log, measure_name, attr_activity, attr_success, attr_bot, attr_traceID,
-                  save_result=False, round_decimals=2, show_edge_labels=True, show_progress=True, max_no_of_edges=200):
+#Defining measures on the edges of the directly follows graph (dfg)
+#The statistics of the waiting times that are computed for every edge and every transition type
+edge_waiting_time_statistics = ['mean', 'median', 'p95']
+def get_edge_waiting_times(df_log, attr_traceID, attr_activity, attr_bot):
     """
-    Applies a measure identified by its name and returns either a visualization or a dataframe, depending on the measure
+    Computes the waiting time between every pair of consecutive events within a trace in one vectorized pass.
+    The events are ordered like in the directly follows graph (see get_event_order), so every pair belongs to an edge.
+    The waiting time is the time between the end of an event (or its start if the end is not known) and
+    the start of the following event (or its end if the start is not known). Negative waiting times
+    (overlapping events) are set to 0
 
     Parameters
     -----------
     df_log
         The log dataframe
-    dfg
-        The directly follows graph
-    log
-        The log that was loaded
-    measure_name
-        The name of the measure which should be applied (e.g. 'relative_fails')
+    attr_traceID
+        The name/key of the attribute in the log which contains the traceID,
+        i.e. the identifier that matches every event to a specific trace. Example value: 'docid_uuid'
     attr_activity
         The name/key of the attribute in the log which contains the name of an activity. Example value: 'concept:name'
-    attr_success
-        The name/key of the attribute in the log which contains the information
-        whether the event was successfull or not (true / false). Example value: 'success'
     attr_bot
         The name/key of the attribute in the log which contains the information
         whether the event was executed by a bot or not (true / false). Example value: 'bot'
-    attr_traceID
-        The name/key of the attribute in the log which contains the traceID,
-        i.e. the identifier that matches every event to a specific trace. Example value: 'docid_uuid'
-    save_result
-        A boolean indicating for graphical measures whether the resulting visualization should be saved as .png or not
-    round_decimals
-        The number of decimals the relative fails value should be rounded to before visualization
-    show_edge_labels
-        A boolean indicating whether the labels of the edges of the graph should be displayed or not
-    show_progress
-        Whether a progress update every 100 paths should be printed out or not
-    max_no_of_edges
-        The maximum number of edges shown in the visualization. More edges show a more detailed picture of the process
-    
+
     Returns
     -----------
-    gviz or result_df
-        The gviz for measures with a dfg visualization or the result_df for measures with a dataframe
+    df_waiting_times
+        A dataframe with one row per pair of consecutive events and the columns 'source', 'target',
+        'transition' ('bot_to_bot', 'bot_to_human', 'human_to_bot' or 'human_to_human') and 'waiting_time' (in seconds)
     """
-    # Measures with a dfg visualization as output
-    is_graphical_measure = False
-    if measure_name == 'relative_fails':
-        is_graphical_measure = True
-        activity_labeling, activity_coloring, measure = measure_relative_fails(df_log, round_decimals, attr_activity,
-                                                                           attr_success, attr_bot)
-    elif measure_name == 'exception_time_impact':
-        is_graphical_measure = True
-        activity_labeling, activity_coloring, measure = measure_exception_time_impact(df_log, attr_activity,
-                                                                           attr_success, attr_bot)
-    elif measure_name == 'exception_time_variance':
-        is_graphical_measure = True
+    case_codes, order = get_event_order(df_log, attr_traceID)
+    activities = df_log[attr_activity].to_numpy()[order]
+    performed_by = np.where((df_log[attr_bot] == True).to_numpy()[order], 'bot', 'human')
+    start_timestamps = pd.to_datetime(df_log['start_timestamp'], utc=True).iloc[order]
+    end_timestamps = pd.to_datetime(df_log['end_timestamp'], utc=True).iloc[order]
+    leave_timestamps = end_timestamps.where(end_timestamps.notna(), start_timestamps).to_numpy(dtype='datetime64[ns]')
+    arrive_timestamps = start_timestamps.where(start_timestamps.notna(), end_timestamps).to_numpy(dtype='datetime64[ns]')
+
+    #events without trace or activity are not considered
+    is_valid = (case_codes >= 0) & pd.notna(activities)
+    same_trace_as_next = (case_codes[:-1] == case_codes[1:]) & is_valid[:-1] & is_valid[1:]
+    waiting_times = (arrive_timestamps[1:] - leave_timestamps[:-1])[same_trace_as_next] / np.timedelta64(1, 's')
+    df_waiting_times = pd.DataFrame({
+        'source': activities[:-1][same_trace_as_next],
+        'target': activities[1:][same_trace_as_next],
+        'transition': np.char.add(np.char.add(performed_by[:-1][same_trace_as_next], '_to_'),
+                                  performed_by[1:][same_trace_as_next]),
+        'waiting_time': np.clip(waiting_times, 0, None)})
+    return df_waiting_times
+def get_edge_waiting_time_statistics(df_waiting_times):
+    """
+    Aggregates the waiting times of consecutive events per edge and per transition type.
+    Additionally every edge gets a row with the transition type 'all' which contains the statistics
+    over all transition types of the edge
+
+    Parameters
+    -----------
+    df_waiting_times
+        The waiting times of consecutive events (see get_edge_waiting_times)
+
+    Returns
+    -----------
+    df_statistics
+        A dataframe with the columns 'source', 'target', 'transition', 'count', 'mean', 'median' and 'p95'
+        (the waiting times are given in seconds)
+    """
+    df_all_transitions = df_waiting_times.assign(transition='all')
+    df_grouped = pd.concat([df_waiting_times, df_all_transitions]).groupby(['source', 'target', 'transition'],
+                                                                           sort=True)['waiting_time']
+    df_statistics = df_grouped.agg(['count', 'mean', 'median'])
+    df_statistics['p95'] = df_grouped.quantile(0.95)
+    return df_statistics.reset_index()
+def measure_edge_waiting_time(df_log, statistic, attr_traceID, attr_activity, attr_bot):
+    """
+    Measure: Calculates for every edge of the directly follows graph the mean, median or 95th percentile of the
+        waiting time between the consecutive events, split into bot to bot, bot to human, human to bot and
+        human to human transitions. The edges are labeled with the statistic of every transition type and the
+        penwidth of an edge depends on the statistic over all its transitions.
+        The activities are labeled and colored by the statistic of the waiting time after the activity
+
+    Parameters
+    -----------
+    df_log
+        The log dataframe
+    statistic
+        The statistic of the waiting times that should be calculated ('mean', 'median' or 'p95')
+    attr_traceID
+        The name/key of the attribute in the log which contains the traceID,
+        i.e. the identifier that matches every event to a specific trace. Example value: 'docid_uuid'
+    attr_activity
+        The name/key of the attribute in the log which contains the name of an activity. Example value: 'concept:name'
+    attr_bot
+        The name/key of the attribute in the log which contains the information
+        whether the event was executed by a bot or not (true / false). Example value: 'bot'
+
+    Returns
+    -----------
+    labels, coloring, edges_labels, edges_values
+        The labels and coloring for every activity, the labels and values for every edge, needed for visualization
+        and the name of the measure (e.g. 'edge_waiting_time_mean')
+    """
+    df_waiting_times = get_edge_waiting_times(df_log, attr_traceID, attr_activity, attr_bot)
+    df_statistics = get_edge_waiting_time_statistics(df_waiting_times)
+
+    edges_labels = {}
+    edges_values = {}
+    for (source, target), df_edge in df_statistics.groupby(['source', 'target'], sort=True):
+        label_lines = []
+        for transition, value in zip(df_edge['transition'], df_edge[statistic]):
+            if transition == 'all':
+                edges_values[(source, target)] = 0 if np.isnan(value) else value
+            else:
+                label_lines.append(transition.replace('_to_', '->') + ": " + timeFormatter_seconds_input(value))
+        edges_labels[(source, target)] = "\n".join(label_lines)
+
+    #waiting time after every activity (over all its outgoing edges)
+    df_grouped_by_source = df_waiting_times.groupby('source')['waiting_time']
+    if statistic == 'p95':
+        waiting_time_after_activity = df_grouped_by_source.quantile(0.95)
+    else:
+        waiting_time_after_activity = df_grouped_by_source.agg(statistic)
+
+    edge_waiting_time = {}
+    performed_by = {}
+    activities_list = list(df_log[attr_activity].unique())
+    for activity in activities_list:
+        value = waiting_time_after_activity.get(activity, np.nan)
+        if np.isnan(value):
+            edge_waiting_time[str(activity)] = "no data"
+        else:
+            edge_waiting_time[str(activity)] = value
+
+        performed_by_list = list(df_log.loc[df_log[attr_activity] == activity, attr_bot].unique())
+        if (True in performed_by_list) & (False in performed_by_list):
+            performed_by[str(activity)] = "manual_and_bot"
+        elif True in performed_by_list:
+            performed_by[str(activity)] = "bot_only"
+        else:
+            performed_by[str(activity)] = "manual_only"
+
+    color_intensities = get_color_intensity(edge_waiting_time)
+    coloring = get_coloring_by_resource(performed_by, color_intensities)
+
+    labels = {}
+    for activity, value in edge_waiting_time.items():
+        if not isinstance(value, str):
+            value_str = timeFormatter_seconds_input(value)
+        else:
+            value_str = value
+        labels[activity] = activity + "\n" + "waiting after (" + statistic + "): " + value_str
+
+    return labels, coloring, edges_labels, edges_values, 'edge_waiting_time_' + statistic
+def measure_edge_waiting_times(df_log, attr_traceID, attr_activity, attr_bot):
+    """
+    Measure: Calculates for every edge of the directly follows graph and every transition type
+        (bot to bot, bot to human, human to bot, human to human and all) the number of transitions and
+        the mean, median and 95th percentile of the waiting time between the consecutive events
+
+    Parameters
+    -----------
+    df_log
+        The log dataframe
+    attr_traceID
+        The name/key of the attribute in the log which contains the traceID,
+        i.e. the identifier that matches every event to a specific trace. Example value: 'docid_uuid'
+    attr_activity
+        The name/key of the attribute in the log which contains the name of an activity. Example value: 'concept:name'
+    attr_bot
+        The name/key of the attribute in the log which contains the information
+        whether the event was executed by a bot or not (true / false). Example value: 'bot'
+
+    Returns
+    -----------
+    results_df
+        The dataframe with the results and the name of the measure ('edge_waiting_times')
+    """
+    df_statistics = get_edge_waiting_time_statistics(get_edge_waiting_times(df_log, attr_traceID, attr_activity, attr_bot))
+    results_df = df_statistics.rename(columns={'count': 'number of transitions'})
+    for statistic in edge_waiting_time_statistics:
+        results_df[statistic] = results_df[statistic].apply(timeFormatter_seconds_input)
+    return results_df, 'edge_waiting_times'
+
+#Reconstruction of the workflow call trees of the bot jobs
+#Messages like "Start Process.xaml", "End SendTo_API", "Finish GetDNummer" or "## End Process.xaml ##" mark the start
+#and the end of a (nested) workflow invocation
+workflow_marker_pattern = re.compile(r'^[#\s]*(Start|End|Finish)\s+(\S+?)(?:\.xaml)?[#\s]*$')
+def get_workflow_marker(message):
+    """
+    Checks whether a log message marks the start or the end of a workflow invocation
+
+    Parameters
+    -----------
+    message
+        The log message (e.g. 'Start PDF_DeleteAllDownloadedPDFs')
+
+    Returns
+    -----------
+    marker, workflow
+        'start' or 'end' and the name of the workflow (without '.xaml'), or None, None if the message is no marker
+    """
+    match = workflow_marker_pattern.match(str(message))
+    if match is None:
+        return None, None
+    if match.group(1) == 'Start':
+        return 'start', match.group(2)
+    return 'end', match.group(2)
+def close_workflow_invocation(invocations, invocation, end_timestamp, closed_by_marker):
+    """
+    Closes a workflow invocation: sets its end, its inclusive and exclusive duration (in seconds) and
+    adds its inclusive duration to the time spent in sub-workflows of its parent invocation
+
+    Parameters
+    -----------
+    invocations
+        All invocations of the log so far (the position in the list is the id of the invocation)
+    invocation
+        The invocation that is closed
+    end_timestamp
+        The time the invocation ended
+    closed_by_marker
+        Whether the invocation was closed by an end marker or implicitly
+    """
+    invocation['end'] = end_timestamp
+    invocation['closed_by_marker'] = closed_by_marker
+    invocation['inclusive_time'] = max((end_timestamp - invocation['start']) / np.timedelta64(1, 's'), 0)
+    invocation['exclusive_time'] = max(invocation['inclusive_time'] - invocation['children_time'], 0)
+    if invocation['parent_invocation'] is not None:
+        invocations[invocation['parent_invocation']]['children_time'] += invocation['inclusive_time']
+def get_workflow_file_name(file_name):
+    """
+    Gets the name of the workflow of a UiPath fileName
+    (e.g. 'Framework\\PDF_ReadInformation.xaml' -> 'PDF_ReadInformation'), or None if the file name is missing
+    """
+    if not isinstance(file_name, str) or file_name == "":
+        return None
+    return re.sub(r'\.xaml$', '', re.split(r'[\\/]', file_name)[-1])
+def reconstruct_workflow_call_trees(df_log, attr_botcaseid, attr_activity, attr_workflow='workflow'):
+    """
+    Rebuilds the call tree of every bot job in a single pass over the bot events (sorted by job and time) with a stack
+    of open workflow invocations. A start marker opens an invocation as child of the invocation on top of the stack,
+    an end marker closes the matching invocation (and all invocations that were opened after it and not closed).
+    If a workflow is started again while it is still open, the open invocation is closed first (workflows are not
+    assumed to call themselves recursively).
+    Invocations that are still open at the end of a job are closed with the last event of the job.
+    If the log contains the workflow (file) that produced every event (see bot_log_parser), the markers are checked
+    against it, since the messages are often copied between workflows: a start marker logged inside another workflow
+    than the caller opens an invocation of the workflow it was logged in, an end marker logged inside the innermost
+    open workflow closes that one, and all other events belong to the innermost open invocation of their workflow.
+    The inclusive duration of an invocation is the time from its start to its end marker, the exclusive duration is
+    the inclusive duration without the inclusive durations of its direct sub-workflows
+
+    Parameters
+    -----------
+    df_log
+        The log dataframe
+    attr_botcaseid
+        The name/key of the attribute in the log which contains the id of the bot job. Example value: 'botCaseId'
+    attr_activity
+        The name/key of the attribute in the log which contains the name of an activity. Example value: 'concept:name'
+    attr_workflow
+        The name/key of the attribute in the log which contains the workflow (file) that produced an event.
+        Example value: 'workflow'. If it is not in the log, only the messages of the markers are used
+
+    Returns
+    -----------
+    df_invocations
+        A dataframe with one row per workflow invocation and the columns 'job', 'invocation', 'parent_invocation',
+        'depth', 'workflow', 'call_path', 'start', 'end', 'closed_by_marker', 'events', 'inclusive_time' and
+        'exclusive_time' (durations in seconds)
+    """
+    if attr_botcaseid not in df_log.columns:
+        print("attribute", attr_botcaseid, "not found in the log")
+        return pd.DataFrame(columns=['job', 'invocation', 'parent_invocation', 'depth', 'workflow', 'call_path', 'start',
+                                     'end', 'closed_by_marker', 'events', 'inclusive_time', 'exclusive_time'])
+    job_codes, order = get_event_order(df_log, attr_botcaseid)
+    jobs = df_log[attr_botcaseid].to_numpy()[order]
+    messages = df_log[attr_activity].to_numpy()[order]
+    start_timestamps = pd.to_datetime(df_log['start_timestamp'], utc=True)
+    end_timestamps = pd.to_datetime(df_log['end_timestamp'], utc=True)
+    timestamps = start_timestamps.where(start_timestamps.notna(), end_timestamps).to_numpy(dtype='datetime64[ns]')[order]
+    if attr_workflow in df_log.columns:
+        files = df_log[attr_workflow].map(get_workflow_file_name).to_numpy()[order]
+    else:
+        files = np.full(len(df_log), None, dtype=object)
+
+    invocations = []
+    stack = []
+
+    last_timestamp = None
+    for position in range(len(job_codes)):
+        if job_codes[position] < 0:
+            continue
+        if position > 0 and job_codes[position] != job_codes[position - 1]:
+            #a new job starts: close the invocations of the previous job that are still open
+            while stack:
+                close_workflow_invocation(invocations, stack.pop(), last_timestamp, False)
+        timestamp = timestamps[position]
+        if np.isnat(timestamp):
+            continue
+        last_timestamp = timestamp
+        marker, workflow = get_workflow_marker(messages[position])
+        file = files[position]
+        if marker == 'start' and file is not None and (not stack or stack[-1]['workflow'] != file):
+            #the marker was not logged by the calling workflow, so it starts the workflow it was logged in
+            workflow = file
+        elif marker == 'end' and file is not None and stack and stack[-1]['workflow'] == file:
+            workflow = file
+        if marker == 'start':
+            if any(invocation['workflow'] == workflow for invocation in stack):
+                #the workflow is started again before it was closed (e.g. a retry or the next item of the job),
+                #so the open invocation (and the invocations opened after it) implicitly end here
+                while stack[-1]['workflow'] != workflow:
+                    close_workflow_invocation(invocations, stack.pop(), timestamp, False)
+                close_workflow_invocation(invocations, stack.pop(), timestamp, False)
+            parent = stack[-1] if stack else None
+            invocation = {'job': jobs[position], 'invocation': len(invocations),
+                          'parent_invocation': parent['invocation'] if parent is not None else None,
+                          'depth': len(stack), 'workflow': workflow,
+                          'call_path': (parent['call_path'] + "/" if parent is not None else "") + workflow,
+                          'start': timestamp, 'end': pd.NaT, 'closed_by_marker': False, 'events': 1,
+                          'inclusive_time': np.nan, 'exclusive_time': np.nan, 'children_time': 0.0}
+            invocations.append(invocation)
+            stack.append(invocation)
+        elif marker == 'end' and any(invocation['workflow'] == workflow for invocation in stack):
+            #invocations opened after the matching one were not closed explicitly and end here as well
+            while stack[-1]['workflow'] != workflow:
+                close_workflow_invocation(invocations, stack.pop(), timestamp, False)
+            stack[-1]['events'] += 1
+            close_workflow_invocation(invocations, stack.pop(), timestamp, True)
+        elif stack:
+            #all other events (and end markers without a start) belong to the innermost open invocation of their
+            #workflow, or to the innermost open invocation if their workflow is unknown or not open
+            invocation = next((invocation for invocation in reversed(stack) if invocation['workflow'] == file),
+                              stack[-1])
+            invocation['events'] += 1
+    while stack:
+        close_workflow_invocation(invocations, stack.pop(), last_timestamp, False)
+
+    df_invocations = pd.DataFrame(invocations, columns=['job', 'invocation', 'parent_invocation', 'depth', 'workflow',
+                                                        'call_path', 'start', 'end', 'closed_by_marker', 'events',
+                                                        'inclusive_time', 'exclusive_time'])
+    df_invocations['start'] = pd.to_datetime(df_invocations['start'], utc=True)
+    df_invocations['end'] = pd.to_datetime(df_invocations['end'], utc=True)
+    return df_invocations
+def measure_sub_workflow_timings(df_log, round_decimals, attr_botcaseid, attr_activity):
+    """
+    Measure: Calculates for every sub-workflow (identified by its call path, e.g. 'Process/SendTo_API') how often it
+        was invoked, its total and mean inclusive duration (including its own sub-workflows) and its total and mean
+        exclusive duration (without its own sub-workflows). The share of the bot runtime is the total exclusive
+        duration divided by the total inclusive duration of all top-level workflows, so the sub-workflow that
+        dominates the bot runtime comes first
+
+    Parameters
+    -----------
+    df_log
+        The log dataframe
+    round_decimals
+        The number of decimals the share of the bot runtime should be rounded to
+    attr_botcaseid
+        The name/key of the attribute in the log which contains the id of the bot job. Example value: 'botCaseId'
+    attr_activity
+        The name/key of the attribute in the log which contains the name of an activity. Example value: 'concept:name'
+
+    Returns
+    -----------
+    results_df
+        The dataframe with the results and the name of the measure ('sub_workflow_timings')
+    """
+    df_invocations = reconstruct_workflow_call_trees(df_log, attr_botcaseid, attr_activity)
+    bot_runtime = df_invocations.loc[df_invocations['depth'] == 0, 'inclusive_time'].sum()
+    df_grouped = df_invocations.groupby(['call_path', 'workflow', 'depth'], sort=False)
+    results_df = df_grouped.agg(invocations=('invocation', 'count'), inclusive_total=('inclusive_time', 'sum'),
+                                inclusive_mean=('inclusive_time', 'mean'), exclusive_total=('exclusive_time', 'sum'),
+                                exclusive_mean=('exclusive_time', 'mean')).reset_index()
+    if bot_runtime > 0:
+        results_df['share of bot runtime'] = (results_df['exclusive_total'] / bot_runtime).round(round_decimals)
+    else:
+        results_df['share of bot runtime'] = np.nan
+    results_df = results_df.sort_values(by=['exclusive_total', 'call_path'], ascending=[False, True]).reset_index(drop=True)
+    for column in ['inclusive_total', 'inclusive_mean', 'exclusive_total', 'exclusive_mean']:
+        results_df[column] = results_df[column].apply(timeFormatter_seconds_input)
+    results_df = results_df.rename(columns={'call_path': 'call path', 'invocations': 'number of invocations',
+                                            'inclusive_total': 'inclusive time total',
+                                            'inclusive_mean': 'inclusive time mean',
+                                            'exclusive_total': 'exclusive time total',
+                                            'exclusive_mean': 'exclusive time mean'})
+    return results_df, 'sub_workflow_timings'
+
+#Robot occupancy
+#A robot is busy with a bot job from the first to the last event of the job. A sweep line runs over the start and end
+#points of all busy intervals, sorted by time (ends before starts at the same time, so touching intervals do not
+#overlap), and keeps the number of running jobs overall and per robot. A robot is busy while it runs at least one job
+def get_robot_busy_intervals(df_log, attr_botcaseid, attr_bot, attr_resource='org:resource'):
+    """
+    Builds the busy interval of every bot job and robot
+
+    Parameters
+    -----------
+    df_log
+        The log dataframe
+    attr_botcaseid
+        The name/key of the attribute in the log which contains the id of the bot job. Example value: 'botCaseId'
+    attr_bot
+        The name/key of the attribute in the log which contains the information
+        whether the event was executed by a bot or not (true / false). Example value: 'bot'
+    attr_resource
+        The name/key of the attribute in the log which contains the robot. Example value: 'org:resource'
+
+    Returns
+    -----------
+    df_intervals
+        A dataframe with the robot, the job, the start and the end of the interval and the number of events,
+        sorted by start
+    """
+    df_bot = df_log.loc[(df_log[attr_bot] == True) & df_log[attr_botcaseid].notna()]
+    if attr_resource in df_bot.columns:
+        robots = df_bot[attr_resource].astype(object).where(df_bot[attr_resource].notna(), 'unknown robot')
+    else:
+        robots = pd.Series('unknown robot', index=df_bot.index)
+    df_times = pd.DataFrame({'robot': robots.astype(str), 'job': df_bot[attr_botcaseid].astype(str),
+                             'start': df_bot['start_timestamp'].where(df_bot['start_timestamp'].notna(),
+                                                                     df_bot['end_timestamp']),
+                             'end': df_bot['end_timestamp'].where(df_bot['end_timestamp'].notna(),
+                                                                 df_bot['start_timestamp'])})
+    df_intervals = df_times.groupby(['robot', 'job'], sort=False).agg(start=('start', 'min'), end=('end', 'max'),
+                                                                      events=('start', 'size')).reset_index()
+    df_intervals = df_intervals.loc[df_intervals['start'].notna() & df_intervals['end'].notna()]
+    return df_intervals.sort_values(by=['start', 'robot', 'job'], kind='stable').reset_index(drop=True)
+def sweep_robot_intervals(df_intervals):
+    """
+    Runs the sweep line over the busy intervals
+
+    Parameters
+    -----------
+    df_intervals
+        The busy intervals (see get_robot_busy_intervals)
+
+    Returns
+    -----------
+    df_sweep
+        A dataframe with one row per start or end point in sweep order: the time, the robot, the change of the number of
+        running jobs (+1/-1), the number of running jobs and of busy robots after the point and the number of jobs
+        the robot runs after the point
+    """
+    n_intervals = len(df_intervals)
+    times = np.concatenate([df_intervals['start'].to_numpy(), df_intervals['end'].to_numpy()])
+    robots = np.concatenate([df_intervals['robot'].to_numpy(), df_intervals['robot'].to_numpy()])
+    deltas = np.concatenate([np.ones(n_intervals, dtype=np.int64), -np.ones(n_intervals, dtype=np.int64)])
+    order = np.lexsort((deltas, times))
+    df_sweep = pd.DataFrame({'time': times[order], 'robot': robots[order], 'delta': deltas[order]})
+    df_sweep['concurrent jobs'] = df_sweep['delta'].cumsum()
+    df_sweep['robot jobs'] = df_sweep.groupby('robot', sort=False)['delta'].cumsum()
+    #a robot becomes busy when its number of running jobs changes from 0 to 1 and idle when it changes from 1 to 0
+    robot_was_busy = (df_sweep['robot jobs'] - df_sweep['delta']) > 0
+    robot_is_busy = df_sweep['robot jobs'] > 0
+    df_sweep['robot busy change'] = robot_is_busy.astype(int) - robot_was_busy.astype(int)
+    df_sweep['busy robots'] = df_sweep['robot busy change'].cumsum()
+    return df_sweep
+def get_robot_busy_periods(df_sweep):
+    """
+    Gets the periods in which every robot is busy (the union of its busy intervals)
+
+    Returns
+    -----------
+    df_busy_periods
+        A dataframe with the robot and the start and the end of every busy period
+    """
+    df_changes = df_sweep.loc[df_sweep['robot busy change'] != 0, ['time', 'robot', 'robot busy change']]
+    starts = df_changes.loc[df_changes['robot busy change'] == 1]
+    ends = df_changes.loc[df_changes['robot busy change'] == -1]
+    #the n-th start and the n-th end of a robot belong together, since busy and idle alternate per robot
+    starts = starts.assign(period=starts.groupby('robot', sort=False).cumcount())
+    ends = ends.assign(period=ends.groupby('robot', sort=False).cumcount())
+    df_busy_periods = starts[['robot', 'period', 'time']].merge(ends[['robot', 'period', 'time']],
+                                                                on=['robot', 'period'], suffixes=('_start', '_end'))
+    return df_busy_periods.rename(columns={'time_start': 'start', 'time_end': 'end'})[['robot', 'start', 'end']]
+def measure_robot_concurrency(df_log, attr_botcaseid, attr_bot, attr_resource='org:resource'):
+    """
+    Measure: Time series of the number of bot jobs running at the same time and the number of busy robots.
+    Every row is a point in time at which a job starts or ends, the values hold until the next row
+
+    Parameters
+    -----------
+    df_log
+        The log dataframe
+    attr_botcaseid
+        The name/key of the attribute in the log which contains the id of the bot job. Example value: 'botCaseId'
+    attr_bot
+        The name/key of the attribute in the log which contains the information
+        whether the event was executed by a bot or not (true / false). Example value: 'bot'
+    attr_resource
+        The name/key of the attribute in the log which contains the robot. Example value: 'org:resource'
+
+    Returns
+    -----------
+    results_df, 'robot_concurrency'
+        The time series as a dataframe and the name of the measure ('robot_concurrency')
+    """
+    df_sweep = sweep_robot_intervals(get_robot_busy_intervals(df_log, attr_botcaseid, attr_bot, attr_resource))
+    #only the last state of points at the same time is kept
+    results_df = df_sweep.drop_duplicates(subset='time', keep='last')[['time', 'concurrent jobs', 'busy robots']]
+    return results_df.reset_index(drop=True), 'robot_concurrency'
+def measure_robot_idle_gaps(df_log, attr_botcaseid, attr_bot, attr_resource='org:resource'):
+    """
+    Measure: Lists the gaps in which a robot is idle between two of its busy periods
+
+    Parameters
+    -----------
+    df_log
+        The log dataframe
+    attr_botcaseid
+        The name/key of the attribute in the log which contains the id of the bot job. Example value: 'botCaseId'
+    attr_bot
+        The name/key of the attribute in the log which contains the information
+        whether the event was executed by a bot or not (true / false). Example value: 'bot'
+    attr_resource
+        The name/key of the attribute in the log which contains the robot. Example value: 'org:resource'
+
+    Returns
+    -----------
+    results_df, 'robot_idle_gaps'
+        The idle gaps as a dataframe and the name of the measure ('robot_idle_gaps')
+    """
+    df_busy_periods = get_robot_busy_periods(sweep_robot_intervals(get_robot_busy_intervals(df_log, attr_botcaseid,
+                                                                                            attr_bot, attr_resource)))
+    df_busy_periods = df_busy_periods.sort_values(by=['robot', 'start'], kind='stable')
+    results_df = pd.DataFrame({'robot': df_busy_periods['robot'], 'idle from': df_busy_periods['end'],
+                               'idle until': df_busy_periods.groupby('robot', sort=False)['start'].shift(-1)})
+    results_df = results_df.loc[results_df['idle until'].notna()].reset_index(drop=True)
+    idle_seconds = (results_df['idle until'] - results_df['idle from']).dt.total_seconds()
+    results_df['idle time'] = idle_seconds.apply(timeFormatter_seconds_input)
+    return results_df, 'robot_idle_gaps'
+def measure_robot_utilization(df_log, round_decimals, attr_botcaseid, attr_bot, attr_resource='org:resource'):
+    """
+    Measure: Calculates the utilization of every robot per hour, i.e. the share of the hour in which the robot was busy
+    with at least one bot job. Hours between the first and the last job of a robot without any job are listed with
+    utilization 0
+
+    Parameters
+    -----------
+    df_log
+        The log dataframe
+    round_decimals
+        The number of decimals the utilization should be rounded to
+    attr_botcaseid
+        The name/key of the attribute in the log which contains the id of the bot job. Example value: 'botCaseId'
+    attr_bot
+        The name/key of the attribute in the log which contains the information
+        whether the event was executed by a bot or not (true / false). Example value: 'bot'
+    attr_resource
+        The name/key of the attribute in the log which contains the robot. Example value: 'org:resource'
+
+    Returns
+    -----------
+    results_df, 'robot_utilization'
+        The utilization per robot and hour as a dataframe and the name of the measure ('robot_utilization')
+    """
+    df_busy_periods = get_robot_busy_periods(sweep_robot_intervals(get_robot_busy_intervals(df_log, attr_botcaseid,
+                                                                                            attr_bot, attr_resource)))
+    columns = ['robot', 'hour', 'busy time', 'utilization']
+    if len(df_busy_periods) == 0:
+        return pd.DataFrame(columns=columns), 'robot_utilization'
+    one_hour = pd.Timedelta(hours=1)
+    first_hours = df_busy_periods['start'].dt.floor('h')
+    n_hours = ((df_busy_periods['end'].dt.floor('h') - first_hours) // one_hour).astype(int) + 1
+    #every busy period is split into the hours it overlaps
+    df_hours = df_busy_periods.loc[df_busy_periods.index.repeat(n_hours)].copy()
+    df_hours['hour'] = first_hours.loc[df_hours.index] + df_hours.groupby(level=0).cumcount().to_numpy() * one_hour
+    overlap_start = df_hours[['start', 'hour']].max(axis=1)
+    overlap_end = pd.concat([df_hours['end'], df_hours['hour'] + one_hour], axis=1).min(axis=1)
+    df_hours['busy seconds'] = (overlap_end - overlap_start).dt.total_seconds().clip(lower=0)
+    df_utilization = df_hours.groupby(['robot', 'hour'])['busy seconds'].sum()
+    #hours without jobs between the first and the last hour of a robot
+    all_hours = []
+    for robot, robot_hours in df_utilization.groupby(level='robot', sort=False):
+        hours = robot_hours.index.get_level_values('hour')
+        all_hours.append(pd.DataFrame({'robot': robot, 'hour': pd.date_range(hours.min(), hours.max(), freq='h')}))
+    df_utilization = df_utilization.reindex(pd.MultiIndex.from_frame(pd.concat(all_hours, ignore_index=True)),
+                                            fill_value=0).reset_index()
+    results_df = pd.DataFrame({'robot': df_utilization['robot'], 'hour': df_utilization['hour'],
+                               'busy time': df_utilization['busy seconds'].apply(timeFormatter_seconds_input),
+                               'utilization': (df_utilization['busy seconds'] / 3600).round(round_decimals)})
+    return results_df[columns], 'robot_utilization'
+def measure_robot_queueing(df_log, attr_traceID, attr_activity, attr_bot, attr_botcaseid, attr_resource='org:resource'):
+    """
+    Measure: Calculates for every handover from a human activity to a bot in a trace how long the business process
+    waited for the robot, i.e. the time from the end of the human activity (the process is ready for the bot) until the
+    first event of a bot job after it (the robot picks the case up). Bot activities of the business process
+    (e.g. 'Check documents RPA') have no bot job, so the robot and the bot job are taken from the first event of the
+    trace with a bot job id after the human activity
+
+    Parameters
+    -----------
+    df_log
+        The log dataframe
+    attr_traceID
+        The name/key of the attribute in the log which contains the traceID. Example value: 'docid_uuid'
+    attr_activity
+        The name/key of the attribute in the log which contains the name of an activity. Example value: 'concept:name'
+    attr_bot
+        The name/key of the attribute in the log which contains the information
+        whether the event was executed by a bot or not (true / false). Example value: 'bot'
+    attr_botcaseid
+        The name/key of the attribute in the log which contains the id of the bot job. Example value: 'botCaseId'
+    attr_resource
+        The name/key of the attribute in the log which contains the robot. Example value: 'org:resource'
+
+    Returns
+    -----------
+    results_df, 'robot_queueing'
+        The queueing time of every handover as a dataframe and the name of the measure ('robot_queueing')
+    """
+    case_codes, order = get_event_order(df_log, attr_traceID)
+    df_sorted = df_log.iloc[order]
+    is_bot = (df_sorted[attr_bot] == True).to_numpy()
+    same_case_as_next = np.concatenate([(case_codes[:-1] == case_codes[1:]) & (case_codes[:-1] >= 0), [False]])
+    next_is_bot = np.concatenate([is_bot[1:], [False]])
+    #the human events after which a bot takes over the trace
+    handover_positions = np.flatnonzero(~is_bot & next_is_bot & same_case_as_next)
+    #the position of the next event with a bot job id at or after every position (len(df_sorted) if there is none)
+    if attr_botcaseid in df_sorted.columns:
+        has_bot_job = df_sorted[attr_botcaseid].notna().to_numpy()
+    else:
+        has_bot_job = is_bot
+    job_positions = np.where(has_bot_job, np.arange(len(df_sorted)), len(df_sorted))
+    next_job_positions = np.minimum.accumulate(job_positions[::-1])[::-1]
+    pickup_positions = next_job_positions[np.minimum(handover_positions + 1, len(df_sorted) - 1)]
+    #only pickups in the same trace
+    is_picked_up = pickup_positions < len(df_sorted)
+    is_picked_up[is_picked_up] = (case_codes[pickup_positions[is_picked_up]] ==
+                                  case_codes[handover_positions[is_picked_up]])
+    df_previous = df_sorted.iloc[handover_positions[is_picked_up]]
+    df_pickup = df_sorted.iloc[pickup_positions[is_picked_up]]
+    ready = df_previous['end_timestamp'].where(df_previous['end_timestamp'].notna(),
+                                               df_previous['start_timestamp']).reset_index(drop=True)
+    pickup = df_pickup['start_timestamp'].where(df_pickup['start_timestamp'].notna(),
+                                                df_pickup['end_timestamp']).reset_index(drop=True)
+    queueing_seconds = (pickup - ready).dt.total_seconds().to_numpy()
+    results_df = pd.DataFrame({'trace': df_pickup[attr_traceID].to_numpy(),
+                               'ready after': df_previous[attr_activity].to_numpy(),
+                               'bot activity': df_pickup[attr_activity].to_numpy(),
+                               'bot job': df_pickup[attr_botcaseid].to_numpy() if attr_botcaseid in df_pickup.columns else None,
+                               'robot': df_pickup[attr_resource].to_numpy() if attr_resource in df_pickup.columns else None,
+                               'ready': ready, 'picked up': pickup,
+                               'queueing seconds': queueing_seconds})
+    results_df['queueing time'] = results_df['queueing seconds'].apply(timeFormatter_seconds_input)
+    return results_df, 'robot_queueing'
+
+#Quantile sketches (t-digest) of the durations of the activities
+#A t-digest summarizes the distribution of a stream of values by a bounded number of weighted centroids. Centroids at
+#the tails of the distribution are small, so high percentiles stay accurate for the heavy-tailed durations of bot
+#retries and timeouts. The t-digests of different partitions of a log can be merged
+#The number of centroids of a t-digest is at most about tdigest_compression, single values are buffered until
+#tdigest_buffer_size values are collected
+tdigest_compression = 100
+tdigest_buffer_size = 500
+#The percentiles shown in the labels of the quantile measures
+duration_quantiles = [50, 90, 99]
+def create_tdigest(compression=tdigest_compression):
+    """
+    Creates an empty t-digest
+
+    Parameters
+    -----------
+    compression
+        The compression of the t-digest, i.e. the maximum number of centroids (higher values are more accurate)
+
+    Returns
+    -----------
+    tdigest
+        A dictionary with the means and weights of the centroids (numpy arrays), the buffer of values which are not
+        added to the centroids yet, the number of values and their minimum and maximum
+    """
+    return {'compression': compression, 'means': np.zeros(0), 'weights': np.zeros(0), 'buffer': [], 'count': 0,
+            'min': np.inf, 'max': -np.inf}
+def compress_tdigest(tdigest, values=None):
+    """
+    Merges the buffered values (and the given values) into the centroids of a t-digest.
+    The sorted centroids are grouped so that every group spans at most one unit of the scale function
+    k(q) = compression / pi * arcsin(2q - 1), which allows large centroids in the middle and small ones at the tails
+
+    Parameters
+    -----------
+    tdigest
+        The t-digest, which is updated
+    values
+        A numpy array of further values that are added, without NaN values (optional)
+    """
+    new_values = np.asarray(tdigest['buffer'], dtype=float)
+    if values is not None:
+        new_values = np.concatenate([new_values, values])
+    tdigest['buffer'] = []
+    means = np.concatenate([tdigest['means'], new_values])
+    weights = np.concatenate([tdigest['weights'], np.ones(len(new_values))])
+    if len(means) == 0:
+        return
+    order = np.argsort(means, kind='stable')
+    means = means[order]
+    weights = weights[order]
+    total_weight = weights.sum()
+    q_left = (np.cumsum(weights) - weights) / total_weight
+    k_left = tdigest['compression'] / np.pi * np.arcsin(np.clip(2*q_left - 1, -1, 1))
+    groups = np.floor(k_left - k_left[0]).astype(np.int64)
+    group_starts = np.flatnonzero(np.concatenate([[True], groups[1:] != groups[:-1]]))
+    group_weights = np.add.reduceat(weights, group_starts)
+    tdigest['means'] = np.add.reduceat(means * weights, group_starts) / group_weights
+    tdigest['weights'] = group_weights
+def add_value_to_tdigest(tdigest, value):
+    """
+    Adds a single value to a t-digest. Missing values (None or NaN) are skipped
+
+    Parameters
+    -----------
+    tdigest
+        The t-digest, which is updated
+    value
+        The value that is added
+    """
+    if value is None or np.isnan(value):
+        return
+    tdigest['buffer'].append(value)
+    tdigest['count'] = tdigest['count'] + 1
+    tdigest['min'] = min(tdigest['min'], value)
+    tdigest['max'] = max(tdigest['max'], value)
+    if len(tdigest['buffer']) >= tdigest_buffer_size:
+        compress_tdigest(tdigest)
+def add_values_to_tdigest(tdigest, values):
+    """
+    Adds all values of an array to a t-digest at once. Missing values (NaN) are skipped
+
+    Parameters
+    -----------
+    tdigest
+        The t-digest, which is updated
+    values
+        The values that are added (numpy array, list or series)
+    """
+    values = np.asarray(values, dtype=float)
+    values = values[~np.isnan(values)]
+    if len(values) == 0:
+        return
+    tdigest['count'] = tdigest['count'] + len(values)
+    tdigest['min'] = min(tdigest['min'], values.min())
+    tdigest['max'] = max(tdigest['max'], values.max())
+    compress_tdigest(tdigest, values)
+def merge_tdigests(tdigest, other_tdigest):
+    """
+    Adds the values summarized by another t-digest to a t-digest, e.g. to combine the t-digests of several partitions
+
+    Parameters
+    -----------
+    tdigest
+        The t-digest, which is updated
+    other_tdigest
+        The t-digest whose values are added
+    """
+    if other_tdigest['count'] == 0:
+        return
+    tdigest['means'] = np.concatenate([tdigest['means'], other_tdigest['means']])
+    tdigest['weights'] = np.concatenate([tdigest['weights'], other_tdigest['weights']])
+    tdigest['buffer'] = tdigest['buffer'] + other_tdigest['buffer']
+    tdigest['count'] = tdigest['count'] + other_tdigest['count']
+    tdigest['min'] = min(tdigest['min'], other_tdigest['min'])
+    tdigest['max'] = max(tdigest['max'], other_tdigest['max'])
+    compress_tdigest(tdigest)
+def get_tdigest_quantile(tdigest, quantile):
+    """
+    Estimates a quantile of the values summarized by a t-digest by interpolating linearly between the centers of the
+    centroids (and the minimum and the maximum at the ends)
+
+    Parameters
+    -----------
+    tdigest
+        The t-digest
+    quantile
+        The quantile between 0 and 1 (e.g. 0.9 for the 90th percentile)
+
+    Returns
+    -----------
+    value
+        The estimated quantile (NaN if the t-digest is empty)
+    """
+    if tdigest['buffer']:
+        compress_tdigest(tdigest)
+    if tdigest['count'] == 0:
+        return np.nan
+    weights = tdigest['weights']
+    total_weight = weights.sum()
+    centers = np.cumsum(weights) - weights / 2
+    positions = np.concatenate([[0], centers, [total_weight]])
+    values = np.concatenate([[tdigest['min']], tdigest['means'], [tdigest['max']]])
+    return float(np.interp(quantile * total_weight, positions, values))
+def get_activity_duration_tdigests(df_log, attr_activity, duration_column, compression=tdigest_compression):
+    """
+    Builds a t-digest of the durations of every activity in one pass over the log dataframe
+
+    Parameters
+    -----------
+    df_log
+        The log dataframe
+    attr_activity
+        The name/key of the attribute in the log which contains the name of an activity. Example value: 'concept:name'
+    duration_column
+        The column with the durations (timedeltas), e.g. 'act_exe_time' or 'time_until_end'
+    compression
+        The compression of the t-digests
+
+    Returns
+    -----------
+    tdigests
+        A dictionary with the t-digest of the durations (in seconds) of every activity
+    """
+    tdigests = {}
+    durations = df_log[duration_column].dt.total_seconds()
+    for activity, activity_durations in durations.groupby(df_log[attr_activity], sort=False):
+        tdigest = create_tdigest(compression)
+        add_values_to_tdigest(tdigest, activity_durations.to_numpy())
+        tdigests[str(activity)] = tdigest
+    return tdigests
+def get_tdigest_quantiles_label(activity, tdigest, approximated=False):
+    """
+    Gets the label of an activity showing the percentiles in duration_quantiles of its durations
+
+    Parameters
+    -----------
+    activity
+        The name of the activity
+    tdigest
+        The t-digest of the durations (in seconds) of the activity
+    approximated
+        Whether the durations are approximated execution times (the percentiles are prefixed with 'appr. ')
+
+    Returns
+    -----------
+    label
+        The label of the activity
+    """
+    if tdigest['count'] == 0:
+        return activity + "\n" + "no data"
+    label = activity
+    for quantile in duration_quantiles:
+        value_str = timeFormatter_seconds_input(get_tdigest_quantile(tdigest, quantile / 100))
+        label = label + "\n" + ("appr. " if approximated else "") + "p" + str(quantile) + ": " + value_str
+    return label
+def measure_execution_time_quantile(df_log, quantile, attr_activity, attr_bot, compression=tdigest_compression):
+    """
+    Measure: Calculates percentiles (p50, p90, p99) of the execution times of every activity with t-digests.
+    Unlike the mean and the standard deviation, high percentiles show the long executions of retries and timeouts.
+    The coloring is based on the selected percentile
+
+    Parameters
+    -----------
+    df_log
+        The log dataframe
+    quantile
+        The percentile the coloring is based on (one of duration_quantiles, e.g. 90)
+    attr_activity
+        The name/key of the attribute in the log which contains the name of an activity. Example value: 'concept:name'
+    attr_bot
+        The name/key of the attribute in the log which contains the information
+        whether the event was executed by a bot or not (true / false). Example value: 'bot'
+    compression
+        The compression of the t-digests
+
+    Returns
+    -----------
+    labels, coloring
+        The labels and coloring for every activity, needed for visualization
+        and the name of the measure (e.g. 'execution_time_p90')
+    """
+    tdigests_exact = get_activity_duration_tdigests(df_log, attr_activity, 'act_exe_time', compression)
+    tdigests_approximated = get_activity_duration_tdigests(df_log, attr_activity, 'act_exe_time_appr', compression)
+
+    execution_time_quantile = {}
+    labels = {}
+    performed_by = {}
+    activities_list = list(df_log[attr_activity].unique())
+    for activity in activities_list:
+        #exact execution times are used if there is at least one, otherwise the approximated execution times
+        tdigest = tdigests_exact.get(str(activity), create_tdigest(compression))
+        approximated = tdigest['count'] == 0
+        if approximated:
+            tdigest = tdigests_approximated.get(str(activity), create_tdigest(compression))
+
+        if tdigest['count'] == 0:
+            execution_time_quantile[str(activity)] = "no data"
+        else:
+            execution_time_quantile[str(activity)] = get_tdigest_quantile(tdigest, quantile / 100)
+        labels[str(activity)] = get_tdigest_quantiles_label(str(activity), tdigest, approximated)
+
+        performed_by_list = list(df_log.loc[df_log[attr_activity] == activity, attr_bot].unique())
+        if (True in performed_by_list) & (False in performed_by_list):
+            performed_by[str(activity)] = "manual_and_bot"
+        elif True in performed_by_list:
+            performed_by[str(activity)] = "bot_only"
+        else:
+            performed_by[str(activity)] = "manual_only"
+
+    color_intensities = get_color_intensity(execution_time_quantile)
+    coloring = get_coloring_by_resource(performed_by, color_intensities)
+
+    return labels, coloring, 'execution_time_p' + str(quantile)
+def measure_time_until_end_quantile(df_log, quantile, attr_activity, attr_bot, compression=tdigest_compression):
+    """
+    Measure: Calculates percentiles (p50, p90, p99) of the time it takes to end the process after every activity
+    with t-digests. The coloring is based on the selected percentile
+
+    Parameters
+    -----------
+    df_log
+        The log dataframe
+    quantile
+        The percentile the coloring is based on (one of duration_quantiles, e.g. 90)
+    attr_activity
+        The name/key of the attribute in the log which contains the name of an activity. Example value: 'concept:name'
+    attr_bot
+        The name/key of the attribute in the log which contains the information
+        whether the event was executed by a bot or not (true / false). Example value: 'bot'
+    compression
+        The compression of the t-digests
+
+    Returns
+    -----------
+    labels, coloring
+        The labels and coloring for every activity, needed for visualization
+        and the name of the measure (e.g. 'time_until_end_p90')
+    """
+    tdigests = get_activity_duration_tdigests(df_log, attr_activity, 'time_until_end', compression)
+
+    time_until_end_quantile = {}
+    labels = {}
+    performed_by = {}
+    activities_list = list(df_log[attr_activity].unique())
+    for activity in activities_list:
+        tdigest = tdigests.get(str(activity), create_tdigest(compression))
+        if tdigest['count'] == 0:
+            time_until_end_quantile[str(activity)] = "no data"
+        else:
+            time_until_end_quantile[str(activity)] = get_tdigest_quantile(tdigest, quantile / 100)
+        labels[str(activity)] = get_tdigest_quantiles_label(str(activity), tdigest)
+
+        performed_by_list = list(df_log.loc[df_log[attr_activity] == activity, attr_bot].unique())
+        if (True in performed_by_list) & (False in performed_by_list):
+            performed_by[str(activity)] = "manual_and_bot"
+        elif True in performed_by_list:
+            performed_by[str(activity)] = "bot_only"
+        else:
+            performed_by[str(activity)] = "manual_only"
+
+    color_intensities = get_color_intensity(time_until_end_quantile)
+    coloring = get_coloring_by_resource(performed_by, color_intensities)
+
+    return labels, coloring, 'time_until_end_p' + str(quantile)
+
+#Preview of the measures on a sample of traces
+#Every trace gets a pseudo-random priority from the hash of its traceID and the sample consists of the traces with the
+#smallest priorities (bottom-k reservoir sampling). Traces are kept whole, and a larger sample always contains the
+#smaller samples of the same seed, so a preview can be refined step by step up to the whole log.
+#The values of the measures on the sample are ratios of sums over the sampled traces. Their confidence intervals are
+#based on the linearized (Taylor) variance of these ratio estimators with finite population correction, i.e. the
+#confidence intervals shrink to the exact values when the sample contains all traces
+#The z values of the supported confidence levels
+confidence_level_z_values = {0.8: 1.2816, 0.9: 1.6449, 0.95: 1.96, 0.99: 2.5758}
+def get_trace_priorities(trace_ids, seed=0):
+    """
+    Gets a pseudo-random priority between 0 and 1 for every traceID, which only depends on the traceID and the seed
+
+    Parameters
+    -----------
+    trace_ids
+        The traceIDs (array or series)
+    seed
+        The seed of the sampling
+
+    Returns
+    -----------
+    priorities
+        A numpy array with the priority of every traceID
+    """
+    hash_key = hashlib.md5(str(seed).encode()).hexdigest()[:16]
+    hashes = pd.util.hash_array(np.asarray(trace_ids).astype(str).astype(object), hash_key=hash_key)
+    return (hashes >> np.uint64(11)).astype(np.float64) / float(2**53)
+def sample_traces(df_log, attr_traceID, sample_size, seed=0):
+    """
+    Samples whole traces of the log dataframe with bottom-k reservoir sampling.
+    Events without traceID are treated as traces with a single event
+
+    Parameters
+    -----------
+    df_log
+        The log dataframe
+    attr_traceID
+        The name/key of the attribute in the log which contains the traceID. Example value: 'docid_uuid'
+    sample_size
+        The number of traces in the sample
+    seed
+        The seed of the sampling. Samples of the same seed are nested
+
+    Returns
+    -----------
+    df_sample, sampled_traces, total_traces
+        The events of the sampled traces (in the order of the log dataframe), the number of sampled traces
+        and the number of traces of the log
+    """
+    trace_keys = get_sampling_trace_keys(df_log, attr_traceID)
+    unique_trace_keys = pd.unique(trace_keys)
+    total_traces = len(unique_trace_keys)
+    if sample_size >= total_traces:
+        return df_log.copy(), total_traces, total_traces
+    priorities = get_trace_priorities(unique_trace_keys, seed)
+    sampled_trace_keys = unique_trace_keys[np.argpartition(priorities, sample_size)[:sample_size]]
+    df_sample = df_log.loc[pd.Series(trace_keys).isin(sampled_trace_keys).to_numpy()].copy()
+    return df_sample, sample_size, total_traces
+def get_sampling_trace_keys(df_log, attr_traceID):
+    """
+    Gets the key of the trace of every event for the sampling: the traceID or, for events without traceID,
+    a key of their own
+    """
+    trace_ids = df_log[attr_traceID].astype(object)
+    own_keys = "event " + pd.Series(np.arange(len(df_log)), index=df_log.index).astype(str)
+    return trace_ids.where(trace_ids.notna(), own_keys).astype(str).to_numpy()
+def get_ratio_linearization(y, x):
+    """
+    Gets the ratio estimator sum(y) / sum(x) over the sampled traces for every column and its linearized values per trace
+
+    Parameters
+    -----------
+    y, x
+        Numpy arrays with one row per sampled trace and one column per activity
+
+    Returns
+    -----------
+    ratio, z
+        The ratio of every column (NaN if sum(x) is 0) and the linearized values, whose variance is the
+        variance of the ratio estimator
+    """
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ratio = y.sum(axis=0) / x.sum(axis=0)
+        z = (y - ratio * x) / x.mean(axis=0)
+    return ratio, z
+def get_std_linearization(y_sum, y_square_sum, count):
+    """
+    Gets the (sample) standard deviation of the values of every column and its linearized values per trace,
+    given per trace the sum of the values, the sum of their squares and their number
+    """
+    mean, z_mean = get_ratio_linearization(y_sum, count)
+    mean_of_squares, z_mean_of_squares = get_ratio_linearization(y_square_sum, count)
+    total_count = count.sum(axis=0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        correction = total_count / (total_count - 1)
+        std = np.sqrt(np.clip(mean_of_squares - mean**2, 0, None) * correction)
+        z = (z_mean_of_squares - 2 * mean * z_mean) * correction / (2 * std)
+    return std, z
+def get_confidence_interval(estimate, z, sampled_traces, total_traces, confidence_level=0.95):
+    """
+    Gets the confidence interval of estimates from their linearized values per sampled trace,
+    with finite population correction
+
+    Parameters
+    -----------
+    estimate
+        The estimates (one per column)
+    z
+        The linearized values, one row per sampled trace
+    sampled_traces
+        The number of sampled traces
+    total_traces
+        The number of traces of the log
+    confidence_level
+        The confidence level (a key of confidence_level_z_values)
+
+    Returns
+    -----------
+    lower, upper
+        The lower and upper bound of the confidence interval of every estimate
+    """
+    finite_population_correction = 1 - sampled_traces / total_traces
+    if sampled_traces > 1:
+        with np.errstate(invalid='ignore'):
+            standard_error = np.sqrt(finite_population_correction * np.var(z, axis=0, ddof=1) / sampled_traces)
+    else:
+        standard_error = np.full(len(estimate), np.inf)
+    half_width = confidence_level_z_values[confidence_level] * np.where(finite_population_correction > 0,
+                                                                         standard_error, 0)
+    return estimate - half_width, estimate + half_width
+#The sums per trace and activity every measure with confidence intervals is computed from
+measure_sum_columns = {
+    'relative_fails': ['fails', 'events'],
+    'automation_rate': ['bot', 'events'],
+    'exception_time_impact': ['tue_fail', 'fail_n', 'tue_success', 'success_n'],
+    'exception_time_variance': ['tue_fail', 'tue_fail_2', 'fail_n', 'tue_success', 'tue_success_2', 'success_n'],
+    'relative_execution_time': ['exe', 'exe_n', 'exe_appr', 'exe_appr_n'],
+    'execution_time_variance': ['exe', 'exe_2', 'exe_n', 'exe_appr', 'exe_appr_2', 'exe_appr_n'],
+    'bot_human_handover_count': ['followed_bot_n', 'followed_human_n'],
+    'bot_human_handover_impact': ['tue_followed_bot', 'followed_bot_n', 'tue_followed_human', 'followed_human_n'],
+    'bot_human_handover_variance': ['tue_followed_bot', 'tue_followed_bot_2', 'followed_bot_n', 'tue_followed_human',
+                                    'tue_followed_human_2', 'followed_human_n']
+}
+def get_trace_activity_sums(df_log, sum_columns, attr_traceID, attr_activity, attr_success, attr_bot):
+    """
+    Sums up the values the measures are computed from per sampled trace and activity.
+    Only the given sums are arranged as (traces x activities) arrays
+
+    Returns
+    -----------
+    sums, activities, trace_execution_time_sums
+        A dictionary with a numpy array (one row per trace, one column per activity) for every summed value,
+        the activities (in the order of the log) and the event-weighted trace execution time and the number of
+        events per trace
+    """
+    df = pd.DataFrame({'trace': get_sampling_trace_keys(df_log, attr_traceID),
+                       'activity': df_log[attr_activity].astype(str).to_numpy()})
+    df['events'] = 1
+    df['fails'] = (df_log[attr_success] == False).to_numpy().astype(int)
+    df['successes'] = (df_log[attr_success] == True).to_numpy().astype(int)
+    df['bot'] = (df_log[attr_bot] == True).to_numpy().astype(int)
+    for column, name in [('act_exe_time', 'exe'), ('act_exe_time_appr', 'exe_appr')]:
+        if column in df_log.columns:
+            seconds = df_log[column].dt.total_seconds().to_numpy()
+        else:
+            seconds = np.full(len(df_log), np.nan)
+        df[name + '_n'] = (~np.isnan(seconds)).astype(int)
+        df[name] = np.nan_to_num(seconds)
+        df[name + '_2'] = np.nan_to_num(seconds)**2
+    if 'time_until_end' in df_log.columns:
+        time_until_end = np.nan_to_num(df_log['time_until_end'].dt.total_seconds().to_numpy())
+    else:
+        time_until_end = np.zeros(len(df_log))
+    groups = [('fail', df['fails'].to_numpy()), ('success', df['successes'].to_numpy())]
+    if 'followed_by' in df_log.columns:
+        groups = groups + [('followed_bot', (df_log['followed_by'] == 'bot').to_numpy().astype(int)),
+                           ('followed_human', (df_log['followed_by'] == 'human').to_numpy().astype(int))]
+    for name, mask in groups:
+        df[name + '_n'] = mask
+        df['tue_' + name] = time_until_end * mask
+        df['tue_' + name + '_2'] = time_until_end**2 * mask
+    activities = list(pd.unique(df['activity']))
+    traces = pd.unique(df['trace'])
+    df_sums = df.groupby(['trace', 'activity'], sort=False).sum()
+    sums = {}
+    for column in [column for column in sum_columns if column in df_sums.columns]:
+        sums[column] = df_sums[column].unstack(fill_value=0).reindex(index=traces, columns=activities,
+                                                                     fill_value=0).to_numpy(dtype=float)
+    if 'trace_execution_time' in df_log.columns:
+        trace_execution_time = df_log['trace_execution_time'].dt.total_seconds().to_numpy()
+    else:
+        trace_execution_time = np.full(len(df_log), np.nan)
+    df_trace = pd.DataFrame({'trace': df['trace'], 'weighted': np.nan_to_num(trace_execution_time),
+                             'events': (~np.isnan(trace_execution_time)).astype(int)})
+    trace_execution_time_sums = df_trace.groupby('trace', sort=False).sum().reindex(traces).to_numpy(dtype=float)
+    return sums, activities, trace_execution_time_sums
+def get_measure_estimates(measure_name, sums, trace_execution_time_sums, total_traces):
+    """
+    Gets the statistics (estimates and linearized values per trace) a measure is based on
+
+    Returns
+    -----------
+    estimates
+        A list of (statistic, unit, estimate, z) for the measure, the unit is 'relative', 'seconds' or 'count'.
+        The list is empty for measures without confidence intervals
+    """
+    estimates = []
+    if any(column not in sums for column in measure_sum_columns.get(measure_name, [])):
+        #the derived columns of the measure are missing
+        return estimates
+    if measure_name == 'relative_fails':
+        ratio, z = get_ratio_linearization(sums['fails'], sums['events'])
+        estimates.append(('relative fails', 'relative', ratio, z))
+    elif measure_name == 'automation_rate':
+        ratio, z = get_ratio_linearization(sums['bot'], sums['events'])
+        estimates.append(('automation rate', 'relative', ratio, z))
+    elif measure_name in ['exception_time_impact', 'bot_human_handover_impact']:
+        first, second = ('fail', 'success') if measure_name == 'exception_time_impact' else ('followed_bot', 'followed_human')
+        ratio_first, z_first = get_ratio_linearization(sums['tue_' + first], sums[first + '_n'])
+        ratio_second, z_second = get_ratio_linearization(sums['tue_' + second], sums[second + '_n'])
+        estimates.append((measure_name.replace('_', ' '), 'seconds', ratio_first - ratio_second, z_first - z_second))
+    elif measure_name in ['exception_time_variance', 'bot_human_handover_variance']:
+        if measure_name == 'exception_time_variance':
+            names = [('fail', 'std time until end (fail)'), ('success', 'std time until end (no fail)')]
+        else:
+            names = [('followed_human', 'std time until end (followed by human)'),
+                     ('followed_bot', 'std time until end (followed by bot)')]
+        for name, statistic in names:
+            std, z = get_std_linearization(sums['tue_' + name], sums['tue_' + name + '_2'], sums[name + '_n'])
+            estimates.append((statistic, 'seconds', std, z))
+    elif measure_name in ['relative_execution_time', 'execution_time_variance']:
+        #exact execution times are used for activities with at least one, otherwise the approximated execution times
+        exact = sums['exe_n'].sum(axis=0) > 0
+        exe = np.where(exact, sums['exe'], sums['exe_appr'])
+        exe_n = np.where(exact, sums['exe_n'], sums['exe_appr_n'])
+        if measure_name == 'execution_time_variance':
+            exe_square = np.where(exact, sums['exe_2'], sums['exe_appr_2'])
+            std, z = get_std_linearization(exe, exe_square, exe_n)
+            estimates.append(('std execution time', 'seconds', std, z))
+        else:
+            mean_activity, z_activity = get_ratio_linearization(exe, exe_n)
+            mean_process, z_process = get_ratio_linearization(trace_execution_time_sums[:, [0]],
+                                                              trace_execution_time_sums[:, [1]])
+            with np.errstate(divide='ignore', invalid='ignore'):
+                ratio = mean_activity / mean_process
+                z = z_activity / mean_process - mean_activity / mean_process**2 * z_process
+            estimates.append(('relative execution time', 'relative', ratio, z))
+    elif measure_name == 'bot_human_handover_count':
+        for name, statistic in [('followed_bot', 'followed by bot'), ('followed_human', 'followed by human')]:
+            values = sums[name + '_n']
+            #the number of handovers in the whole log is estimated from the mean number per trace
+            estimates.append((statistic, 'count', total_traces * values.mean(axis=0),
+                              total_traces * (values - values.mean(axis=0))))
+    return estimates
+def measure_value_table(df_sample, measure_name, sampled_traces, total_traces, attr_activity, attr_success, attr_bot,
+                        attr_traceID, confidence_level=0.95):
+    """
+    Computes the values of a measure for every activity on a sample of traces together with their confidence intervals.
+    Supported are the measures on the activities whose values are (differences or ratios of) means, proportions,
+    standard deviations or counts: 'relative_fails', 'exception_time_impact', 'exception_time_variance',
+    'relative_execution_time', 'execution_time_variance', 'bot_human_handover_count', 'bot_human_handover_impact',
+    'bot_human_handover_variance' and 'automation_rate'.
+    The intervals of standard deviations need larger samples than those of means, especially for heavy-tailed durations
+
+    Parameters
+    -----------
+    df_sample
+        The log dataframe of the sampled traces (see sample_traces), including the derived columns of the measure
+    measure_name
+        The name of the measure (e.g. 'relative_fails')
+    sampled_traces
+        The number of sampled traces
+    total_traces
+        The number of traces of the whole log
+    attr_activity
+        The name/key of the attribute in the log which contains the name of an activity. Example value: 'concept:name'
+    attr_success
+        The name/key of the attribute in the log which contains the information
+        whether the event was successfull or not (true / false). Example value: 'success'
+    attr_bot
+        The name/key of the attribute in the log which contains the information
+        whether the event was executed by a bot or not (true / false). Example value: 'bot'
+    attr_traceID
+        The name/key of the attribute in the log which contains the traceID. Example value: 'docid_uuid'
+    confidence_level
+        The confidence level of the intervals (0.8, 0.9, 0.95 or 0.99)
+
+    Returns
+    -----------
+    df_value_table
+        A dataframe with the activity, the statistic, its unit, the estimate, the lower and upper bound of the
+        confidence interval and the numbers of sampled and total traces. Empty for measures without confidence intervals
+    """
+    columns = ['activity', 'statistic', 'unit', 'estimate', 'ci lower', 'ci upper', 'sampled traces', 'total traces']
+    sums, activities, trace_execution_time_sums = get_trace_activity_sums(df_sample,
+                                                                          measure_sum_columns.get(measure_name, []),
+                                                                          attr_traceID, attr_activity, attr_success,
+                                                                          attr_bot)
+    rows = []
+    for statistic, unit, estimate, z in get_measure_estimates(measure_name, sums, trace_execution_time_sums,
+                                                              total_traces):
+        lower, upper = get_confidence_interval(estimate, z, sampled_traces, total_traces, confidence_level)
+        for position, activity in enumerate(activities):
+            if np.isnan(estimate[position]):
+                continue
+            rows.append([activity, statistic, unit, estimate[position], lower[position], upper[position],
+                         sampled_traces, total_traces])
+    return pd.DataFrame(rows, columns=columns)
+def format_confidence_interval(lower, upper, unit, round_decimals=2):
+    """
+    Formats a confidence interval for the label of an activity
+    """
+    if unit == 'relative':
+        return str(round(lower*100, round_decimals)) + " % - " + str(round(upper*100, round_decimals)) + " %"
+    elif unit == 'seconds':
+        return timeFormatter_seconds_input(lower) + " - " + timeFormatter_seconds_input(upper)
+    return str(int(round(lower))) + " - " + str(int(round(upper)))
+@profiled_stage('preview_measure', name_argument='measure_name', rows_argument='df_log')
+def preview_measure(df_log, log_name, measure_name, attr_activity, attr_success, attr_bot, attr_traceID,
+                    sample_size=1000, seed=0, confidence_level=0.95, save_result=False, round_decimals=2,
+                    show_edge_labels=True, max_no_of_edges=200, attr_eventid='eventId', attr_botcaseid='botCaseId'):
+    """
+    Applies a measure on a sample of whole traces for a fast preview. The values of the measures on the activities
+    are shown with their confidence interval (see measure_value_table). Measures on paths, edges and sub-workflows are
+    computed on the sample without confidence intervals
+
+    Parameters
+    -----------
+    df_log
+        The log dataframe
+    log_name
+        The name of the log, used for the file names of the saved results (e.g. 'company')
+    measure_name
+        The name of the measure which should be applied (e.g. 'relative_fails')
+    attr_activity
+        The name/key of the attribute in the log which contains the name of an activity. Example value: 'concept:name'
+    attr_success
+        The name/key of the attribute in the log which contains the information
+        whether the event was successfull or not (true / false). Example value: 'success'
+    attr_bot
+        The name/key of the attribute in the log which contains the information
+        whether the event was executed by a bot or not (true / false). Example value: 'bot'
+    attr_traceID
+        The name/key of the attribute in the log which contains the traceID. Example value: 'docid_uuid'
+    sample_size
+        The number of traces in the sample. If it is at least the number of traces of the log, the exact result is computed
+    seed
+        The seed of the sampling. Samples of the same seed are nested, so a larger sample refines a smaller one
+    confidence_level
+        The confidence level of the intervals (0.8, 0.9, 0.95 or 0.99)
+    save_result
+        A boolean indicating whether the resulting visualization or dataframe and the value table should be saved or not
+    round_decimals
+        The number of decimals relative values are rounded to before visualization
+    show_edge_labels
+        A boolean indicating whether the labels of the edges of the graph should be displayed or not
+    max_no_of_edges
+        The maximum number of edges shown in the visualization
+    attr_eventid
+        The name/key of the attribute in the log which contains the unique id of an event. Example value: 'eventid'
+    attr_botcaseid
+        The name/key of the attribute in the log which contains the id of the bot job. Example value: 'botCaseId'
+
+    Returns
+    -----------
+    result, df_value_table
+        The gviz or result_df of the measure on the sample and the values of the measure with their confidence intervals
+    """
+    df_sample, sampled_traces, total_traces = sample_traces(df_log, attr_traceID, sample_size, seed)
+    print("preview of", measure_name, "on", sampled_traces, "of", total_traces, "traces")
+    is_graphical_measure, measure_result = compute_measure(df_sample, measure_name, attr_activity, attr_success,
+                                                           attr_bot, attr_traceID, round_decimals=round_decimals,
+                                                           show_progress=False, attr_eventid=attr_eventid,
+                                                           attr_botcaseid=attr_botcaseid)
+    if measure_result is None:
+        return None, None
+    df_value_table = measure_value_table(df_sample, measure_name, sampled_traces, total_traces, attr_activity,
+                                         attr_success, attr_bot, attr_traceID, confidence_level)
+
+    if is_graphical_measure:
+        activity_labeling, activity_coloring, edges_labeling, edges_values = measure_result
+        activity_labeling = dict(activity_labeling)
+        for activity, unit, lower, upper in zip(df_value_table['activity'], df_value_table['unit'],
+                                                df_value_table['ci lower'], df_value_table['ci upper']):
+            if activity in activity_labeling and sampled_traces < total_traces:
+                activity_labeling[activity] = (activity_labeling[activity] + "\n" + str(int(confidence_level*100)) +
+                                               "% CI: " + format_confidence_interval(lower, upper, unit, round_decimals))
+        measure_result = (activity_labeling, activity_coloring, edges_labeling, edges_values)
+    dfg_sample = discover_dfg_from_df(df_sample, attr_activity, attr_traceID)[0]
+    preview_name = log_name + '_preview_' + str(sampled_traces)
+    result = render_measure_result(is_graphical_measure, measure_result, df_sample, preview_name, dfg_sample,
+                                   measure_name, attr_activity, save_result=save_result,
+                                   show_edge_labels=show_edge_labels, max_no_of_edges=max_no_of_edges)
+    if save_result and len(df_value_table) > 0:
+        save_name = 'df_' + preview_name + '_' + measure_name + '_value_table.csv'
+        df_value_table.to_csv("results/measure_outputs/csvs/" + save_name, index=False, sep=';')
+    return result, df_value_table
+def iterate_measure_previews(df_log, measure_name, attr_activity, attr_success, attr_bot, attr_traceID,
+                             initial_sample_size=100, growth_factor=4, seed=0, confidence_level=0.95,
+                             attr_eventid='eventId'):
+    """
+    Refines the values of a measure progressively: starting with a small sample of traces, the sample is enlarged by
+    the growth factor until it contains all traces of the log, i.e. the last values are exact.
+    Since the samples are nested, the total effort is only a constant factor above computing the exact values once
+
+    Parameters
+    -----------
+    df_log
+        The log dataframe
+    measure_name
+        The name of the measure (see measure_value_table for the supported measures)
+    attr_activity, attr_success, attr_bot, attr_traceID
+        The names/keys of the attributes in the log (see preview_measure)
+    initial_sample_size
+        The number of traces of the first sample
+    growth_factor
+        The factor by which the sample is enlarged in every step
+    seed
+        The seed of the sampling
+    confidence_level
+        The confidence level of the intervals (0.8, 0.9, 0.95 or 0.99)
+    attr_eventid
+        The name/key of the attribute in the log which contains the unique id of an event. Example value: 'eventid'
+
+    Returns
+    -----------
+    generator of df_value_table
+        The values of the measure with their confidence intervals for every sample size
+    """
+    sample_size = initial_sample_size
+    while True:
+        df_sample, sampled_traces, total_traces = sample_traces(df_log, attr_traceID, sample_size, seed)
+        add_derived_columns(df_sample, measure_derived_columns.get(measure_name, []), attr_traceID, attr_activity,
+                            attr_eventid, attr_bot)
+        yield measure_value_table(df_sample, measure_name, sampled_traces, total_traces, attr_activity, attr_success,
+                                  attr_bot, attr_traceID, confidence_level)
+        if sampled_traces >= total_traces:
+            return
+        sample_size = sample_size * growth_factor
+
+#Functions for applying the measures
+@profiled_stage('compute_measure', category='measure', name_argument='measure_name', rows_argument='df_log')
+def compute_measure(df_log, measure_name, attr_activity, attr_success, attr_bot, attr_traceID, round_decimals=2,
+                    show_progress=True, attr_eventid='eventId', attr_botcaseid='botCaseId', significance_level=None,
+                    attr_resource='org:resource'):
+    """
+    Computes a measure identified by its name without visualizing or saving the result.
+    The derived columns the measure reads (see measure_derived_columns) are added to the log dataframe first,
+    if they are not in the dataframe yet
+
+    Parameters
+    -----------
+    df_log
+        The log dataframe
+    measure_name
+        The name of the measure which should be computed (e.g. 'relative_fails')
+    attr_activity
+        The name/key of the attribute in the log which contains the name of an activity. Example value: 'concept:name'
+    attr_success
+        The name/key of the attribute in the log which contains the information
+        whether the event was successfull or not (true / false). Example value: 'success'
+    attr_bot
+        The name/key of the attribute in the log which contains the information
+        whether the event was executed by a bot or not (true / false). Example value: 'bot'
+    attr_traceID
+        The name/key of the attribute in the log which contains the traceID,
+        i.e. the identifier that matches every event to a specific trace. Example value: 'docid_uuid'
+    round_decimals
+        The number of decimals the relative fails value should be rounded to before visualization
+    show_progress
+        Whether a progress update every 100 paths should be printed out or not
+    attr_eventid
+        The name/key of the attribute in the log which contains the unique id of an event. Example value: 'eventid'
+    attr_botcaseid
+        The name/key of the attribute in the log which contains the id of the bot job. Example value: 'botCaseId'
+    significance_level
+        If given (e.g. 0.05), the exception time impact and bot human handover impact only color statistically
+        significant differences and show their bootstrap confidence intervals and p-values
+    attr_resource
+        The name/key of the attribute in the log which contains the robot of bot events. Example value: 'org:resource'
+
+    Returns
+    -----------
+    is_graphical_measure, measure_result
+        A boolean indicating whether the measure has a dfg visualization as output and the result of the measure,
+        i.e. the labels and coloring for every activity and the labels and values for every edge (None if the edges
+        are labeled with their frequency) for measures with a dfg visualization
+        or the result_df for measures with a dataframe. The measure_result is None for unknown measures
+    """
+    #compute the derived columns the measure reads, if they are not in the log dataframe yet
+    add_derived_columns(df_log, measure_derived_columns.get(measure_name, []), attr_traceID, attr_activity, attr_eventid,
+                        attr_bot)
+
+    # Measures with a dfg visualization as output
+    is_graphical_measure = False
+    if measure_name == 'relative_fails':
+        is_graphical_measure = True
+        activity_labeling, activity_coloring, measure = measure_relative_fails(df_log, round_decimals, attr_activity,
+                                                                           attr_success, attr_bot)
+    elif measure_name == 'exception_time_impact':
+        is_graphical_measure = True
+        activity_labeling, activity_coloring, measure = measure_exception_time_impact(df_log, attr_activity,
+                                                                           attr_success, attr_bot,
+                                                                           significance_level=significance_level)
+    elif measure_name == 'exception_time_variance':
+        is_graphical_measure = True
         activity_labeling, activity_coloring, measure = measure_exception_time_variance(df_log, attr_activity,
                                                                            attr_success, attr_bot)
     elif measure_name == 'relative_execution_time':
@@ -1492,11 +3936,30 @@ def apply_measure(df_log, log_name, dfg, log, measure_name, attr_activity, attr_
     
     elif measure_name == 'bot_human_handover_impact':
         is_graphical_measure = True
-        activity_labeling, activity_coloring, measure = measure_bot_human_handover_impact(df_log, attr_activity, attr_bot)
+        activity_labeling, activity_coloring, measure = measure_bot_human_handover_impact(df_log, attr_activity, attr_bot,
+                                                                           significance_level=significance_level)
         
     elif measure_name == 'bot_human_handover_variance':
         is_graphical_measure = True
         activity_labeling, activity_coloring, measure = measure_bot_human_handover_variance(df_log, attr_activity, attr_bot)
+
+    elif measure_name in ['edge_waiting_time_' + statistic for statistic in edge_waiting_time_statistics]:
+        is_graphical_measure = True
+        activity_labeling, activity_coloring, edges_labeling, edges_values, measure = measure_edge_waiting_time(df_log,
+                                                                           measure_name[len('edge_waiting_time_'):],
+                                                                           attr_traceID, attr_activity, attr_bot)
+
+    elif measure_name in ['execution_time_p' + str(quantile) for quantile in duration_quantiles]:
+        is_graphical_measure = True
+        activity_labeling, activity_coloring, measure = measure_execution_time_quantile(df_log,
+                                                                           int(measure_name[len('execution_time_p'):]),
+                                                                           attr_activity, attr_bot)
+
+    elif measure_name in ['time_until_end_p' + str(quantile) for quantile in duration_quantiles]:
+        is_graphical_measure = True
+        activity_labeling, activity_coloring, measure = measure_time_until_end_quantile(df_log,
+                                                                           int(measure_name[len('time_until_end_p'):]),
+                                                                           attr_activity, attr_bot)
     
     # Measures with a dataframe as output
     elif measure_name == 'relative_case_fails':
@@ -1522,33 +3985,609 @@ def apply_measure(df_log, log_name, dfg, log, measure_name, attr_activity, attr_
                                                                                             show_progress=show_progress)
         result_df = df_case_activities_execution_time_variance
         #display(df_case_activities_execution_time_variance)
+
+    elif measure_name == 'edge_waiting_times':
+        df_edge_waiting_times, measure = measure_edge_waiting_times(df_log, attr_traceID, attr_activity, attr_bot)
+        result_df = df_edge_waiting_times
+
+    elif measure_name == 'sub_workflow_timings':
+        df_sub_workflow_timings, measure = measure_sub_workflow_timings(df_log, round_decimals, attr_botcaseid,
+                                                                        attr_activity)
+        result_df = df_sub_workflow_timings
+
+    elif measure_name == 'robot_concurrency':
+        result_df, measure = measure_robot_concurrency(df_log, attr_botcaseid, attr_bot, attr_resource)
+
+    elif measure_name == 'robot_idle_gaps':
+        result_df, measure = measure_robot_idle_gaps(df_log, attr_botcaseid, attr_bot, attr_resource)
+
+    elif measure_name == 'robot_utilization':
+        result_df, measure = measure_robot_utilization(df_log, round_decimals, attr_botcaseid, attr_bot, attr_resource)
+
+    elif measure_name == 'robot_queueing':
+        result_df, measure = measure_robot_queueing(df_log, attr_traceID, attr_activity, attr_bot, attr_botcaseid,
+                                                    attr_resource)
         
     else:
         print("unknown measure")
-        
+        return False, None
+
+    if is_graphical_measure:
+        if not measure_name.startswith('edge_waiting_time_'):
+            #the edges of measures on the activities are labeled with their frequency
+            edges_labeling = None
+            edges_values = None
+        return True, (activity_labeling, activity_coloring, edges_labeling, edges_values)
+    else:
+        return False, result_df
+@profiled_stage('render_measure_result', name_argument='measure_name')
+def render_measure_result(is_graphical_measure, measure_result, df_log, log_name, dfg, measure_name, attr_activity,
+                          save_result=False, show_edge_labels=True, max_no_of_edges=200, layout_cache_dir=None,
+                          min_activity_frequency=0):
+    """
+    Visualizes the result of a measure computed with compute_measure and saves the visualization (.png) or
+    the dataframe (.csv) if desired
+
+    Parameters
+    -----------
+    is_graphical_measure
+        A boolean indicating whether the measure has a dfg visualization as output
+    measure_result
+        The labels and coloring for every activity and the labels and values for every edge
+        for measures with a dfg visualization or the result_df for measures with a dataframe
+    df_log
+        The log dataframe
+    log_name
+        The name of the log, used for the file names of the saved results (e.g. 'company')
+    dfg
+        The directly follows graph
+    measure_name
+        The name of the measure (e.g. 'relative_fails')
+    attr_activity
+        The name/key of the attribute in the log which contains the name of an activity. Example value: 'concept:name'
+    save_result
+        A boolean indicating whether the resulting visualization or dataframe should be saved or not
+    show_edge_labels
+        A boolean indicating whether the labels of the edges of the graph should be displayed or not
+    max_no_of_edges
+        The maximum number of edges shown in the visualization. More edges show a more detailed picture of the process
+    layout_cache_dir
+        If given, the layout of the dfg is computed once per log and edge filter, cached in this folder and reused
+        for the visualizations of all graphical measures. If None, every visualization is laid out separately
+    min_activity_frequency
+        Activities that occur less often in the log are collapsed into one aggregate node in the visualization
+
+    Returns
+    -----------
+    gviz or result_df
+        The gviz for measures with a dfg visualization or the result_df for measures with a dataframe
+    """
     if is_graphical_measure:
+        activity_labeling, activity_coloring, edges_labeling, edges_values = measure_result
+        activities_count = df_log[attr_activity].value_counts().to_dict()
         gviz = custom_variant_measure_apply(dfg, activities_color=activity_coloring, activities_labels=activity_labeling,
-                                        show_edge_labels=show_edge_labels, log=log, max_no_of_edges=max_no_of_edges)
+                                        show_edge_labels=show_edge_labels, activities_count=activities_count,
+                                        max_no_of_edges=max_no_of_edges, edges_labels=edges_labeling,
+                                        edges_values=edges_values, layout_cache_dir=layout_cache_dir,
+                                        layout_name=log_name, min_activity_frequency=min_activity_frequency)
         #dfg_visualization.view(gviz)
         if save_result:
-            save_name = 'dfg_' + selected_log +'_' + measure_name + '.png'
-            dfg_visualization.save(gviz, "results/measure_outputs/graphs/" + save_name)
+            save_name = 'dfg_' + log_name +'_' + measure_name + '.png'
+            save_gviz(gviz, "results/measure_outputs/graphs/" + save_name)
         return gviz
     else:
+        result_df = measure_result
         if save_result:
-            save_name = 'df_' + selected_log +'_' + measure_name + '.csv'
+            save_name = 'df_' + log_name +'_' + measure_name + '.csv'
             result_df.to_csv("results/measure_outputs/csvs/" + save_name, index=False, sep=';')
         return result_df
+@profiled_stage('apply_measure', name_argument='measure_name', rows_argument='df_log')
+def apply_measure(df_log, log_name, dfg, measure_name, attr_activity, attr_success, attr_bot, attr_traceID,
+                  save_result=False, round_decimals=2, show_edge_labels=True, show_progress=True, max_no_of_edges=200,
+                  attr_eventid='eventId', layout_cache_dir=None, min_activity_frequency=0, attr_botcaseid='botCaseId',
+                  significance_level=None, group_by=None, group_output='table'):
+    """
+    Applies a measure identified by its name and returns either a visualization or a dataframe, depending on the measure
+
+    Parameters
+    -----------
+    df_log
+        The log dataframe
+    log_name
+        The name of the log, used for the file names of the saved results (e.g. 'company')
+    dfg
+        The directly follows graph
+    measure_name
+        The name of the measure which should be applied (e.g. 'relative_fails')
+    attr_activity
+        The name/key of the attribute in the log which contains the name of an activity. Example value: 'concept:name'
+    attr_success
+        The name/key of the attribute in the log which contains the information
+        whether the event was successfull or not (true / false). Example value: 'success'
+    attr_bot
+        The name/key of the attribute in the log which contains the information
+        whether the event was executed by a bot or not (true / false). Example value: 'bot'
+    attr_traceID
+        The name/key of the attribute in the log which contains the traceID,
+        i.e. the identifier that matches every event to a specific trace. Example value: 'docid_uuid'
+    save_result
+        A boolean indicating for graphical measures whether the resulting visualization should be saved as .png or not
+    round_decimals
+        The number of decimals the relative fails value should be rounded to before visualization
+    show_edge_labels
+        A boolean indicating whether the labels of the edges of the graph should be displayed or not
+    show_progress
+        Whether a progress update every 100 paths should be printed out or not
+    max_no_of_edges
+        The maximum number of edges shown in the visualization. More edges show a more detailed picture of the process
+    attr_eventid
+        The name/key of the attribute in the log which contains the unique id of an event. Example value: 'eventid'
+    layout_cache_dir
+        If given, the layout of the dfg is computed once per log and edge filter, cached in this folder and reused
+        for the visualizations of all graphical measures. If None, every visualization is laid out separately
+    min_activity_frequency
+        Activities that occur less often in the log are collapsed into one aggregate node in the visualization
+    attr_botcaseid
+        The name/key of the attribute in the log which contains the id of the bot job. Example value: 'botCaseId'
+    significance_level
+        If given (e.g. 0.05), the exception time impact and bot human handover impact only color statistically
+        significant differences and show their bootstrap confidence intervals and p-values
+    group_by
+        If given, the measure is applied per group of traces and the groups are compared (see apply_grouped_measure):
+        'day' or 'week' of the start of the trace, 'resource', 'bot_process', 'bot_version' or any attribute of the log
+    group_output
+        'table' for a comparison table of the groups or 'dfgs' for one directly follows graph per group
+    
+    Returns
+    -----------
+    gviz or result_df
+        The gviz for measures with a dfg visualization or the result_df for measures with a dataframe
+        (for group_by see apply_grouped_measure)
+    """
+    if group_by is not None:
+        return apply_grouped_measure(df_log, log_name, measure_name, group_by, attr_activity, attr_success, attr_bot,
+                                     attr_traceID, group_output=group_output, save_result=save_result,
+                                     round_decimals=round_decimals, show_edge_labels=show_edge_labels,
+                                     show_progress=show_progress, max_no_of_edges=max_no_of_edges,
+                                     attr_eventid=attr_eventid, attr_botcaseid=attr_botcaseid,
+                                     significance_level=significance_level)
+    is_graphical_measure, measure_result = compute_measure(df_log, measure_name, attr_activity, attr_success, attr_bot,
+                                                           attr_traceID, round_decimals=round_decimals,
+                                                           show_progress=show_progress, attr_eventid=attr_eventid,
+                                                           attr_botcaseid=attr_botcaseid,
+                                                           significance_level=significance_level)
+    if measure_result is None:
+        return None
+    return render_measure_result(is_graphical_measure, measure_result, df_log, log_name, dfg, measure_name,
+                                 attr_activity, save_result=save_result, show_edge_labels=show_edge_labels,
+                                 max_no_of_edges=max_no_of_edges, layout_cache_dir=layout_cache_dir,
+                                 min_activity_frequency=min_activity_frequency)
+
+#Functions for applying a measure per group of traces (e.g. per robot, bot version or week)
+#Every trace belongs to exactly one group, so the traces are kept whole: for the time buckets the group is the day or
+#week of the start of the trace, for an attribute it is the first value of the attribute in the trace (e.g. the
+#version of the bot process that worked on the trace). For the resource the first value of the bot job events is used,
+#so a trace belongs to the robot that picked it up and not to the human who started it.
+#Traces without a value belong to the group 'none'
+#Short names of the attributes that are often used for grouping, any other attribute of the log can be used as well
+group_by_attributes = {'resource': 'org:resource', 'bot_process': 'botProcessName',
+                       'bot_version': 'botProcessVersionNumber'}
+#The measures that can be compared in one grouped aggregation
+grouped_comparison_measures = ['relative_fails', 'exception_time_impact', 'exception_time_variance',
+                               'relative_execution_time', 'execution_time_variance', 'bot_human_handover_count',
+                               'bot_human_handover_impact', 'bot_human_handover_variance', 'automation_rate']
+def get_trace_groups_by(df_log, group_by, attr_traceID, attr_activity, attr_eventid, attr_bot,
+                        attr_botcaseid='botCaseId'):
+    """
+    Gets the group of the trace of every event
+
+    Parameters
+    -----------
+    df_log
+        The log dataframe
+    group_by
+        'day' or 'week' (of the start of the trace), a key of group_by_attributes or the name of an attribute of the log
+    attr_traceID, attr_activity, attr_eventid, attr_bot, attr_botcaseid
+        The names/keys of the attributes in the log (see compute_measure)
+
+    Returns
+    -----------
+    groups
+        A series with the group (as string) of every event
+    """
+    if group_by in ['day', 'week']:
+        add_derived_columns(df_log, ['trace_start'], attr_traceID, attr_activity, attr_eventid, attr_bot)
+        if group_by == 'day':
+            groups = df_log['trace_start'].dt.strftime('%Y-%m-%d')
+        else:
+            iso_calendar = df_log['trace_start'].dt.isocalendar()
+            groups = (iso_calendar['year'].astype(str) + "-W" +
+                      iso_calendar['week'].astype(str).str.zfill(2)).where(df_log['trace_start'].notna())
+    else:
+        attribute = group_by_attributes.get(group_by, group_by)
+        if attribute not in df_log.columns:
+            print("unknown group_by attribute", attribute)
+            return None
+        values = df_log[attribute].astype(object)
+        has_trace = df_log[attr_traceID].notna()
+        if group_by == 'resource':
+            #only the resources of the events of a bot job (executed by a bot with a bot case id) are robots
+            is_bot_job = df_log[attr_bot] == True
+            if attr_botcaseid in df_log.columns:
+                is_bot_job &= df_log[attr_botcaseid].notna()
+            values = values.where(is_bot_job)
+        #the first value of every trace (missing values are skipped)
+        trace_values = values.loc[has_trace].groupby(df_log.loc[has_trace, attr_traceID], sort=False).transform('first')
+        groups = values.copy()
+        groups.loc[has_trace] = trace_values
+    return groups.where(groups.notna(), 'none').astype(str)
+def get_std_from_sums(value_sum, square_sum, count):
+    """
+    Gets the (sample) standard deviation from the sum of the values, the sum of their squares and their number
+    (NaN for less than two values)
+    """
+    with np.errstate(divide='ignore', invalid='ignore'):
+        variance = (square_sum - value_sum**2 / count) / (count - 1)
+    return np.sqrt(np.clip(variance, 0, None)).where(count > 1)
+def measure_grouped_comparison(df_log, measure_name, groups, attr_activity, attr_success, attr_bot, round_decimals=2):
+    """
+    Measure: Compares the value of a measure on the activities between groups of traces (e.g. bot versions),
+    computed for all groups at once in one grouped aggregation over groups and activities.
+    Every row is an activity, every column a group. Cells are empty if the value is not defined for an activity in a
+    group (e.g. an exception time impact without fails)
+
+    Parameters
+    -----------
+    df_log
+        The log dataframe (including the derived columns of the measure)
+    measure_name
+        The name of the measure (one of grouped_comparison_measures)
+    groups
+        The group of every event (see get_trace_groups_by)
+    attr_activity
+        The name/key of the attribute in the log which contains the name of an activity. Example value: 'concept:name'
+    attr_success
+        The name/key of the attribute in the log which contains the information
+        whether the event was successfull or not (true / false). Example value: 'success'
+    attr_bot
+        The name/key of the attribute in the log which contains the information
+        whether the event was executed by a bot or not (true / false). Example value: 'bot'
+    round_decimals
+        The number of decimals relative values are rounded to
+
+    Returns
+    -----------
+    results_df, measure
+        The comparison table and the name of the measure (e.g. 'relative_fails_by_group')
+    """
+    df = pd.DataFrame({'group': groups.to_numpy(), 'activity': df_log[attr_activity].astype(str).to_numpy()})
+    df['events'] = 1
+    df['fails'] = (df_log[attr_success] == False).to_numpy()
+    df['successes'] = (df_log[attr_success] == True).to_numpy()
+    df['bot'] = (df_log[attr_bot] == True).to_numpy()
+    if 'act_exe_time' in df_log.columns:
+        #exact execution times are used for activities with at least one in the group, otherwise the approximated ones
+        for column, name in [('act_exe_time', 'exe'), ('act_exe_time_appr', 'exe_appr')]:
+            seconds = df_log[column].dt.total_seconds().to_numpy()
+            df[name + '_n'] = ~np.isnan(seconds)
+            df[name] = np.nan_to_num(seconds)
+            df[name + '_2'] = np.nan_to_num(seconds)**2
+    if 'time_until_end' in df_log.columns:
+        time_until_end = df_log['time_until_end'].dt.total_seconds().to_numpy()
+        samples = [('fail', df['fails'].to_numpy()), ('success', df['successes'].to_numpy())]
+        if 'followed_by' in df_log.columns:
+            samples = samples + [('followed_bot', (df_log['followed_by'] == 'bot').to_numpy()),
+                                 ('followed_human', (df_log['followed_by'] == 'human').to_numpy())]
+        for name, mask in samples:
+            df[name + '_n'] = mask
+            df['tue_' + name] = np.where(mask, time_until_end, 0)
+            df['tue_' + name + '_2'] = np.where(mask, time_until_end**2, 0)
+
+    #one grouped aggregation over all groups and activities
+    df_sums = df.groupby(['group', 'activity'], sort=False).sum()
+
+    unit = 'seconds'
+    with np.errstate(divide='ignore', invalid='ignore'):
+        if measure_name == 'relative_fails':
+            values = (df_sums['fails'] / df_sums['events'])
+            unit = 'relative'
+        elif measure_name == 'automation_rate':
+            values = (df_sums['bot'] / df_sums['events'])
+            unit = 'relative'
+        elif measure_name in ['exception_time_impact', 'bot_human_handover_impact']:
+            first, second = ('fail', 'success') if measure_name == 'exception_time_impact' else ('followed_bot', 'followed_human')
+            values = (df_sums['tue_' + first] / df_sums[first + '_n'] - df_sums['tue_' + second] / df_sums[second + '_n'])
+            values = values.where((df_sums[first + '_n'] > 0) & (df_sums[second + '_n'] > 0))
+        elif measure_name in ['exception_time_variance', 'bot_human_handover_variance']:
+            first, second = ('fail', 'success') if measure_name == 'exception_time_variance' else ('followed_bot', 'followed_human')
+            values = (get_std_from_sums(df_sums['tue_' + first], df_sums['tue_' + first + '_2'], df_sums[first + '_n']) -
+                      get_std_from_sums(df_sums['tue_' + second], df_sums['tue_' + second + '_2'], df_sums[second + '_n']))
+        elif measure_name in ['relative_execution_time', 'execution_time_variance']:
+            exact = df_sums['exe_n'] > 0
+            exe = df_sums['exe'].where(exact, df_sums['exe_appr'])
+            exe_2 = df_sums['exe_2'].where(exact, df_sums['exe_appr_2'])
+            exe_n = df_sums['exe_n'].where(exact, df_sums['exe_appr_n'])
+            if measure_name == 'execution_time_variance':
+                values = get_std_from_sums(exe, exe_2, exe_n)
+            else:
+                trace_execution_time = df_log['trace_execution_time'].dt.total_seconds()
+                mean_exe_time_process = trace_execution_time.groupby(groups.to_numpy(), sort=False).mean()
+                values = (exe / exe_n) / mean_exe_time_process.reindex(df_sums.index.get_level_values('group')).to_numpy()
+                unit = 'relative'
+        elif measure_name == 'bot_human_handover_count':
+            values = ("followed by bot: " + df_sums['followed_bot_n'].astype(int).astype(str) + ", followed by human: " +
+                      df_sums['followed_human_n'].astype(int).astype(str))
+            unit = 'text'
+        else:
+            print("measure cannot be compared between groups in one aggregation")
+            return None, measure_name + '_by_group'
+
+    if unit == 'relative':
+        values = values.replace([np.inf, -np.inf], np.nan).round(round_decimals + 2)
+    elif unit == 'seconds':
+        values = values.apply(lambda value: "" if pd.isnull(value) else timeFormatter_seconds_input(value))
+    results_df = values.unstack('group')
+    results_df = results_df.reindex(index=pd.unique(df['activity']), columns=pd.unique(df['group']))
+    results_df.index.name = 'activity'
+    results_df.columns.name = None
+    return results_df.reset_index(), measure_name + '_by_group'
+def get_group_file_name(group):
+    """
+    Converts a group to a part of a file name
+    """
+    return re.sub(r'[^A-Za-z0-9_.-]+', '_', str(group))
+@profiled_stage('apply_grouped_measure', name_argument='measure_name', rows_argument='df_log')
+def apply_grouped_measure(df_log, log_name, measure_name, group_by, attr_activity, attr_success, attr_bot, attr_traceID,
+                          group_output='table', save_result=False, round_decimals=2, show_edge_labels=True,
+                          show_progress=True, max_no_of_edges=200, attr_eventid='eventId', attr_botcaseid='botCaseId',
+                          significance_level=None):
+    """
+    Applies a measure per group of traces (e.g. per bot version, robot, day or week) and compares the groups, either
+    in one comparison table or as one directly follows graph per group (small multiples).
+    Measures with a dataframe as output are computed per group and concatenated with a 'group' column
+
+    Parameters
+    -----------
+    df_log
+        The log dataframe
+    log_name
+        The name of the log, used for the file names of the saved results (e.g. 'company')
+    measure_name
+        The name of the measure which should be applied (e.g. 'relative_fails')
+    group_by
+        'day' or 'week' (of the start of the trace), a key of group_by_attributes (e.g. 'bot_version') or
+        the name of an attribute of the log
+    attr_activity, attr_success, attr_bot, attr_traceID
+        The names/keys of the attributes in the log (see apply_measure)
+    group_output
+        'table' for a comparison table (measures in grouped_comparison_measures) or 'dfgs' for one directly follows
+        graph per group
+    save_result
+        A boolean indicating whether the resulting visualizations or dataframe should be saved or not
+    round_decimals, show_edge_labels, show_progress, max_no_of_edges, attr_eventid, attr_botcaseid, significance_level
+        See apply_measure
+
+    Returns
+    -----------
+    result_df or gvizs
+        The comparison table, or a dictionary with the gviz or result_df of every group for group_output 'dfgs'
+    """
+    add_derived_columns(df_log, measure_derived_columns.get(measure_name, []), attr_traceID, attr_activity, attr_eventid,
+                        attr_bot)
+    groups = get_trace_groups_by(df_log, group_by, attr_traceID, attr_activity, attr_eventid, attr_bot, attr_botcaseid)
+    if groups is None:
+        return None
+    group_log_name = log_name + '_by_' + get_group_file_name(group_by)
+
+    if group_output == 'table' and measure_name in grouped_comparison_measures:
+        result_df, measure = measure_grouped_comparison(df_log, measure_name, groups, attr_activity, attr_success,
+                                                        attr_bot, round_decimals)
+        return render_measure_result(False, result_df, df_log, group_log_name, None, measure_name, attr_activity,
+                                     save_result=save_result)
+
+    #the measure is computed per group (the derived columns of the whole log are reused, since traces are kept whole)
+    outputs = {}
+    results_dfs = []
+    for group in pd.unique(groups):
+        df_group = df_log.loc[(groups == group).to_numpy()]
+        is_graphical_measure, measure_result = compute_measure(df_group, measure_name, attr_activity, attr_success,
+                                                               attr_bot, attr_traceID, round_decimals=round_decimals,
+                                                               show_progress=show_progress, attr_eventid=attr_eventid,
+                                                               attr_botcaseid=attr_botcaseid,
+                                                               significance_level=significance_level)
+        if measure_result is None:
+            return None
+        if is_graphical_measure and group_output == 'dfgs':
+            dfg_group = discover_dfg_from_df(df_group, attr_activity, attr_traceID)[0]
+            outputs[group] = render_measure_result(True, measure_result, df_group,
+                                                   group_log_name + '_' + get_group_file_name(group), dfg_group,
+                                                   measure_name, attr_activity, save_result=save_result,
+                                                   show_edge_labels=show_edge_labels, max_no_of_edges=max_no_of_edges)
+        elif is_graphical_measure:
+            print("measure cannot be compared in a table, use group_output 'dfgs'")
+            return None
+        else:
+            results_dfs.append(measure_result.assign(group=group))
+    if results_dfs:
+        result_df = pd.concat(results_dfs, ignore_index=True)
+        result_df = result_df[['group'] + [column for column in result_df.columns if column != 'group']]
+        return render_measure_result(False, result_df, df_log, group_log_name, None, measure_name, attr_activity,
+                                     save_result=save_result)
+    return outputs
+
+#Functions for applying several measures in parallel
+#The input of the measures is stored in this module-level dictionary before the worker processes are started.
+#Forked worker processes inherit it, so the log dataframe is not pickled and copied for every single measure
+shared_measure_input = {}
+def compute_measure_in_worker(measure_name):
+    """
+    Computes a measure on the log dataframe in shared_measure_input. Used as task of the worker pool
+
+    Parameters
+    -----------
+    measure_name
+        The name of the measure which should be computed (e.g. 'relative_fails')
+
+    Returns
+    -----------
+    measure_name, is_graphical_measure, measure_result, compute_seconds
+        The name of the measure, the result of compute_measure and the time it took to compute the measure
+    """
+    start_time = time.perf_counter()
+    is_graphical_measure, measure_result = compute_measure(shared_measure_input['df_log'], measure_name,
+                                                           shared_measure_input['attr_activity'],
+                                                           shared_measure_input['attr_success'],
+                                                           shared_measure_input['attr_bot'],
+                                                           shared_measure_input['attr_traceID'],
+                                                           round_decimals=shared_measure_input['round_decimals'],
+                                                           show_progress=shared_measure_input['show_progress'],
+                                                           significance_level=shared_measure_input['significance_level'])
+    return measure_name, is_graphical_measure, measure_result, time.perf_counter() - start_time
+def render_measure_result_timed(is_graphical_measure, measure_result, df_log, log_name, dfg, measure_name, attr_activity,
+                                save_result, show_edge_labels, max_no_of_edges, layout_cache_dir=None,
+                                min_activity_frequency=0):
+    """
+    Calls render_measure_result and measures the time it takes. Used as task of the I/O pool
+
+    Returns
+    -----------
+    measure_name, output, render_seconds
+        The name of the measure, the gviz or result_df and the time it took to render and save the result
+    """
+    start_time = time.perf_counter()
+    output = render_measure_result(is_graphical_measure, measure_result, df_log, log_name, dfg, measure_name,
+                                   attr_activity, save_result=save_result, show_edge_labels=show_edge_labels,
+                                   max_no_of_edges=max_no_of_edges, layout_cache_dir=layout_cache_dir,
+                                   min_activity_frequency=min_activity_frequency)
+    return measure_name, output, time.perf_counter() - start_time
+@profiled_stage('apply_measures_parallel', rows_argument='df_log')
+def apply_measures_parallel(df_log, log_name, dfg, measure_names, attr_activity, attr_success, attr_bot, attr_traceID,
+                            save_result=False, round_decimals=2, show_edge_labels=True, show_progress=False,
+                            max_no_of_edges=200, max_workers=None, max_io_workers=4, attr_eventid='eventId',
+                            layout_cache_dir=None, min_activity_frequency=0, significance_level=None):
+    """
+    Applies several measures concurrently. The measures are computed in a pool of worker processes which share the
+    log dataframe (the workers are forked, so the dataframe is not copied per measure). As soon as a measure is
+    computed, its visualization is rendered (graphviz) or its dataframe is written in a separate pool of I/O threads,
+    while the other measures are still computed.
+    If processes cannot be forked on the platform, threads are used for computing the measures as well.
+    The time it took to compute and to render every measure is printed and returned
+
+    Parameters
+    -----------
+    df_log
+        The log dataframe
+    log_name
+        The name of the log, used for the file names of the saved results (e.g. 'company')
+    dfg
+        The directly follows graph
+    measure_names
+        The names of the measures which should be applied (e.g. ['relative_fails', 'automation_rate'])
+    attr_activity
+        The name/key of the attribute in the log which contains the name of an activity. Example value: 'concept:name'
+    attr_success
+        The name/key of the attribute in the log which contains the information
+        whether the event was successfull or not (true / false). Example value: 'success'
+    attr_bot
+        The name/key of the attribute in the log which contains the information
+        whether the event was executed by a bot or not (true / false). Example value: 'bot'
+    attr_traceID
+        The name/key of the attribute in the log which contains the traceID,
+        i.e. the identifier that matches every event to a specific trace. Example value: 'docid_uuid'
+    save_result
+        A boolean indicating whether the resulting visualizations or dataframes should be saved or not
+    round_decimals
+        The number of decimals the relative values should be rounded to before visualization
+    show_edge_labels
+        A boolean indicating whether the labels of the edges of the graph should be displayed or not
+    show_progress
+        Whether progress updates of the single measures should be printed out or not
+    max_no_of_edges
+        The maximum number of edges shown in the visualization
+    max_workers
+        The number of worker processes computing the measures (default: number of CPUs, at most number of measures)
+    max_io_workers
+        The number of threads rendering and saving the results
+    attr_eventid
+        The name/key of the attribute in the log which contains the unique id of an event. Example value: 'eventid'
+    layout_cache_dir
+        If given, the layout of the dfg is computed once, cached in this folder and reused for all graphical measures
+    min_activity_frequency
+        Activities that occur less often in the log are collapsed into one aggregate node in the visualizations
+    significance_level
+        If given (e.g. 0.05), the exception time impact and bot human handover impact only color statistically
+        significant differences
+
+    Returns
+    -----------
+    outputs, timings
+        For every measure the gviz or result_df and for every measure the seconds it took to compute and to render it
+    """
+    #the derived columns are computed once before the workers are started, so that every worker can read them
+    add_derived_columns(df_log, get_measure_derived_columns(measure_names), attr_traceID, attr_activity, attr_eventid,
+                        attr_bot)
+    shared_measure_input.clear()
+    shared_measure_input.update({'df_log': df_log, 'attr_activity': attr_activity, 'attr_success': attr_success,
+                                 'attr_bot': attr_bot, 'attr_traceID': attr_traceID, 'round_decimals': round_decimals,
+                                 'show_progress': show_progress, 'significance_level': significance_level})
+    if max_workers is None:
+        max_workers = min(len(measure_names), os.cpu_count() or 1)
+    max_workers = max(max_workers, 1)
+
+    if 'fork' in multiprocessing.get_all_start_methods():
+        compute_pool = ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context('fork'))
+    else:
+        compute_pool = ThreadPoolExecutor(max_workers=max_workers)
+    io_pool = ThreadPoolExecutor(max_workers=max_io_workers)
+
+    outputs = {}
+    timings = {}
+    wall_start_time = time.perf_counter()
+    try:
+        compute_futures = [compute_pool.submit(compute_measure_in_worker, measure_name) for measure_name in measure_names]
+        render_futures = []
+        for compute_future in as_completed(compute_futures):
+            measure_name, is_graphical_measure, measure_result, compute_seconds = compute_future.result()
+            timings[measure_name] = {'compute_seconds': compute_seconds, 'render_seconds': 0.0}
+            if measure_result is None:
+                continue
+            render_futures.append(io_pool.submit(render_measure_result_timed, is_graphical_measure, measure_result, df_log,
+                                                 log_name, dfg, measure_name, attr_activity, save_result,
+                                                 show_edge_labels, max_no_of_edges, layout_cache_dir,
+                                                 min_activity_frequency))
+        for render_future in as_completed(render_futures):
+            measure_name, output, render_seconds = render_future.result()
+            outputs[measure_name] = output
+            timings[measure_name]['render_seconds'] = render_seconds
+    finally:
+        compute_pool.shutdown()
+        io_pool.shutdown()
+        shared_measure_input.clear()
+    wall_seconds = time.perf_counter() - wall_start_time
+
+    print("Measure timings in seconds (compute | render and save):")
+    for measure_name in measure_names:
+        if measure_name in timings:
+            print("  " + measure_name.ljust(45), "{:8.2f} | {:8.2f}".format(timings[measure_name]['compute_seconds'],
+                                                                          timings[measure_name]['render_seconds']))
+    print("  " + "wall time all measures".ljust(45), "{:8.2f}".format(wall_seconds))
+
+    return outputs, timings
 
 
 #Applying the measures on a selected log
 
 # Measures with a dfg visualization as output
 # 'relative_fails', 'exception_time_impact', 'exception_time_variance', 'relative_execution_time', 'execution_time_variance',
-# 'bot_human_handover_count', 'bot_human_handover_impact', 'bot_human_handover_variance'
+# 'bot_human_handover_count', 'bot_human_handover_impact', 'bot_human_handover_variance',
+# 'edge_waiting_time_mean', 'edge_waiting_time_median', 'edge_waiting_time_p95' (the edges show the waiting times)
+# 'execution_time_p50', 'execution_time_p90', 'execution_time_p99', 'time_until_end_p50', 'time_until_end_p90',
+# 'time_until_end_p99' (the labels show the p50, p90 and p99 of the durations)
 
 # Measures with a dataframe as output
-# 'relative_case_fails', 'automation_rate', 'case_activities_execution_time', 'case_activities_execution_time_variance'
+# 'relative_case_fails', 'automation_rate', 'case_activities_execution_time', 'case_activities_execution_time_variance',
+# 'edge_waiting_times', 'sub_workflow_timings',
+# 'robot_concurrency' (time series), 'robot_idle_gaps', 'robot_utilization' (per robot and hour), 'robot_queueing'
 
 # Value to execute all measures at once: 'all_measures'
 
@@ -1556,64 +4595,213 @@ def apply_measure(df_log, log_name, dfg, log, measure_name, attr_activity, attr_
 selected_measure = 'exception_time_impact'
 #choose log ('company' or 'bpi')
 selected_log = 'company'
+#choose the number of traces of a fast preview of the selected measure on a sample (None computes the exact result)
+selected_preview_sample_size = None
+#choose the significance level of the exception time impact and bot human handover impact (None colors all differences)
+selected_significance_level = None
+#choose a grouping of the traces to compare the groups ('day', 'week', 'resource', 'bot_process', 'bot_version' or None)
+#and whether the groups are compared in a table ('table') or in one graph per group ('dfgs')
+selected_group_by = None
+selected_group_output = 'table'
+#choose an event store to load the merged log from instead of the xes file (e.g. 'results/event_store.sqlite', see
+#event_store.py) and the cases that should be loaded from it, e.g. {'start': '2022-05-09', 'end': '2022-05-16'} for one
+#week or {'bot_process_versions': ['1.4.0-final.4']} for one bot process version (None loads all cases)
+selected_event_store = None
+selected_event_filter = None
+#choose a folder to save a profile of the run to (time, rows and peak RSS of every stage as summary table and
+#Chrome trace) or None for no profiling, and the stages that should be captured with cProfile (e.g. ['merge_logs'])
+selected_profile_dir = None
+selected_cprofile_stages = None
+#choose a memory budget in bytes (e.g. 512 * 1024 * 1024) to apply the measures out of core, i.e. the merged log is
+#spilled to partitions on disk and aggregated one partition at a time (see out_of_core.py), or None to load the whole log
+selected_memory_budget = None
+#choose a folder to cache the layout of the dfg in (e.g. 'results/layouts/'), so that the graphs of all measures are
+#drawn at the same fixed positions (needs the Graphviz binaries dot and neato), or None to lay out every graph with dot
+selected_layout_cache_dir = None
 
-def standard_values_for_logs(log_name):
+#Standard values for the known logs: path to the merged log and names/keys of the respective attributes in the log
+standard_log_configurations = {
+    #Real world log from company
+    'company': {'path': "results/Company_Merged_Log.xes",
+                'attr_activity': 'concept:name',
+                'attr_timestamp': 'time:timestamp',
+                'attr_traceID': 'caseId',
+                'attr_success': 'success',
+                'attr_bot': 'bot',
+                'attr_eventid': 'eventId',
+                'attr_lifecycle': 'lifecycle:transition'},
+    #BPI challenge
+    'bpi': {'path': "results/BPI_Merged_Log.xes",
+            'attr_activity': 'concept:name',
+            'attr_timestamp': 'time:timestamp',
+            'attr_traceID': 'docid',
+            'attr_success': 'success',
+            'attr_bot': 'bot',
+            'attr_eventid': 'eventId',
+            'attr_lifecycle': 'lifecycle:transition'}
+}
+
+@profiled_stage('load_log', name_argument='log_name')
+def standard_values_for_logs(log_name, use_snapshot_cache=True, snapshot_cache_dir="results/snapshots/", derived_columns=None,
+                             event_store_path=None, event_filter=None):
     """
-    Sets standard values for the known logs and returns these
+    Sets standard values for the known logs and returns these.
+    Only the selected log is loaded and preprocessed. If the snapshot cache is used, the preprocessed log dataframe and
+    the directly follows graph are saved as snapshot after the first run. As long as neither the merged log nor
+    the attribute configuration change, later runs load the snapshot instead of preprocessing the log again.
+    Derived columns that are not in the snapshot yet are added and the snapshot is saved again with them
 
     Parameters
     -----------
     log_name
         The name of the selected log, e.g., 'company' or 'bpi'
+    use_snapshot_cache
+        Whether the preprocessed log should be loaded from/saved to the snapshot cache or not
+    snapshot_cache_dir
+        The folder containing the snapshots
+    derived_columns
+        The names of the derived columns (see derived_columns_registry) that should be added to the log dataframe
+        right away. All other derived columns are added by the measures when they are needed.
+        If None, all derived columns are added
+    event_store_path
+        The path to an event store that contains the merged log under the name log_name. If given, the log is loaded
+        from the event store (see load_merged_log_from_event_store) instead of the xes file and no snapshot is used
+    event_filter
+        The conditions of the query of the cases from the event store (see query_events)
 
     Returns
     -----------
-    df_log, dfg, log, attr_activity, attr_success, attr_bot, attr_traceID
-        The defined attributes depending on the selected log
-    """
-
-    #Standard values: Real world log from company
-    path = "results/Company_Merged_Log.xes"
-    #Names/keys of the respective attributes in the log
-    attr_activity = 'concept:name'
-    attr_timestamp = 'time:timestamp'
-    attr_traceID = 'caseId'
-    attr_success = 'success'
-    attr_bot = 'bot'
-    attr_eventid = 'eventId'
-    attr_lifecycle = 'lifecycle:transition'
-    log_company, df_log_company, dfg_company = load_merged_log_and_preprocess(path, attr_lifecycle, attr_timestamp, True)
-    df_log_company = preprocess_add_columns(df_log_company, attr_traceID, attr_timestamp, attr_activity, attr_eventid, attr_bot)
-    df_log, dfg, log = df_log_company, dfg_company, log_company
-
-    if log_name == 'bpi':
-        #BPI challenge
-        path = "results/BPI_Merged_Log.xes"
-        #Names/keys of the respective attributes in the log
-        attr_activity = 'concept:name'
-        attr_timestamp = 'time:timestamp'
-        attr_traceID = 'docid'
-        attr_success = 'success'
-        attr_bot = 'bot'
-        attr_eventid = 'eventId'
-        attr_lifecycle = 'lifecycle:transition'
-        log_bpi, df_log_bpi, dfg_bpi = load_merged_log_and_preprocess(path, attr_lifecycle, attr_timestamp, True)
-        df_log_bpi = preprocess_add_columns(df_log_bpi, attr_traceID, attr_timestamp, attr_activity, attr_eventid, attr_bot)
-        df_log, dfg, log = df_log_bpi, dfg_bpi, log_bpi
-
-    return df_log, dfg, log, attr_activity, attr_success, attr_bot, attr_traceID
-
-def execute_selected_measures(measure, log, save_result):
-    df_log, dfg, log, attr_activity, attr_success, attr_bot, attr_traceID = standard_values_for_logs(log)
+    df_log, dfg, attr_activity, attr_success, attr_bot, attr_traceID
+        The defined attributes depending on the selected log (all None for a log without standard values)
+    """
+    if log_name not in standard_log_configurations:
+        print("unknown log", log_name, "- known logs:", list(standard_log_configurations.keys()))
+        return None, None, None, None, None, None
+    configuration = standard_log_configurations[log_name]
+    path = configuration['path']
+    attr_activity = configuration['attr_activity']
+    attr_timestamp = configuration['attr_timestamp']
+    attr_traceID = configuration['attr_traceID']
+    attr_success = configuration['attr_success']
+    attr_bot = configuration['attr_bot']
+    attr_eventid = configuration['attr_eventid']
+    attr_lifecycle = configuration['attr_lifecycle']
+    if derived_columns is None:
+        derived_columns = list(derived_columns_registry.keys())
+
+    if event_store_path is not None:
+        df_log, dfg = load_merged_log_from_event_store(event_store_path, log_name, attr_lifecycle, attr_timestamp,
+                                                       event_filter, True)
+        if df_log is not None:
+            add_derived_columns(df_log, derived_columns, attr_traceID, attr_activity, attr_eventid, attr_bot)
+        return df_log, dfg, attr_activity, attr_success, attr_bot, attr_traceID
+
+    if use_snapshot_cache:
+        attributes = {key: value for key, value in configuration.items() if key != 'path'}
+        snapshot_key = get_snapshot_key(path, attributes)
+        snapshot_dir = os.path.join(snapshot_cache_dir, log_name + "_" + snapshot_key[:16])
+        if os.path.isdir(snapshot_dir):
+            print("Loading preprocessed log from snapshot", snapshot_dir)
+            df_log, dfg = load_snapshot(snapshot_dir)
+            evict_stale_snapshots(snapshot_cache_dir, log_name, snapshot_dir)
+            no_of_columns = len(df_log.columns)
+            add_derived_columns(df_log, derived_columns, attr_traceID, attr_activity, attr_eventid, attr_bot)
+            if len(df_log.columns) > no_of_columns:
+                save_snapshot(snapshot_dir, df_log, dfg)
+            return df_log, dfg, attr_activity, attr_success, attr_bot, attr_traceID
+
+    df_log, dfg = load_merged_log_and_preprocess(path, attr_lifecycle, attr_timestamp, True)
+    add_derived_columns(df_log, derived_columns, attr_traceID, attr_activity, attr_eventid, attr_bot)
+
+    if use_snapshot_cache:
+        os.makedirs(snapshot_cache_dir, exist_ok=True)
+        save_snapshot(snapshot_dir, df_log, dfg)
+        evict_stale_snapshots(snapshot_cache_dir, log_name, snapshot_dir)
+
+    return df_log, dfg, attr_activity, attr_success, attr_bot, attr_traceID
+
+def execute_selected_measures(measure, log_name, save_result, parallel=True, layout_cache_dir=None,
+                              preview_sample_size=None, significance_level=None, group_by=None, group_output='table',
+                              profile_dir=None, cprofile_stages=None, event_store_path=None, event_filter=None,
+                              memory_budget=None):
+    #only the logs with standard values can be loaded
+    if log_name not in standard_log_configurations:
+        print("unknown log", log_name, "- known logs:", list(standard_log_configurations.keys()))
+        return
+    #the run is profiled, if a folder for the profile is given
+    profiler = None
+    if profile_dir is not None:
+        profiler = start_profiler(create_profiler(cprofile_stages=cprofile_stages, cprofile_dir=profile_dir))
+    #with a memory budget, the log is not loaded into the memory but spilled to partitions on disk (see out_of_core.py)
+    if memory_budget is not None:
+        from out_of_core import apply_measures_out_of_core
+        from sharded_measures import sharded_measure_names
+        configuration = standard_log_configurations[log_name]
+        apply_measures_out_of_core(configuration['path'], log_name,
+                                   sharded_measure_names if measure == 'all_measures' else [measure],
+                                   configuration['attr_activity'], configuration['attr_success'],
+                                   configuration['attr_bot'], configuration['attr_traceID'],
+                                   configuration['attr_lifecycle'], configuration['attr_timestamp'],
+                                   memory_budget=memory_budget, save_result=save_result, max_no_of_edges=150)
+        if profiler is not None:
+            stop_profiler(profiler)
+            print_profile_summary(profiler)
+            save_profile(profiler, profile_dir, log_name + "_" + measure)
+        return
+    #with a layout cache folder, the layout of the dfg is computed once and reused for the visualizations of all measures
+    #the derived columns the selected measures read are added when the log is loaded, so that they are saved with the
+    #snapshot of the log. A preview only adds the derived columns to its sample
+    all_measure_names = ['relative_fails', 'exception_time_impact', 'exception_time_variance', 'relative_execution_time', 'execution_time_variance',
+                         'bot_human_handover_count', 'bot_human_handover_impact', 'bot_human_handover_variance', 'relative_case_fails', 'automation_rate',
+                         'case_activities_execution_time', 'case_activities_execution_time_variance',
+                         'edge_waiting_time_mean', 'edge_waiting_time_median', 'edge_waiting_time_p95', 'edge_waiting_times',
+                         'sub_workflow_timings', 'execution_time_p50', 'execution_time_p90', 'execution_time_p99',
+                         'time_until_end_p50', 'time_until_end_p90', 'time_until_end_p99', 'robot_concurrency',
+                         'robot_idle_gaps', 'robot_utilization', 'robot_queueing']
     if measure == 'all_measures':
-        all_measure_names = ['relative_fails', 'exception_time_impact', 'exception_time_variance', 'relative_execution_time', 'execution_time_variance',
-                             'bot_human_handover_count', 'bot_human_handover_impact', 'bot_human_handover_variance', 'relative_case_fails', 'automation_rate',
-                             'case_activities_execution_time', 'case_activities_execution_time_variance']
-        for measure_name in all_measure_names:
-            apply_measure(df_log, log, dfg, log, measure_name, attr_activity, attr_success, attr_bot, attr_traceID, save_result, round_decimals=2,
-                                        show_edge_labels=True, show_progress=True, max_no_of_edges=150)
+        derived_columns = get_measure_derived_columns(all_measure_names)
+    elif preview_sample_size is not None and group_by is None:
+        derived_columns = []
     else:
-        apply_measure(df_log, log, dfg, log, measure, attr_activity, attr_success, attr_bot, attr_traceID, save_result, round_decimals=2,
-                                    show_edge_labels=True, show_progress=True, max_no_of_edges=150)
-        
-execute_selected_measures(selected_measure, selected_log, True)
\ No newline at end of file
+        derived_columns = get_measure_derived_columns([measure])
+    df_log, dfg, attr_activity, attr_success, attr_bot, attr_traceID = standard_values_for_logs(
+        log_name, derived_columns=derived_columns, event_store_path=event_store_path, event_filter=event_filter)
+    if df_log is None:
+        print("The log", log_name, "could not be loaded. Measure is not applied")
+        if profiler is not None:
+            stop_profiler(profiler)
+        return
+    if group_by is not None and measure != 'all_measures':
+        apply_measure(df_log, log_name, dfg, measure, attr_activity, attr_success, attr_bot, attr_traceID, save_result,
+                      round_decimals=2, show_edge_labels=True, show_progress=True, max_no_of_edges=150,
+                      significance_level=significance_level, group_by=group_by, group_output=group_output)
+    elif preview_sample_size is not None and measure != 'all_measures':
+        preview_measure(df_log, log_name, measure, attr_activity, attr_success, attr_bot, attr_traceID,
+                        sample_size=preview_sample_size, save_result=save_result, round_decimals=2,
+                        show_edge_labels=True, max_no_of_edges=150)
+    elif measure == 'all_measures':
+        if parallel:
+            apply_measures_parallel(df_log, log_name, dfg, all_measure_names, attr_activity, attr_success, attr_bot, attr_traceID,
+                                    save_result, round_decimals=2, show_edge_labels=True, show_progress=False, max_no_of_edges=150,
+                                    layout_cache_dir=layout_cache_dir, significance_level=significance_level)
+        else:
+            for measure_name in all_measure_names:
+                apply_measure(df_log, log_name, dfg, measure_name, attr_activity, attr_success, attr_bot, attr_traceID, save_result, round_decimals=2,
+                                            show_edge_labels=True, show_progress=True, max_no_of_edges=150,
+                                            layout_cache_dir=layout_cache_dir, significance_level=significance_level)
+    else:
+        apply_measure(df_log, log_name, dfg, measure, attr_activity, attr_success, attr_bot, attr_traceID, save_result, round_decimals=2,
+                                    show_edge_labels=True, show_progress=True, max_no_of_edges=150,
+                                    layout_cache_dir=layout_cache_dir, significance_level=significance_level)
+    if profiler is not None:
+        stop_profiler(profiler)
+        print_profile_summary(profiler)
+        save_profile(profiler, profile_dir, log_name + "_" + measure)
+
+if __name__ == "__main__":
+    execute_selected_measures(selected_measure, selected_log, True, preview_sample_size=selected_preview_sample_size,
+                              significance_level=selected_significance_level, group_by=selected_group_by,
+                              group_output=selected_group_output, profile_dir=selected_profile_dir,
+                              cprofile_stages=selected_cprofile_stages, event_store_path=selected_event_store,
+                              event_filter=selected_event_filter, memory_budget=selected_memory_budget,
+                              layout_cache_dir=selected_layout_cache_dir)
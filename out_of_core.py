@@ -0,0 +1,322 @@
+#Out-of-core Measures
+
+#Imports
+import os
+import sys
+import math
+import json
+import tempfile
+import pandas as pd
+from lxml import etree
+from pm4py.util.dt_parsing import parser as dt_parser
+from measures import preprocess_lifecycles, standard_log_configurations
+from sharded_measures import (get_shard_numbers, shard_position_column, compute_partial, save_partial, load_partial,
+                              create_reduction, fold_partial, finish_reduction, compute_sharded_measure,
+                              render_sharded_measure_result, sharded_measure_names)
+from profiling import profiled_stage, report_progress
+
+#Out-of-core execution of the measures on merged logs that do not fit into the memory.
+#The xes file is read trace by trace (without building the whole log) and its events are spilled to partitions on disk
+#by their traceID, so that every trace is in exactly one partition. The partitions are preprocessed and aggregated one
+#at a time into the partial aggregates of sharded_measures.py, and the partials are combined into the results of the
+#measures. The memory used at any time depends on the memory budget, not on the size of the log
+#The memory budget in bytes: the number of partitions is chosen so that one partition can be preprocessed and aggregated
+#within the budget, and the events buffered while reading the xes file take at most half of it
+out_of_core_memory_budget = 512 * 1024 * 1024
+#The estimated memory in bytes needed to preprocess and aggregate the events of one byte of the xes file
+out_of_core_memory_per_xes_byte = 4
+#The estimated memory in bytes of one buffered event while reading the xes file
+out_of_core_bytes_per_buffered_event = 2000
+out_of_core_format_version = 1
+
+#Spilling the xes file to partitions
+def get_xes_attribute_value(element, date_parser):
+    """
+    Gets the typed value of an attribute element of a xes file (like the xes importer of pm4py)
+
+    Returns
+    -----------
+    key, value, is_date
+        The key of the attribute, its value and whether it is a date (None as key for elements that are no attributes)
+    """
+    tag = etree.QName(element).localname
+    key = element.get('key')
+    value = element.get('value')
+    if tag == 'string' or tag == 'id':
+        return key, value, False
+    elif tag == 'date':
+        return key, date_parser.apply(value), True
+    elif tag == 'float':
+        try:
+            return key, float(value), False
+        except ValueError:
+            return None, None, False
+    elif tag == 'int':
+        try:
+            return key, int(value), False
+        except ValueError:
+            return None, None, False
+    elif tag == 'boolean':
+        return key, str(value).lower() == 'true', False
+    elif tag == 'list':
+        return key, None, False
+    return None, None, False
+def flush_partition_buffers(partition_dir, buffers, partitions, date_columns):
+    """
+    Writes the buffered events of every partition as a new chunk of the partition and empties the buffers
+    """
+    for partition_number, rows in buffers.items():
+        if not rows:
+            continue
+        df_chunk = pd.DataFrame(rows)
+        for column in date_columns:
+            if column in df_chunk.columns:
+                df_chunk[column] = pd.to_datetime(df_chunk[column], utc=True)
+        partition = partitions[partition_number]
+        chunk_file = 'partition_' + str(partition_number).zfill(5) + '_' + str(len(partition['chunks'])).zfill(5) + '.pkl'
+        df_chunk.to_pickle(os.path.join(partition_dir, chunk_file))
+        partition['chunks'].append(chunk_file)
+        partition['no_of_events'] = partition['no_of_events'] + len(rows)
+        rows.clear()
+@profiled_stage('partition_xes_log')
+def partition_xes_log(path, partition_dir, attr_traceID, memory_budget=out_of_core_memory_budget, no_of_partitions=None,
+                      show_progress=True):
+    """
+    Reads a xes log trace by trace and spills its events to partitions on disk by their traceID.
+    Every partition consists of chunks (pickled dataframes with the columns of pm4py's dataframe of the log, i.e. the
+    event attributes and the trace attributes prefixed with 'case:', and the position of every event in the log)
+
+    Parameters
+    -----------
+    path
+        The path to the xes log
+    partition_dir
+        The folder the partitions and their manifest ('partitions.json') are written to
+    attr_traceID
+        The name/key of the attribute in the log which contains the traceID,
+        i.e. the identifier that matches every event to a specific trace. Example value: 'docid_uuid'
+    memory_budget
+        The memory budget in bytes
+    no_of_partitions
+        The number of partitions (by default chosen by the size of the xes file and the memory budget)
+    show_progress
+        Whether a progress update every 100000 events should be printed out or not
+
+    Returns
+    -----------
+    manifest
+        The manifest of the partitions as dictionary
+    """
+    if no_of_partitions is None:
+        no_of_partitions = max(1, math.ceil(os.path.getsize(path) * out_of_core_memory_per_xes_byte / memory_budget))
+    max_buffered_events = max(1000, memory_budget // 2 // out_of_core_bytes_per_buffered_event)
+    os.makedirs(partition_dir, exist_ok=True)
+    partitions = [{'chunks': [], 'partial': 'partial_' + str(partition_number).zfill(5) + '.json', 'no_of_events': 0}
+                  for partition_number in range(no_of_partitions)]
+    buffers = {partition_number: [] for partition_number in range(no_of_partitions)}
+    date_columns = set()
+    date_parser = dt_parser.get()
+
+    no_of_events = 0
+    no_of_buffered_events = 0
+    xes_file = open(path, 'rb')
+    xes_megabytes = os.path.getsize(path) // (1024 * 1024)
+    for _, trace_element in etree.iterparse(xes_file, events=('end',), tag='{*}trace'):
+        trace_attributes = {}
+        event_rows = []
+        for child in trace_element:
+            if etree.QName(child).localname == 'event':
+                row = {}
+                for attribute_element in child:
+                    key, value, is_date = get_xes_attribute_value(attribute_element, date_parser)
+                    if key is not None:
+                        row[key] = value
+                        if is_date:
+                            date_columns.add(key)
+                event_rows.append(row)
+            else:
+                key, value, is_date = get_xes_attribute_value(child, date_parser)
+                if key is not None:
+                    trace_attributes['case:' + key] = value
+                    if is_date:
+                        date_columns.add('case:' + key)
+        if event_rows:
+            shard_numbers = get_shard_numbers(pd.Series([row.get(attr_traceID) for row in event_rows], dtype=object),
+                                              no_of_partitions)
+            for row, partition_number in zip(event_rows, shard_numbers):
+                row.update(trace_attributes)
+                row[shard_position_column] = no_of_events
+                buffers[int(partition_number)].append(row)
+                no_of_events = no_of_events + 1
+                if show_progress and no_of_events % 100000 == 0:
+                    report_progress('partition_xes_log', xes_file.tell() // (1024 * 1024), xes_megabytes,
+                                    "MB of the xes file partitioned")
+            no_of_buffered_events = no_of_buffered_events + len(event_rows)
+        #the parsed trace is removed from the tree, so that the tree does not grow with the log
+        trace_element.clear(keep_tail=True)
+        while trace_element.getprevious() is not None:
+            del trace_element.getparent()[0]
+        if no_of_buffered_events >= max_buffered_events:
+            flush_partition_buffers(partition_dir, buffers, partitions, date_columns)
+            no_of_buffered_events = 0
+    xes_file.close()
+    flush_partition_buffers(partition_dir, buffers, partitions, date_columns)
+
+    manifest = {'format_version': out_of_core_format_version, 'path': path, 'no_of_events': no_of_events,
+                'attr_traceID': attr_traceID, 'partitions': partitions}
+    with open(os.path.join(partition_dir, 'partitions.json'), 'w') as file:
+        json.dump(manifest, file, indent=2)
+    return manifest
+
+#Preprocessing and aggregation of one partition at a time
+@profiled_stage('aggregate_partition')
+def aggregate_partition(partition_dir, manifest, partition_number, attr_activity, attr_success, attr_bot, attr_lifecycle,
+                        attr_timestamp, attr_case='case:concept:name'):
+    """
+    Loads a partition, preprocesses its events (see preprocess_lifecycles) and saves its partial aggregate
+    (see compute_partial in sharded_measures.py) next to it
+
+    Parameters
+    -----------
+    partition_dir
+        The folder with the partitions
+    manifest
+        The manifest of the partitions (see partition_xes_log)
+    partition_number
+        The number of the partition
+    attr_activity
+        The name/key of the attribute in the log which contains the name of an activity. Example value: 'concept:name'
+    attr_success
+        The name/key of the attribute in the log which contains the information
+        whether the event was successfull or not (true / false). Example value: 'success'
+    attr_bot
+        The name/key of the attribute in the log which contains the information
+        whether the event was executed by a bot or not (true / false). Example value: 'bot'
+    attr_lifecycle
+        The name/key of the attribute in the log which contains the lifecycle ('start' or 'complete').
+        Example value: 'lifecycle:transition'
+    attr_timestamp
+        The name/key of the attribute in the log which contains the timestamp. Example value: 'time:timestamp'
+    attr_case
+        The name/key of the attribute that identifies the cases of the directly follows graph. If it is not in the log,
+        the traceID is used
+
+    Returns
+    -----------
+    partial_path
+        The path to the saved partial (None for empty partitions)
+    """
+    partition = manifest['partitions'][partition_number]
+    if partition['no_of_events'] == 0:
+        return None
+    df_log_initial = pd.concat([pd.read_pickle(os.path.join(partition_dir, chunk_file))
+                                for chunk_file in partition['chunks']], ignore_index=True)
+    df_log, dfg = preprocess_lifecycles(df_log_initial, attr_lifecycle, attr_timestamp, show_progress=False)
+    del df_log_initial
+    if attr_case not in df_log.columns:
+        attr_case = manifest['attr_traceID']
+    partial = compute_partial(df_log, manifest['attr_traceID'], attr_activity, attr_success, attr_bot, attr_case)
+    partial_path = os.path.join(partition_dir, partition['partial'])
+    save_partial(partial, partial_path)
+    return partial_path
+@profiled_stage('apply_measures_out_of_core')
+def apply_measures_out_of_core(path, log_name, measure_names, attr_activity, attr_success, attr_bot, attr_traceID,
+                               attr_lifecycle, attr_timestamp, attr_case='case:concept:name',
+                               memory_budget=out_of_core_memory_budget, partition_dir=None, save_result=False,
+                               round_decimals=2, show_edge_labels=True, max_no_of_edges=200, show_progress=True):
+    """
+    Applies measures to a merged xes log without loading the whole log into the memory: the log is spilled to
+    partitions on disk, every partition is preprocessed and aggregated on its own and the partial aggregates are
+    combined into the results of the measures (the same results as apply_measure on the complete log, see
+    sharded_measures.py for the measures that can be computed from the partial aggregates)
+
+    Parameters
+    -----------
+    path
+        The path to the merged xes log
+    log_name
+        The name of the log, used for the file names of the saved results (e.g. 'company')
+    measure_names
+        The names of the measures (see sharded_measure_names)
+    attr_activity
+        The name/key of the attribute in the log which contains the name of an activity. Example value: 'concept:name'
+    attr_success
+        The name/key of the attribute in the log which contains the information
+        whether the event was successfull or not (true / false). Example value: 'success'
+    attr_bot
+        The name/key of the attribute in the log which contains the information
+        whether the event was executed by a bot or not (true / false). Example value: 'bot'
+    attr_traceID
+        The name/key of the attribute in the log which contains the traceID. Example value: 'docid_uuid'
+    attr_lifecycle
+        The name/key of the attribute in the log which contains the lifecycle ('start' or 'complete').
+        Example value: 'lifecycle:transition'
+    attr_timestamp
+        The name/key of the attribute in the log which contains the timestamp. Example value: 'time:timestamp'
+    attr_case
+        The name/key of the attribute that identifies the cases of the directly follows graph
+    memory_budget
+        The memory budget in bytes
+    partition_dir
+        The folder the partitions and partials are written to. If None, a temporary folder is used and deleted afterwards
+    save_result
+        A boolean indicating whether the resulting visualizations or dataframes should be saved or not
+    round_decimals
+        The number of decimals relative values are rounded to before visualization
+    show_edge_labels
+        A boolean indicating whether the labels of the edges of the graph should be displayed or not
+    max_no_of_edges
+        The maximum number of edges shown in the visualization
+    show_progress
+        Whether progress updates should be printed out or not
+
+    Returns
+    -----------
+    outputs
+        A dictionary with the gviz or the result_df of every measure (None for measures that cannot be computed
+        from the partial aggregates)
+    """
+    temporary_dir = None
+    if partition_dir is None:
+        temporary_dir = tempfile.TemporaryDirectory(prefix='partitions_')
+        partition_dir = temporary_dir.name
+    try:
+        manifest = partition_xes_log(path, partition_dir, attr_traceID, memory_budget, show_progress=show_progress)
+        #the partial of every partition is folded into the combined aggregate right away, so that only one partial
+        #is in memory at a time
+        reduced = create_reduction()
+        for partition_number in range(len(manifest['partitions'])):
+            partial_path = aggregate_partition(partition_dir, manifest, partition_number, attr_activity, attr_success,
+                                               attr_bot, attr_lifecycle, attr_timestamp, attr_case)
+            partial = load_partial(partial_path) if partial_path is not None else None
+            if partial is not None:
+                fold_partial(reduced, partial)
+            if show_progress:
+                report_progress('apply_measures_out_of_core', partition_number + 1, len(manifest['partitions']),
+                                "partitions aggregated")
+    finally:
+        if temporary_dir is not None:
+            temporary_dir.cleanup()
+    reduced = finish_reduction(reduced)
+
+    outputs = {}
+    for measure_name in measure_names:
+        is_graphical_measure, measure_result = compute_sharded_measure(reduced, measure_name, round_decimals)
+        if measure_result is None:
+            outputs[measure_name] = None
+            continue
+        outputs[measure_name] = render_sharded_measure_result(is_graphical_measure, measure_result, reduced, log_name,
+                                                              measure_name, save_result=save_result,
+                                                              show_edge_labels=show_edge_labels,
+                                                              max_no_of_edges=max_no_of_edges)
+    return outputs
+
+if __name__ == "__main__":
+    #All measures that can be computed from partial aggregates on the company log with a memory budget of 64 MB
+    #(e.g. 'python3 out_of_core.py 64' for a budget in MB)
+    configuration = standard_log_configurations['company']
+    memory_budget = int(sys.argv[1]) * 1024 * 1024 if len(sys.argv) > 1 else 64 * 1024 * 1024
+    apply_measures_out_of_core(configuration['path'], 'company', sharded_measure_names, configuration['attr_activity'],
+                               configuration['attr_success'], configuration['attr_bot'], configuration['attr_traceID'],
+                               configuration['attr_lifecycle'], configuration['attr_timestamp'],
+                               memory_budget=memory_budget, save_result=True)
@@ -0,0 +1,398 @@
+#Profiling
+
+#Imports
+import os
+import sys
+import json
+import time
+import logging
+import cProfile
+import pstats
+import threading
+import functools
+import inspect
+import contextlib
+import pandas as pd
+
+#Progress reporting
+#The long loops of the parser, the merger and the measures report their progress to the progress reporter, a function
+#with the arguments stage, current, total and unit (e.g. 'merge_logs', 100, 132, 'business process events').
+#The default reporter prints the progress. set_progress_reporter replaces it, e.g. with logging_progress_reporter for
+#production runs or silent_progress_reporter
+progress_logger = logging.getLogger('bot_log_mining')
+def print_progress_reporter(stage, current, total, unit):
+    """
+    Prints the progress (e.g. '100  of  132  business process events')
+    """
+    print(current, " of ", total, " " + unit)
+def logging_progress_reporter(stage, current, total, unit):
+    """
+    Logs the progress with the logger 'bot_log_mining' (level info)
+    """
+    progress_logger.info("%s: %s of %s %s", stage, current, total, unit)
+def silent_progress_reporter(stage, current, total, unit):
+    """
+    Ignores the progress
+    """
+    pass
+progress_reporter = print_progress_reporter
+def set_progress_reporter(reporter):
+    """
+    Sets the function the progress is reported to (see print_progress_reporter) and returns the previous one
+    """
+    global progress_reporter
+    previous_reporter = progress_reporter
+    progress_reporter = reporter
+    return previous_reporter
+def report_progress(stage, current, total, unit):
+    """
+    Reports the progress of a stage to the progress reporter
+
+    Parameters
+    -----------
+    stage
+        The name of the stage (e.g. 'merge_logs')
+    current
+        The number of items processed so far
+    total
+        The total number of items
+    unit
+        The name of the items (e.g. 'paths')
+    """
+    progress_reporter(stage, current, total, unit)
+
+#Profiling of the stages of the pipeline
+#While a profiler is active, every stage (e.g. parsing, merging, preprocessing, every derived column and every measure)
+#is recorded with its start and end, its parent stage, its number of rows and the peak resident set size (RSS) of the
+#process during the stage. A background thread samples the RSS. Stages can be captured with cProfile in addition.
+#Only one profiler is active at a time (current_profiler). Without an active profiler, the stages are not recorded
+#and the instrumentation costs one comparison per stage. Stages that run in worker processes are not recorded
+current_profiler = None
+def get_rss():
+    """
+    Gets the current resident set size of the process in bytes. Outside of Linux, the peak resident set size
+    of the process so far is used instead (None if it is not available either)
+    """
+    try:
+        with open('/proc/self/statm', 'r') as file:
+            return int(file.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        import resource
+        max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        #kilobytes on Linux, bytes on macOS
+        return max_rss if sys.platform == 'darwin' else max_rss * 1024
+    except (ImportError, OSError):
+        return None
+def create_profiler(rss_sampling_interval=0.01, cprofile_stages=None, cprofile_dir="results/profiles/"):
+    """
+    Creates a profiler, which records the stages while it is active (see start_profiler)
+
+    Parameters
+    -----------
+    rss_sampling_interval
+        The number of seconds between two samples of the RSS (None for no sampling, then the RSS is only
+        read at the start and end of every stage)
+    cprofile_stages
+        The names of the stages that are captured with cProfile (e.g. ['merge_logs', 'compute_measure:relative_fails']).
+        A name without ':' captures the stage for all names (e.g. 'compute_measure' for all measures).
+        cProfile captures one stage at a time, so stages nested in a captured stage are not captured separately
+    cprofile_dir
+        The folder the cProfile statistics are saved to ('<stage>_<number>.prof')
+
+    Returns
+    -----------
+    profiler
+        The profiler as dictionary
+    """
+    return {'records': [], 'stacks': {}, 'open_records': [], 'rss_samples': [], 'origin': None, 'lock': threading.Lock(),
+            'rss_sampling_interval': rss_sampling_interval, 'sampler_thread': None, 'stop_event': threading.Event(),
+            'cprofile_stages': set(cprofile_stages or []), 'cprofile_dir': cprofile_dir, 'active_cprofile': None,
+            'pid': os.getpid()}
+def start_profiler(profiler):
+    """
+    Makes the profiler the active profiler and starts the sampling of the RSS
+    """
+    global current_profiler
+    if current_profiler is not None:
+        print("another profiler is already active, it is stopped")
+        stop_profiler(current_profiler)
+    profiler['origin'] = time.perf_counter()
+    profiler['stop_event'].clear()
+    current_profiler = profiler
+    add_rss_sample(profiler)
+    if profiler['rss_sampling_interval'] is not None:
+        profiler['sampler_thread'] = threading.Thread(target=sample_rss, args=(profiler,), daemon=True)
+        profiler['sampler_thread'].start()
+    return profiler
+def stop_profiler(profiler):
+    """
+    Stops the sampling of the RSS and deactivates the profiler. The recorded stages are kept
+    """
+    global current_profiler
+    profiler['stop_event'].set()
+    if profiler['sampler_thread'] is not None:
+        profiler['sampler_thread'].join()
+        profiler['sampler_thread'] = None
+    add_rss_sample(profiler)
+    if current_profiler is profiler:
+        current_profiler = None
+    return profiler
+@contextlib.contextmanager
+def profiling(rss_sampling_interval=0.01, cprofile_stages=None, cprofile_dir="results/profiles/"):
+    """
+    Creates and starts a profiler for the duration of a with block (see create_profiler for the parameters), e.g.
+        with profiling() as profiler:
+            execute_selected_measures(...)
+        print_profile_summary(profiler)
+    """
+    profiler = start_profiler(create_profiler(rss_sampling_interval, cprofile_stages, cprofile_dir))
+    try:
+        yield profiler
+    finally:
+        stop_profiler(profiler)
+def sample_rss(profiler):
+    """
+    Samples the RSS until the profiler is stopped (runs in the sampling thread)
+    """
+    while not profiler['stop_event'].wait(profiler['rss_sampling_interval']):
+        add_rss_sample(profiler)
+def add_rss_sample(profiler):
+    """
+    Reads the RSS, adds it to the samples and updates the peak RSS of the open stages
+    """
+    rss = get_rss()
+    if rss is None:
+        return
+    with profiler['lock']:
+        profiler['rss_samples'].append((time.perf_counter() - profiler['origin'], rss))
+        for record in profiler['open_records']:
+            if record['peak_rss'] is None or rss > record['peak_rss']:
+                record['peak_rss'] = rss
+@contextlib.contextmanager
+def profile_stage(name, rows=None, category='stage'):
+    """
+    Records a stage of the pipeline with the active profiler, e.g.
+        with profile_stage('read_xes'):
+            ...
+    The stages of a thread are nested, i.e. a stage started within another stage is recorded as its child.
+    Without an active profiler, the stage is not recorded
+
+    Parameters
+    -----------
+    name
+        The name of the stage (e.g. 'merge_logs' or 'compute_measure:relative_fails')
+    rows
+        The number of rows (e.g. events) the stage processes. Can also be set later with the record (record['rows'])
+    category
+        The category of the stage (e.g. 'stage', 'measure' or 'derived_column')
+
+    Returns
+    -----------
+    record
+        The record of the stage (None without an active profiler)
+    """
+    profiler = current_profiler
+    if profiler is None:
+        yield None
+        return
+    thread_id = threading.get_ident()
+    with profiler['lock']:
+        stack = profiler['stacks'].setdefault(thread_id, [])
+        record = {'name': name, 'category': category, 'thread': thread_id, 'depth': len(stack),
+                  'parent': stack[-1]['index'] if stack else None, 'index': len(profiler['records']), 'rows': rows,
+                  'start': None, 'end': None, 'seconds': None, 'peak_rss': None, 'start_rss': None,
+                  'cprofile_path': None}
+        profiler['records'].append(record)
+        stack.append(record)
+        profiler['open_records'].append(record)
+    record['start_rss'] = get_rss()
+    add_rss_sample(profiler)
+    cprofile = start_cprofile(profiler, name)
+    record['start'] = time.perf_counter() - profiler['origin']
+    try:
+        yield record
+    finally:
+        record['end'] = time.perf_counter() - profiler['origin']
+        record['seconds'] = record['end'] - record['start']
+        if cprofile is not None:
+            record['cprofile_path'] = stop_cprofile(profiler, cprofile, name)
+        add_rss_sample(profiler)
+        with profiler['lock']:
+            stack.remove(record)
+            profiler['open_records'].remove(record)
+def profiled_stage(stage, category='stage', name_argument=None, rows_argument=None):
+    """
+    Decorator that records every call of a function as stage (see profile_stage), e.g.
+        @profiled_stage('compute_measure', category='measure', name_argument='measure_name', rows_argument='df_log')
+
+    Parameters
+    -----------
+    stage
+        The name of the stage
+    category
+        The category of the stage
+    name_argument
+        The name of an argument of the function whose value is appended to the name of the stage
+        (e.g. 'measure_name' gives 'compute_measure:relative_fails')
+    rows_argument
+        The name of an argument of the function whose length is the number of rows of the stage (e.g. 'df_log')
+    """
+    def decorator(function):
+        signature = inspect.signature(function)
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if current_profiler is None:
+                return function(*args, **kwargs)
+            arguments = signature.bind_partial(*args, **kwargs).arguments
+            name = stage
+            if name_argument is not None and name_argument in arguments:
+                name = stage + ":" + str(arguments[name_argument])
+            rows = None
+            if rows_argument is not None and arguments.get(rows_argument) is not None:
+                rows = len(arguments[rows_argument])
+            with profile_stage(name, rows, category):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorator
+def start_cprofile(profiler, name):
+    """
+    Starts cProfile for a stage, if the stage should be captured and no other stage is captured yet
+    """
+    if name not in profiler['cprofile_stages'] and name.split(":")[0] not in profiler['cprofile_stages']:
+        return None
+    with profiler['lock']:
+        if profiler['active_cprofile'] is not None:
+            return None
+        cprofile = cProfile.Profile()
+        profiler['active_cprofile'] = cprofile
+    cprofile.enable()
+    return cprofile
+def stop_cprofile(profiler, cprofile, name):
+    """
+    Stops cProfile of a stage and saves its statistics
+
+    Returns
+    -----------
+    path
+        The path to the saved statistics (can be read with pstats, see print_cprofile_statistics)
+    """
+    cprofile.disable()
+    with profiler['lock']:
+        profiler['active_cprofile'] = None
+        number = sum(1 for record in profiler['records'] if record['cprofile_path'] is not None)
+    os.makedirs(profiler['cprofile_dir'], exist_ok=True)
+    file_name = "".join(character if character.isalnum() or character in "-_" else "_" for character in name)
+    path = os.path.join(profiler['cprofile_dir'], file_name + "_" + str(number) + ".prof")
+    cprofile.dump_stats(path)
+    return path
+def print_cprofile_statistics(path, sort_by='cumulative', no_of_functions=20):
+    """
+    Prints the functions of a saved cProfile capture that took the most time
+    """
+    pstats.Stats(path).sort_stats(sort_by).print_stats(no_of_functions)
+
+#Outputs of the profiler
+def get_profile_summary(profiler):
+    """
+    Summarizes the recorded stages by name, in the order of their first start
+
+    Parameters
+    -----------
+    profiler
+        The profiler
+
+    Returns
+    -----------
+    df_summary
+        A dataframe with one row per stage name: its depth, the number of calls, the total and the self time in seconds
+        (without the time of the child stages), the number of rows and the throughput (rows per second), and the
+        peak RSS in MB
+    """
+    columns = ['stage', 'category', 'depth', 'calls', 'seconds', 'self_seconds', 'rows', 'rows_per_second', 'peak_rss_mb']
+    records = [record for record in profiler['records'] if record['seconds'] is not None]
+    if len(records) == 0:
+        return pd.DataFrame(columns=columns)
+    child_seconds = {}
+    for record in records:
+        if record['parent'] is not None:
+            child_seconds[record['parent']] = child_seconds.get(record['parent'], 0) + record['seconds']
+    df_records = pd.DataFrame({
+        'stage': [record['name'] for record in records],
+        'category': [record['category'] for record in records],
+        'depth': [record['depth'] for record in records],
+        'start': [record['start'] for record in records],
+        'seconds': [record['seconds'] for record in records],
+        'self_seconds': [record['seconds'] - child_seconds.get(record['index'], 0) for record in records],
+        'rows': [record['rows'] for record in records],
+        'peak_rss': [record['peak_rss'] for record in records]})
+    df_summary = df_records.groupby('stage', sort=False).agg(
+        category=('category', 'first'), depth=('depth', 'min'), start=('start', 'min'), calls=('seconds', 'size'),
+        seconds=('seconds', 'sum'), self_seconds=('self_seconds', 'sum'), rows=('rows', lambda rows: rows.sum(min_count=1)),
+        peak_rss=('peak_rss', 'max')).sort_values('start').reset_index()
+    df_summary['rows_per_second'] = df_summary['rows'] / df_summary['seconds']
+    df_summary['peak_rss_mb'] = df_summary['peak_rss'] / 2**20
+    return df_summary[columns]
+def print_profile_summary(profiler, round_decimals=3):
+    """
+    Prints the summary of the recorded stages (see get_profile_summary) as table, child stages are indented
+    """
+    df_summary = get_profile_summary(profiler)
+    print("  " + "stage".ljust(60), "calls".rjust(6), "seconds".rjust(10), "self".rjust(10), "rows".rjust(10),
+          "rows/s".rjust(12), "peak RSS MB".rjust(12))
+    for index, row in df_summary.iterrows():
+        print("  " + ("  " * row['depth'] + row['stage'])[:60].ljust(60), str(row['calls']).rjust(6),
+              "{:10.{}f}".format(row['seconds'], round_decimals), "{:10.{}f}".format(row['self_seconds'], round_decimals),
+              ("" if pd.isna(row['rows']) else str(int(row['rows']))).rjust(10),
+              ("" if pd.isna(row['rows_per_second']) else "{:12.0f}".format(row['rows_per_second'])).rjust(12),
+              ("" if pd.isna(row['peak_rss_mb']) else "{:12.1f}".format(row['peak_rss_mb'])).rjust(12))
+def export_chrome_trace(profiler, path):
+    """
+    Exports the recorded stages and the RSS samples as Chrome trace events (json), which can be opened with
+    chrome://tracing or https://ui.perfetto.dev. Every stage is a complete event ('X') with its rows and peak RSS
+    as arguments, the RSS samples are a counter ('C')
+
+    Parameters
+    -----------
+    profiler
+        The profiler
+    path
+        The path of the json file
+    """
+    thread_numbers = {}
+    trace_events = [{'name': 'process_name', 'ph': 'M', 'pid': profiler['pid'], 'args': {'name': 'bot log mining'}}]
+    for record in profiler['records']:
+        if record['seconds'] is None:
+            continue
+        if record['thread'] not in thread_numbers:
+            thread_numbers[record['thread']] = len(thread_numbers)
+            trace_events.append({'name': 'thread_name', 'ph': 'M', 'pid': profiler['pid'],
+                                 'tid': thread_numbers[record['thread']],
+                                 'args': {'name': 'thread ' + str(thread_numbers[record['thread']])}})
+        arguments = {'rows': record['rows'], 'rows_per_second': None if not record['rows'] or record['seconds'] == 0
+                     else record['rows'] / record['seconds'],
+                     'peak_rss_mb': None if record['peak_rss'] is None else record['peak_rss'] / 2**20}
+        if record['cprofile_path'] is not None:
+            arguments['cprofile_path'] = record['cprofile_path']
+        trace_events.append({'name': record['name'], 'cat': record['category'], 'ph': 'X',
+                             'ts': record['start'] * 10**6, 'dur': record['seconds'] * 10**6, 'pid': profiler['pid'],
+                             'tid': thread_numbers[record['thread']], 'args': arguments})
+    for sample_time, rss in profiler['rss_samples']:
+        trace_events.append({'name': 'RSS', 'ph': 'C', 'ts': sample_time * 10**6, 'pid': profiler['pid'],
+                             'args': {'rss_mb': rss / 2**20}})
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, 'w') as file:
+        json.dump({'traceEvents': trace_events, 'displayTimeUnit': 'ms'}, file)
+def save_profile(profiler, output_dir, name):
+    """
+    Saves the summary of the recorded stages as csv file ('<name>_summary.csv') and the Chrome trace
+    ('<name>_trace.json') to the output folder
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    get_profile_summary(profiler).to_csv(os.path.join(output_dir, name + "_summary.csv"), index=False)
+    export_chrome_trace(profiler, os.path.join(output_dir, name + "_trace.json"))
+    print("Saved profile to", os.path.join(output_dir, name + "_summary.csv"), "and",
+          os.path.join(output_dir, name + "_trace.json"))
@@ -0,0 +1,644 @@
+#Sharded Measures
+
+#Imports
+import os
+import sys
+import json
+import hashlib
+import tempfile
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import numpy as np
+import pandas as pd
+from measures import discover_dfg_from_df, custom_variant_measure_apply, save_gviz, standard_values_for_logs
+from streaming_measures import (create_streaming_state, update_streaming_state_from_df, close_all_traces,
+                                merge_streaming_states, streaming_measure_functions)
+from profiling import profiled_stage
+
+#Map-reduce of the measures over shards of a log that is too large for one machine.
+#The log is split by trace into shards (every trace is in exactly one shard). Every shard is turned into a partial
+#aggregate independently (on any machine), and the reducer combines the partials into the results of the measures.
+#Protocol on the file system (the shard folder can be on a share or copied between machines):
+#   manifest.json       the format version, the attributes of the log and the file names of the shards and partials
+#   shard_<n>.pkl       the events of the shard as pickled dataframe (written by write_shards)
+#   partial_<n>.json    the partial aggregate of the shard (written by compute_shard_partial)
+#A partial aggregate contains
+#   'state'             the accumulators of the streaming measures: per activity (counts, fails, bot and human events,
+#                       execution times, the handover counts 'followed_by' and times until the end), per edge and of
+#                       the trace execution time (see streaming_measures.py)
+#   'activity_index'    per activity the position of its first event in the log and the number of manual events
+#   'dfg'               the counts of the directly follows relations, the start and end activities and the activities
+#   'variants'          per variant (path) the number of traces, failed traces, events, bot events and its first event
+#The positions of the first events restore the order of the activities, edges and variants of the complete log, so the
+#reduced results are the same as the results of apply_measure on the complete log. Only the percentile measures
+#('execution_time_p90', ...) differ slightly: they are estimated with t-digests, which depend on the order in which the
+#durations are added, both on one machine and when the t-digests of the shards are merged
+sharded_format_version = 1
+#The column of the shards that contains the position of every event in the complete log
+shard_position_column = 'log_position'
+#The measures that can be computed from the partials (the graphical measures of the streaming measures and two
+#measures with a dataframe as output)
+sharded_dataframe_measures = ['relative_case_fails', 'automation_rate']
+sharded_measure_names = list(streaming_measure_functions.keys()) + sharded_dataframe_measures
+
+#Sharding of the log
+def get_shard_numbers(trace_ids, no_of_shards):
+    """
+    Assigns every trace to a shard by a stable hash of its traceID (the same on every machine and in every run).
+    Events without traceID are assigned to the first shard
+
+    Parameters
+    -----------
+    trace_ids
+        The traceIDs of the events (series)
+    no_of_shards
+        The number of shards
+
+    Returns
+    -----------
+    shard_numbers
+        A numpy array with the number of the shard of every event
+    """
+    codes, unique_trace_ids = pd.factorize(trace_ids, sort=False)
+    unique_shard_numbers = np.array([int.from_bytes(hashlib.blake2b(str(trace_id).encode('utf-8'), digest_size=8).digest(),
+                                                    'little') % no_of_shards for trace_id in unique_trace_ids],
+                                    dtype=np.int64)
+    shard_numbers = np.zeros(len(codes), dtype=np.int64)
+    shard_numbers[codes >= 0] = unique_shard_numbers[codes[codes >= 0]]
+    return shard_numbers
+def get_manifest(shard_dir):
+    """
+    Reads the manifest of a shard folder (None if there is no manifest of a known format version)
+    """
+    manifest_path = os.path.join(shard_dir, 'manifest.json')
+    if not os.path.exists(manifest_path):
+        print("There is no manifest in", shard_dir)
+        return None
+    with open(manifest_path) as file:
+        manifest = json.load(file)
+    if manifest.get('format_version') != sharded_format_version:
+        print("The shards in", shard_dir, "have the format version", manifest.get('format_version'),
+              "instead of", sharded_format_version)
+        return None
+    return manifest
+@profiled_stage('write_shards', rows_argument='df_log')
+def write_shards(df_log, shard_dir, no_of_shards, attr_traceID, attr_activity, attr_success, attr_bot,
+                 attr_case='case:concept:name'):
+    """
+    Splits a preprocessed log dataframe by trace into shards and writes them and their manifest to a folder.
+    Only the columns the partials need are written
+
+    Parameters
+    -----------
+    df_log
+        The log dataframe (including the columns 'start_timestamp' and 'end_timestamp', see preprocess_lifecycles)
+    shard_dir
+        The folder the shards are written to (e.g. 'results/shards/company')
+    no_of_shards
+        The number of shards
+    attr_traceID
+        The name/key of the attribute in the log which contains the traceID,
+        i.e. the identifier that matches every event to a specific trace. Example value: 'docid_uuid'
+    attr_activity
+        The name/key of the attribute in the log which contains the name of an activity. Example value: 'concept:name'
+    attr_success
+        The name/key of the attribute in the log which contains the information
+        whether the event was successfull or not (true / false). Example value: 'success'
+    attr_bot
+        The name/key of the attribute in the log which contains the information
+        whether the event was executed by a bot or not (true / false). Example value: 'bot'
+    attr_case
+        The name/key of the attribute that identifies the cases of the directly follows graph (like the dfg of
+        preprocess_lifecycles). If it is not in the log, the traceID is used
+
+    Returns
+    -----------
+    manifest
+        The manifest of the shards as dictionary
+    """
+    if attr_case not in df_log.columns:
+        attr_case = attr_traceID
+    columns = list(dict.fromkeys([attr_traceID, attr_activity, attr_success, attr_bot, attr_case, 'start_timestamp',
+                                  'end_timestamp']))
+    df_shards = df_log[columns].copy()
+    df_shards[shard_position_column] = np.arange(len(df_shards), dtype=np.int64)
+    shard_numbers = get_shard_numbers(df_shards[attr_traceID], no_of_shards)
+
+    os.makedirs(shard_dir, exist_ok=True)
+    shards = []
+    for shard_number in range(no_of_shards):
+        df_shard = df_shards.loc[shard_numbers == shard_number]
+        shard_file = 'shard_' + str(shard_number).zfill(5) + '.pkl'
+        df_shard.to_pickle(os.path.join(shard_dir, shard_file))
+        shards.append({'shard': shard_file, 'partial': 'partial_' + str(shard_number).zfill(5) + '.json',
+                       'no_of_events': len(df_shard)})
+    manifest = {'format_version': sharded_format_version, 'no_of_events': len(df_shards),
+                'attributes': {'attr_traceID': attr_traceID, 'attr_activity': attr_activity,
+                               'attr_success': attr_success, 'attr_bot': attr_bot, 'attr_case': attr_case},
+                'shards': shards}
+    with open(os.path.join(shard_dir, 'manifest.json'), 'w') as file:
+        json.dump(manifest, file, indent=2)
+    return manifest
+
+#Partial aggregates of a shard
+@profiled_stage('compute_partial', rows_argument='df_shard')
+def compute_partial(df_shard, attr_traceID, attr_activity, attr_success, attr_bot, attr_case):
+    """
+    Computes the partial aggregate of a shard (see the description of the partials above)
+
+    Parameters
+    -----------
+    df_shard
+        The events of the shard in the order of the complete log, including the column shard_position_column
+    attr_traceID
+        The name/key of the attribute in the log which contains the traceID. Example value: 'docid_uuid'
+    attr_activity
+        The name/key of the attribute in the log which contains the name of an activity. Example value: 'concept:name'
+    attr_success
+        The name/key of the attribute in the log which contains the information
+        whether the event was successfull or not (true / false). Example value: 'success'
+    attr_bot
+        The name/key of the attribute in the log which contains the information
+        whether the event was executed by a bot or not (true / false). Example value: 'bot'
+    attr_case
+        The name/key of the attribute that identifies the cases of the directly follows graph
+
+    Returns
+    -----------
+    partial
+        The partial aggregate as dictionary
+    """
+    state = create_streaming_state()
+    update_streaming_state_from_df(state, df_shard, attr_traceID, attr_activity, attr_success, attr_bot)
+    close_all_traces(state)
+
+    activities = df_shard[attr_activity].astype(str)
+    positions = df_shard[shard_position_column]
+    first_seen = positions.groupby(activities, sort=False).min()
+    manual = (df_shard[attr_bot] == False).groupby(activities, sort=False).sum()
+    activity_index = {activity: {'first_seen': int(first_seen[activity]), 'manual': int(manual[activity])}
+                      for activity in first_seen.index}
+
+    dfg, start_activities, end_activities, activities_count = discover_dfg_from_df(df_shard, attr_activity, attr_case)
+
+    #the variants like the path column (the activities of a trace joined by commas, in the order of the log)
+    df_traces = df_shard.loc[df_shard[attr_traceID].notna()]
+    trace_groups = df_traces.groupby(attr_traceID, sort=False)
+    df_trace_variants = pd.DataFrame({'path': trace_groups[attr_activity].agg(','.join),
+                                      'failed_traces': (df_traces[attr_success] == False).groupby(df_traces[attr_traceID], sort=False).any(),
+                                      'events': trace_groups.size(),
+                                      'bot_events': (df_traces[attr_bot] == True).groupby(df_traces[attr_traceID], sort=False).sum(),
+                                      'first_seen': trace_groups[shard_position_column].min()})
+    variant_groups = df_trace_variants.groupby('path', sort=False)
+    df_variants = pd.DataFrame({'traces': variant_groups.size(), 'failed_traces': variant_groups['failed_traces'].sum(),
+                                'events': variant_groups['events'].sum(), 'bot_events': variant_groups['bot_events'].sum(),
+                                'first_seen': variant_groups['first_seen'].min()})
+    variants = {path: {key: int(value) for key, value in row.items()} for path, row in df_variants.iterrows()}
+
+    return {'state': state, 'activity_index': activity_index,
+            'dfg': {'dfg': dfg, 'start_activities': start_activities, 'end_activities': end_activities,
+                    'activities_count': activities_count},
+            'variants': variants}
+
+#Serialization of the partials as json (tuple keys, boolean keys and numpy arrays are converted to lists/strings)
+def get_json_tdigest(tdigest):
+    return {'compression': tdigest['compression'], 'means': np.asarray(tdigest['means'], dtype=float).tolist(),
+            'weights': np.asarray(tdigest['weights'], dtype=float).tolist(),
+            'buffer': [float(value) for value in tdigest['buffer']], 'count': int(tdigest['count']),
+            'min': float(tdigest['min']), 'max': float(tdigest['max'])}
+def get_tdigest_from_json(data):
+    return {'compression': data['compression'], 'means': np.array(data['means'], dtype=float),
+            'weights': np.array(data['weights'], dtype=float), 'buffer': list(data['buffer']), 'count': data['count'],
+            'min': data['min'], 'max': data['max']}
+def get_json_partial(partial):
+    """
+    Converts a partial aggregate to a dictionary that can be saved as json
+    """
+    state = partial['state']
+    activities = {}
+    for activity, activity_state in state['activities'].items():
+        json_activity_state = {key: value for key, value in activity_state.items() if not key.endswith('_tdigest')}
+        json_activity_state['time_until_end_success'] = {str(key).lower(): value for key, value
+                                                         in activity_state['time_until_end_success'].items()}
+        for key in ['exe_time_tdigest', 'exe_time_appr_tdigest', 'time_until_end_tdigest']:
+            json_activity_state[key] = get_json_tdigest(activity_state[key])
+        activities[activity] = json_activity_state
+    return {'format_version': sharded_format_version,
+            'state': {'activities': activities,
+                      'edges': [[edge[0], edge[1], edge_state] for edge, edge_state in state['edges'].items()],
+                      'trace_execution_time': state['trace_execution_time'], 'closed_traces': state['closed_traces']},
+            'activity_index': partial['activity_index'],
+            'dfg': {'dfg': [[edge[0], edge[1], count] for edge, count in partial['dfg']['dfg'].items()],
+                    'start_activities': partial['dfg']['start_activities'],
+                    'end_activities': partial['dfg']['end_activities'],
+                    'activities_count': partial['dfg']['activities_count']},
+            'variants': partial['variants']}
+def get_partial_from_json(data):
+    """
+    Converts a partial aggregate read from json back to its dictionary (see get_json_partial)
+    """
+    activities = {}
+    for activity, json_activity_state in data['state']['activities'].items():
+        activity_state = dict(json_activity_state)
+        activity_state['time_until_end_success'] = {key == 'true': value for key, value
+                                                    in json_activity_state['time_until_end_success'].items()}
+        for key in ['exe_time_tdigest', 'exe_time_appr_tdigest', 'time_until_end_tdigest']:
+            activity_state[key] = get_tdigest_from_json(json_activity_state[key])
+        activities[activity] = activity_state
+    state = create_streaming_state()
+    state['activities'] = activities
+    state['edges'] = {(source, target): edge_state for source, target, edge_state in data['state']['edges']}
+    state['trace_execution_time'] = data['state']['trace_execution_time']
+    state['closed_traces'] = data['state']['closed_traces']
+    return {'state': state, 'activity_index': data['activity_index'],
+            'dfg': {'dfg': {(source, target): count for source, target, count in data['dfg']['dfg']},
+                    'start_activities': data['dfg']['start_activities'],
+                    'end_activities': data['dfg']['end_activities'],
+                    'activities_count': data['dfg']['activities_count']},
+            'variants': data['variants']}
+def save_partial(partial, path):
+    """
+    Saves a partial aggregate as json file. The file is written under a temporary name first, so that a reducer never
+    reads a partial that is only partly written
+    """
+    temporary_path = path + '.tmp'
+    with open(temporary_path, 'w') as file:
+        json.dump(get_json_partial(partial), file)
+    os.replace(temporary_path, path)
+def load_partial(path):
+    """
+    Loads a partial aggregate from a json file (None if it has an unknown format version)
+    """
+    with open(path) as file:
+        data = json.load(file)
+    if data.get('format_version') != sharded_format_version:
+        print("The partial", path, "has the format version", data.get('format_version'), "instead of",
+              sharded_format_version)
+        return None
+    return get_partial_from_json(data)
+def compute_shard_partial(shard_dir, shard_number):
+    """
+    Computes the partial aggregate of a shard of a shard folder and saves it next to the shard
+    (the map step, which can run on any machine that can read and write the shard folder)
+
+    Parameters
+    -----------
+    shard_dir
+        The folder with the manifest and the shards (see write_shards)
+    shard_number
+        The number of the shard
+
+    Returns
+    -----------
+    partial_path
+        The path to the saved partial (None if the manifest cannot be read)
+    """
+    manifest = get_manifest(shard_dir)
+    if manifest is None:
+        return None
+    shard = manifest['shards'][shard_number]
+    df_shard = pd.read_pickle(os.path.join(shard_dir, shard['shard']))
+    partial = compute_partial(df_shard, **manifest['attributes'])
+    partial_path = os.path.join(shard_dir, shard['partial'])
+    save_partial(partial, partial_path)
+    return partial_path
+
+#Reduction of the partials
+def get_ordered_dict(dictionary, order_key):
+    """
+    Sorts the items of a dictionary by a key function (stable)
+    """
+    return {key: dictionary[key] for key in sorted(dictionary.keys(), key=order_key)}
+def create_reduction():
+    """
+    Creates an empty combined aggregate, into which the partial aggregates of the shards are folded one at a time
+    (see fold_partial), so that only one partial has to be kept in memory besides the combined aggregate
+    """
+    return {'state': create_streaming_state(), 'activity_index': {},
+            'dfg': {'dfg': {}, 'start_activities': {}, 'end_activities': {}, 'activities_count': {}},
+            'variants': {}}
+def fold_partial(reduced, partial):
+    """
+    Folds the partial aggregate of a shard into the combined aggregate (the reduce step)
+
+    Parameters
+    -----------
+    reduced
+        The combined aggregate (see create_reduction), which is updated in place
+    partial
+        The partial aggregate of a shard (see compute_partial)
+
+    Returns
+    -----------
+    reduced
+        The updated combined aggregate
+    """
+    merge_streaming_states(reduced['state'], partial['state'])
+    activity_index = reduced['activity_index']
+    for activity, index in partial['activity_index'].items():
+        if activity not in activity_index:
+            activity_index[activity] = {'first_seen': index['first_seen'], 'manual': 0}
+        activity_index[activity]['first_seen'] = min(activity_index[activity]['first_seen'], index['first_seen'])
+        activity_index[activity]['manual'] = activity_index[activity]['manual'] + index['manual']
+    for key in ['dfg', 'start_activities', 'end_activities', 'activities_count']:
+        counts = reduced['dfg'][key]
+        for counted, count in partial['dfg'][key].items():
+            counts[counted] = counts.get(counted, 0) + count
+    variants = reduced['variants']
+    for path, variant in partial['variants'].items():
+        if path not in variants:
+            variants[path] = {'traces': 0, 'failed_traces': 0, 'events': 0, 'bot_events': 0,
+                              'first_seen': variant['first_seen']}
+        for key in ['traces', 'failed_traces', 'events', 'bot_events']:
+            variants[path][key] = variants[path][key] + variant[key]
+        variants[path]['first_seen'] = min(variants[path]['first_seen'], variant['first_seen'])
+    return reduced
+@profiled_stage('finish_reduction')
+def finish_reduction(reduced):
+    """
+    Orders the activities, edges and variants of the combined aggregate like in the complete log, i.e. by the position
+    of their first event, after all partial aggregates were folded into it
+
+    Parameters
+    -----------
+    reduced
+        The combined aggregate (see fold_partial)
+
+    Returns
+    -----------
+    reduced
+        The combined aggregate, in the same format as a partial aggregate
+    """
+    state = reduced['state']
+    #the activities are numbered in the order of their first event, like the activity codes of discover_dfg_from_df
+    activity_order = {activity: index['first_seen'] for activity, index in reduced['activity_index'].items()}
+    get_activity_order = lambda activity: activity_order.get(str(activity), np.inf)
+    get_edge_order = lambda edge: (get_activity_order(edge[0]), get_activity_order(edge[1]))
+    state['activities'] = get_ordered_dict(state['activities'], get_activity_order)
+    state['edges'] = get_ordered_dict(state['edges'], get_edge_order)
+    variants = reduced['variants']
+    return {'state': state, 'activity_index': get_ordered_dict(reduced['activity_index'], get_activity_order),
+            'dfg': {'dfg': get_ordered_dict(reduced['dfg']['dfg'], get_edge_order),
+                    'start_activities': get_ordered_dict(reduced['dfg']['start_activities'], get_activity_order),
+                    'end_activities': get_ordered_dict(reduced['dfg']['end_activities'], get_activity_order),
+                    'activities_count': get_ordered_dict(reduced['dfg']['activities_count'], get_activity_order)},
+            'variants': get_ordered_dict(variants, lambda path: variants[path]['first_seen'])}
+@profiled_stage('reduce_partials')
+def reduce_partials(partials):
+    """
+    Combines the partial aggregates of all shards of a log (the reduce step). The activities, edges and variants are
+    ordered like in the complete log, i.e. by the position of their first event
+
+    Parameters
+    -----------
+    partials
+        The partial aggregates of the shards (see compute_partial), e.g. a generator that loads them one at a time
+
+    Returns
+    -----------
+    reduced
+        The combined aggregate, in the same format as a partial aggregate
+    """
+    reduced = create_reduction()
+    for partial in partials:
+        fold_partial(reduced, partial)
+    return finish_reduction(reduced)
+def reduce_shard_dir(shard_dir):
+    """
+    Loads the partial aggregates of all shards of a shard folder and combines them
+
+    Parameters
+    -----------
+    shard_dir
+        The folder with the manifest, the shards and their partials
+
+    Returns
+    -----------
+    reduced
+        The combined aggregate (None if a partial is missing or cannot be read)
+    """
+    manifest = get_manifest(shard_dir)
+    if manifest is None:
+        return None
+    partial_paths = [os.path.join(shard_dir, shard['partial']) for shard in manifest['shards']]
+    missing_partials = [partial_path for partial_path in partial_paths if not os.path.exists(partial_path)]
+    if missing_partials:
+        print(len(missing_partials), "of", len(partial_paths), "partials are missing, e.g.", missing_partials[0])
+        return None
+    #the partials are folded into the combined aggregate one at a time instead of loading all of them first
+    reduced = create_reduction()
+    for partial_path in partial_paths:
+        partial = load_partial(partial_path)
+        if partial is None:
+            return None
+        fold_partial(reduced, partial)
+    return finish_reduction(reduced)
+
+#The measures on the combined aggregate
+def sharded_relative_case_fails(reduced, round_decimals=2):
+    """
+    Version of measure_relative_case_fails on the variants of the combined aggregate
+    """
+    paths_list = list(reduced['variants'].keys())
+    fail_rate = []
+    bot_share = []
+    for path in paths_list:
+        variant = reduced['variants'][path]
+        fail_rate.append(str(round(variant['failed_traces'] / variant['traces'] * 100, round_decimals)))
+        bot_share.append(str(round(variant['bot_events'] / variant['events'] * 100, round_decimals)))
+    results_df = pd.DataFrame({'path': paths_list, 'fail rate in %': fail_rate, 'bot share in %': bot_share})
+    results_df.sort_values(by=['fail rate in %'], ascending=False, inplace=True)
+    return results_df, 'relative_case_fails'
+def sharded_automation_rate(reduced, round_decimals=2):
+    """
+    Version of measure_automation_rate on the activity counts of the combined aggregate
+    """
+    activities_list = list(reduced['activity_index'].keys())
+    bot_share_total = []
+    human_share_total = []
+    for activity in activities_list:
+        bot_share_total.append(reduced['state']['activities'][activity]['bot'])
+        human_share_total.append(reduced['activity_index'][activity]['manual'])
+    counts = [reduced['state']['activities'][activity]['count'] for activity in activities_list]
+    results_df = pd.DataFrame(
+                {'activity': activities_list,
+                 'performed by bot': bot_share_total,
+                 'performed by bot in %': [str(round(bot / count * 100, round_decimals))
+                                           for bot, count in zip(bot_share_total, counts)],
+                 'performed manually': human_share_total,
+                 'performed manually in %': [str(round(human / count * 100, round_decimals))
+                                             for human, count in zip(human_share_total, counts)]
+                })
+    results_df.sort_values(by=['performed by bot in %'], ascending=False, inplace=True)
+    return results_df, 'automation_rate'
+def compute_sharded_measure(reduced, measure_name, round_decimals=2):
+    """
+    Computes a measure from the combined aggregate of the shards, like compute_measure on the complete log
+
+    Parameters
+    -----------
+    reduced
+        The combined aggregate (see reduce_partials)
+    measure_name
+        The name of the measure (one of sharded_measure_names, e.g. 'relative_fails')
+    round_decimals
+        The number of decimals relative values are rounded to before visualization
+
+    Returns
+    -----------
+    is_graphical_measure, measure_result
+        Like compute_measure: the labels and coloring for every activity (and None for the edge labels and values)
+        for measures with a dfg visualization or the result_df for measures with a dataframe.
+        The measure_result is None for measures that cannot be computed from the partials
+    """
+    if measure_name in streaming_measure_functions:
+        activity_labeling, activity_coloring, measure = streaming_measure_functions[measure_name](reduced['state'],
+                                                                                                 round_decimals)
+        return True, (activity_labeling, activity_coloring, None, None)
+    elif measure_name == 'relative_case_fails':
+        result_df, measure = sharded_relative_case_fails(reduced, round_decimals)
+        return False, result_df
+    elif measure_name == 'automation_rate':
+        result_df, measure = sharded_automation_rate(reduced, round_decimals)
+        return False, result_df
+    print("The measure", measure_name, "cannot be computed from the partials of the shards")
+    return False, None
+def render_sharded_measure_result(is_graphical_measure, measure_result, reduced, log_name, measure_name,
+                                  save_result=False, show_edge_labels=True, max_no_of_edges=200):
+    """
+    Visualizes the result of a measure computed with compute_sharded_measure on the combined directly follows graph
+    and saves the visualization (.png) or the dataframe (.csv) if desired (like render_measure_result)
+
+    Returns
+    -----------
+    gviz or result_df
+        The gviz for measures with a dfg visualization or the result_df for measures with a dataframe
+    """
+    if is_graphical_measure:
+        activity_labeling, activity_coloring, edges_labeling, edges_values = measure_result
+        #ordered by frequency like value_counts of the activities of the complete log
+        activities_count = pd.Series(reduced['dfg']['activities_count']).sort_values(ascending=False).to_dict()
+        gviz = custom_variant_measure_apply(reduced['dfg']['dfg'], activities_color=activity_coloring,
+                                            activities_labels=activity_labeling, show_edge_labels=show_edge_labels,
+                                            activities_count=activities_count, max_no_of_edges=max_no_of_edges,
+                                            edges_labels=edges_labeling, edges_values=edges_values)
+        if save_result:
+            save_gviz(gviz, "results/measure_outputs/graphs/dfg_" + log_name + '_' + measure_name + '.png')
+        return gviz
+    else:
+        result_df = measure_result
+        if save_result:
+            result_df.to_csv("results/measure_outputs/csvs/df_" + log_name + '_' + measure_name + '.csv', index=False,
+                             sep=';')
+        return result_df
+
+#Local runner: the shards are written to a folder and their partials are computed in a pool of worker processes
+@profiled_stage('run_sharded_measures', rows_argument='df_log')
+def run_sharded_measures(df_log, log_name, measure_names, attr_activity, attr_success, attr_bot, attr_traceID,
+                         attr_case='case:concept:name', no_of_shards=None, shard_dir=None, max_workers=None,
+                         save_result=False, round_decimals=2, show_edge_labels=True, max_no_of_edges=200):
+    """
+    Applies measures to a log with the map-reduce of the shards on the local machine
+
+    Parameters
+    -----------
+    df_log
+        The log dataframe (including the columns 'start_timestamp' and 'end_timestamp', see preprocess_lifecycles)
+    log_name
+        The name of the log, used for the file names of the saved results (e.g. 'company')
+    measure_names
+        The names of the measures (see sharded_measure_names)
+    attr_activity
+        The name/key of the attribute in the log which contains the name of an activity. Example value: 'concept:name'
+    attr_success
+        The name/key of the attribute in the log which contains the information
+        whether the event was successfull or not (true / false). Example value: 'success'
+    attr_bot
+        The name/key of the attribute in the log which contains the information
+        whether the event was executed by a bot or not (true / false). Example value: 'bot'
+    attr_traceID
+        The name/key of the attribute in the log which contains the traceID. Example value: 'docid_uuid'
+    attr_case
+        The name/key of the attribute that identifies the cases of the directly follows graph
+    no_of_shards
+        The number of shards (by default the number of worker processes)
+    shard_dir
+        The folder the shards and partials are written to. If None, a temporary folder is used and deleted afterwards
+    max_workers
+        The number of worker processes computing the partials (by default the number of CPUs)
+    save_result
+        A boolean indicating whether the resulting visualizations or dataframes should be saved or not
+    round_decimals
+        The number of decimals relative values are rounded to before visualization
+    show_edge_labels
+        A boolean indicating whether the labels of the edges of the graph should be displayed or not
+    max_no_of_edges
+        The maximum number of edges shown in the visualization
+
+    Returns
+    -----------
+    outputs
+        A dictionary with the gviz or the result_df of every measure (None for measures that cannot be computed
+        from the partials)
+    """
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    if no_of_shards is None:
+        no_of_shards = max_workers
+    temporary_dir = None
+    if shard_dir is None:
+        temporary_dir = tempfile.TemporaryDirectory(prefix='shards_')
+        shard_dir = temporary_dir.name
+    try:
+        write_shards(df_log, shard_dir, no_of_shards, attr_traceID, attr_activity, attr_success, attr_bot, attr_case)
+        if 'fork' in multiprocessing.get_all_start_methods():
+            pool = ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context('fork'))
+        else:
+            pool = ThreadPoolExecutor(max_workers=max_workers)
+        with pool:
+            list(pool.map(compute_shard_partial, [shard_dir] * no_of_shards, range(no_of_shards)))
+        reduced = reduce_shard_dir(shard_dir)
+    finally:
+        if temporary_dir is not None:
+            temporary_dir.cleanup()
+    if reduced is None:
+        return None
+
+    outputs = {}
+    for measure_name in measure_names:
+        is_graphical_measure, measure_result = compute_sharded_measure(reduced, measure_name, round_decimals)
+        if measure_result is None:
+            outputs[measure_name] = None
+            continue
+        outputs[measure_name] = render_sharded_measure_result(is_graphical_measure, measure_result, reduced, log_name,
+                                                              measure_name, save_result=save_result,
+                                                              show_edge_labels=show_edge_labels,
+                                                              max_no_of_edges=max_no_of_edges)
+    return outputs
+
+if __name__ == "__main__":
+    #On several machines (the shard folder is shared between the machines):
+    #   python3 sharded_measures.py shard company results/shards/company 16
+    #   python3 sharded_measures.py partial results/shards/company 3          (for every shard, on any machine)
+    #   python3 sharded_measures.py reduce results/shards/company company relative_fails automation_rate
+    #On the local machine (without arguments): all measures on the company log with one shard per CPU
+    if len(sys.argv) > 1 and sys.argv[1] == 'shard':
+        df_log, dfg, attr_activity, attr_success, attr_bot, attr_traceID = standard_values_for_logs(sys.argv[2],
+                                                                                                    derived_columns=[])
+        if df_log is not None:
+            write_shards(df_log, sys.argv[3], int(sys.argv[4]), attr_traceID, attr_activity, attr_success, attr_bot)
+    elif len(sys.argv) > 1 and sys.argv[1] == 'partial':
+        print("Saved partial", compute_shard_partial(sys.argv[2], int(sys.argv[3])))
+    elif len(sys.argv) > 1 and sys.argv[1] == 'reduce':
+        reduced = reduce_shard_dir(sys.argv[2])
+        if reduced is not None:
+            for measure_name in sys.argv[4:]:
+                is_graphical_measure, measure_result = compute_sharded_measure(reduced, measure_name)
+                if measure_result is not None:
+                    render_sharded_measure_result(is_graphical_measure, measure_result, reduced, sys.argv[3],
+                                                  measure_name, save_result=True)
+    else:
+        df_log, dfg, attr_activity, attr_success, attr_bot, attr_traceID = standard_values_for_logs('company',
+                                                                                                    derived_columns=[])
+        run_sharded_measures(df_log, 'company', sharded_measure_names, attr_activity, attr_success, attr_bot,
+                             attr_traceID, save_result=True)
@@ -0,0 +1,752 @@
+#Streaming Measures
+
+#Imports
+import pandas as pd
+import numpy as np
+from measures import (get_color_intensity, get_coloring_by_resource, timeFormatter_seconds_input,
+                      custom_variant_measure_apply, save_gviz, create_tdigest, add_value_to_tdigest, merge_tdigests,
+                      get_tdigest_quantile, get_tdigest_quantiles_label, duration_quantiles)
+from profiling import profiled_stage
+
+#Accumulators for the mean and the variance of a stream of values
+#(Welford's online algorithm, two accumulators are merged with the parallel algorithm of Chan et al.)
+def create_welford_state():
+    """
+    Creates an empty accumulator for the mean and the variance of a stream of values
+
+    Returns
+    -----------
+    welford_state
+        A dictionary with the number of values ('n'), their mean ('mean') and the sum of squared
+        differences from the mean ('m2')
+    """
+    return {'n': 0, 'mean': 0.0, 'm2': 0.0}
+def update_welford_state(welford_state, value):
+    """
+    Adds a value to an accumulator (see create_welford_state). Missing values (None or NaN) are skipped
+
+    Parameters
+    -----------
+    welford_state
+        The accumulator, which is updated
+    value
+        The value that is added
+    """
+    if value is None or np.isnan(value):
+        return
+    welford_state['n'] = welford_state['n'] + 1
+    delta = value - welford_state['mean']
+    welford_state['mean'] = welford_state['mean'] + delta / welford_state['n']
+    welford_state['m2'] = welford_state['m2'] + delta * (value - welford_state['mean'])
+def merge_welford_states(welford_state, other_welford_state):
+    """
+    Adds the values of another accumulator to an accumulator (see create_welford_state)
+
+    Parameters
+    -----------
+    welford_state
+        The accumulator, which is updated
+    other_welford_state
+        The accumulator whose values are added
+    """
+    n = welford_state['n'] + other_welford_state['n']
+    if other_welford_state['n'] == 0:
+        return
+    delta = other_welford_state['mean'] - welford_state['mean']
+    welford_state['m2'] = (welford_state['m2'] + other_welford_state['m2'] +
+                           delta * delta * welford_state['n'] * other_welford_state['n'] / n)
+    welford_state['mean'] = welford_state['mean'] + delta * other_welford_state['n'] / n
+    welford_state['n'] = n
+def get_welford_mean(welford_state):
+    """
+    Gets the mean of the values of an accumulator (NaN if there are no values)
+    """
+    if welford_state['n'] == 0:
+        return np.nan
+    return welford_state['mean']
+def get_welford_std(welford_state):
+    """
+    Gets the (sample) standard deviation of the values of an accumulator (NaN if there are less than two values)
+    """
+    if welford_state['n'] < 2:
+        return np.nan
+    return float(np.sqrt(max(welford_state['m2'], 0.0) / (welford_state['n'] - 1)))
+
+#State of the streaming measures
+#The state is updated event by event. Everything that is known when an event arrives (counts, fails, execution times,
+#edges) is added right away. The time until the end of the trace is only known when the trace is closed, so for every
+#open trace only the accumulators of the times the events were left (per activity) and its last event are kept.
+#When the trace is closed, the times until its end are derived from them (time until end = trace end - time left),
+#so the memory of an open trace does not grow with the number of its events
+def create_activity_state():
+    """
+    Creates the accumulators of one activity
+
+    Returns
+    -----------
+    activity_state
+        A dictionary with the counts of events, fails, successes, bot and human events, the accumulators of the
+        exact and approximated execution times, the counts of the resources the activity is followed by and the
+        accumulators of the time until the end of the trace split by success and by the following resource
+        and t-digests of the execution times and the times until the end (all durations in seconds)
+    """
+    return {'count': 0, 'fails': 0, 'successes': 0, 'bot': 0, 'human': 0,
+            'exe_time': create_welford_state(), 'exe_time_appr': create_welford_state(),
+            'followed_by': {'bot': 0, 'human': 0, 'end_of_trace': 0},
+            'time_until_end_success': {True: create_welford_state(), False: create_welford_state()},
+            'time_until_end_followed_by': {'bot': create_welford_state(), 'human': create_welford_state()},
+            'exe_time_tdigest': create_tdigest(), 'exe_time_appr_tdigest': create_tdigest(),
+            'time_until_end_tdigest': create_tdigest()}
+def create_open_activity_state():
+    """
+    Creates the accumulators of the times the events of one activity of an open trace were left (in seconds since the
+    epoch), split like the accumulators of the time until the end of the trace (see create_activity_state)
+
+    Returns
+    -----------
+    open_activity_state
+        A dictionary with a t-digest of the times left, the accumulators split by success and by the following resource
+        and the numbers of events without a time (whose time until the end is 0)
+    """
+    return {'leave_tdigest': create_tdigest(), 'no_leave': 0,
+            'success': {True: create_welford_state(), False: create_welford_state()},
+            'success_no_leave': {True: 0, False: 0},
+            'followed_by': {'bot': create_welford_state(), 'human': create_welford_state()},
+            'followed_by_no_leave': {'bot': 0, 'human': 0}}
+def create_streaming_state():
+    """
+    Creates an empty state of the streaming measures
+
+    Returns
+    -----------
+    state
+        A dictionary with the accumulators of every activity ('activities'), the count and waiting time accumulator of
+        every edge ('edges'), the accumulators of the open traces ('traces') and the accumulator of the trace execution time
+        (weighted by the number of events of a trace, like the trace_execution_time column of the log dataframe)
+    """
+    return {'activities': {}, 'edges': {}, 'traces': {}, 'trace_execution_time': create_welford_state(),
+            'closed_traces': 0}
+def get_timestamp_seconds(timestamp):
+    """
+    Converts a timestamp to seconds since the epoch (None for missing timestamps)
+    """
+    if timestamp is None or pd.isnull(timestamp):
+        return None
+    return pd.Timestamp(timestamp).timestamp()
+def add_event_to_open_trace(trace, event, followed_by):
+    """
+    Adds an event of an open trace, whose following resource is known now, to the accumulators of the trace
+
+    Parameters
+    -----------
+    trace
+        The open trace (see update_streaming_state), which is updated
+    event
+        The event ('activity', 'success' and 'leave_seconds')
+    followed_by
+        By whom the following event was executed ('bot', 'human' or 'end_of_trace')
+    """
+    if event['activity'] not in trace['activities']:
+        trace['activities'][event['activity']] = create_open_activity_state()
+    open_activity_state = trace['activities'][event['activity']]
+    has_success = event['success'] == True or event['success'] == False
+    leave_seconds = event['leave_seconds']
+    if leave_seconds is None:
+        open_activity_state['no_leave'] += 1
+        if has_success:
+            open_activity_state['success_no_leave'][bool(event['success'])] += 1
+        if followed_by != 'end_of_trace':
+            open_activity_state['followed_by_no_leave'][followed_by] += 1
+        return
+    add_value_to_tdigest(open_activity_state['leave_tdigest'], leave_seconds)
+    if has_success:
+        update_welford_state(open_activity_state['success'][bool(event['success'])], leave_seconds)
+    if followed_by != 'end_of_trace':
+        update_welford_state(open_activity_state['followed_by'][followed_by], leave_seconds)
+def clear_leave_times(open_activity_state):
+    """
+    Counts all events of the accumulators of an open trace (see create_open_activity_state) as events without a time,
+    i.e. with a time until the end of 0
+    """
+    open_activity_state['no_leave'] = open_activity_state['no_leave'] + open_activity_state['leave_tdigest']['count']
+    open_activity_state['leave_tdigest'] = create_tdigest()
+    for split in ['success', 'followed_by']:
+        for key, welford_state in open_activity_state[split].items():
+            open_activity_state[split + '_no_leave'][key] = open_activity_state[split + '_no_leave'][key] + welford_state['n']
+            open_activity_state[split][key] = create_welford_state()
+def get_time_until_end_welford_state(leave_welford_state, no_leave, trace_end):
+    """
+    Gets the accumulator of the times until the end of a trace from the accumulator of the times the events were left
+    (the mean is mirrored at the end of the trace, the variance does not change) and the number of events without a time.
+    Negative times until the end are set to 0 (for the mean of the accumulator)
+    """
+    welford_state = {'n': leave_welford_state['n'], 'm2': leave_welford_state['m2'],
+                     'mean': max(trace_end - leave_welford_state['mean'], 0.0)}
+    merge_welford_states(welford_state, {'n': no_leave, 'mean': 0.0, 'm2': 0.0})
+    return welford_state
+def add_time_until_end_to_tdigest(tdigest, leave_tdigest, no_leave, trace_end):
+    """
+    Adds the times until the end of a trace to a t-digest, given the t-digest of the times the events were left
+    and the number of events without a time. Negative times until the end are set to 0
+    """
+    #values that are only buffered are added one by one, like single events
+    for leave_seconds in leave_tdigest['buffer']:
+        add_value_to_tdigest(tdigest, max(trace_end - leave_seconds, 0.0))
+    if len(leave_tdigest['means']) > 0:
+        #the centroids are mirrored at the end of the trace
+        mirrored_tdigest = create_tdigest(leave_tdigest['compression'])
+        mirrored_tdigest['means'] = np.maximum(trace_end - leave_tdigest['means'][::-1], 0.0)
+        mirrored_tdigest['weights'] = leave_tdigest['weights'][::-1]
+        mirrored_tdigest['count'] = leave_tdigest['count'] - len(leave_tdigest['buffer'])
+        mirrored_tdigest['min'] = max(trace_end - leave_tdigest['max'], 0.0)
+        mirrored_tdigest['max'] = max(trace_end - leave_tdigest['min'], 0.0)
+        merge_tdigests(tdigest, mirrored_tdigest)
+    for _ in range(no_leave):
+        add_value_to_tdigest(tdigest, 0.0)
+def update_streaming_state(state, event, attr_traceID, attr_activity, attr_success, attr_bot):
+    """
+    Adds a new event of the merged log to the state of the streaming measures.
+    Events without traceID are treated as traces with a single event
+
+    Parameters
+    -----------
+    state
+        The state of the streaming measures (see create_streaming_state), which is updated
+    event
+        The event as dictionary, containing the attributes of the log and 'start_timestamp' and/or 'end_timestamp'
+    attr_traceID
+        The name/key of the attribute in the log which contains the traceID,
+        i.e. the identifier that matches every event to a specific trace. Example value: 'docid_uuid'
+    attr_activity
+        The name/key of the attribute in the log which contains the name of an activity. Example value: 'concept:name'
+    attr_success
+        The name/key of the attribute in the log which contains the information
+        whether the event was successfull or not (true / false). Example value: 'success'
+    attr_bot
+        The name/key of the attribute in the log which contains the information
+        whether the event was executed by a bot or not (true / false). Example value: 'bot'
+    """
+    activity = str(event[attr_activity])
+    if activity not in state['activities']:
+        state['activities'][activity] = create_activity_state()
+    activity_state = state['activities'][activity]
+    is_bot = event.get(attr_bot) == True
+    resource = 'bot' if is_bot else 'human'
+    success = event.get(attr_success)
+    start_seconds = get_timestamp_seconds(event.get('start_timestamp'))
+    end_seconds = get_timestamp_seconds(event.get('end_timestamp'))
+
+    activity_state['count'] = activity_state['count'] + 1
+    if success == False:
+        activity_state['fails'] = activity_state['fails'] + 1
+    elif success == True:
+        activity_state['successes'] = activity_state['successes'] + 1
+    activity_state[resource] = activity_state[resource] + 1
+    if start_seconds is not None and end_seconds is not None:
+        update_welford_state(activity_state['exe_time'], end_seconds - start_seconds)
+        add_value_to_tdigest(activity_state['exe_time_tdigest'], end_seconds - start_seconds)
+
+    trace_id = event.get(attr_traceID)
+    trace_is_known = trace_id is not None and not pd.isnull(trace_id)
+    if not trace_is_known or trace_id not in state['traces']:
+        state['traces'][trace_id if trace_is_known else None] = {'activities': {}, 'last_event': None, 'events': 0,
+                                                                 'min_start': None, 'min_end': None,
+                                                                 'max_start': None, 'max_end': None}
+    trace = state['traces'][trace_id if trace_is_known else None]
+
+    #the execution time is approximated by the time since the previous event of the trace
+    reference_seconds = start_seconds if start_seconds is not None else end_seconds
+    if trace['last_event'] is not None:
+        previous_event = trace['last_event']
+        previous_activity_state = state['activities'][previous_event['activity']]
+        previous_activity_state['followed_by'][resource] = previous_activity_state['followed_by'][resource] + 1
+        add_event_to_open_trace(trace, previous_event, resource)
+        if reference_seconds is not None and previous_event['reference_seconds'] is not None:
+            update_welford_state(activity_state['exe_time_appr'], reference_seconds - previous_event['reference_seconds'])
+            add_value_to_tdigest(activity_state['exe_time_appr_tdigest'],
+                                 reference_seconds - previous_event['reference_seconds'])
+        edge = (previous_event['activity'], activity)
+        if edge not in state['edges']:
+            state['edges'][edge] = {'count': 0, 'waiting_time': create_welford_state()}
+        state['edges'][edge]['count'] = state['edges'][edge]['count'] + 1
+        arrive_seconds = start_seconds if start_seconds is not None else end_seconds
+        if arrive_seconds is not None and previous_event['leave_seconds'] is not None:
+            update_welford_state(state['edges'][edge]['waiting_time'],
+                                 max(arrive_seconds - previous_event['leave_seconds'], 0))
+
+    #only the last event is kept, until it is known by whom it is followed
+    trace['last_event'] = {'activity': activity, 'success': success, 'reference_seconds': reference_seconds,
+                           'leave_seconds': end_seconds if end_seconds is not None else start_seconds}
+    trace['events'] = trace['events'] + 1
+    for key, value, is_min in [('min_start', start_seconds, True), ('min_end', end_seconds, True),
+                               ('max_start', start_seconds, False), ('max_end', end_seconds, False)]:
+        if value is not None and (trace[key] is None or (value < trace[key] if is_min else value > trace[key])):
+            trace[key] = value
+
+    if not trace_is_known:
+        close_trace(state, None)
+def close_trace(state, trace_id):
+    """
+    Closes a trace, i.e. the times until the end of the trace are calculated from the accumulators of the trace and
+    added to the accumulators of the activities. Afterwards the accumulators of the trace are removed. Events that
+    arrive later for the same traceID start a new trace
+
+    Parameters
+    -----------
+    state
+        The state of the streaming measures (see create_streaming_state), which is updated
+    trace_id
+        The traceID of the trace that is closed
+    """
+    trace = state['traces'].pop(trace_id, None)
+    if trace is None:
+        return
+    #like the trace_start and trace_end columns: if only complete (start) events are known, the end (start)
+    #timestamps are used instead
+    trace_start = trace['min_start'] if trace['min_start'] is not None else trace['min_end']
+    trace_end = trace['max_end'] if trace['max_end'] is not None else trace['max_start']
+    if trace['last_event'] is not None:
+        state['activities'][trace['last_event']['activity']]['followed_by']['end_of_trace'] += 1
+        add_event_to_open_trace(trace, trace['last_event'], 'end_of_trace')
+    for activity, open_activity_state in trace['activities'].items():
+        #events without traceID and traces without timestamps have a time until the end of 0
+        if trace_id is None or trace_end is None:
+            clear_leave_times(open_activity_state)
+        activity_end = trace_end if trace_end is not None else 0.0
+        activity_state = state['activities'][activity]
+        add_time_until_end_to_tdigest(activity_state['time_until_end_tdigest'], open_activity_state['leave_tdigest'],
+                                      open_activity_state['no_leave'], activity_end)
+        for key in [True, False]:
+            merge_welford_states(activity_state['time_until_end_success'][key],
+                                 get_time_until_end_welford_state(open_activity_state['success'][key],
+                                                                  open_activity_state['success_no_leave'][key],
+                                                                  activity_end))
+        for key in ['bot', 'human']:
+            merge_welford_states(activity_state['time_until_end_followed_by'][key],
+                                 get_time_until_end_welford_state(open_activity_state['followed_by'][key],
+                                                                  open_activity_state['followed_by_no_leave'][key],
+                                                                  activity_end))
+    if trace_id is not None and trace_start is not None and trace_end is not None:
+        merge_welford_states(state['trace_execution_time'],
+                             {'n': trace['events'], 'mean': trace_end - trace_start, 'm2': 0.0})
+    state['closed_traces'] = state['closed_traces'] + 1
+def close_all_traces(state):
+    """
+    Closes all open traces of the state (e.g. at the end of a log)
+
+    Parameters
+    -----------
+    state
+        The state of the streaming measures (see create_streaming_state), which is updated
+    """
+    for trace_id in list(state['traces'].keys()):
+        close_trace(state, trace_id)
+def merge_streaming_states(state, other_state):
+    """
+    Adds the accumulators of another state to a state, e.g. to combine the states of several partitions of a log.
+    The partitions have to be split by trace, i.e. an open trace must not be in both states
+
+    Parameters
+    -----------
+    state
+        The state of the streaming measures (see create_streaming_state), which is updated
+    other_state
+        The state whose accumulators are added
+    """
+    for activity, other_activity_state in other_state['activities'].items():
+        if activity not in state['activities']:
+            state['activities'][activity] = create_activity_state()
+        activity_state = state['activities'][activity]
+        for key in ['count', 'fails', 'successes', 'bot', 'human']:
+            activity_state[key] = activity_state[key] + other_activity_state[key]
+        merge_welford_states(activity_state['exe_time'], other_activity_state['exe_time'])
+        merge_welford_states(activity_state['exe_time_appr'], other_activity_state['exe_time_appr'])
+        for key in ['exe_time_tdigest', 'exe_time_appr_tdigest', 'time_until_end_tdigest']:
+            merge_tdigests(activity_state[key], other_activity_state[key])
+        for key in ['bot', 'human', 'end_of_trace']:
+            activity_state['followed_by'][key] = activity_state['followed_by'][key] + other_activity_state['followed_by'][key]
+        for key in [True, False]:
+            merge_welford_states(activity_state['time_until_end_success'][key],
+                                 other_activity_state['time_until_end_success'][key])
+        for key in ['bot', 'human']:
+            merge_welford_states(activity_state['time_until_end_followed_by'][key],
+                                 other_activity_state['time_until_end_followed_by'][key])
+    for edge, other_edge_state in other_state['edges'].items():
+        if edge not in state['edges']:
+            state['edges'][edge] = {'count': 0, 'waiting_time': create_welford_state()}
+        state['edges'][edge]['count'] = state['edges'][edge]['count'] + other_edge_state['count']
+        merge_welford_states(state['edges'][edge]['waiting_time'], other_edge_state['waiting_time'])
+    for trace_id, trace in other_state['traces'].items():
+        if trace_id in state['traces']:
+            print("trace", trace_id, "is open in both states, the events of the other state are not merged")
+            continue
+        state['traces'][trace_id] = trace
+    merge_welford_states(state['trace_execution_time'], other_state['trace_execution_time'])
+    state['closed_traces'] = state['closed_traces'] + other_state['closed_traces']
+@profiled_stage('update_streaming_state_from_df', rows_argument='df_log')
+def update_streaming_state_from_df(state, df_log, attr_traceID, attr_activity, attr_success, attr_bot):
+    """
+    Adds all events of a log dataframe (in the order of the dataframe) to the state of the streaming measures.
+    The traces are not closed
+
+    Parameters
+    -----------
+    state
+        The state of the streaming measures (see create_streaming_state), which is updated
+    df_log
+        The log dataframe (including the columns 'start_timestamp' and 'end_timestamp')
+    attr_traceID
+        The name/key of the attribute in the log which contains the traceID. Example value: 'docid_uuid'
+    attr_activity
+        The name/key of the attribute in the log which contains the name of an activity. Example value: 'concept:name'
+    attr_success
+        The name/key of the attribute in the log which contains the information
+        whether the event was successfull or not (true / false). Example value: 'success'
+    attr_bot
+        The name/key of the attribute in the log which contains the information
+        whether the event was executed by a bot or not (true / false). Example value: 'bot'
+    """
+    columns = [attr_traceID, attr_activity, attr_success, attr_bot, 'start_timestamp', 'end_timestamp']
+    for values in zip(*[df_log[column].tolist() for column in columns]):
+        update_streaming_state(state, dict(zip(columns, values)), attr_traceID, attr_activity, attr_success, attr_bot)
+
+#Reading the measures from the state (in O(activities), with the same labels and coloring as the measures in measures.py)
+def get_streaming_performed_by(activity_state):
+    """
+    Gets by whom an activity was performed ('manual_and_bot', 'bot_only' or 'manual_only')
+    """
+    if activity_state['bot'] > 0 and activity_state['human'] > 0:
+        return "manual_and_bot"
+    elif activity_state['bot'] > 0:
+        return "bot_only"
+    return "manual_only"
+def format_streaming_value(value, value_format, round_decimals=2):
+    """
+    Formats a measure value for the label of an activity: special values (strings) are kept,
+    relative values are shown in percent ('percent') and durations in days, hours, minutes and seconds ('time')
+    """
+    if isinstance(value, str):
+        return value
+    if value_format == 'percent':
+        return str(round(value*100, round_decimals)) + " %"
+    return timeFormatter_seconds_input(value)
+def get_streaming_labels_and_coloring(state, values, labels_values, value_format, round_decimals=2, prefixes=None):
+    """
+    Gets the labels and coloring of the activities: the coloring depends on values, the labels show labels_values
+
+    Parameters
+    -----------
+    state
+        The state of the streaming measures
+    values
+        For every activity the value the color intensity is calculated from
+    labels_values
+        For every activity a list of the values shown in the label
+    value_format
+        'percent' or 'time' (see format_streaming_value)
+    round_decimals
+        The number of decimals relative values are rounded to
+    prefixes
+        For every value in the labels a prefix (e.g. 'fail: '). If None, no prefixes are used
+
+    Returns
+    -----------
+    labels, coloring
+        The labels and coloring for every activity
+    """
+    performed_by = {activity: get_streaming_performed_by(activity_state)
+                    for activity, activity_state in state['activities'].items()}
+    coloring = get_coloring_by_resource(performed_by, get_color_intensity(values))
+    labels = {}
+    for activity, activity_labels_values in labels_values.items():
+        label_lines = [activity]
+        for position, value in enumerate(activity_labels_values):
+            prefix = prefixes[position] if prefixes is not None else ""
+            label_lines.append(prefix + format_streaming_value(value, value_format, round_decimals))
+        labels[activity] = "\n".join(label_lines)
+    return labels, coloring
+def streaming_relative_fails(state, round_decimals=2):
+    """
+    Streaming version of measure_relative_fails
+    """
+    fail_rates = {}
+    for activity, activity_state in state['activities'].items():
+        if activity_state['fails'] == 0:
+            fail_rates[activity] = "no fails"
+        elif activity_state['fails'] == activity_state['count']:
+            fail_rates[activity] = "only fails"
+        else:
+            fail_rates[activity] = activity_state['fails'] / activity_state['count']
+    labels, coloring = get_streaming_labels_and_coloring(state, fail_rates, {activity: [value] for activity, value in
+                                                                           fail_rates.items()}, 'percent', round_decimals)
+    return labels, coloring, 'relative fails'
+def streaming_exception_time_impact(state):
+    """
+    Streaming version of measure_exception_time_impact (only closed traces contribute to the times until the end)
+    """
+    exception_time_impact = {}
+    for activity, activity_state in state['activities'].items():
+        if activity_state['fails'] == 0:
+            exception_time_impact[activity] = "no fails"
+        elif activity_state['successes'] == 0:
+            exception_time_impact[activity] = "only fails"
+        else:
+            eti_value = (get_welford_mean(activity_state['time_until_end_success'][False]) -
+                         get_welford_mean(activity_state['time_until_end_success'][True]))
+            exception_time_impact[activity] = "no data" if np.isnan(eti_value) else eti_value
+    labels, coloring = get_streaming_labels_and_coloring(state, exception_time_impact,
+                                                         {activity: [value] for activity, value in
+                                                          exception_time_impact.items()}, 'time')
+    return labels, coloring, 'exception time impact'
+def streaming_exception_time_variance(state):
+    """
+    Streaming version of measure_exception_time_variance (only closed traces contribute to the times until the end)
+    """
+    variance_no_fail = {}
+    variance_fail = {}
+    variance_diff = {}
+    for activity, activity_state in state['activities'].items():
+        std_fails = get_welford_std(activity_state['time_until_end_success'][False])
+        std_no_fails = get_welford_std(activity_state['time_until_end_success'][True])
+        if activity_state['fails'] == 0:
+            variance_no_fail[activity] = std_no_fails
+            variance_fail[activity] = "no fails"
+            variance_diff[activity] = "no fails"
+        elif activity_state['successes'] == 0:
+            variance_no_fail[activity] = "only fails"
+            variance_fail[activity] = std_fails
+            variance_diff[activity] = "only fails"
+        else:
+            variance_fail[activity] = std_fails
+            variance_no_fail[activity] = std_no_fails
+            var_diff_value = std_fails - std_no_fails
+            variance_diff[activity] = 0 if np.isnan(var_diff_value) else var_diff_value
+    labels, coloring = get_streaming_labels_and_coloring(state, variance_diff,
+                                                         {activity: [variance_no_fail[activity], variance_fail[activity]]
+                                                          for activity in variance_diff}, 'time',
+                                                         prefixes=["no fail: ", "fail: "])
+    return labels, coloring, 'exception_time_variance'
+def streaming_relative_execution_time(state, round_decimals=2):
+    """
+    Streaming version of measure_relative_execution_time (only closed traces contribute to the trace execution time)
+    """
+    relative_execution_time = {}
+    labels_values = {}
+    mean_exe_time_process = get_welford_mean(state['trace_execution_time'])
+    for activity, activity_state in state['activities'].items():
+        #exact execution times are used if there is at least one, otherwise the approximated execution times
+        approximated = activity_state['exe_time']['n'] == 0
+        if approximated:
+            mean_exe_time_activity = get_welford_mean(activity_state['exe_time_appr'])
+        else:
+            mean_exe_time_activity = get_welford_mean(activity_state['exe_time'])
+        if np.isnan(mean_exe_time_activity) or np.isnan(mean_exe_time_process) or mean_exe_time_process == 0:
+            relative_execution_time[activity] = "no data"
+            labels_values[activity] = ["no data"]
+        else:
+            relative_execution_time[activity] = mean_exe_time_activity / mean_exe_time_process
+            value_str = format_streaming_value(relative_execution_time[activity], 'percent', round_decimals)
+            labels_values[activity] = ["appr. " + value_str if approximated else value_str]
+    labels, coloring = get_streaming_labels_and_coloring(state, relative_execution_time, labels_values, 'percent',
+                                                         round_decimals)
+    return labels, coloring, 'relative_execution_time'
+def streaming_execution_time_variance(state):
+    """
+    Streaming version of measure_execution_time_variance
+    """
+    execution_time_variance = {}
+    labels_values = {}
+    for activity, activity_state in state['activities'].items():
+        approximated = activity_state['exe_time']['n'] == 0
+        if approximated:
+            std_exe_time_activity = get_welford_std(activity_state['exe_time_appr'])
+        else:
+            std_exe_time_activity = get_welford_std(activity_state['exe_time'])
+        if np.isnan(std_exe_time_activity):
+            execution_time_variance[activity] = "no data"
+            labels_values[activity] = ["no data"]
+        else:
+            execution_time_variance[activity] = std_exe_time_activity
+            value_str = format_streaming_value(std_exe_time_activity, 'time')
+            labels_values[activity] = ["appr. " + value_str if approximated else value_str]
+    labels, coloring = get_streaming_labels_and_coloring(state, execution_time_variance, labels_values, 'time')
+    return labels, coloring, 'execution_time_variance'
+def streaming_bot_human_handover_count(state):
+    """
+    Streaming version of measure_bot_human_handover_count
+    """
+    labels_values = {}
+    for activity, activity_state in state['activities'].items():
+        followed_by_bot = activity_state['followed_by']['bot']
+        followed_by_human = activity_state['followed_by']['human']
+        if followed_by_bot == 0:
+            labels_values[activity] = ["always followed by human"]
+        elif followed_by_human == 0:
+            labels_values[activity] = ["always followed by bot"]
+        else:
+            labels_values[activity] = ["followed by bot: " + str(followed_by_bot) + "\n" + "followed by human: " +
+                                       str(followed_by_human)]
+    labels, coloring = get_streaming_labels_and_coloring(state, {activity: 0.5 for activity in labels_values},
+                                                         labels_values, 'time')
+    return labels, coloring, 'bot_human_handover_count'
+def streaming_bot_human_handover_impact(state):
+    """
+    Streaming version of measure_bot_human_handover_impact (only closed traces contribute to the times until the end)
+    """
+    bot_human_handover_impact = {}
+    for activity, activity_state in state['activities'].items():
+        if activity_state['followed_by']['bot'] == 0:
+            bot_human_handover_impact[activity] = "always followed by human"
+        elif activity_state['followed_by']['human'] == 0:
+            bot_human_handover_impact[activity] = "always followed by bot"
+        else:
+            bhhi_value = (get_welford_mean(activity_state['time_until_end_followed_by']['bot']) -
+                          get_welford_mean(activity_state['time_until_end_followed_by']['human']))
+            bot_human_handover_impact[activity] = "no data" if np.isnan(bhhi_value) else bhhi_value
+    labels, coloring = get_streaming_labels_and_coloring(state, bot_human_handover_impact,
+                                                         {activity: [value] for activity, value in
+                                                          bot_human_handover_impact.items()}, 'time')
+    return labels, coloring, 'bot_human_handover_impact'
+def streaming_bot_human_handover_variance(state):
+    """
+    Streaming version of measure_bot_human_handover_variance (only closed traces contribute to the times until the end)
+    """
+    variance_followed_human = {}
+    variance_followed_bot = {}
+    variance_diff = {}
+    for activity, activity_state in state['activities'].items():
+        followed_by_bot = activity_state['followed_by']['bot']
+        followed_by_human = activity_state['followed_by']['human']
+        std_followed_bot = get_welford_std(activity_state['time_until_end_followed_by']['bot'])
+        std_followed_human = get_welford_std(activity_state['time_until_end_followed_by']['human'])
+        if followed_by_bot == 0 and followed_by_human == 0:
+            variance_followed_human[activity] = "no data"
+            variance_followed_bot[activity] = "no data"
+            variance_diff[activity] = "no data"
+        elif followed_by_bot == 0:
+            variance_followed_human[activity] = std_followed_human
+            variance_followed_bot[activity] = "always followed by human"
+            variance_diff[activity] = "always followed by human"
+        elif followed_by_human == 0:
+            variance_followed_human[activity] = "always followed by bot"
+            variance_followed_bot[activity] = std_followed_bot
+            variance_diff[activity] = "always followed by bot"
+        elif followed_by_bot == 1:
+            variance_followed_human[activity] = std_followed_human
+            variance_followed_bot[activity] = "once followed by bot"
+            variance_diff[activity] = "once followed by bot"
+        elif followed_by_human == 1:
+            variance_followed_human[activity] = "once followed by human"
+            variance_followed_bot[activity] = std_followed_bot
+            variance_diff[activity] = "once followed by human"
+        else:
+            variance_followed_bot[activity] = std_followed_bot
+            variance_followed_human[activity] = std_followed_human
+            variance_diff[activity] = std_followed_bot - std_followed_human
+    labels, coloring = get_streaming_labels_and_coloring(state, variance_diff,
+                                                         {activity: [variance_followed_human[activity],
+                                                                     variance_followed_bot[activity]]
+                                                          for activity in variance_diff}, 'time',
+                                                         prefixes=["followed by human: ", "followed by bot: "])
+    return labels, coloring, 'bot_human_handover_variance'
+def streaming_execution_time_quantile(state, quantile):
+    """
+    Streaming version of measure_execution_time_quantile
+    """
+    execution_time_quantile = {}
+    labels = {}
+    for activity, activity_state in state['activities'].items():
+        approximated = activity_state['exe_time_tdigest']['count'] == 0
+        tdigest = activity_state['exe_time_appr_tdigest'] if approximated else activity_state['exe_time_tdigest']
+        if tdigest['count'] == 0:
+            execution_time_quantile[activity] = "no data"
+        else:
+            execution_time_quantile[activity] = get_tdigest_quantile(tdigest, quantile / 100)
+        labels[activity] = get_tdigest_quantiles_label(activity, tdigest, approximated)
+    performed_by = {activity: get_streaming_performed_by(activity_state)
+                    for activity, activity_state in state['activities'].items()}
+    coloring = get_coloring_by_resource(performed_by, get_color_intensity(execution_time_quantile))
+    return labels, coloring, 'execution_time_p' + str(quantile)
+def streaming_time_until_end_quantile(state, quantile):
+    """
+    Streaming version of measure_time_until_end_quantile (only closed traces contribute to the times until the end)
+    """
+    time_until_end_quantile = {}
+    labels = {}
+    for activity, activity_state in state['activities'].items():
+        tdigest = activity_state['time_until_end_tdigest']
+        if tdigest['count'] == 0:
+            time_until_end_quantile[activity] = "no data"
+        else:
+            time_until_end_quantile[activity] = get_tdigest_quantile(tdigest, quantile / 100)
+        labels[activity] = get_tdigest_quantiles_label(activity, tdigest)
+    performed_by = {activity: get_streaming_performed_by(activity_state)
+                    for activity, activity_state in state['activities'].items()}
+    coloring = get_coloring_by_resource(performed_by, get_color_intensity(time_until_end_quantile))
+    return labels, coloring, 'time_until_end_p' + str(quantile)
+
+#The streaming measures that can be read from the state
+streaming_measure_functions = {
+    'relative_fails': lambda state, round_decimals: streaming_relative_fails(state, round_decimals),
+    'exception_time_impact': lambda state, round_decimals: streaming_exception_time_impact(state),
+    'exception_time_variance': lambda state, round_decimals: streaming_exception_time_variance(state),
+    'relative_execution_time': lambda state, round_decimals: streaming_relative_execution_time(state, round_decimals),
+    'execution_time_variance': lambda state, round_decimals: streaming_execution_time_variance(state),
+    'bot_human_handover_count': lambda state, round_decimals: streaming_bot_human_handover_count(state),
+    'bot_human_handover_impact': lambda state, round_decimals: streaming_bot_human_handover_impact(state),
+    'bot_human_handover_variance': lambda state, round_decimals: streaming_bot_human_handover_variance(state)
+}
+for quantile in duration_quantiles:
+    streaming_measure_functions['execution_time_p' + str(quantile)] = (
+        lambda state, round_decimals, quantile=quantile: streaming_execution_time_quantile(state, quantile))
+    streaming_measure_functions['time_until_end_p' + str(quantile)] = (
+        lambda state, round_decimals, quantile=quantile: streaming_time_until_end_quantile(state, quantile))
+def get_streaming_dfg(state):
+    """
+    Gets the directly follows graph and the activity counts of the events added to the state so far
+
+    Returns
+    -----------
+    dfg, activities_count
+        The directly follows graph and the number of events of every activity
+    """
+    dfg = {edge: edge_state['count'] for edge, edge_state in state['edges'].items()}
+    activities_count = {activity: activity_state['count'] for activity, activity_state in state['activities'].items()}
+    return dfg, activities_count
+def apply_streaming_measure(state, measure_name, round_decimals=2, show_edge_labels=True, max_no_of_edges=200,
+                            save_path=None):
+    """
+    Reads a graphical measure from the state of the streaming measures and visualizes it on the directly follows graph
+    of the events added so far. Open traces are not closed, i.e. the times until the end only include closed traces
+
+    Parameters
+    -----------
+    state
+        The state of the streaming measures
+    measure_name
+        The name of the measure (a key of streaming_measure_functions, e.g. 'relative_fails')
+    round_decimals
+        The number of decimals relative values are rounded to before visualization
+    show_edge_labels
+        A boolean indicating whether the labels of the edges of the graph should be displayed or not
+    max_no_of_edges
+        The maximum number of edges shown in the visualization
+    save_path
+        If given, the visualization is saved to this path (e.g. 'results/live/dfg_relative_fails.png')
+
+    Returns
+    -----------
+    gviz
+        The visualization of the measure
+    """
+    if measure_name not in streaming_measure_functions:
+        print("unknown streaming measure")
+        return None
+    labels, coloring, measure = streaming_measure_functions[measure_name](state, round_decimals)
+    dfg, activities_count = get_streaming_dfg(state)
+    gviz = custom_variant_measure_apply(dfg, activities_color=coloring, activities_labels=labels,
+                                        show_edge_labels=show_edge_labels, activities_count=activities_count,
+                                        max_no_of_edges=max_no_of_edges)
+    if save_path is not None:
+        save_gviz(gviz, save_path)
+    return gviz
@@ -0,0 +1,233 @@
+#Trace Index
+
+#Imports
+import numpy as np
+import pandas as pd
+from measures import add_derived_columns, discover_dfg_from_df, apply_measure
+from profiling import profiled_stage
+
+#Inverted bitmap index from the attribute values of the events to the traces that contain them
+#Every trace gets a position (in the order in which the traces appear in the log) and for every indexed value a bitmap
+#marks the traces with at least one event with this value. The bitmaps are packed (8 traces per byte, numpy.packbits),
+#so AND/OR/NOT queries are bitwise operations on small arrays instead of scans of the log dataframe.
+#Besides the activity, every dimension is indexed for all events and per activity, so that questions like
+#"which traces failed at activity X" refer to the same event
+#The dimensions of the index and the attributes they are read from ('bot' and 'followed_by' are fixed)
+trace_index_dimensions = ['success', 'followed_by', 'bot', 'resource', 'bot_version']
+@profiled_stage('build_trace_index', rows_argument='df_log')
+def build_trace_index(df_log, attr_traceID, attr_activity, attr_success, attr_bot, attr_eventid='eventId',
+                      attr_resource='org:resource', attr_bot_version='botProcessVersionNumber'):
+    """
+    Builds the inverted bitmap index of a log dataframe. Attributes that are not in the log are not indexed.
+    Events without traceID are not indexed
+
+    Parameters
+    -----------
+    df_log
+        The log dataframe. The derived column 'followed_by' is added, if it is not in the dataframe yet
+    attr_traceID
+        The name/key of the attribute in the log which contains the traceID,
+        i.e. the identifier that matches every event to a specific trace. Example value: 'docid_uuid'
+    attr_activity
+        The name/key of the attribute in the log which contains the name of an activity. Example value: 'concept:name'
+    attr_success
+        The name/key of the attribute in the log which contains the information
+        whether the event was successfull or not (true / false). Example value: 'success'
+    attr_bot
+        The name/key of the attribute in the log which contains the information
+        whether the event was executed by a bot or not (true / false). Example value: 'bot'
+    attr_eventid
+        The name/key of the attribute in the log which contains the unique id of an event. Example value: 'eventid'
+    attr_resource
+        The name/key of the attribute in the log which contains the resource. Example value: 'org:resource'
+    attr_bot_version
+        The name/key of the attribute in the log which contains the version of the bot process.
+        Example value: 'botProcessVersionNumber'
+
+    Returns
+    -----------
+    trace_index
+        A dictionary with the traceIDs in the order of their positions ('trace_ids'), the position of the trace
+        of every event in the dataframe ('event_trace_positions', -1 for events without traceID), the number of
+        traces and the packed bitmaps ('bitmaps') with the keys (dimension, value) and (dimension, value, activity)
+    """
+    add_derived_columns(df_log, ['followed_by'], attr_traceID, attr_activity, attr_eventid, attr_bot)
+    event_trace_positions, trace_ids = pd.factorize(df_log[attr_traceID], sort=False)
+    n_traces = len(trace_ids)
+    indexed = event_trace_positions >= 0
+    activities = df_log[attr_activity].astype(str).to_numpy()
+
+    dimension_columns = {'success': attr_success, 'followed_by': 'followed_by', 'bot': attr_bot,
+                         'resource': attr_resource, 'bot_version': attr_bot_version}
+    bitmaps = {}
+    add_dimension_bitmaps(bitmaps, 'activity', activities[indexed], event_trace_positions[indexed], n_traces)
+    for dimension in trace_index_dimensions:
+        column = dimension_columns[dimension]
+        if column not in df_log.columns:
+            continue
+        values = df_log[column].to_numpy()
+        has_value = indexed & pd.notna(values)
+        add_dimension_bitmaps(bitmaps, dimension, values[has_value], event_trace_positions[has_value], n_traces)
+        add_dimension_bitmaps(bitmaps, dimension, values[has_value], event_trace_positions[has_value], n_traces,
+                              activities[has_value])
+    return {'trace_ids': np.asarray(trace_ids), 'event_trace_positions': event_trace_positions, 'n_traces': n_traces,
+            'bitmaps': bitmaps}
+def add_dimension_bitmaps(bitmaps, dimension, values, trace_positions, n_traces, activities=None):
+    """
+    Adds the bitmaps of all values of a dimension (or of all pairs of value and activity) to the bitmaps of the index
+
+    Parameters
+    -----------
+    bitmaps
+        The bitmaps of the index, which are extended
+    dimension
+        The name of the dimension (e.g. 'success')
+    values
+        The value of every event
+    trace_positions
+        The position of the trace of every event
+    n_traces
+        The number of traces
+    activities
+        The activity of every event. If given, the keys are (dimension, value, activity) instead of (dimension, value)
+    """
+    if activities is None:
+        df_keys = pd.DataFrame({'value': values, 'trace': trace_positions})
+        key_columns = ['value']
+    else:
+        df_keys = pd.DataFrame({'value': values, 'activity': activities, 'trace': trace_positions})
+        key_columns = ['value', 'activity']
+    df_keys = df_keys.drop_duplicates()
+    for key, df_key in df_keys.groupby(key_columns, sort=False):
+        bits = np.zeros(n_traces, dtype=bool)
+        bits[df_key['trace'].to_numpy()] = True
+        key = key if isinstance(key, tuple) else (key,)
+        bitmaps[(dimension,) + tuple(get_index_value(value) for value in key)] = np.packbits(bits)
+def get_index_value(value):
+    """
+    Converts numpy scalars to python values, so that keys like ('success', False) find the bitmaps
+    """
+    return value.item() if isinstance(value, np.generic) else value
+
+#Queries on the index
+def get_trace_bitmap(trace_index, dimension, value, activity=None):
+    """
+    Gets the bitmap of the traces with at least one event with the given value (and activity)
+
+    Parameters
+    -----------
+    trace_index
+        The index (see build_trace_index)
+    dimension
+        'activity' or one of trace_index_dimensions (e.g. 'success')
+    value
+        The value (e.g. False for failed events, 'human' for 'followed_by')
+    activity
+        If given, only events of this activity are considered (not for the dimension 'activity')
+
+    Returns
+    -----------
+    bitmap
+        The packed bitmap of the traces (empty if no trace contains the value)
+    """
+    key = (dimension, value) if activity is None else (dimension, value, activity)
+    if key not in trace_index['bitmaps']:
+        return np.zeros((trace_index['n_traces'] + 7) // 8, dtype=np.uint8)
+    return trace_index['bitmaps'][key]
+def bitmap_and(*bitmaps):
+    """
+    Gets the traces contained in all bitmaps
+    """
+    result = bitmaps[0]
+    for bitmap in bitmaps[1:]:
+        result = np.bitwise_and(result, bitmap)
+    return result
+def bitmap_or(*bitmaps):
+    """
+    Gets the traces contained in at least one of the bitmaps
+    """
+    result = bitmaps[0]
+    for bitmap in bitmaps[1:]:
+        result = np.bitwise_or(result, bitmap)
+    return result
+def bitmap_not(trace_index, bitmap):
+    """
+    Gets the traces not contained in the bitmap (the unused bits of the last byte stay 0)
+    """
+    all_traces = np.packbits(np.ones(trace_index['n_traces'], dtype=bool))
+    return np.bitwise_and(np.invert(bitmap), all_traces)
+def get_bitmap_trace_mask(trace_index, bitmap):
+    """
+    Unpacks a bitmap to a boolean numpy array with one entry per trace position
+    """
+    return np.unpackbits(bitmap, count=trace_index['n_traces']).astype(bool)
+def count_traces(trace_index, bitmap):
+    """
+    Gets the number of traces of a bitmap
+    """
+    return int(get_bitmap_trace_mask(trace_index, bitmap).sum())
+def get_traces(trace_index, bitmap):
+    """
+    Gets the traceIDs of a bitmap (in the order in which the traces appear in the log)
+    """
+    return list(trace_index['trace_ids'][get_bitmap_trace_mask(trace_index, bitmap)])
+def get_sub_log(trace_index, df_log, bitmap):
+    """
+    Gets the events of the traces of a bitmap as log dataframe (the traces are kept whole)
+
+    Parameters
+    -----------
+    trace_index
+        The index (see build_trace_index) of the log dataframe
+    df_log
+        The log dataframe the index was built from
+    bitmap
+        The bitmap of the traces
+
+    Returns
+    -----------
+    df_sub_log
+        The events of the traces (in the order of the log dataframe), including the derived columns of the log
+    """
+    trace_mask = get_bitmap_trace_mask(trace_index, bitmap)
+    event_trace_positions = trace_index['event_trace_positions']
+    event_mask = (event_trace_positions >= 0) & trace_mask[np.maximum(event_trace_positions, 0)]
+    return df_log.loc[event_mask].copy()
+def apply_measure_on_traces(trace_index, df_log, bitmap, log_name, measure_name, attr_activity, attr_success, attr_bot,
+                            attr_traceID, save_result=False, **parameters):
+    """
+    Applies a measure on the sub-log of the traces of a bitmap (e.g. the traces failing at a specific activity).
+    The directly follows graph is discovered from the sub-log
+
+    Parameters
+    -----------
+    trace_index
+        The index (see build_trace_index) of the log dataframe
+    df_log
+        The log dataframe the index was built from
+    bitmap
+        The bitmap of the traces
+    log_name
+        The name of the sub-log, used for the file names of the saved results (e.g. 'company_failed_checks')
+    measure_name
+        The name of the measure which should be applied (e.g. 'relative_fails')
+    attr_activity, attr_success, attr_bot, attr_traceID
+        The names/keys of the attributes in the log (see apply_measure)
+    save_result
+        A boolean indicating whether the resulting visualization or dataframe should be saved or not
+    parameters
+        Further parameters of apply_measure (e.g. max_no_of_edges)
+
+    Returns
+    -----------
+    gviz or result_df
+        The gviz for measures with a dfg visualization or the result_df for measures with a dataframe
+        (None if the bitmap contains no traces)
+    """
+    df_sub_log = get_sub_log(trace_index, df_log, bitmap)
+    if len(df_sub_log) == 0:
+        print("no traces match the query")
+        return None
+    dfg_sub_log = discover_dfg_from_df(df_sub_log, attr_activity, attr_traceID)[0]
+    return apply_measure(df_sub_log, log_name, dfg_sub_log, measure_name, attr_activity, attr_success, attr_bot,
+                         attr_traceID, save_result=save_result, **parameters)